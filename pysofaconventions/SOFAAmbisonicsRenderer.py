@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFAAmbisonicsRenderer.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import numpy as np
+
+from .SOFAError import SOFAError
+from .SOFAConvolver import SOFAConvolver
+from .SOFAResampler import SOFAResampler
+from .SOFASphericalHarmonics import SOFASphericalHarmonics
+
+
+class SOFAAmbisonicsRenderer(object):
+    """
+    Streaming renderer of one AmbisonicsDRIR measurement.
+
+    The input has one channel per emitter (E), and the output is either the
+    Ambisonic signal (R channels) in the requested ordering and normalization,
+    or a binaural signal when a spherical harmonic HRTF decoder is given.
+    The convention conversion and the decoder are folded into the filters
+    beforehand, so that each block costs a single SOFAConvolver block.
+    """
+
+    def __init__(self, sofafile, measurement=0, blockSize=None,
+                 channelOrdering='acn', normalization='sn3d', decoder=None):
+        """
+        :param sofafile:        a SOFAFile with AmbisonicsDRIR data, [M,R,E,N]
+        :param measurement:     index of the measurement to render
+        :param blockSize:       number of samples per block (see SOFAConvolver)
+        :param channelOrdering: ordering of the Ambisonic output ('ACN' or 'FuMa')
+        :param normalization:   normalization of the Ambisonic output ('SN3D', 'N3D' or 'FuMa')
+        :param decoder:         a SOFASphericalHarmonicHRTF, for binaural output
+        :raises:                SOFAError if the data does not match the Ambisonics order,
+                                or if the decoder sampling rate does not match
+        """
+        self.order = self.getAmbisonicsOrder(sofafile)
+        self.samplingRate = SOFAResampler.getFileSamplingRate(sofafile)
+        ir = np.ma.filled(sofafile.getVariableInstance('Data.IR')[measurement], 0.)
+        numCoefficients = SOFASphericalHarmonics.getNumCoefficients(self.order)
+        if ir.shape[0] != numCoefficients:
+            raise SOFAError('Number of receivers does not match AmbisonicsOrder: ' + str(ir.shape[0]))
+
+        sourceOrdering = sofafile.getVariableAttributeValue('Data.IR', 'ChannelOrdering')
+        sourceNormalization = sofafile.getVariableAttributeValue('Data.IR', 'Normalization')
+        if decoder is None:
+            matrix = SOFASphericalHarmonics.getConversionMatrix(self.order, sourceOrdering, sourceNormalization,
+                                                                channelOrdering, normalization)
+            filters = np.tensordot(matrix, ir, axes=(1, 0))
+        else:
+            if decoder.samplingRate != self.samplingRate:
+                raise SOFAError('Decoder sampling rate does not match: ' + str(decoder.samplingRate))
+            matrix = SOFASphericalHarmonics.getConversionMatrix(self.order, sourceOrdering, sourceNormalization)
+            filters = self.getBinauralFilters(np.tensordot(matrix, ir, axes=(1, 0)), decoder.getCoefficientsIR())
+
+        self.convolver = SOFAConvolver(filters, blockSize)
+        self.blockSize = self.convolver.blockSize
+        self.numInputs = self.convolver.numInputs
+        self.numOutputs = self.convolver.numOutputs
+
+    @classmethod
+    def getAmbisonicsOrder(cls, sofafile):
+        """
+        :return:    the AmbisonicsOrder global attribute, as an integer
+        :raises:    SOFAError if the attribute is missing
+        """
+        if 'AmbisonicsOrder' not in sofafile.getGlobalAttributesAsDict():
+            raise SOFAError('Missing AmbisonicsOrder attribute')
+        return int(sofafile.getGlobalAttributeValue('AmbisonicsOrder'))
+
+    @classmethod
+    def getBinauralFilters(cls, ambisonicIR, decoderIR):
+        """
+        Combine Ambisonic impulse responses with a spherical harmonic decoder.
+        Both are expected in ACN/N3D; only the orders present in both are used.
+
+        :param ambisonicIR:     ndarray with shape [Q,E,N]
+        :param decoderIR:       ndarray with shape [Q',R,N'] (see SOFASphericalHarmonicHRTF.getCoefficientsIR)
+        :return:                ndarray with shape [R,E,N+N'-1]
+        """
+        numCoefficients = min(ambisonicIR.shape[0], decoderIR.shape[0])
+        length = ambisonicIR.shape[-1] + decoderIR.shape[-1] - 1
+        ambisonicSpectra = np.fft.rfft(ambisonicIR[:numCoefficients], n=length, axis=-1)
+        decoderSpectra = np.fft.rfft(decoderIR[:numCoefficients], n=length, axis=-1)
+        return np.fft.irfft(np.einsum('qef,qrf->ref', ambisonicSpectra, decoderSpectra), n=length, axis=-1)
+
+    def reset(self):
+        """
+        Clear the convolution state
+        """
+        self.convolver.reset()
+
+    def processBlock(self, block):
+        """
+        :param block:   ndarray with shape [E, blockSize] (or [blockSize] with a single emitter)
+        :return:        ndarray with shape [outputs, blockSize]
+        """
+        return self.convolver.processBlock(block)
+
+    def process(self, signal):
+        """
+        :param signal:  ndarray with shape [E, L], where L is a multiple of blockSize
+        :return:        ndarray with shape [outputs, L]
+        """
+        return self.convolver.process(signal)
+
+    def render(self, signal):
+        """
+        Render a whole signal, including the reverberation tail
+
+        :param signal:  ndarray with shape [E, L] (or [L] with a single emitter)
+        :return:        ndarray with shape [outputs, L + taps - 1]
+        """
+        return self.convolver.convolve(signal)
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFABundle.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import json
+import mmap
+import struct
+
+import netCDF4
+import numpy as np
+
+from .SOFAError import SOFAError
+from .SOFAFIRConverter import SOFAFIRConverter
+from .SOFAFile import SOFAFile
+from .SOFAMemoryFile import SOFAMemoryDataset
+from .SOFAMemoryFile import SOFAMemoryDimension
+from .SOFAMemoryFile import SOFAMemoryVariable
+from .SOFANcFile import SOFANetCDFFile
+from .SOFAWriter import SOFAWriter
+
+
+class SOFABundleDimension(SOFAMemoryDimension):
+    """
+    Dimension of a bundle
+    """
+
+
+class SOFABundleVariable(SOFAMemoryVariable):
+    """
+    Memory-mapped, read-only variable of a bundle
+    """
+
+    __slots__ = ()
+
+    def __init__(self, name, dimensions, data, fillValue, attributes):
+        SOFAMemoryVariable.__init__(self, name, dimensions, data, fillValue, attributes, writable=False)
+
+
+class SOFABundleDataset(SOFAMemoryDataset):
+    """
+    Memory-mapped, read-only bundle
+    """
+
+    __slots__ = ('map',)
+
+    def __init__(self, path):
+        SOFAMemoryDataset.__init__(self, writable=False)
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = SOFABundle.readHeader(self.map)
+        self.__dict__.update(SOFABundle.decodeAttributes(header['attributes']))
+        self.dimensions = dict((name, SOFABundleDimension(name, size))
+                               for name, size in header['dimensions'].items())
+        self.variables = {}
+        for name, description in header['variables'].items():
+            shape = tuple(description['shape'])
+            if 'values' in description:
+                data = np.empty(len(description['values']), dtype=object)
+                data[:] = description['values']
+                data = data.reshape(shape)
+            else:
+                dtype = np.dtype(description['dtype'])
+                data = np.frombuffer(self.map, dtype=dtype, count=int(np.prod(shape)),
+                                     offset=header['dataStart'] + description['offset']).reshape(shape)
+            self.variables[name] = SOFABundleVariable(name, description['dimensions'], data,
+                                                      description.get('fillValue'),
+                                                      SOFABundle.decodeAttributes(description['attributes']))
+
+    def close(self):
+        # The mapping is released when the last array view is garbage collected
+        self.variables = {}
+
+
+class SOFABundleFile(SOFANetCDFFile):
+    """
+    SOFANetCDFFile reading a bundle, without the netCDF and HDF5 libraries
+    """
+
+    usesNetCDF = False
+
+    def __init__(self, path, mode='r'):
+        if mode != 'r':
+            raise SOFAError('Bundles can only be opened for reading')
+        self.file = SOFABundleDataset(path)
+        self.filename = path
+
+
+class SOFABundle(object):
+    """
+    Export of SOFA files to memory-mappable bundles, and back.
+
+    A bundle is a single file with a magic string, the length of a JSON header, the header
+    (global attributes, dimensions, and the dimensions, shape, type, fill value, attributes and data offset
+    of each variable, relative to the first data block), and the raw little-endian data of each variable, aligned to blockAlignment bytes.
+    String variables are stored in the header. The data is stored as in the netCDF file, including
+    fill values, so the conversion is lossless in both directions.
+    Opening a bundle is a single mmap: variables are array views of the mapping.
+    """
+
+    magic = b'SOFABNDL'
+    version = 1
+    blockAlignment = 64
+
+    @classmethod
+    def encodeAttributes(cls, attributes):
+        """
+        :param attributes:  dictionary of netCDF attribute values
+        :return:            dictionary of JSON values; numeric values are stored with their type
+        """
+        encoded = {}
+        for name, value in attributes.items():
+            if isinstance(value, (str, bytes)):
+                encoded[name] = value.decode('utf-8') if isinstance(value, bytes) else value
+            else:
+                value = np.asarray(value)
+                encoded[name] = {'dtype': value.dtype.newbyteorder('<').str, 'shape': list(value.shape),
+                                 'value': value.reshape(-1).tolist()}
+        return encoded
+
+    @classmethod
+    def decodeAttributes(cls, attributes):
+        """
+        :param attributes:  dictionary of JSON values (see encodeAttributes)
+        :return:            dictionary of attribute values, as returned by netCDF4
+        """
+        decoded = {}
+        for name, value in attributes.items():
+            if isinstance(value, dict):
+                array = np.array(value['value'], dtype=value['dtype']).reshape(value['shape'])
+                decoded[name] = array[()] if array.ndim == 0 else array
+            else:
+                decoded[name] = value
+        return decoded
+
+    @classmethod
+    def readHeader(cls, buffer):
+        """
+        :param buffer:  the bundle contents
+        :return:        the header dictionary, with the 'dataStart' offset of the data blocks
+        :raises:        SOFAError if the buffer is not a bundle
+        """
+        if bytes(buffer[:len(cls.magic)]) != cls.magic:
+            raise SOFAError('Not a SOFA bundle')
+        length, = struct.unpack('<Q', buffer[len(cls.magic):len(cls.magic) + 8])
+        start = len(cls.magic) + 8
+        header = json.loads(bytes(buffer[start:start + length]).decode('utf-8'))
+        header['dataStart'] = cls.getDataStart(length)
+        return header
+
+    @classmethod
+    def export(cls, sofafile, path, chunkSize=None):
+        """
+        Write a SOFA file as a bundle.
+        Open files are read through their storage backend, holding SOFANetCDFFile.lock while reading.
+
+        :param sofafile:    a SOFAFile instance, or the path of a SOFA file
+        :param path:        path of the bundle
+        :param chunkSize:   number of rows copied at once
+        """
+        if hasattr(sofafile, 'getFilename'):
+            cls.exportDataset(sofafile.ncfile.file, path, chunkSize)
+            return
+        sofafile = SOFAFile.openSource(SOFAFile.getSource(sofafile))
+        try:
+            cls.exportDataset(sofafile.ncfile.file, path, chunkSize)
+        finally:
+            sofafile.close()
+
+    @classmethod
+    def exportDataset(cls, source, path, chunkSize=None):
+        """
+        :param source:      the dataset of an open file, of any storage backend (see SOFANetCDFFile)
+        :param path:        path of the bundle
+        :param chunkSize:   number of rows copied at once
+        """
+        with SOFANetCDFFile.lock:
+            header = {'version': cls.version,
+                      'attributes': cls.encodeAttributes(source.__dict__),
+                      'dimensions': dict((name, len(dimension)) for name, dimension in source.dimensions.items()),
+                      'variables': {}}
+            blocks = []
+            offset = 0
+            for name, variable in source.variables.items():
+                description = {'dimensions': list(variable.dimensions), 'shape': list(variable.shape),
+                               'attributes': cls.encodeAttributes(variable.__dict__),
+                               'fillValue': SOFANetCDFFile.getVariableFillValue(variable)}
+                if variable.dtype == str:
+                    description['dtype'] = 'str'
+                    description['values'] = [str(value) for value in np.asarray(variable[...]).reshape(-1)]
+                else:
+                    dtype = np.dtype(variable.dtype).newbyteorder('<')
+                    description['dtype'] = dtype.str
+                    description['offset'] = offset
+                    blocks.append((variable, dtype))
+                    offset += -(-int(np.prod(variable.shape)) * dtype.itemsize // cls.blockAlignment) * \
+                        cls.blockAlignment
+                header['variables'][name] = description
+
+        encoded = json.dumps(header).encode('utf-8')
+        dataStart = cls.getDataStart(len(encoded))
+        with open(path, 'wb') as f:
+            f.write(cls.magic + struct.pack('<Q', len(encoded)) + encoded)
+            f.write(b'\0' * (dataStart - f.tell()))
+            for variable, dtype in blocks:
+                start = f.tell()
+                if len(variable.shape) == 0:
+                    with SOFANetCDFFile.lock:
+                        value = variable.getValue()
+                    f.write(np.asarray(np.ma.getdata(value), dtype=dtype).tobytes())
+                else:
+                    for chunkStart, chunkStop in SOFAFIRConverter.getChunkRanges(variable.shape[0], chunkSize):
+                        # Masked values keep the fill values read from the file
+                        with SOFANetCDFFile.lock:
+                            values = variable[chunkStart:chunkStop]
+                        f.write(np.ascontiguousarray(np.ma.getdata(values), dtype=dtype).tobytes())
+                f.write(b'\0' * (-(f.tell() - start) % cls.blockAlignment))
+
+    @classmethod
+    def getDataStart(cls, headerLength):
+        """
+        :param headerLength:    length of the encoded header
+        :return:                offset of the first data block
+        """
+        end = len(cls.magic) + 8 + headerLength
+        return -(-end // cls.blockAlignment) * cls.blockAlignment
+
+    @classmethod
+    def open(cls, path, conventionClass=None):
+        """
+        Open a bundle with the SOFAFile read interface
+
+        :param path:            path of the bundle
+        :param conventionClass: the returned class (defaults to the class of the SOFAConventions attribute)
+        :return:                a SOFAFile (or subclass) instance
+        """
+        from .SOFAValidationCache import SOFAValidationCache
+        ncfile = SOFABundleFile(path)
+        if conventionClass is None:
+            conventions = ncfile.getGlobalAttributesAsDict().get('SOFAConventions')
+            conventionClass = SOFAValidationCache.getConventionClass(conventions)
+        sofafile = conventionClass.__new__(conventionClass)
+        sofafile.ncfile = ncfile
+        return sofafile
+
+    @classmethod
+    def toSOFA(cls, path, sofaPath, chunkSize=None, compression=None):
+        """
+        Write a bundle back as a SOFA file
+
+        :param path:        path of the bundle
+        :param sofaPath:    path of the new SOFA file
+        :param chunkSize:   number of rows copied at once
+        :param compression: dictionary {name: createVariable keyword arguments}, or a SOFACompression profile name
+        """
+        bundle = SOFABundleDataset(path)
+        target = netCDF4.Dataset(sofaPath, 'w', format='NETCDF4')
+        try:
+            SOFAWriter.copyDataset(bundle, target, chunkSize, compression)
+        finally:
+            target.close()
+            bundle.close()
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFACache.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+from .SOFAAPI import SOFAAPI
+
+
+class SOFACache(object):
+    """
+    On-disk cache of ndarrays derived from SOFA files.
+    Each entry is stored as a single .npz file named after its key.
+    """
+
+    hashBlockSize = 1 << 20
+
+    def __init__(self, directory):
+        self.directory = directory
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    @classmethod
+    def getFileHash(cls, path):
+        """
+        Compute the SHA-256 digest of a file, reading it in blocks
+
+        :param path:    path to the file
+        :return:        hexadecimal digest string
+        """
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(cls.hashBlockSize), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @classmethod
+    def getFileStamp(cls, sofafile):
+        """
+        Identify the contents of an open file without reading them, from the path,
+        size and modification time of the file (of every file below it, for directory backends)
+
+        :param sofafile:    a SOFAFile instance
+        :return:            a Tuple to use as a key part, or None if the file is not on disk
+                            (read from memory, or created by the memory backend)
+        """
+        if not sofafile.ncfile.reopenable:
+            return None
+        path = os.path.abspath(sofafile.getFilename())
+        try:
+            if not os.path.isdir(path):
+                status = os.stat(path)
+                return path, status.st_size, status.st_mtime_ns
+            stamp = [path]
+            for directory, names, files in os.walk(path):
+                names.sort()
+                for name in sorted(files):
+                    status = os.stat(os.path.join(directory, name))
+                    stamp.append((os.path.relpath(os.path.join(directory, name), path), status.st_size,
+                                  status.st_mtime_ns))
+            return tuple(stamp)
+        except OSError:
+            return None
+
+    @classmethod
+    def getKey(cls, *parts):
+        """
+        Build a cache key from the given parts.
+        The API version is always included, so entries are invalidated on upgrades.
+
+        :param parts:   values identifying the entry (converted to strings)
+        :return:        hexadecimal key string
+        """
+        digest = hashlib.sha256()
+        for part in (SOFAAPI.getAPIVersion(),) + parts:
+            digest.update(repr(part).encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def getPath(self, key):
+        """
+        Get the path of the file holding a cache entry
+
+        :param key: the entry key
+        :return:    path string
+        """
+        return os.path.join(self.directory, key + '.npz')
+
+    def has(self, key):
+        """
+        Query if an entry exists
+
+        :param key: the entry key
+        :return:    Boolean
+        """
+        return os.path.isfile(self.getPath(key))
+
+    def load(self, key):
+        """
+        Load an entry
+
+        :param key: the entry key
+        :return:    a dictionary of ndarrays, or None if the entry does not exist
+        """
+        try:
+            with np.load(self.getPath(key)) as entry:
+                return dict((name, entry[name]) for name in entry.files)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def save(self, key, arrays):
+        """
+        Store an entry. The file is written under a temporary name and then renamed,
+        so concurrent readers never see a partial entry.
+
+        :param key:     the entry key
+        :param arrays:  a dictionary of ndarrays
+        """
+        fd, tmpPath = tempfile.mkstemp(suffix='.npz', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(tmpPath, self.getPath(key))
+        except Exception:
+            os.remove(tmpPath)
+            raise
+
+    def remove(self, key):
+        """
+        Remove an entry, if it exists
+
+        :param key: the entry key
+        """
+        if self.has(key):
+            os.remove(self.getPath(key))
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFACatalog.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import fnmatch
+import os
+import sqlite3
+from concurrent import futures
+
+import numpy as np
+
+from .SOFAError import SOFAError
+from .SOFAFile import SOFAFile
+from .SOFAHeaderValidator import SOFAHeaderValidator
+from .SOFANcFile import SOFANetCDFFile
+from .SOFAResampler import SOFAResampler
+from .SOFASphericalHarmonics import SOFASphericalHarmonics
+from .SOFAValidationCache import SOFAValidationCache
+
+
+class SOFACatalog(object):
+    """
+    Index of the metadata of a collection of SOFA files, stored in a SQLite database.
+
+    Scanning extracts, in parallel, the global attributes, dimension sizes,
+    convention, data type, sampling rate, SourcePosition ranges and validation status
+    of every file, opening each file once and validating its metadata (see SOFAHeaderValidator).
+    Files are only read again when their modification time or size change,
+    or when the validation rules of their convention change (see SOFAValidationCache).
+    Queries only use the database.
+    """
+
+    # Indexed columns of the files table
+    columns = ['path', 'mtime', 'size', 'conventions', 'conventionsVersion', 'dataType', 'samplingRate',
+               'I', 'C', 'M', 'R', 'E', 'N',
+               'azimuthMin', 'azimuthMax', 'elevationMin', 'elevationMax', 'distanceMin', 'distanceMax',
+               'valid', 'error', 'validationKey']
+    schema = '''
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY, mtime REAL, size INTEGER,
+            conventions TEXT, conventionsVersion TEXT, dataType TEXT, samplingRate REAL,
+            I INTEGER, C INTEGER, M INTEGER, R INTEGER, E INTEGER, N INTEGER,
+            azimuthMin REAL, azimuthMax REAL, elevationMin REAL, elevationMax REAL,
+            distanceMin REAL, distanceMax REAL,
+            valid INTEGER, error TEXT, validationKey TEXT);
+        CREATE TABLE IF NOT EXISTS attributes (path TEXT, name TEXT, value TEXT);
+        CREATE TABLE IF NOT EXISTS dimensions (path TEXT, name TEXT, size INTEGER);
+        CREATE INDEX IF NOT EXISTS filesConventions ON files (conventions, dataType, samplingRate);
+        CREATE INDEX IF NOT EXISTS filesMeasurements ON files (M);
+        CREATE INDEX IF NOT EXISTS filesElevation ON files (elevationMin, elevationMax);
+        CREATE INDEX IF NOT EXISTS attributesPath ON attributes (path);
+        CREATE INDEX IF NOT EXISTS attributesName ON attributes (name, value);
+        CREATE INDEX IF NOT EXISTS dimensionsPath ON dimensions (path);
+    '''
+    defaultPattern = '*.sofa'
+
+    def __init__(self, path):
+        """
+        :param path:    path of the database, created if it does not exist
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(self.schema)
+
+    def close(self):
+        self.connection.close()
+
+    @classmethod
+    def getConventionClass(cls, conventions):
+        """
+        Get the class implementing a SOFAConventions name
+
+        :param conventions: the SOFAConventions attribute value
+        :return:            the convention class, or SOFAFile if it is not known
+        """
+        return SOFAValidationCache.getConventionClass(conventions)
+
+    @classmethod
+    def getFileInfo(cls, path):
+        """
+        Extract the catalog record of a file
+
+        :param path:    path of the file
+        :return:        dictionary with an entry for each of columns, plus
+                        'attributes' and 'dimensions' dictionaries.
+                        Files which can not be read are recorded as not valid, with the error.
+        """
+        stat = os.stat(path)
+        info = dict((column, None) for column in cls.columns)
+        info.update({'path': path, 'mtime': stat.st_mtime, 'size': stat.st_size, 'valid': 0,
+                     'attributes': {}, 'dimensions': {}})
+        try:
+            with SOFANetCDFFile.lock:
+                cls.readFileInfo(path, info)
+        except Exception as e:
+            info['valid'] = 0
+            info['error'] = str(e) or e.__class__.__name__
+        return info
+
+    @classmethod
+    def readFileInfo(cls, path, info):
+        """
+        Fill a catalog record with the metadata and validation status of a file,
+        opening it once and validating its metadata only (see SOFAHeaderValidator)
+
+        :param path:    path of the file
+        :param info:    the record dictionary (see getFileInfo)
+        """
+        sofafile = SOFAFile.openSource(SOFAFile.getSource(path))
+        try:
+            header = SOFAHeaderValidator.readHeader(sofafile.getFile())
+            attributes, dimensions, variables = header
+            info['attributes'] = dict((name, str(value)) for name, value in attributes.items())
+            info['dimensions'] = dimensions
+            info['conventions'] = info['attributes'].get('SOFAConventions')
+            info['conventionsVersion'] = info['attributes'].get('SOFAConventionsVersion')
+            info['dataType'] = info['attributes'].get('DataType')
+            for dimension in ['I', 'C', 'M', 'R', 'E', 'N']:
+                info[dimension] = info['dimensions'].get(dimension)
+
+            try:
+                info['samplingRate'] = SOFAResampler.getFileSamplingRate(sofafile)
+            except SOFAError:
+                pass
+            info.update(cls.getPositionRanges(sofafile))
+        finally:
+            sofafile.close()
+
+        info['validationKey'] = SOFAValidationCache.getValidationKey(cls.getConventionClass(info['conventions']))
+        valid, info['error'] = SOFAHeaderValidator.validateHeader(header)
+        info['valid'] = int(valid)
+
+    @classmethod
+    def getPositionRanges(cls, sofafile):
+        """
+        Get the ranges of SourcePosition, in degrees and in the distance units
+
+        :param sofafile:    a SOFAFile instance
+        :return:            dictionary with azimuthMin/Max, elevationMin/Max and distanceMin/Max
+        """
+        if not sofafile.hasVariable('SourcePosition'):
+            return {}
+        units, coordinates = sofafile.getSourcePositionInfo()
+        positions = np.ma.filled(sofafile.getSourcePositionValues(), np.nan).astype(float)
+        positions = positions.reshape(-1, positions.shape[-1])
+        try:
+            azimuth, elevation = SOFASphericalHarmonics.getDirections(positions, coordinates, units)
+        except SOFAError:
+            return {}
+        if coordinates == 'spherical':
+            distance = positions[:, 2]
+        else:
+            distance = np.linalg.norm(positions, axis=-1)
+        azimuth = np.mod(np.degrees(azimuth), 360.)
+        elevation = np.degrees(elevation)
+        return {'azimuthMin': float(np.nanmin(azimuth)), 'azimuthMax': float(np.nanmax(azimuth)),
+                'elevationMin': float(np.nanmin(elevation)), 'elevationMax': float(np.nanmax(elevation)),
+                'distanceMin': float(np.nanmin(distance)), 'distanceMax': float(np.nanmax(distance))}
+
+    @classmethod
+    def findFiles(cls, directories, pattern=None):
+        """
+        Find the files matching a pattern, recursively
+
+        :param directories: a directory or a list of directories
+        :param pattern:     a filename pattern (defaults to defaultPattern)
+        :return:            sorted list of absolute paths
+        """
+        if isinstance(directories, str):
+            directories = [directories]
+        pattern = pattern or cls.defaultPattern
+        paths = []
+        for directory in directories:
+            for root, _, filenames in os.walk(directory):
+                paths.extend(os.path.abspath(os.path.join(root, filename))
+                             for filename in fnmatch.filter(filenames, pattern))
+        return sorted(paths)
+
+    def scan(self, directories, pattern=None, workers=None, processes=True):
+        """
+        Add or refresh the records of the files of some directories.
+        Files whose modification time and size did not change are not opened, unless the validation
+        rules of their convention changed, and records of files which no longer exist in those directories are removed.
+
+        :param directories: a directory or a list of directories
+        :param pattern:     a filename pattern (defaults to defaultPattern)
+        :param workers:     number of parallel workers (defaults to the number of CPUs)
+        :param processes:   whether to use a process pool instead of a thread pool
+        :return:            dictionary with the number of 'added', 'updated', 'removed' and 'unchanged' files
+        """
+        if isinstance(directories, str):
+            directories = [directories]
+        paths = self.findFiles(directories, pattern)
+        known = dict((row['path'], row) for row in
+                     self.connection.execute('SELECT path, mtime, size, conventions, validationKey FROM files'))
+
+        pending = []
+        for path in paths:
+            stat = os.stat(path)
+            row = known.get(path)
+            if row is None or (row['mtime'], row['size']) != (stat.st_mtime, stat.st_size):
+                pending.append(path)
+            elif row['validationKey'] is not None and row['validationKey'] != \
+                    SOFAValidationCache.getValidationKey(self.getConventionClass(row['conventions'])):
+                pending.append(path)
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers <= 1 or len(pending) <= 1:
+            records = [self.getFileInfo(path) for path in pending]
+        else:
+            executor = futures.ProcessPoolExecutor if processes else futures.ThreadPoolExecutor
+            with executor(max_workers=workers) as pool:
+                records = list(pool.map(self.getFileInfo, pending, chunksize=max(1, len(pending) // (4 * workers))))
+
+        # Records of files in the scanned directories which do not exist anymore
+        roots = [os.path.join(os.path.abspath(directory), '') for directory in directories]
+        existing = set(paths)
+        removed = [path for path in known if path not in existing and
+                   any(path.startswith(root) for root in roots) and
+                   fnmatch.fnmatch(os.path.basename(path), pattern or self.defaultPattern)]
+
+        with self.connection:
+            for path in removed:
+                self.deleteRecord(path)
+            for record in records:
+                self.deleteRecord(record['path'])
+                self.connection.execute('INSERT INTO files VALUES (' + ', '.join(['?'] * len(self.columns)) + ')',
+                                        [record[column] for column in self.columns])
+                self.connection.executemany('INSERT INTO attributes VALUES (?, ?, ?)',
+                                            [(record['path'], name, value)
+                                             for name, value in record['attributes'].items()])
+                self.connection.executemany('INSERT INTO dimensions VALUES (?, ?, ?)',
+                                            [(record['path'], name, size)
+                                             for name, size in record['dimensions'].items()])
+
+        added = len([record for record in records if record['path'] not in known])
+        return {'added': added, 'updated': len(records) - added, 'removed': len(removed),
+                'unchanged': len(paths) - len(records)}
+
+    def deleteRecord(self, path):
+        """
+        Remove a file from the catalog
+
+        :param path:    path of the file
+        """
+        for table in ['files', 'attributes', 'dimensions']:
+            self.connection.execute('DELETE FROM ' + table + ' WHERE path = ?', (path,))
+
+    def query(self, conventions=None, dataType=None, samplingRate=None, valid=None,
+              attributes=None, where=None, parameters=()):
+        """
+        Find files in the catalog, without opening them.
+        For example, SimpleFreeFieldHRIR files at 48 kHz with more than 1000 measurements
+        and sources below -30 degrees of elevation:
+            query('SimpleFreeFieldHRIR', samplingRate=48000, where='M > ? AND elevationMin < ?', parameters=(1000, -30))
+
+        :param conventions:     SOFAConventions value
+        :param dataType:        DataType value
+        :param samplingRate:    sampling rate in Hz
+        :param valid:           validation status
+        :param attributes:      dictionary of global attribute values
+        :param where:           additional SQL condition over the columns of the files table
+        :param parameters:      parameters of the SQL condition
+        :return:                list of dictionaries with the columns of the matching files
+        """
+        conditions = []
+        values = []
+        for column, value in [('conventions', conventions), ('dataType', dataType),
+                              ('samplingRate', samplingRate), ('valid', valid)]:
+            if value is not None:
+                conditions.append(column + ' = ?')
+                values.append(int(value) if column == 'valid' else value)
+        for name, value in (attributes or {}).items():
+            conditions.append('path IN (SELECT path FROM attributes WHERE name = ? AND value = ?)')
+            values.extend([name, str(value)])
+        if where:
+            conditions.append('(' + where + ')')
+            values.extend(parameters)
+
+        statement = 'SELECT * FROM files'
+        if conditions:
+            statement += ' WHERE ' + ' AND '.join(conditions)
+        statement += ' ORDER BY path'
+        return [dict(row) for row in self.connection.execute(statement, values)]
+
+    def getAttributes(self, path):
+        """
+        :param path:    path of a cataloged file
+        :return:        dictionary with its global attributes, as strings
+        """
+        return dict((row['name'], row['value']) for row in
+                    self.connection.execute('SELECT name, value FROM attributes WHERE path = ?', (path,)))
+
+    def getDimensions(self, path):
+        """
+        :param path:    path of a cataloged file
+        :return:        dictionary with its dimension sizes
+        """
+        return dict((row['name'], row['size']) for row in
+                    self.connection.execute('SELECT name, size FROM dimensions WHERE path = ?', (path,)))
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFACompression.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from .SOFADiff import SOFADiff
+from .SOFAError import SOFAError
+from .SOFAFIRConverter import SOFAFIRConverter
+from .SOFAFile import SOFAFile
+from .SOFAWriter import SOFAWriter
+
+
+class SOFACompression(object):
+    """
+    Named compression profiles for the data variables of SOFA files,
+    and an evaluator of their size, decoding speed and numerical error on a given file.
+
+    Profiles are createVariable keyword arguments, applied to the 'Data.' variables;
+    quantization arguments only apply to the floating point signal variables, so that
+    Data.SamplingRate, Data.Delay and any other data variable are kept lossless.
+    """
+
+    profiles = {
+        'none': {'zlib': False, 'shuffle': False},
+        'fast-read': {'zlib': True, 'complevel': 1, 'shuffle': True},
+        'lossless-small': {'zlib': True, 'complevel': 9, 'shuffle': True},
+        'archive': {'zlib': True, 'complevel': 9, 'shuffle': True, 'significant_digits': 5},
+    }
+    quantizationArguments = ['significant_digits', 'least_significant_digit', 'quantize_mode']
+    # Variables holding the signals (the coefficients of SOS data are stored in Data.IR)
+    signalVariables = ['Data.IR', 'Data.Real', 'Data.Imag']
+
+    @classmethod
+    def getProfile(cls, profile):
+        """
+        :param profile: profile name
+        :return:        the createVariable keyword arguments of the profile
+        :raises:        SOFAError if the profile is not known
+        """
+        if profile not in cls.profiles:
+            raise SOFAError('Compression profile not known: ' + str(profile))
+        return dict(cls.profiles[profile])
+
+    @classmethod
+    def isDataVariable(cls, name, variable):
+        """
+        :param name:        variable name
+        :param variable:    the variable instance
+        :return:            whether the profiles apply to the variable
+        """
+        return name.startswith('Data.') and variable.dtype != str and np.dtype(variable.dtype).kind in 'iuf'
+
+    @classmethod
+    def getCompression(cls, variables, profile):
+        """
+        Get the compression of the data variables for a profile
+
+        :param variables:   dictionary {name: variable instance}
+        :param profile:     profile name
+        :return:            dictionary {name: createVariable keyword arguments}
+        """
+        arguments = cls.getProfile(profile)
+        compression = {}
+        for name, variable in variables.items():
+            if not cls.isDataVariable(name, variable):
+                continue
+            compression[name] = dict(arguments)
+            if name not in cls.signalVariables or np.dtype(variable.dtype).kind != 'f':
+                for argument in cls.quantizationArguments:
+                    compression[name].pop(argument, None)
+        return compression
+
+    @classmethod
+    def repack(cls, sofafile, path, profile, chunkSize=None):
+        """
+        Copy a SOFA file, compressing its data variables with a profile
+
+        :param sofafile:    a SOFAFile instance, or the path of a SOFA file
+        :param path:        path of the new file
+        :param profile:     profile name
+        :param chunkSize:   number of rows copied at once
+        """
+        cls.getProfile(profile)
+        source = sofafile if hasattr(sofafile, 'getFilename') else SOFAFile(sofafile, 'r')
+        try:
+            SOFAWriter.copyFile(source, path, backend='netcdf4', chunkSize=chunkSize, compression=profile)
+        finally:
+            if source is not sofafile:
+                source.close()
+
+    @classmethod
+    def getDecodeTime(cls, path, names, chunkSize=None):
+        """
+        :param path:        path of a SOFA file
+        :param names:       names of the decoded variables
+        :param chunkSize:   number of rows read at once
+        :return:            seconds taken to open the file and read the variables
+        """
+        start = time.perf_counter()
+        sofafile = SOFAFile(path, 'r')
+        try:
+            for name in names:
+                variable = sofafile.getVariableInstance(name)
+                if len(variable.shape) == 0:
+                    variable.getValue()
+                    continue
+                for chunkStart, chunkStop in SOFAFIRConverter.getChunkRanges(variable.shape[0], chunkSize):
+                    variable[chunkStart:chunkStop]
+        finally:
+            sofafile.close()
+        return time.perf_counter() - start
+
+    @classmethod
+    def evaluate(cls, sofafile, profiles=None, repeats=3, chunkSize=None):
+        """
+        Repack a file with each profile, and measure the result
+
+        :param sofafile:    a SOFAFile instance, or the path of a SOFA file
+        :param profiles:    profile names (defaults to all profiles)
+        :param repeats:     number of decoding runs; the fastest one is reported
+        :param chunkSize:   number of rows copied and read at once
+        :return:            dictionary {profile: dictionary} with the file 'size' in bytes,
+                            the compression 'ratio' of the data variables (uncompressed size / file size),
+                            the 'decodeTime' in seconds and 'throughput' in bytes per second of decoded data,
+                            and the 'maxAbsError' and 'maxRelError' of the data variables
+        """
+        source = SOFAFile.getSource(sofafile)
+        if profiles is None:
+            profiles = sorted(cls.profiles)
+        original = SOFAFile.openSource(source)
+        try:
+            variables = original.getVariablesAsDict()
+            names = [name for name, variable in variables.items() if cls.isDataVariable(name, variable)]
+            dataBytes = sum(int(np.prod(variables[name].shape)) * np.dtype(variables[name].dtype).itemsize
+                            for name in names)
+        finally:
+            original.close()
+
+        results = {}
+        directory = tempfile.mkdtemp()
+        try:
+            for profile in profiles:
+                repackedPath = os.path.join(directory, profile + '.sofa')
+                original = SOFAFile.openSource(source)
+                try:
+                    cls.repack(original, repackedPath, profile, chunkSize)
+                finally:
+                    original.close()
+                size = os.path.getsize(repackedPath)
+                decodeTime = min(cls.getDecodeTime(repackedPath, names, chunkSize) for _ in range(max(1, repeats)))
+                differences = SOFADiff.diffData(sofafile, repackedPath, variables=names, workers=1, chunkSize=chunkSize)
+                results[profile] = {
+                    'size': size,
+                    'ratio': dataBytes / float(size),
+                    'decodeTime': decodeTime,
+                    'throughput': dataBytes / decodeTime,
+                    'maxAbsError': cls.getMaximum(differences, 'maxAbsError'),
+                    'maxRelError': cls.getMaximum(differences, 'maxRelError'),
+                }
+        finally:
+            shutil.rmtree(directory)
+        return results
+
+    @classmethod
+    def getMaximum(cls, differences, key):
+        """
+        :param differences: result of SOFADiff.diffData
+        :param key:         'maxAbsError' or 'maxRelError'
+        :return:            the maximum error of all the variables (0 if there are no compared values)
+        """
+        errors = [np.asarray(difference[key], dtype=float).ravel() for difference in differences.values()]
+        return float(np.max(np.nan_to_num(np.concatenate(errors + [np.zeros(1)]), nan=0.)))
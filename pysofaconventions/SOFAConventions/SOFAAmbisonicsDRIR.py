@@ -37,12 +37,17 @@
 
 import warnings
 
-from pysofaconventions import SOFAFile, SOFAWarning
+from pysofaconventions import SOFAFile, SOFAWarning, SOFAAmbisonicsRenderer
 
 
 class SOFAAmbisonicsDRIR(SOFAFile):
     conventionVersionMajor = 0
     conventionVersionMinor = 2
+    # Rules of isValid checked from the metadata only (see SOFAHeaderValidator)
+    headerRules = {'DataType': 'FIRE',
+                   'attributes': ['AmbisonicsOrder'],
+                   'dataIRAttributes': ['ChannelOrdering', 'Normalization'],
+                   'variables': ['Listener', 'Source']}
 
     def isValid(self):
         """
@@ -98,3 +103,16 @@ class SOFAAmbisonicsDRIR(SOFAFile):
             return False
 
         return True
+
+    def getRenderer(self, measurement=0, blockSize=None, channelOrdering='acn', normalization='sn3d', decoder=None):
+        """
+        Get a streaming renderer of one measurement (see SOFAAmbisonicsRenderer)
+
+        :param measurement:     index of the measurement to render
+        :param blockSize:       number of samples per block
+        :param channelOrdering: ordering of the Ambisonic output ('ACN' or 'FuMa')
+        :param normalization:   normalization of the Ambisonic output ('SN3D', 'N3D' or 'FuMa')
+        :param decoder:         a SOFASphericalHarmonicHRTF, for binaural output
+        :return:                a SOFAAmbisonicsRenderer instance
+        """
+        return SOFAAmbisonicsRenderer(self, measurement, blockSize, channelOrdering, normalization, decoder)
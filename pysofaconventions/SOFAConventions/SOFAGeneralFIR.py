@@ -43,6 +43,8 @@ from pysofaconventions import SOFAFile, SOFAWarning
 class SOFAGeneralFIR(SOFAFile):
     conventionVersionMajor = 1
     conventionVersionMinor = 0
+    # Rules of isValid checked from the metadata only (see SOFAHeaderValidator)
+    headerRules = {'DataType': 'FIR'}
 
     def isValid(self):
         """
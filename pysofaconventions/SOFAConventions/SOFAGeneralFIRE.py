@@ -37,12 +37,14 @@
 
 import warnings
 
-from pysofaconventions import SOFAFile, SOFAWarning
+from pysofaconventions import SOFAFile, SOFAWarning, SOFAFIRERenderer, SOFARoomAcoustics
 
 
 class SOFAGeneralFIRE(SOFAFile):
     conventionVersionMajor = 1
     conventionVersionMinor = 0
+    # Rules of isValid checked from the metadata only (see SOFAHeaderValidator)
+    headerRules = {'DataType': 'FIRE'}
 
     def isValid(self):
         """
@@ -73,3 +75,26 @@ class SOFAGeneralFIRE(SOFAFile):
             return False
 
         return True
+
+    def getRenderer(self, measurement=0, blockSize=None, crossfade=True, cacheSize=None):
+        """
+        Get a streaming renderer of E emitter signals into R receiver signals (see SOFAFIRERenderer)
+
+        :param measurement: index of the initial measurement
+        :param blockSize:   number of samples per block
+        :param crossfade:   whether to crossfade the output when the measurement changes
+        :param cacheSize:   number of measurements whose spectra are kept in memory
+        :return:            a SOFAFIRERenderer instance
+        """
+        return SOFAFIRERenderer(self, measurement, blockSize, crossfade, cacheSize)
+
+    def getRoomAcousticParameters(self, bands=None, chunkSize=None):
+        """
+        Compute EDT, T20, T30, C50, C80, D50, DRR and Ts for all impulse responses
+        (see SOFARoomAcoustics.getFileParameters)
+
+        :param bands:       octave band center frequencies in Hz, or None for broadband parameters
+        :param chunkSize:   number of measurements processed at once
+        :return:            dict with the parameter arrays, their 'dimensions' and 'bands'
+        """
+        return SOFARoomAcoustics.getFileParameters(self, bands, chunkSize)
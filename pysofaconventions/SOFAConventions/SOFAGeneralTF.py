@@ -37,12 +37,14 @@
 
 import warnings
 
-from pysofaconventions import SOFAFile, SOFAWarning
+from pysofaconventions import SOFAFile, SOFAWarning, SOFAFIRConverter
 
 
 class SOFAGeneralTF(SOFAFile):
     conventionVersionMajor = 1
     conventionVersionMinor = 0
+    # Rules of isValid checked from the metadata only (see SOFAHeaderValidator)
+    headerRules = {'DataType': 'TF'}
 
     def isValid(self):
         """
@@ -73,3 +75,24 @@ class SOFAGeneralTF(SOFAFile):
             return False
 
         return True
+
+    def iterDataIRFromTF(self, samplingRate=None, numSamples=None, chunkSize=None):
+        """
+        Stream the transfer functions converted into impulse responses, in chunks along M.
+        By default, the highest frequency in N is taken as Nyquist frequency,
+        and the frequency resolution of N is kept.
+
+        :param samplingRate:    sampling rate of the impulse responses, or None
+        :param numSamples:      length of the impulse responses, or None
+        :param chunkSize:       number of measurements converted at once
+        :return:                generator of Tuples (start, stop, ir), with ir shape [stop-start,R,numSamples]
+        """
+        return SOFAFIRConverter.iterTFAsIR(self, samplingRate, numSamples, chunkSize)
+
+    def getDataIRFromTF(self, samplingRate=None, numSamples=None, chunkSize=None):
+        """
+        Get the transfer functions converted into impulse responses (see iterDataIRFromTF)
+
+        :return:    ndarray with shape [M,R,numSamples]
+        """
+        return SOFAFIRConverter.getTFAsIR(self, samplingRate, numSamples, chunkSize)
@@ -37,12 +37,16 @@
 
 import warnings
 
-from pysofaconventions import SOFAFile, SOFAWarning
+from pysofaconventions import SOFAFile, SOFAWarning, SOFAMinimumPhase, SOFAResampler, SOFASphericalHarmonicHRTF
 
 
 class SOFASimpleFreeFieldHRIR(SOFAFile):
     conventionVersionMajor = 1
     conventionVersionMinor = 0
+    # Rules of isValid checked from the metadata only (see SOFAHeaderValidator)
+    headerRules = {'DataType': 'FIR', 'RoomType': 'free field',
+                   'attributes': ['ListenerShortName', 'DatabaseName'],
+                   'dimensionSizes': [('E', 1), ('R', 2)]}
 
     def isValid(self):
         """
@@ -102,3 +106,51 @@ class SOFASimpleFreeFieldHRIR(SOFAFile):
             return False
 
         return True
+
+    def iterMinimumPhaseDecomposition(self, chunkSize=None, nfft=None, threshold=None):
+        """
+        Stream the minimum-phase HRIRs and their broadband onsets, in chunks along M (see SOFAMinimumPhase)
+
+        :param chunkSize:   number of measurements processed at once
+        :param nfft:        FFT size of the cepstral method
+        :param threshold:   onset threshold, in dB relative to the peak
+        :return:            generator of Tuples (start, stop, minimumPhaseIR, delay)
+        """
+        return SOFAMinimumPhase.iterDecomposition(self, chunkSize, nfft, threshold)
+
+    def getMinimumPhaseDecomposition(self, chunkSize=None, nfft=None, threshold=None, cacheDirectory=None):
+        """
+        Get the minimum-phase HRIRs, their broadband onsets and the resulting ITD
+
+        :param chunkSize:       number of measurements processed at once
+        :param nfft:            FFT size of the cepstral method
+        :param threshold:       onset threshold, in dB relative to the peak
+        :param cacheDirectory:  if given, results are cached there by file hash and parameters
+        :return:                a Tuple (minimumPhaseIR [M,R,N], delay [M,R] in samples, ITD [M] in seconds)
+        """
+        ir, delay = SOFAMinimumPhase.getDecomposition(self, chunkSize, nfft, threshold, cacheDirectory)
+        itd = (delay[:, 0] - delay[:, 1]) / SOFAResampler.getFileSamplingRate(self)
+        return ir, delay, itd
+
+    def writeMinimumPhaseFile(self, path, chunkSize=None, nfft=None, threshold=None):
+        """
+        Write a new SimpleFreeFieldHRIR file with the minimum-phase HRIRs in Data.IR
+        and their onsets in Data.Delay [M,R]
+
+        :param path:        path of the new file
+        :param chunkSize:   number of measurements processed and written at once
+        :param nfft:        FFT size of the cepstral method
+        :param threshold:   onset threshold, in dB relative to the peak
+        """
+        SOFAMinimumPhase.writeDecomposition(self, path, chunkSize, nfft, threshold)
+
+    def getSphericalHarmonicHRTF(self, order, regularization=1e-3, chunkSize=None):
+        """
+        Fit a spherical harmonic representation of the HRTF set (see SOFASphericalHarmonicHRTF)
+
+        :param order:           the spherical harmonic order
+        :param regularization:  Tikhonov regularization, relative to the number of measurements
+        :param chunkSize:       number of measurements read at once
+        :return:                a SOFASphericalHarmonicHRTF instance, with the fitting error in dB
+        """
+        return SOFASphericalHarmonicHRTF.fit(self, order, regularization, chunkSize)
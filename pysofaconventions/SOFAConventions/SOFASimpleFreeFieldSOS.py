@@ -37,12 +37,17 @@
 
 import warnings
 
-from pysofaconventions import SOFAFile, SOFAWarning
+from pysofaconventions import SOFAFile, SOFAWarning, SOFAFIRConverter
 
 
 class SOFASimpleFreeFieldSOS(SOFAFile):
     conventionVersionMajor = 1
     conventionVersionMinor = 0
+    # Rules of isValid checked from the metadata only (see SOFAHeaderValidator)
+    headerRules = {'DataType': 'SOS', 'RoomType': 'free field',
+                   'attributes': ['DatabaseName'],
+                   'dimensionSizes': [('E', 1)],
+                   'dimensionMultiples': [('N', 6)]}
 
     def isValid(self):
         """
@@ -97,3 +102,21 @@ class SOFASimpleFreeFieldSOS(SOFAFile):
             return False
 
         return True
+
+    def iterDataIRFromSOS(self, numSamples, chunkSize=None):
+        """
+        Stream the impulse responses of the second order sections, in chunks along M
+
+        :param numSamples:  length of the impulse responses
+        :param chunkSize:   number of measurements converted at once
+        :return:            generator of Tuples (start, stop, ir), with ir shape [stop-start,R,numSamples]
+        """
+        return SOFAFIRConverter.iterSOSAsIR(self, numSamples, chunkSize)
+
+    def getDataIRFromSOS(self, numSamples, chunkSize=None):
+        """
+        Get the impulse responses of the second order sections (see iterDataIRFromSOS)
+
+        :return:    ndarray with shape [M,R,numSamples]
+        """
+        return SOFAFIRConverter.getSOSAsIR(self, numSamples, chunkSize)
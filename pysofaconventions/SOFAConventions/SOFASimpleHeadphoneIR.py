@@ -43,6 +43,12 @@ from pysofaconventions import SOFAFile, SOFAWarning
 class SOFASimpleHeadphoneIR(SOFAFile):
     conventionVersionMajor = 0
     conventionVersionMinor = 2
+    # Rules of isValid checked from the metadata only (see SOFAHeaderValidator)
+    headerRules = {'DataType': 'FIR', 'RoomType': 'free field',
+                   'attributes': ['ListenerShortName', 'ListenerDescription', 'SourceDescription',
+                                  'EmitterDescription', 'DatabaseName', 'SourceModel',
+                                  'SourceManufacturer', 'SourceURI'],
+                   'equalDimensions': [('E', 'R')]}
 
     def isValid(self):
         """
@@ -37,12 +37,17 @@
 
 import warnings
 
-from pysofaconventions import SOFAFile, SOFAWarning
+from pysofaconventions import SOFAFile, SOFAWarning, SOFARoomAcoustics
 
 
 class SOFASingleRoomDRIR(SOFAFile):
     conventionVersionMajor = 0
     conventionVersionMinor = 3
+    # Rules of isValid checked from the metadata only (see SOFAHeaderValidator)
+    headerRules = {'DataType': 'FIR', 'RoomType': 'reverberant',
+                   'attributes': ['RoomDescription'],
+                   'variables': ['Listener'],
+                   'dimensionSizes': [('E', 1)]}
 
     def isValid(self):
         """
@@ -95,4 +100,15 @@ class SOFASingleRoomDRIR(SOFAFile):
                           SOFAWarning)
             return False
 
-        return True
\ No newline at end of file
+        return True
+
+    def getRoomAcousticParameters(self, bands=None, chunkSize=None):
+        """
+        Compute EDT, T20, T30, C50, C80, D50, DRR and Ts for all impulse responses
+        (see SOFARoomAcoustics.getFileParameters)
+
+        :param bands:       octave band center frequencies in Hz, or None for broadband parameters
+        :param chunkSize:   number of measurements processed at once
+        :return:            dict with the parameter arrays, their 'dimensions' and 'bands'
+        """
+        return SOFARoomAcoustics.getFileParameters(self, bands, chunkSize)
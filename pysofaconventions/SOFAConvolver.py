@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFAConvolver.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import numpy as np
+
+from .SOFAError import SOFAError
+
+
+class SOFAConvolver(object):
+    """
+    Streaming multichannel convolution with a uniformly partitioned overlap-save scheme.
+
+    The filters are split into partitions of `blockSize` taps, whose spectra are stored
+    together with a frequency-domain delay line of the past input blocks.
+    Each block is then rendered with a single batched matrix product over all
+    frequency bins, outputs, inputs and partitions, with a latency of one block.
+    """
+
+    defaultBlockSize = 512
+
+    def __init__(self, filters, blockSize=None):
+        """
+        :param filters:     ndarray with shape [outputs, inputs, taps]
+        :param blockSize:   number of samples per block (defaults to defaultBlockSize)
+        :raises:            SOFAError if the filters or the block size are not valid
+        """
+        filters = np.ma.filled(filters, 0.).astype(float)
+        if filters.ndim != 3 or filters.shape[-1] < 1:
+            raise SOFAError('Filters must have shape [outputs, inputs, taps], got: ' + str(filters.shape))
+        if blockSize is None:
+            blockSize = self.defaultBlockSize
+        if blockSize < 1:
+            raise SOFAError('Invalid block size: ' + str(blockSize))
+
+        self.blockSize = int(blockSize)
+        self.numOutputs, self.numInputs, self.numTaps = filters.shape
+        self.numPartitions = -(-self.numTaps // self.blockSize)
+        numBins = self.blockSize + 1
+        self.spectra = self.getFilterSpectra(filters, self.blockSize)
+
+        # The delay line is stored twice, so that the last partitions are always a contiguous slice
+        self.delayLine = np.zeros((numBins, 2 * self.numPartitions, self.numInputs), dtype=complex)
+        self.inputBuffer = np.zeros((self.numInputs, 2 * self.blockSize))
+        self.position = 0
+
+    @classmethod
+    def getFilterSpectra(cls, filters, blockSize):
+        """
+        Get the spectra of the filter partitions, in the layout used by the convolution
+
+        :param filters:     ndarray with shape [outputs, inputs, taps]
+        :param blockSize:   number of samples per block
+        :return:            complex ndarray with shape [blockSize+1, outputs, partitions*inputs]
+        """
+        numOutputs, numInputs, numTaps = filters.shape
+        numPartitions = -(-numTaps // blockSize)
+
+        partitions = np.zeros((numOutputs, numInputs, numPartitions * blockSize))
+        partitions[..., :numTaps] = filters
+        partitions = partitions.reshape(numOutputs, numInputs, numPartitions, blockSize)
+        spectra = np.fft.rfft(partitions, n=2 * blockSize, axis=-1)
+        # Partition-major along the last axis, matching the layout of the delay line
+        return np.ascontiguousarray(spectra.transpose(3, 0, 2, 1)).reshape(
+            blockSize + 1, numOutputs, numPartitions * numInputs)
+
+    def reset(self):
+        """
+        Clear the internal state, as if no input had been processed
+        """
+        self.delayLine[:] = 0.
+        self.inputBuffer[:] = 0.
+        self.position = 0
+
+    def processBlock(self, block):
+        """
+        Convolve one block of input
+
+        :param block:   ndarray with shape [inputs, blockSize] (or [blockSize] with a single input)
+        :return:        ndarray with shape [outputs, blockSize]
+        :raises:        SOFAError if the block shape is not valid
+        """
+        return self.renderBlock(self.spectra, self.pushBlock(block))
+
+    def pushBlock(self, block):
+        """
+        Add one block of input to the frequency-domain delay line
+
+        :param block:   ndarray with shape [inputs, blockSize] (or [blockSize] with a single input)
+        :return:        the input history, complex ndarray with shape [blockSize+1, partitions*inputs, 1]
+        :raises:        SOFAError if the block shape is not valid
+        """
+        block = np.asarray(block, dtype=float)
+        if block.ndim == 1:
+            block = block[np.newaxis]
+        if block.shape != (self.numInputs, self.blockSize):
+            raise SOFAError('Invalid block shape: ' + str(block.shape))
+
+        self.inputBuffer[:, :self.blockSize] = self.inputBuffer[:, self.blockSize:]
+        self.inputBuffer[:, self.blockSize:] = block
+        spectrum = np.fft.rfft(self.inputBuffer, axis=-1).T
+
+        self.position = (self.position - 1) % self.numPartitions
+        self.delayLine[:, self.position] = spectrum
+        self.delayLine[:, self.position + self.numPartitions] = spectrum
+        history = self.delayLine[:, self.position:self.position + self.numPartitions]
+        return history.reshape(history.shape[0], -1, 1)
+
+    def renderBlock(self, spectra, history):
+        """
+        Multiply-accumulate the input history with a set of filter spectra
+
+        :param spectra: filter spectra (see getFilterSpectra)
+        :param history: the input history (see pushBlock)
+        :return:        ndarray with shape [outputs, blockSize]
+        """
+        output = np.matmul(spectra, history)[..., 0]
+        return np.fft.irfft(output.T, n=2 * self.blockSize, axis=-1)[:, self.blockSize:]
+
+    def process(self, signal):
+        """
+        Convolve a stream of input, block by block, keeping the state between calls
+
+        :param signal:  ndarray with shape [inputs, L] (or [L] with a single input),
+                        where L is a multiple of blockSize
+        :return:        ndarray with shape [outputs, L]
+        :raises:        SOFAError if the length is not a multiple of blockSize
+        """
+        signal = np.asarray(signal, dtype=float)
+        if signal.ndim == 1:
+            signal = signal[np.newaxis]
+        if signal.shape[-1] % self.blockSize != 0:
+            raise SOFAError('Signal length is not a multiple of the block size: ' + str(signal.shape[-1]))
+
+        output = np.empty((self.numOutputs, signal.shape[-1]))
+        for start in range(0, signal.shape[-1], self.blockSize):
+            output[:, start:start + self.blockSize] = self.processBlock(signal[:, start:start + self.blockSize])
+        return output
+
+    def convolve(self, signal):
+        """
+        Compute the full linear convolution of a signal with the filters.
+        The internal state is reset before and after.
+
+        :param signal:  ndarray with shape [inputs, L] (or [L] with a single input)
+        :return:        ndarray with shape [outputs, L + taps - 1]
+        """
+        signal = np.asarray(signal, dtype=float)
+        if signal.ndim == 1:
+            signal = signal[np.newaxis]
+        length = signal.shape[-1] + self.numTaps - 1
+        padded = np.zeros(signal.shape[:-1] + (-(-length // self.blockSize) * self.blockSize,))
+        padded[..., :signal.shape[-1]] = signal
+
+        self.reset()
+        output = self.process(padded)[:, :length]
+        self.reset()
+        return output
@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFADiff.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import argparse
+import os
+import sys
+import uuid
+from concurrent import futures
+
+import numpy as np
+
+from .SOFAFIRConverter import SOFAFIRConverter
+from .SOFAFile import SOFAFile
+from .SOFAFingerprint import SOFAFingerprint
+from .SOFAMapReduce import SOFAMapReduce
+from .SOFANcFile import SOFANetCDFFile
+
+
+class SOFADiff(object):
+    """
+    Structural and numeric comparison of two SOFA files.
+
+    Metadata (global attributes, dimensions, and variable types, dimensions and attributes)
+    is compared without reading any data. Variables with the same shape in both files are then
+    compared chunk by chunk along one dimension, in a thread or process pool, so memory
+    is bounded by the chunk size. For each index of that dimension (each measurement by default)
+    the maximum absolute error and the maximum error relative to the peak of the first file are reported.
+    """
+
+    @classmethod
+    def diffMetadata(cls, a, b, ignoredAttributes=None):
+        """
+        Compare the metadata of two files
+
+        :param a:                   a SOFAFile instance
+        :param b:                   a SOFAFile instance
+        :param ignoredAttributes:   global attributes not compared
+                                    (defaults to SOFAFingerprint.ignoredAttributes)
+        :return:                    dictionary with the differing 'attributes', 'dimensions' and 'variables'.
+                                    Each difference is a Tuple (valueA, valueB), with None for missing values.
+                                    Variable differences are dictionaries with 'dtype', 'dimensions', 'shape'
+                                    or 'attributes' entries.
+        """
+        if ignoredAttributes is None:
+            ignoredAttributes = SOFAFingerprint.ignoredAttributes
+
+        def canonical(values):
+            return dict((name, SOFAFingerprint.getCanonicalValue(value)) for name, value in values.items())
+
+        attributesA = canonical(a.getGlobalAttributesAsDict())
+        attributesB = canonical(b.getGlobalAttributesAsDict())
+        dimensionsA = dict((name, len(dimension)) for name, dimension in a.getDimensionsAsDict().items())
+        dimensionsB = dict((name, len(dimension)) for name, dimension in b.getDimensionsAsDict().items())
+        variablesA = a.getVariablesAsDict()
+        variablesB = b.getVariablesAsDict()
+
+        variables = {}
+        for name in sorted(set(variablesA) | set(variablesB)):
+            if name not in variablesA or name not in variablesB:
+                dimensions = [variable.dimensions if variable is not None else None
+                              for variable in [variablesA.get(name), variablesB.get(name)]]
+                variables[name] = {'dimensions': tuple(dimensions)}
+                continue
+            varA, varB = variablesA[name], variablesB[name]
+            difference = {}
+            for key, valueA, valueB in [('dtype', SOFAFingerprint.getCanonicalType(varA.dtype).str,
+                                         SOFAFingerprint.getCanonicalType(varB.dtype).str),
+                                        ('dimensions', varA.dimensions, varB.dimensions),
+                                        ('shape', varA.shape, varB.shape)]:
+                if valueA != valueB:
+                    difference[key] = (valueA, valueB)
+            attributes = cls.getDifferences(
+                canonical(dict((attr, varA.getncattr(attr)) for attr in varA.ncattrs() if not attr.startswith('_'))),
+                canonical(dict((attr, varB.getncattr(attr)) for attr in varB.ncattrs() if not attr.startswith('_'))))
+            if attributes:
+                difference['attributes'] = attributes
+            if difference:
+                variables[name] = difference
+
+        return {'attributes': cls.getDifferences(attributesA, attributesB, ignoredAttributes),
+                'dimensions': cls.getDifferences(dimensionsA, dimensionsB),
+                'variables': variables}
+
+    @classmethod
+    def getDifferences(cls, a, b, ignored=()):
+        """
+        :param a:       a dictionary
+        :param b:       a dictionary
+        :param ignored: keys not compared
+        :return:        dictionary of Tuples (valueA, valueB) for the keys with different values
+        """
+        return dict((key, (a.get(key), b.get(key))) for key in sorted(set(a) | set(b))
+                    if key not in ignored and a.get(key) != b.get(key))
+
+    @classmethod
+    def compareChunk(cls, task):
+        """
+        Compare one hyperslab of a variable in both files
+
+        :param task:    a Tuple (token, sourceA, sourceB, variable, axis, start, stop, rtol, atol),
+                        with the files as returned by SOFAFile.getSource, and axis None to compare the whole variable
+        :return:        Tuple (maxAbsError, maxRelError, differing) of arrays along the axis
+        """
+        token, sourceA, sourceB, name, axis, start, stop, rtol, atol = task
+        data = []
+        for source in [sourceA, sourceB]:
+            variable = SOFAMapReduce.getFile(token, source).getVariableInstance(name)
+            index = [slice(None)] * len(variable.dimensions)
+            if axis is not None:
+                index[axis] = slice(start, stop)
+            with SOFANetCDFFile.lock:
+                data.append(variable[tuple(index)])
+        a, b = [np.ma.asarray(values) for values in data]
+
+        # Move the compared axis first, and flatten the rest
+        if axis is None:
+            a, b = a.reshape(1, -1), b.reshape(1, -1)
+        else:
+            a, b = [np.moveaxis(values, axis, 0).reshape(stop - start, -1) for values in [a, b]]
+        maskA, maskB = np.ma.getmaskarray(a), np.ma.getmaskarray(b)
+        a, b = np.ma.getdata(a), np.ma.getdata(b)
+
+        if a.dtype.kind in 'OUS' or b.dtype.kind in 'OUS':
+            differing = (a != b) & ~(maskA & maskB)
+            nan = np.full(len(a), np.nan)
+            return nan, nan, np.any(differing | (maskA != maskB), axis=1)
+
+        a, b = a.astype(float), b.astype(float)
+        valid = ~(maskA | maskB)
+        nanA, nanB = np.isnan(a), np.isnan(b)
+        # NaN in one file only gives a NaN error, and equal infinities no error
+        with np.errstate(invalid='ignore'):
+            error = np.where((a == b) | (nanA & nanB), 0., np.abs(a - b))
+            error = np.where(valid, error, 0.)
+            outside = (error != 0) & ~(error <= atol + rtol * np.abs(b))
+        outside |= (nanA != nanB) | ((np.isinf(a) | np.isinf(b)) & (a != b))
+        differing = (valid & outside) | (maskA != maskB)
+        maxAbsError = np.max(error, axis=1, initial=0.)
+        peak = np.max(np.where(valid, np.abs(a), 0.), axis=1, initial=0.)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            maxRelError = np.where(maxAbsError == 0, 0., maxAbsError / peak)
+        return maxAbsError, maxRelError, np.any(differing, axis=1)
+
+    @classmethod
+    def diffData(cls, a, b, variables=None, axis='M', rtol=0., atol=0., maxDifferences=None,
+                 workers=None, chunkSize=None, processes=False):
+        """
+        Compare the values of the variables with the same shape in both files
+
+        :param a:               a SOFAFile instance, or the path of a SOFA file
+        :param b:               a SOFAFile instance, or the path of a SOFA file
+        :param variables:       names of the compared variables (defaults to all common variables)
+        :param axis:            name of the dimension along which errors are reported;
+                                variables without it are compared as a whole
+        :param rtol:            relative tolerance (see numpy.isclose)
+        :param atol:            absolute tolerance (see numpy.isclose)
+        :param maxDifferences:  stop after finding this number of differing indices (defaults to no limit)
+        :param workers:         number of workers (defaults to the number of CPUs; 1 runs in the calling thread)
+        :param chunkSize:       number of elements of each chunk along the axis
+                                (defaults to SOFAFIRConverter.defaultChunkSize)
+        :param processes:       whether to use a process pool instead of a thread pool
+        :return:                dictionary with an entry per compared variable, with the arrays
+                                'maxAbsError' and 'maxRelError' (NaN where not compared,
+                                or where a value is NaN in one file only),
+                                the list of differing 'indices', and whether the comparison is 'complete'
+        """
+        sourceA, sourceB = SOFAFile.getSource(a), SOFAFile.getSource(b)
+        token = uuid.uuid4().hex
+        if chunkSize is None:
+            chunkSize = SOFAFIRConverter.defaultChunkSize
+
+        fileA, fileB = SOFAFile.openSource(sourceA), SOFAFile.openSource(sourceB)
+        try:
+            variablesA, variablesB = fileA.getVariablesAsDict(), fileB.getVariablesAsDict()
+            if variables is None:
+                variables = sorted(set(variablesA) & set(variablesB))
+            tasks = []
+            results = {}
+            remaining = {}
+            for name in variables:
+                varA, varB = variablesA.get(name), variablesB.get(name)
+                if varA is None or varB is None or varA.shape != varB.shape or varA.dimensions != varB.dimensions:
+                    continue
+                axisIndex = varA.dimensions.index(axis) if axis in varA.dimensions else None
+                size = varA.shape[axisIndex] if axisIndex is not None else 1
+                ranges = SOFAFIRConverter.getChunkRanges(size, chunkSize) if axisIndex is not None else [(0, 1)]
+                results[name] = {'maxAbsError': np.full(size, np.nan), 'maxRelError': np.full(size, np.nan),
+                                 'indices': [], 'complete': True}
+                remaining[name] = len(ranges)
+                tasks.extend((token, sourceA, sourceB, name, axisIndex, start, stop, rtol, atol)
+                             for start, stop in ranges)
+        finally:
+            fileA.close()
+            fileB.close()
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        pool = None
+        submitted = []
+        try:
+            if workers <= 1 or len(tasks) <= 1:
+                pending = ((task, cls.compareChunk(task)) for task in tasks)
+            else:
+                executor = futures.ProcessPoolExecutor if processes else futures.ThreadPoolExecutor
+                pool = executor(max_workers=workers)
+                submitted = [(task, pool.submit(cls.compareChunk, task)) for task in tasks]
+                pending = ((task, future.result()) for task, future in submitted)
+
+            found = 0
+            for task, (maxAbsError, maxRelError, differing) in pending:
+                result = results[task[3]]
+                start, stop = task[5], task[6]
+                result['maxAbsError'][start:stop] = maxAbsError
+                result['maxRelError'][start:stop] = maxRelError
+                result['indices'].extend(int(index) for index in start + np.flatnonzero(differing))
+                remaining[task[3]] -= 1
+                found += int(np.count_nonzero(differing))
+                if maxDifferences is not None and found >= maxDifferences:
+                    for name, result in results.items():
+                        result['complete'] = remaining[name] == 0
+                    break
+            return results
+        finally:
+            if pool is not None:
+                # Skip the chunks not started after an early exit
+                for task, future in submitted:
+                    future.cancel()
+                pool.shutdown(wait=True)
+            SOFAMapReduce.closeFiles(token)
+
+    @classmethod
+    def diff(cls, a, b, ignoredAttributes=None, **kwargs):
+        """
+        Compare the metadata and the data of two files
+
+        :param a:                   a SOFAFile instance, or the path of a SOFA file
+        :param b:                   a SOFAFile instance, or the path of a SOFA file
+        :param ignoredAttributes:   global attributes not compared (see diffMetadata)
+        :param kwargs:              options of diffData
+        :return:                    dictionary with the 'metadata' and 'data' differences,
+                                    and whether both files are 'equal'
+        """
+        fileA, fileB = SOFAFile.openSource(SOFAFile.getSource(a)), SOFAFile.openSource(SOFAFile.getSource(b))
+        try:
+            metadata = cls.diffMetadata(fileA, fileB, ignoredAttributes)
+        finally:
+            fileA.close()
+            fileB.close()
+        data = cls.diffData(a, b, **kwargs)
+        equal = not any(metadata.values()) and not any(result['indices'] for result in data.values())
+        return {'metadata': metadata, 'data': data, 'equal': equal}
+
+    @classmethod
+    def getReport(cls, differences, maxIndices=20):
+        """
+        Format the result of diff as text
+
+        :param differences: the result of diff
+        :param maxIndices:  maximum number of differing indices listed per variable
+        :return:            List of lines
+        """
+        lines = []
+        for kind in ['attributes', 'dimensions']:
+            for name, (valueA, valueB) in differences['metadata'][kind].items():
+                lines.append(kind[:-1] + ' ' + name + ': ' + repr(valueA) + ' != ' + repr(valueB))
+        for name, difference in differences['metadata']['variables'].items():
+            for key, values in difference.items():
+                if key == 'attributes':
+                    for attribute, (valueA, valueB) in values.items():
+                        lines.append('variable ' + name + ' attribute ' + attribute + ': ' +
+                                     repr(valueA) + ' != ' + repr(valueB))
+                else:
+                    lines.append('variable ' + name + ' ' + key + ': ' +
+                                 repr(values[0]) + ' != ' + repr(values[1]))
+        for name, result in differences['data'].items():
+            if not result['indices']:
+                continue
+            indices = result['indices']
+            listed = [str(index) for index in indices[:maxIndices]]
+            if len(indices) > maxIndices:
+                listed.append('...')
+            line = 'data ' + name + ': ' + str(len(indices)) + ' of ' + str(len(result['maxAbsError'])) + ' differ'
+            if not result['complete']:
+                line += ' (incomplete)'
+            if not np.all(np.isnan(result['maxAbsError'])):
+                line += ', max abs error ' + '%g' % np.nanmax(result['maxAbsError']) + \
+                        ', max rel error ' + '%g' % np.nanmax(result['maxRelError'])
+            lines.append(line + ': ' + ', '.join(listed))
+        return lines
+
+    @classmethod
+    def main(cls, argv=None):
+        """
+        Command line interface: sofadiff a.sofa b.sofa
+
+        :param argv:    List of arguments (defaults to sys.argv[1:])
+        :return:        exit status: 0 if the files are equal, 1 if they differ, 2 on errors
+        """
+        parser = argparse.ArgumentParser(prog='sofadiff', description='Compare two SOFA files')
+        parser.add_argument('a', help='first SOFA file')
+        parser.add_argument('b', help='second SOFA file')
+        parser.add_argument('--rtol', type=float, default=0., help='relative tolerance')
+        parser.add_argument('--atol', type=float, default=0., help='absolute tolerance')
+        parser.add_argument('--axis', default='M', help='dimension along which differences are reported')
+        parser.add_argument('--variable', action='append', dest='variables', help='compared variable (repeatable)')
+        parser.add_argument('--max-differences', type=int, help='stop after this number of differences')
+        parser.add_argument('--workers', type=int, help='number of parallel workers')
+        parser.add_argument('--chunk-size', type=int, help='number of elements compared at once along the axis')
+        parser.add_argument('--ignore-attribute', action='append', dest='ignoredAttributes', default=[],
+                            help='global attribute not compared, besides ' +
+                                 ', '.join(SOFAFingerprint.ignoredAttributes) + ' (repeatable)')
+        args = parser.parse_args(argv)
+
+        try:
+            differences = cls.diff(args.a, args.b,
+                                   ignoredAttributes=SOFAFingerprint.ignoredAttributes + args.ignoredAttributes,
+                                   variables=args.variables, axis=args.axis, rtol=args.rtol, atol=args.atol,
+                                   maxDifferences=args.max_differences, workers=args.workers,
+                                   chunkSize=args.chunk_size)
+        except (IOError, OSError) as e:
+            sys.stderr.write('sofadiff: ' + str(e) + '\n')
+            return 2
+        for line in cls.getReport(differences):
+            sys.stdout.write(line + '\n')
+        return 0 if differences['equal'] else 1
+
+
+def main():
+    sys.exit(SOFADiff.main())
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
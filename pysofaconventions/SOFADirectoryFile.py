@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFADirectoryFile.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import json
+import os
+import shutil
+
+import numpy as np
+
+from .SOFABundle import SOFABundle
+from .SOFAError import SOFAError
+from .SOFAMemoryFile import SOFAMemoryDataset
+from .SOFAMemoryFile import SOFAMemoryDimension
+from .SOFAMemoryFile import SOFAMemoryVariable
+from .SOFANcFile import SOFANetCDFFile
+
+
+class SOFADirectoryVariable(SOFAMemoryVariable):
+    """
+    Variable of a directory store, stored as .npy files of chunkRows rows along its first dimension.
+    Chunks are loaded when read, and modified chunks are kept in memory until all their rows are written
+    as a whole, or until flushed. Chunks never written are not stored, and read as fill values.
+    """
+
+    __slots__ = ('path', 'chunkRows', 'chunks', 'written')
+
+    def __init__(self, name, dimensions, shape, dtype, fillValue, attributes, path, chunkRows, writable=True):
+        self.name = name
+        self.dimensions = tuple(dimensions)
+        self.data = None
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.fillValue = fillValue
+        self.autoMask = True
+        self.writable = writable
+        self.path = path
+        self.chunkRows = chunkRows
+        self.chunks = {}
+        # Rows written as a whole, by chunk index, for the chunks in memory
+        self.written = {}
+        self.__dict__.update(attributes)
+
+    def getChunkPath(self, chunk):
+        """
+        :param chunk:   chunk index
+        :return:        path of the chunk file
+        """
+        return os.path.join(self.path, self.name, str(chunk) + '.npy')
+
+    def getChunkRows(self, chunk):
+        """
+        :param chunk:   chunk index
+        :return:        number of rows of the chunk (the last one may be shorter)
+        """
+        return min(self.chunkRows, self.shape[0] - chunk * self.chunkRows)
+
+    def getChunk(self, chunk):
+        """
+        :param chunk:   chunk index
+        :return:        the rows of the chunk
+        """
+        if chunk in self.chunks:
+            return self.chunks[chunk]
+        path = self.getChunkPath(chunk)
+        if os.path.exists(path):
+            return np.load(path)
+        return np.full((self.getChunkRows(chunk),) + self.shape[1:], 0 if self.fillValue is None else self.fillValue, dtype=self.dtype)
+
+    def getRows(self, index):
+        """
+        Split an index into its first dimension rows and the index of the remaining dimensions
+
+        :param index:   numpy index
+        :return:        (rows, remaining index): rows is an integer, or an ndarray of row numbers
+        """
+        index = index if isinstance(index, tuple) else (index,)
+        for position, item in enumerate(index):
+            if item is Ellipsis:
+                index = index[:position] + (slice(None),) * (len(self.shape) - len(index) + 1) + index[position + 1:]
+                break
+        rows = np.arange(self.shape[0])[index[0] if index else slice(None)]
+        return rows, index[1:]
+
+    def getBlock(self, rows):
+        """
+        :param rows:    integer or ndarray of row numbers
+        :return:        (chunk indices, concatenated chunk rows, positions of the rows in the block)
+        """
+        rows = np.atleast_1d(rows)
+        chunks = np.unique(rows // self.chunkRows)
+        if chunks.size:
+            block = np.concatenate([self.getChunk(chunk) for chunk in chunks])
+        else:
+            block = np.empty((0,) + self.shape[1:], dtype=self.dtype)
+        positions = np.searchsorted(chunks, rows // self.chunkRows) * self.chunkRows + rows % self.chunkRows
+        return chunks, block, positions
+
+    def readData(self, index):
+        rows, index = self.getRows(index)
+        chunks, block, positions = self.getBlock(rows)
+        values = block[positions]
+        return values[0][index] if np.ndim(rows) == 0 else values[(slice(None),) + index]
+
+    def writeData(self, index, values):
+        self.checkWritable()
+        rows, index = self.getRows(index)
+        chunks, block, positions = self.getBlock(rows)
+        selected = block[positions]
+        if np.ndim(rows) == 0:
+            selected[0][index] = values
+        else:
+            selected[(slice(None),) + index] = values
+        block[positions] = selected
+        start = 0
+        for chunk in chunks:
+            stop = start + self.getChunkRows(chunk)
+            self.chunks[chunk] = block[start:stop]
+            start = stop
+
+        # Chunks whose rows have all been written are complete, and stored right away
+        if all(isinstance(item, slice) and item == slice(None) for item in index):
+            rows = np.atleast_1d(rows)
+            for chunk in chunks:
+                written = self.written.setdefault(chunk, set())
+                written.update(rows[rows // self.chunkRows == chunk].tolist())
+                if len(written) == self.getChunkRows(chunk):
+                    self.saveChunk(chunk)
+
+    def saveChunk(self, chunk):
+        """
+        Write a modified chunk, and release it from memory
+
+        :param chunk:   chunk index
+        """
+        os.makedirs(os.path.join(self.path, self.name), exist_ok=True)
+        np.save(self.getChunkPath(chunk), self.chunks.pop(chunk))
+        self.written.pop(chunk, None)
+
+    def flush(self):
+        """
+        Write the modified chunks
+        """
+        for chunk in list(self.chunks):
+            self.saveChunk(chunk)
+
+
+class SOFADirectoryDataset(SOFAMemoryDataset):
+    """
+    Directory store, with the netCDF4.Dataset interface used by SOFANetCDFFile and SOFAWriter.
+
+    The directory has a JSON header with the global attributes, the dimensions, and the description
+    of each variable. String and scalar variables are stored in the header, and the other variables
+    in chunk files (see SOFADirectoryVariable). The header and the modified chunks are written on close.
+    """
+
+    __slots__ = ('path',)
+
+    def __init__(self, path, mode='r'):
+        SOFAMemoryDataset.__init__(self, mode != 'r')
+        self.path = path
+        headerPath = os.path.join(path, SOFADirectoryFile.headerName)
+        if mode == 'w':
+            if os.path.exists(path):
+                if not os.path.exists(headerPath) and (not os.path.isdir(path) or os.listdir(path)):
+                    raise SOFAError('Not a directory store: ' + str(path))
+                shutil.rmtree(path)
+            os.makedirs(path)
+            return
+
+        with open(headerPath) as f:
+            header = json.load(f)
+        self.__dict__.update(SOFABundle.decodeAttributes(header['attributes']))
+        self.dimensions = dict((name, SOFAMemoryDimension(name, size))
+                               for name, size in header['dimensions'].items())
+        for name, description in header['variables'].items():
+            attributes = SOFABundle.decodeAttributes(description['attributes'])
+            shape = tuple(description['shape'])
+            if 'values' in description:
+                dtype = object if description['dtype'] == 'str' else description['dtype']
+                data = np.empty(len(description['values']), dtype=dtype)
+                data[:] = description['values']
+                self.variables[name] = SOFAMemoryVariable(name, description['dimensions'], data.reshape(shape),
+                                                          description['fillValue'], attributes, self.writable)
+            else:
+                self.variables[name] = SOFADirectoryVariable(name, description['dimensions'], shape,
+                                                             description['dtype'], description['fillValue'],
+                                                             attributes, path, description['chunkRows'],
+                                                             self.writable)
+
+    def createVariableInstance(self, name, dimensions, shape, dtype, fillValue, attributes):
+        if dtype.kind == 'O' or len(shape) == 0:
+            return SOFAMemoryDataset.createVariableInstance(self, name, dimensions, shape, dtype, fillValue,
+                                                            attributes)
+        rowBytes = int(np.prod(shape[1:])) * dtype.itemsize
+        chunkRows = max(1, SOFADirectoryFile.chunkBytes // max(1, rowBytes))
+        return SOFADirectoryVariable(name, dimensions, shape, dtype, fillValue, attributes, self.path, chunkRows)
+
+    def close(self):
+        if not self.writable:
+            return
+        header = {'version': SOFADirectoryFile.version,
+                  'attributes': SOFABundle.encodeAttributes(self.__dict__),
+                  'dimensions': dict((name, len(dimension)) for name, dimension in self.dimensions.items()),
+                  'variables': {}}
+        for name, variable in self.variables.items():
+            description = {'dimensions': list(variable.dimensions), 'shape': list(variable.shape),
+                           'attributes': SOFABundle.encodeAttributes(variable.__dict__),
+                           'fillValue': variable.fillValue}
+            if isinstance(variable, SOFADirectoryVariable):
+                variable.flush()
+                description['dtype'] = variable.dtype.str
+                description['chunkRows'] = variable.chunkRows
+            else:
+                description['dtype'] = 'str' if variable.dtype == str else variable.data.dtype.str
+                description['values'] = variable.data.reshape(-1).tolist()
+            header['variables'][name] = description
+        with open(os.path.join(self.path, SOFADirectoryFile.headerName), 'w') as f:
+            json.dump(header, f)
+        self.writable = False
+
+
+class SOFADirectoryFile(SOFANetCDFFile):
+    """
+    SOFANetCDFFile storing its data in a directory (see SOFADirectoryDataset),
+    so that single chunks can be read and rewritten without the netCDF and HDF5 libraries.
+    """
+
+    usesNetCDF = False
+
+    headerName = 'header.json'
+    version = 1
+    # Approximate size of the chunk files
+    chunkBytes = 1 << 20
+
+    def __init__(self, path, mode='r'):
+        self.file = SOFADirectoryDataset(path, mode)
+        self.filename = path
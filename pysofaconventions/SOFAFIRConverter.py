@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFAFIRConverter.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import numpy as np
+
+from .SOFAError import SOFAError
+
+
+class SOFAFIRConverter(object):
+    """
+    Batch conversion of TF and SOS data into FIR (Data.IR-like) arrays.
+
+    All conversions operate on the last axis and broadcast over the leading ones,
+    so a whole [M,R,N] block is converted at once, without per-measurement loops.
+    The file-level methods stream the data along M in chunks of `chunkSize` measurements.
+    """
+
+    defaultChunkSize = 256
+
+    @classmethod
+    def getChunkRanges(cls, size, chunkSize=None):
+        """
+        Split a dimension of the given size into consecutive ranges
+
+        :param size:        the dimension size
+        :param chunkSize:   maximum number of elements per range (defaults to defaultChunkSize)
+        :return:            a list of (start, stop) tuples
+        :raises:            SOFAError if chunkSize is not positive
+        """
+        if chunkSize is None:
+            chunkSize = cls.defaultChunkSize
+        if chunkSize < 1:
+            raise SOFAError('Invalid chunk size: ' + str(chunkSize))
+
+        return [(start, min(start + chunkSize, size)) for start in range(0, size, chunkSize)]
+
+    @classmethod
+    def getInterpolationWeights(cls, frequencies, targetFrequencies):
+        """
+        Compute linear interpolation indices and weights between two frequency grids.
+        Target frequencies outside the source range are clamped to the closest bin.
+
+        :param frequencies:         ascending source frequencies, shape [N]
+        :param targetFrequencies:   target frequencies, shape [K]
+        :return:                    a Tuple (lower index, upper index, upper weight), each with shape [K]
+        """
+        frequencies = np.asarray(frequencies, dtype=float)
+        if len(frequencies) == 1:
+            zeros = np.zeros(len(targetFrequencies), dtype=int)
+            return zeros, zeros, np.zeros(len(targetFrequencies))
+
+        targetFrequencies = np.clip(np.asarray(targetFrequencies, dtype=float), frequencies[0], frequencies[-1])
+
+        upper = np.clip(np.searchsorted(frequencies, targetFrequencies, side='right'), 1, len(frequencies) - 1)
+        lower = upper - 1
+        span = frequencies[upper] - frequencies[lower]
+        span[span == 0] = 1.
+        weight = np.clip((targetFrequencies - frequencies[lower]) / span, 0., 1.)
+
+        return lower, upper, weight
+
+    @classmethod
+    def transferFunctionToIR(cls, real, imag, frequencies, samplingRate, numSamples):
+        """
+        Convert transfer functions into impulse responses with a single batched inverse real FFT.
+        The spectra are linearly interpolated from `frequencies` into the FFT grid.
+
+        :param real:            real part of the transfer functions, shape [..., N]
+        :param imag:            imaginary part of the transfer functions, shape [..., N]
+        :param frequencies:     frequency of each bin in Hertz, shape [N]
+        :param samplingRate:    sampling rate of the resulting impulse responses
+        :param numSamples:      length of the resulting impulse responses
+        :return:                ndarray with shape [..., numSamples]
+        :raises:                SOFAError if the arguments are not consistent
+        """
+        frequencies = np.asarray(frequencies, dtype=float).reshape(-1)
+        real = np.asarray(real, dtype=float)
+        imag = np.asarray(imag, dtype=float)
+
+        if real.shape != imag.shape:
+            raise SOFAError('Real and imaginary parts have different shapes: '
+                            + str(real.shape) + ', ' + str(imag.shape))
+        if real.shape[-1] != len(frequencies):
+            raise SOFAError('Number of frequency bins does not match: '
+                            + str(real.shape[-1]) + ', expected ' + str(len(frequencies)))
+        if samplingRate <= 0 or numSamples < 1:
+            raise SOFAError('Invalid sampling rate or number of samples: '
+                            + str(samplingRate) + ', ' + str(numSamples))
+
+        order = np.argsort(frequencies, kind='stable')
+        spectrum = real[..., order] + 1j * imag[..., order]
+        targetFrequencies = np.arange(numSamples // 2 + 1) * (float(samplingRate) / numSamples)
+        lower, upper, weight = cls.getInterpolationWeights(frequencies[order], targetFrequencies)
+
+        interpolated = spectrum[..., lower] * (1. - weight) + spectrum[..., upper] * weight
+        return np.fft.irfft(interpolated, n=numSamples, axis=-1)
+
+    @classmethod
+    def sosToIR(cls, coefficients, numSamples):
+        """
+        Compute the impulse response of cascaded second order sections.
+        Each section is given by six coefficients (b0, b1, b2, a0, a1, a2).
+        The recursion runs once per section and sample, vectorized over all leading axes.
+
+        :param coefficients:    ndarray with shape [..., 6*numSections]
+        :param numSamples:      length of the resulting impulse responses
+        :return:                ndarray with shape [..., numSamples]
+        :raises:                SOFAError if the coefficients are not valid
+        """
+        coefficients = np.asarray(coefficients, dtype=float)
+        if coefficients.shape[-1] % 6 != 0:
+            raise SOFAError('Number of SOS coefficients is not multiple of 6: ' + str(coefficients.shape[-1]))
+        if numSamples < 1:
+            raise SOFAError('Invalid number of samples: ' + str(numSamples))
+
+        batchShape = coefficients.shape[:-1]
+        sections = coefficients.reshape((-1, coefficients.shape[-1] // 6, 6))
+        if np.any(sections[:, :, 3] == 0):
+            raise SOFAError('Invalid SOS coefficients: a0 is zero')
+        sections = sections / sections[:, :, 3:4]
+
+        signal = np.zeros((sections.shape[0], numSamples))
+        signal[:, 0] = 1.
+        for s in range(sections.shape[1]):
+            b0, b1, b2, _, a1, a2 = [sections[:, s, k] for k in range(6)]
+
+            # Feedforward part, vectorized along time
+            v = b0[:, None] * signal
+            v[:, 1:] += b1[:, None] * signal[:, :-1]
+            v[:, 2:] += b2[:, None] * signal[:, :-2]
+
+            # Feedback part, vectorized along the batch
+            y1 = np.zeros(sections.shape[0])
+            y2 = np.zeros(sections.shape[0])
+            for k in range(numSamples):
+                yk = v[:, k] - a1 * y1 - a2 * y2
+                v[:, k] = yk
+                y2 = y1
+                y1 = yk
+            signal = v
+
+        return signal.reshape(batchShape + (numSamples,))
+
+    @classmethod
+    def getTFParameters(cls, sofafile, samplingRate=None, numSamples=None):
+        """
+        Resolve the conversion parameters of a TF file.
+        By default, the highest frequency bin is assumed to be at Nyquist,
+        and the number of samples is chosen to keep the frequency resolution.
+
+        :param sofafile:        a SOFAFile instance with TF DataType
+        :param samplingRate:    target sampling rate, or None
+        :param numSamples:      target number of samples, or None
+        :return:                a Tuple (frequencies, samplingRate, numSamples)
+        """
+        frequencies = np.ma.filled(sofafile.getVariableValue('N'), 0.).astype(float).reshape(-1)
+        if samplingRate is None:
+            samplingRate = 2. * np.max(frequencies)
+        if numSamples is None:
+            numSamples = max(2 * (len(frequencies) - 1), 1)
+        return frequencies, samplingRate, numSamples
+
+    @classmethod
+    def iterTFAsIR(cls, sofafile, samplingRate=None, numSamples=None, chunkSize=None):
+        """
+        Stream the Data.Real/Data.Imag variables of a TF file as impulse responses
+
+        :param sofafile:        a SOFAFile instance with TF DataType
+        :param samplingRate:    target sampling rate (see getTFParameters)
+        :param numSamples:      target number of samples (see getTFParameters)
+        :param chunkSize:       number of measurements converted at once
+        :return:                generator of Tuples (start, stop, ir), with ir shape [stop-start,R,numSamples]
+        :raises:                SOFAError if the file is not TF
+        """
+        if not sofafile.isTFDataType():
+            raise SOFAError('DataType is not TF: ' + sofafile.getGlobalAttributeValue('DataType'))
+
+        frequencies, samplingRate, numSamples = cls.getTFParameters(sofafile, samplingRate, numSamples)
+        real = sofafile.getVariableInstance('Data.Real')
+        imag = sofafile.getVariableInstance('Data.Imag')
+
+        for start, stop in cls.getChunkRanges(real.shape[0], chunkSize):
+            yield start, stop, cls.transferFunctionToIR(np.ma.filled(real[start:stop], 0.),
+                                                        np.ma.filled(imag[start:stop], 0.),
+                                                        frequencies, samplingRate, numSamples)
+
+    @classmethod
+    def iterSOSAsIR(cls, sofafile, numSamples, chunkSize=None):
+        """
+        Stream the Data.IR variable of a SOS file as impulse responses
+
+        :param sofafile:        a SOFAFile instance with SOS DataType
+        :param numSamples:      length of the resulting impulse responses
+        :param chunkSize:       number of measurements converted at once
+        :return:                generator of Tuples (start, stop, ir), with ir shape [stop-start,R,numSamples]
+        :raises:                SOFAError if the file is not SOS
+        """
+        if not sofafile.isSOSDataType():
+            raise SOFAError('DataType is not SOS: ' + sofafile.getGlobalAttributeValue('DataType'))
+
+        sos = sofafile.getVariableInstance('Data.IR')
+        for start, stop in cls.getChunkRanges(sos.shape[0], chunkSize):
+            yield start, stop, cls.sosToIR(np.ma.filled(sos[start:stop], 0.), numSamples)
+
+    @classmethod
+    def collect(cls, chunks, size):
+        """
+        Gather streamed chunks into a single preallocated array
+
+        :param chunks:  iterable of Tuples (start, stop, data)
+        :param size:    total size of the first dimension
+        :return:        ndarray with all chunks, or None if there are no chunks
+        """
+        result = None
+        for start, stop, data in chunks:
+            if result is None:
+                result = np.empty((size,) + data.shape[1:], dtype=data.dtype)
+            result[start:stop] = data
+        return result
+
+    @classmethod
+    def getTFAsIR(cls, sofafile, samplingRate=None, numSamples=None, chunkSize=None):
+        """
+        Get all transfer functions of a TF file as impulse responses, [M,R,numSamples]
+
+        :return:    ndarray with the impulse responses
+        """
+        return cls.collect(cls.iterTFAsIR(sofafile, samplingRate, numSamples, chunkSize),
+                           sofafile.getDimensionSize('M'))
+
+    @classmethod
+    def getSOSAsIR(cls, sofafile, numSamples, chunkSize=None):
+        """
+        Get all second order sections of a SOS file as impulse responses, [M,R,numSamples]
+
+        :return:    ndarray with the impulse responses
+        """
+        return cls.collect(cls.iterSOSAsIR(sofafile, numSamples, chunkSize),
+                           sofafile.getDimensionSize('M'))
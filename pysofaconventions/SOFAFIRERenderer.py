@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFAFIRERenderer.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+from collections import OrderedDict
+
+import numpy as np
+
+from .SOFAError import SOFAError
+from .SOFAConvolver import SOFAConvolver
+
+
+class SOFAFIRERenderer(SOFAConvolver):
+    """
+    Streaming renderer of FIRE data (Data.IR with shape [M,R,E,N]),
+    taking one input channel per emitter and producing one output per receiver.
+
+    All E x R partition spectra of a measurement are kept in one contiguous array,
+    so each block is a single SOFAConvolver matrix product.
+    The active measurement (e.g. the head orientation) can be switched between blocks:
+    the input history is kept, the spectra of the recently used measurements are cached,
+    and the transition is optionally crossfaded over one block.
+    """
+
+    # Number of measurements whose spectra are kept in memory
+    defaultCacheSize = 16
+
+    def __init__(self, sofafile, measurement=0, blockSize=None, crossfade=True, cacheSize=None):
+        """
+        :param sofafile:    a SOFAFile with FIRE DataType
+        :param measurement: index of the initial measurement
+        :param blockSize:   number of samples per block (see SOFAConvolver)
+        :param crossfade:   whether to crossfade the output when the measurement changes
+        :param cacheSize:   number of cached measurements (defaults to defaultCacheSize)
+        :raises:            SOFAError if Data.IR is not FIRE, or the measurement does not exist
+        """
+        self.ir = sofafile.getVariableInstance('Data.IR')
+        if len(self.ir.shape) != 4:
+            raise SOFAError('Data.IR is not FIRE, got shape: ' + str(self.ir.shape))
+        self.numMeasurements = self.ir.shape[0]
+        self.crossfade = crossfade
+        self.cacheSize = max(1, self.defaultCacheSize if cacheSize is None else cacheSize)
+        self.cache = OrderedDict()
+
+        SOFAConvolver.__init__(self, self.getMeasurementIR(measurement), blockSize)
+        self.measurement = measurement
+        self.cache[measurement] = self.spectra
+        self.previousSpectra = None
+        self.fade = np.arange(1, self.blockSize + 1) / float(self.blockSize)
+
+    def getMeasurementIR(self, measurement):
+        """
+        :param measurement: measurement index
+        :return:            ndarray with shape [R,E,N]
+        :raises:            SOFAError if the measurement does not exist
+        """
+        if not 0 <= measurement < self.numMeasurements:
+            raise SOFAError('Invalid measurement index: ' + str(measurement))
+        return np.ma.filled(self.ir[measurement], 0.)
+
+    def getMeasurementSpectra(self, measurement):
+        """
+        Get the partition spectra of a measurement, from the cache when possible
+
+        :param measurement: measurement index
+        :return:            complex ndarray (see SOFAConvolver.getFilterSpectra)
+        """
+        if measurement in self.cache:
+            self.cache.move_to_end(measurement)
+        else:
+            self.cache[measurement] = self.getFilterSpectra(self.getMeasurementIR(measurement), self.blockSize)
+            while len(self.cache) > self.cacheSize:
+                self.cache.popitem(last=False)
+        return self.cache[measurement]
+
+    def setMeasurement(self, measurement):
+        """
+        Select the measurement used from the next block on
+
+        :param measurement: measurement index
+        """
+        spectra = self.getMeasurementSpectra(measurement)
+        if measurement == self.measurement:
+            return
+        if self.crossfade and self.previousSpectra is None:
+            self.previousSpectra = self.spectra
+        self.spectra = spectra
+        self.measurement = measurement
+
+    def reset(self):
+        """
+        Clear the internal state, as if no input had been processed
+        """
+        SOFAConvolver.reset(self)
+        self.previousSpectra = None
+
+    def processBlock(self, block):
+        """
+        Render one block of input
+
+        :param block:   ndarray with shape [E, blockSize] (or [blockSize] with a single emitter)
+        :return:        ndarray with shape [R, blockSize]
+        """
+        history = self.pushBlock(block)
+        output = self.renderBlock(self.spectra, history)
+        if self.previousSpectra is not None:
+            previous = self.renderBlock(self.previousSpectra, history)
+            output = previous + self.fade * (output - previous)
+            self.previousSpectra = None
+        return output
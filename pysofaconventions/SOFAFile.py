@@ -37,13 +37,20 @@
 
 import warnings
 
+import numpy as np
+
 from .SOFAAttributes import SOFAAttributes
 from .SOFAEmitter import SOFAEmitter
 from .SOFAError import SOFAError
+from .SOFAFIRConverter import SOFAFIRConverter
+from .SOFAHeaderValidator import SOFAHeaderValidator
+from .SOFAIRTrimmer import SOFAIRTrimmer
 from .SOFAListener import SOFAListener
 from .SOFANcFile import SOFANetCDFFile
 from .SOFAPositionVariable import SOFAPositionVariable
+from .SOFAReadAhead import SOFAReadAhead
 from .SOFAReceiver import SOFAReceiver
+from .SOFAResampler import SOFAResampler
 from .SOFASource import SOFASource
 from .SOFAUnits import SOFAUnits
 from .SOFAWarning import SOFAWarning
@@ -55,14 +62,62 @@ class SOFAFile(object):
     conventionVersionMajor = None
     conventionVersionMinor = None
 
+    # Storage backend used when none is given (see SOFANetCDFFile.backends)
+    defaultBackend = 'netcdf4'
+
     @classmethod
     def getConventionVersion(cls):
         return str(cls.conventionVersionMajor) + "." + str(cls.conventionVersionMinor)
 
     # # INIT
 
-    def __init__(self,path,mode):
-        self.ncfile = SOFANetCDFFile(path,mode)
+    def __init__(self,path,mode,backend=None):
+        """
+        :param path:    path of the file
+        :param mode:    'r' to read, 'w' to create, 'a' to modify
+        :param backend: storage backend name or class (see SOFANetCDFFile.getBackend),
+                        defaults to defaultBackend
+        """
+        self.ncfile = SOFANetCDFFile.getBackend(backend or self.defaultBackend)(path,mode)
+
+    @classmethod
+    def fromBytes(cls, buffer, name='<memory>'):
+        """
+        Open a SOFA file from its contents in memory, for reading, without touching the filesystem
+
+        :param buffer:  bytes-like object with the contents of a netCDF4 file
+        :param name:    name returned by getFilename
+        :return:        an instance of the class
+        """
+        sofafile = cls.__new__(cls)
+        sofafile.ncfile = SOFANetCDFFile(name, 'r', memory=buffer)
+        return sofafile
+
+    @classmethod
+    def getSource(cls, sofafile, backend=None):
+        """
+        Get what workers need to open a file again, since instances can not be shared by threads nor processes
+
+        :param sofafile:    a SOFAFile instance, or the path of a SOFA file
+        :param backend:     storage backend of a path (see SOFANetCDFFile.getBackend), defaults to defaultBackend
+        :return:            a picklable Tuple (path, backend class), to open with openSource
+        :raises:            SOFAError if the file was read from memory (see fromBytes)
+        """
+        if hasattr(sofafile, 'getFilename'):
+            if not sofafile.ncfile.reopenable:
+                raise SOFAError('Files read from memory can not be opened again: ' + str(sofafile.getFilename()))
+            return sofafile.getFilename(), type(sofafile.ncfile)
+        return sofafile, SOFANetCDFFile.getBackend(backend or cls.defaultBackend)
+
+    @classmethod
+    def openSource(cls, source, mode='r'):
+        """
+        :param source:  a Tuple (path, backend class), see getSource
+        :param mode:    'r' to read, 'a' to modify
+        :return:        a SOFAFile instance
+        """
+        path, backend = source
+        return SOFAFile(path, mode, backend=backend)
 
     def close(self):
         self.ncfile.close()
@@ -90,6 +145,27 @@ class SOFAFile(object):
 
         return True
 
+    def validateHeader(self):
+        """
+        Check file validity like isValid, from the metadata only, and without warnings (see SOFAHeaderValidator)
+
+        :return:    a Tuple (valid, message), with the error description of not valid files, or None
+        """
+        return SOFAHeaderValidator.validate(self)
+
+    def checkIntegrity(self, tolerance=1e-3, workers=None, chunkSize=None, processes=False):
+        """
+        Check the data and position values for NaN and Inf values and inconsistent geometry (see SOFAIntegrity)
+
+        :param tolerance:   maximum absolute cosine of the angle between Up and View vectors
+        :param workers:     number of workers of the data variables scan
+        :param chunkSize:   number of measurements read at once
+        :param processes:   whether to use a process pool instead of a thread pool
+        :return:            dictionary {name: {problem: ndarray of measurement indices}}
+        """
+        from .SOFAIntegrity import SOFAIntegrity
+        return SOFAIntegrity.check(self, tolerance, workers, chunkSize, processes)
+
 
     def getFile(self):
         """
@@ -506,18 +582,24 @@ class SOFAFile(object):
         return self.getVariableValue('EmitterView')
 
 
-    def getDataIR(self):
+    def getDataIR(self, untrimmed=False):
         """
         Get Values of Data.IR (the actual data)
+        :param untrimmed: for files written by SOFAIRTrimmer.trim, get the responses with their original alignment
         :return: ndarray with the values
         """
+        if untrimmed and SOFAIRTrimmer.isTrimmed(self):
+            return SOFAIRTrimmer.getUntrimmedIR(self)
         return self.getVariableValue('Data.IR')
 
-    def getDataDelay(self):
+    def getDataDelay(self, untrimmed=False):
         """
         Get Values of Data.Delay
+        :param untrimmed: for files written by SOFAIRTrimmer.trim, get the delays of the original alignment
         :return: ndarray with the values
         """
+        if untrimmed and SOFAIRTrimmer.isTrimmed(self):
+            return SOFAIRTrimmer.getUntrimmedDelay(self)
         return self.getVariableValue('Data.Delay')
 
     def getSamplingRate(self):
@@ -535,6 +617,79 @@ class SOFAFile(object):
         """
         return self.getVariableAttributeValue('Data.SamplingRate','Units')
 
+    def getDataIRResampled(self, targetRate, chunkSize=None, cacheDirectory=None):
+        """
+        Get Data.IR and Data.Delay converted to another sampling rate,
+        using batched polyphase filtering (see SOFAResampler)
+
+        :param targetRate:      the target sampling rate
+        :param chunkSize:       number of measurements resampled at once
+        :param cacheDirectory:  if given, results are cached there by file hash and target rate
+        :return:                a Tuple (ir, delay) of ndarrays
+        """
+        return SOFAResampler.getResampledData(self, targetRate, chunkSize, cacheDirectory)
+
+    def extract(self, selection, path, variables=None, chunkSize=None, compression=None):
+        """
+        Write a subset of the measurements to a new file of the same convention (see SOFASubset)
+
+        :param selection:   indices, a boolean mask with M entries, or a predicate on the measurements
+        :param path:        path of the new file
+        :param variables:   variables passed to the predicate
+        :param chunkSize:   number of measurements read at once
+        :param compression: dictionary {name: createVariable keyword arguments}, or a SOFACompression profile name
+        :return:            ndarray with the indices of the extracted measurements
+        """
+        from .SOFASubset import SOFASubset
+        return SOFASubset.extract(self, selection, path, variables, chunkSize, compression)
+
+    def iterMeasurements(self, batch=None, variables=None, readAhead=True, ranges=None):
+        """
+        Stream aligned chunks of several variables along the measurement dimension.
+        Variables with an M dimension are sliced along it, variables with an I dimension
+        are read once and broadcast along it to the chunk length, and the rest are read once.
+        With readAhead, the next chunk is read in a background thread while the current
+        one is processed, so at most two chunks are held in memory.
+
+        :param batch:       number of measurements per chunk (see SOFAFIRConverter.getChunkRanges)
+        :param variables:   list of variable names (defaults to all variables with an M dimension)
+        :param readAhead:   whether to read the next chunk in the background
+        :param ranges:      list of (start, stop) measurement ranges (defaults to consecutive chunks of batch)
+        :return:            an iterator of Tuples (start, stop, values), where values is
+                            a dictionary of ndarrays with the variable names as keys
+        :raises:            SOFAError if a variable does not exist
+        """
+        if variables is None:
+            variables = [name for name, var in self.getVariablesAsDict().items() if 'M' in var.dimensions]
+        instances = [(name, self.getVariableInstance(name)) for name in variables]
+        constants = dict((name, var[:]) for name, var in instances if 'M' not in var.dimensions)
+
+        def read(measurementRange):
+            start, stop = measurementRange
+            values = {}
+            for name, var in instances:
+                dimensions = var.dimensions
+                if 'M' in dimensions:
+                    index = [slice(None)] * len(dimensions)
+                    index[dimensions.index('M')] = slice(start, stop)
+                    with SOFANetCDFFile.lock:
+                        values[name] = var[tuple(index)]
+                elif 'I' in dimensions:
+                    shape = list(var.shape)
+                    shape[dimensions.index('I')] = stop - start
+                    data = constants[name]
+                    values[name] = np.ma.masked_array(np.broadcast_to(np.ma.getdata(data), shape),
+                                                      mask=np.broadcast_to(np.ma.getmaskarray(data), shape))
+                else:
+                    values[name] = constants[name]
+            return start, stop, values
+
+        if ranges is None:
+            ranges = SOFAFIRConverter.getChunkRanges(self.getDimensionSize('M'), batch)
+        if readAhead:
+            return iter(SOFAReadAhead(read, ranges))
+        return (read(measurementRange) for measurementRange in ranges)
+
     def getDataIRChannelOrdering(self):
         """
         Get ChannelOrdering of Data.IR (AmbisonicsDRIR only)
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFAFingerprint.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import hashlib
+import json
+import os
+import uuid
+from concurrent import futures
+
+import numpy as np
+
+from .SOFAFIRConverter import SOFAFIRConverter
+from .SOFAFile import SOFAFile
+from .SOFAMapReduce import SOFAMapReduce
+
+
+class SOFAFingerprint(object):
+    """
+    Canonical hash of the content of a SOFA file, independent of its storage layout.
+
+    The hash covers the global attributes (except the ignored ones), the dimensions,
+    and the name, type, dimensions, attributes and values of every variable, all in sorted order.
+    Chunking, compression, byte order, fill values and attribute order do not change it.
+
+    Variable data is hashed in leaves of about leafSize bytes along the first dimension.
+    The number of rows of a leaf only depends on the variable shape and type, so the leaves
+    can be read and hashed in parallel, with bounded memory, without changing the result.
+    """
+
+    # Attributes which change when a file is rewritten, without changing its content
+    ignoredAttributes = ['DateCreated', 'DateModified', 'APIName', 'APIVersion']
+    leafSize = 1 << 20
+
+    @classmethod
+    def getCanonicalValue(cls, value):
+        """
+        Convert an attribute value to a JSON serializable value
+
+        :param value:   a string, number or ndarray
+        :return:        the canonical value
+        """
+        if isinstance(value, bytes):
+            return value.decode('utf-8')
+        if isinstance(value, str):
+            return value
+        return np.asarray(value).tolist()
+
+    @classmethod
+    def getHeader(cls, sofafile, ignoredAttributes=None):
+        """
+        Get the canonical description of the metadata of a file
+
+        :param sofafile:            a SOFAFile instance
+        :param ignoredAttributes:   global attributes to exclude (defaults to ignoredAttributes)
+        :return:                    bytes of a JSON document with sorted keys
+        """
+        if ignoredAttributes is None:
+            ignoredAttributes = cls.ignoredAttributes
+        attributes = dict((name, cls.getCanonicalValue(value))
+                          for name, value in sofafile.getGlobalAttributesAsDict().items()
+                          if name not in ignoredAttributes)
+        dimensions = dict((name, len(dimension)) for name, dimension in sofafile.getDimensionsAsDict().items())
+        variables = {}
+        for name, variable in sofafile.getVariablesAsDict().items():
+            # Attributes starting with '_' (such as _FillValue) describe the storage
+            variables[name] = {
+                'dtype': cls.getCanonicalType(variable.dtype).str,
+                'dimensions': list(variable.dimensions),
+                'attributes': dict((attribute, cls.getCanonicalValue(variable.getncattr(attribute)))
+                                   for attribute in variable.ncattrs() if not attribute.startswith('_'))}
+        header = {'attributes': attributes, 'dimensions': dimensions, 'variables': variables}
+        return json.dumps(header, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+    @classmethod
+    def getCanonicalType(cls, dtype):
+        """
+        :param dtype:   type of a variable
+        :return:        the little-endian numpy dtype, or the object dtype for strings
+        """
+        dtype = np.dtype(dtype)
+        if dtype.kind in 'OU':
+            return np.dtype(object)
+        return dtype.newbyteorder('<') if dtype.byteorder not in '|' else dtype
+
+    @classmethod
+    def getDataDigest(cls, data):
+        """
+        Hash a block of variable data, including its mask
+
+        :param data:    ndarray or masked array
+        :return:        SHA-256 digest bytes
+        """
+        digest = hashlib.sha256()
+        mask = np.ma.getmaskarray(data)
+        data = np.ma.getdata(data)
+        if data.dtype.kind in 'OU':
+            values = np.where(mask, '', data).ravel()
+            digest.update('\0'.join(str(value) for value in values).encode('utf-8'))
+        else:
+            data = np.where(mask, np.zeros((), data.dtype), data)
+            digest.update(np.ascontiguousarray(data, dtype=cls.getCanonicalType(data.dtype)).tobytes())
+        digest.update(np.packbits(mask).tobytes())
+        return digest.digest()
+
+    @classmethod
+    def getLeafRows(cls, variable):
+        """
+        Get the number of rows along the first dimension hashed in each leaf
+
+        :param variable:    a netCDF4.Variable instance
+        :return:            number of rows
+        """
+        rowBytes = int(np.prod(variable.shape[1:])) * cls.getCanonicalType(variable.dtype).itemsize
+        return max(1, cls.leafSize // max(1, rowBytes))
+
+    @classmethod
+    def getFingerprint(cls, sofafile, ignoredAttributes=None, workers=None, processes=False):
+        """
+        Compute the canonical content hash of a file
+
+        :param sofafile:            a SOFAFile instance, or the path of a SOFA file
+        :param ignoredAttributes:   global attributes to exclude (defaults to ignoredAttributes)
+        :param workers:             number of workers hashing the leaves
+                                    (defaults to the number of CPUs; 1 runs in the calling thread)
+        :param processes:           whether to use a process pool instead of a thread pool
+        :return:                    hexadecimal SHA-256 digest string
+        """
+        source = SOFAFile.getSource(sofafile)
+        token = uuid.uuid4().hex
+        digest = hashlib.sha256()
+        tasks = []
+        leaves = {}
+
+        metadata = SOFAFile.openSource(source)
+        try:
+            digest.update(cls.getHeader(metadata, ignoredAttributes))
+            variables = metadata.getVariablesAsDict()
+            for name in sorted(variables):
+                variable = variables[name]
+                if len(variable.shape) == 0:
+                    leaves[name] = [cls.getDataDigest(variable[...])]
+                    continue
+                ranges = SOFAFIRConverter.getChunkRanges(variable.shape[0], cls.getLeafRows(variable))
+                leaves[name] = range(len(tasks), len(tasks) + len(ranges))
+                tasks.extend((token, source, name, 0, start, stop, cls.getDataDigest) for start, stop in ranges)
+        finally:
+            metadata.close()
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        try:
+            if workers <= 1 or len(tasks) <= 1:
+                results = [SOFAMapReduce.mapChunk(task) for task in tasks]
+            else:
+                executor = futures.ProcessPoolExecutor if processes else futures.ThreadPoolExecutor
+                with executor(max_workers=workers) as pool:
+                    results = list(pool.map(SOFAMapReduce.mapChunk, tasks))
+        finally:
+            SOFAMapReduce.closeFiles(token)
+
+        for name in sorted(leaves):
+            digest.update(name.encode('utf-8') + b'\0')
+            for leaf in leaves[name]:
+                digest.update(leaf if isinstance(leaf, bytes) else results[leaf])
+        return digest.hexdigest()
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFAH5pyFile.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import numpy as np
+
+from .SOFAError import SOFAError
+from .SOFAMemoryFile import SOFAMemoryDataset
+from .SOFAMemoryFile import SOFAMemoryDimension
+from .SOFAMemoryFile import SOFAMemoryVariable
+from .SOFANcFile import SOFANetCDFFile
+
+
+class SOFAH5pyVariable(SOFAMemoryVariable):
+    """
+    Variable of a netCDF4 file read with h5py
+    """
+
+    __slots__ = ('compression',)
+
+    def __init__(self, name, dimensions, dataset):
+        self.name = name
+        self.dimensions = tuple(dimensions)
+        self.data = dataset
+        self.shape = dataset.shape
+        stringInfo = SOFAH5pyFile.getH5py().check_string_dtype(dataset.dtype)
+        # Like netCDF4, the type is reported in native byte order
+        self.dtype = str if stringInfo is not None and stringInfo.length is None else dataset.dtype.newbyteorder('=')
+        self.autoMask = True
+        self.writable = False
+        self.compression = {'zlib': dataset.compression == 'gzip', 'complevel': dataset.compression_opts or 0,
+                            'shuffle': dataset.shuffle}
+        self.__dict__.update(SOFAH5pyFile.getAttributes(dataset.attrs))
+        self.fillValue = SOFANetCDFFile.getVariableFillValue(self)
+
+    def readData(self, index):
+        dataset = self.data.asstr() if self.dtype == str else self.data
+        if len(self.shape) == 0:
+            return dataset[()]
+        # h5py only supports increasing indices, so other selections are read as a whole
+        try:
+            return dataset[index]
+        except TypeError:
+            return dataset[()][index]
+
+    def chunking(self):
+        return list(self.data.chunks) if self.data.chunks else 'contiguous'
+
+    def filters(self):
+        return self.compression
+
+
+class SOFAH5pyDataset(SOFAMemoryDataset):
+    """
+    Read-only netCDF4 file opened with h5py, with the netCDF4.Dataset interface used by SOFANetCDFFile.
+    Dimensions are the HDF5 dimension scales, and netCDF internal attributes are hidden.
+    """
+
+    __slots__ = ('h5file',)
+
+    def __init__(self, path):
+        SOFAMemoryDataset.__init__(self, writable=False)
+        self.h5file = SOFAH5pyFile.getH5py().File(path, 'r')
+        self.__dict__.update(SOFAH5pyFile.getAttributes(self.h5file.attrs))
+
+        dimensions = []
+        for name, dataset in self.h5file.items():
+            if dataset.attrs.get('CLASS') == b'DIMENSION_SCALE':
+                dimensions.append((int(dataset.attrs['_Netcdf4Dimid']), name, dataset))
+        for dimid, name, dataset in sorted(dimensions, key=lambda dimension: dimension[0]):
+            self.dimensions[name] = SOFAMemoryDimension(name, dataset.shape[0], dataset.maxshape[0] is None)
+        for name, dataset in self.h5file.items():
+            if name in self.dimensions:
+                if bytes(dataset.attrs.get('NAME', b'')).startswith(SOFAH5pyFile.dimensionName):
+                    continue
+                # Coordinate variables are dimension scales of themselves
+                variableDimensions = [name]
+            else:
+                variableDimensions = [dimension[0].name.split('/')[-1] for dimension in dataset.dims]
+            self.variables[name] = SOFAH5pyVariable(name, variableDimensions, dataset)
+            # netCDF does not resize the scales of unlimited dimensions
+            for dimension, size in zip(variableDimensions, dataset.shape):
+                self.dimensions[dimension].size = max(self.dimensions[dimension].size, size)
+
+    def close(self):
+        self.h5file.close()
+
+
+class SOFAH5pyFile(SOFANetCDFFile):
+    """
+    SOFANetCDFFile reading netCDF4 files with h5py, without the netCDF library.
+    Files can only be opened for reading.
+    """
+
+    usesNetCDF = False
+
+    # Attributes used by the netCDF library to store its data model in HDF5
+    internalAttributes = ['_NCProperties', '_Netcdf4Dimid', '_Netcdf4Coordinates', '_nc3_strict',
+                          'DIMENSION_LIST', 'REFERENCE_LIST', 'CLASS', 'NAME']
+    dimensionName = b'This is a netCDF dimension but not a netCDF variable'
+
+    def __init__(self, path, mode='r'):
+        if mode != 'r':
+            raise SOFAError('The h5py backend can only open files for reading')
+        self.file = SOFAH5pyDataset(path)
+        self.filename = path
+
+    @classmethod
+    def getH5py(cls):
+        """
+        :return:    the h5py module
+        :raises:    SOFAError if h5py is not installed
+        """
+        try:
+            import h5py
+        except ImportError:  # pragma: no cover
+            raise SOFAError('The h5py backend requires h5py')
+        return h5py
+
+    @classmethod
+    def getAttributes(cls, attributes):
+        """
+        Convert HDF5 attributes to the values returned by netCDF4
+
+        :param attributes:  h5py AttributeManager
+        :return:            dictionary of attribute values, without the netCDF internal attributes
+        """
+        converted = {}
+        for name, value in attributes.items():
+            if name in cls.internalAttributes:
+                continue
+            if isinstance(value, bytes):
+                value = value.decode('utf-8')
+            elif isinstance(value, np.ndarray) and value.shape == (1,):
+                value = value[0]
+            converted[name] = value
+        return converted
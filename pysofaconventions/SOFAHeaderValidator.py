@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFAHeaderValidator.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+from .SOFAAttributes import SOFAAttributes
+from .SOFAError import SOFAError
+from .SOFANcFile import SOFANetCDFFile
+from .SOFAUnits import SOFAUnits
+
+
+class SOFAHeaderValidator(object):
+    """
+    Fast validation of SOFA files from their metadata only.
+
+    The global attributes, dimension sizes and variable shapes and attributes are read once,
+    and the rules of SOFAFile.isValid and of the convention classes are checked on them,
+    without reading any variable values or creating the position variable helpers.
+    Results are returned instead of warned, with the same error descriptions as isValid.
+
+    The specific rules of each convention are declared next to its isValid method,
+    in the headerRules attribute of the convention class (see checkConvention).
+    """
+
+    # Position objects: (name, dimensions with I, dimensions with M,
+    #                    whether Up and View always need the Units and Type attributes)
+    positionObjects = [('Listener', ('I', 'C'), ('M', 'C'), False),
+                       ('Source', ('I', 'C'), ('M', 'C'), False),
+                       ('Receiver', ('R', 'C', 'I'), ('R', 'C', 'M'), True),
+                       ('Emitter', ('E', 'C', 'I'), ('E', 'C', 'M'), True)]
+
+    # Data variables of each DataType: (name, allowed dimensions, expected dimensions description,
+    #                                   whether the Units attribute must be a frequency unit)
+    dataVariables = {
+        'FIR': [('Data.IR', [('M', 'R', 'N')], '[M,R,N]', False),
+                ('Data.SamplingRate', [('I',), ('M',)], '[I] or [R]', True),
+                ('Data.Delay', [('I', 'R'), ('M', 'R')], '[I,R] or [M,R]', False)],
+        'FIRE': [('Data.IR', [('M', 'R', 'E', 'N')], '[M,R,E,N]', False),
+                 ('Data.SamplingRate', [('I',), ('M',)], '[I] or [R]', True),
+                 ('Data.Delay', [('I', 'R', 'E'), ('M', 'R', 'E')], '[I,R,E] or [M,R,E]', False)],
+        'SOS': [('Data.IR', [('M', 'R', 'N')], '[M,R,N]', False),
+                ('Data.SamplingRate', [('I',), ('M',)], '[I] or [R]', True),
+                ('Data.Delay', [('I', 'R'), ('M', 'R')], '[I,R] or [M,R]', False)],
+        'TF': [('Data.Real', [('M', 'R', 'N')], '[M,R,N]', False),
+               ('Data.Imag', [('M', 'R', 'N')], '[M,R,N]', False),
+               ('N', [('N',)], '[N]', True)],
+    }
+
+    dimensionDescriptions = {'E': 'emitters', 'R': 'receivers', 'N': 'coefficients'}
+
+    @classmethod
+    def readHeader(cls, dataset):
+        """
+        Read the metadata of a dataset
+
+        :param dataset: a netCDF4.Dataset, or an object with its interface (see SOFANetCDFFile)
+        :return:        Tuple (attributes, dimensions, variables), with the global attributes dictionary,
+                        the dictionary {name: size} of the dimensions, and the dictionary
+                        {name: (shape, attributes)} of the variables
+        """
+        attributes = dict(dataset.__dict__)
+        dimensions = dict((name, len(dimension)) for name, dimension in dataset.dimensions.items())
+        variables = dict((name, (tuple(variable.shape), dict(variable.__dict__)))
+                         for name, variable in dataset.variables.items())
+        return attributes, dimensions, variables
+
+    @classmethod
+    def validate(cls, sofafile, conventions=None, backend=None):
+        """
+        Check the validity of a file from its metadata
+
+        :param sofafile:    a SOFAFile instance, or the path of a SOFA file
+        :param conventions: name of the convention whose rules are checked (defaults to the convention
+                            of the class of the instance, or to the SOFAConventions attribute of the file).
+                            Only the general rules are checked for unknown conventions.
+        :param backend:     storage backend used to open a path (see SOFANetCDFFile.getBackend)
+        :return:            Tuple (valid, message), with the error description of not valid files, or None
+        """
+        if hasattr(sofafile, 'getFile'):
+            header = cls.readHeader(sofafile.getFile())
+            if conventions is None:
+                conventions = type(sofafile).__name__[len('SOFA'):]
+        else:
+            ncfile = SOFANetCDFFile.getBackend(backend or 'netcdf4')(sofafile, 'r')
+            try:
+                header = cls.readHeader(ncfile.file)
+            finally:
+                ncfile.close()
+        return cls.validateHeader(header, conventions)
+
+    @classmethod
+    def validateHeader(cls, header, conventions=None):
+        """
+        Check the validity of file metadata
+
+        :param header:      the file metadata (see readHeader)
+        :param conventions: name of the convention whose rules are checked
+                            (defaults to the SOFAConventions attribute)
+        :return:            Tuple (valid, message), with the error description of not valid files, or None
+        """
+        if conventions is None:
+            conventions = header[0].get('SOFAConventions')
+        try:
+            cls.checkHeader(header)
+            if cls.getConventionRules(conventions) is not None:
+                cls.checkConvention(header, str(conventions))
+        except SOFAError as e:
+            return False, str(e)
+        return True, None
+
+    @classmethod
+    def isValid(cls, sofafile, conventions=None, backend=None):
+        """
+        :return:    whether the file is valid (see validate)
+        """
+        return cls.validate(sofafile, conventions, backend)[0]
+
+    @classmethod
+    def checkHeader(cls, header):
+        """
+        Check the rules of SOFAFile.isValid
+
+        :param header:  the file metadata (see readHeader)
+        :raises:        SOFAError with the description of the first broken rule
+        """
+        attributes, dimensions, variables = header
+
+        for attrName in SOFAAttributes.getAttributeNames():
+            if SOFAAttributes.isRequired(attrName) and attrName not in attributes:
+                raise SOFAError('Missing required attribute: ' + attrName)
+        if attributes['Conventions'] != 'SOFA':
+            raise SOFAError('File convention is not SOFA: ' + str(attributes['Conventions']))
+
+        cls.checkDimensions(dimensions)
+        for positionObject in cls.positionObjects:
+            cls.checkPositionVariables(header, *positionObject)
+        cls.checkDataVariables(header)
+
+    @classmethod
+    def checkDimensions(cls, dimensions):
+        """
+        :param dimensions:  dictionary {name: size}
+        :raises:            SOFAError if a dimension is missing or has an invalid size
+        """
+        for dimension in ['M', 'N', 'R', 'E', 'I', 'C']:
+            if dimension not in dimensions:
+                raise SOFAError('Dimension not found: ' + dimension)
+        for dimension in ['M', 'N', 'R', 'E']:
+            if dimensions[dimension] < 1:
+                raise SOFAError('Incorrect dimension size for ' + dimension + ': ' + str(dimensions[dimension]))
+        for dimension, size in [('I', 1), ('C', 3)]:
+            if dimensions[dimension] != size:
+                raise SOFAError('Incorrect dimension size for ' + dimension + ': ' + str(dimensions[dimension]))
+
+    @classmethod
+    def checkPositionVariables(cls, header, name, dimensionsI, dimensionsM, orientationAttributes):
+        """
+        Check the Position, Up and View variables of a position object
+
+        :param header:                  the file metadata (see readHeader)
+        :param name:                    'Listener', 'Source', 'Receiver' or 'Emitter'
+        :param dimensionsI:             dimension names of the variables with I
+        :param dimensionsM:             dimension names of the variables with M
+        :param orientationAttributes:   whether Up and View always need the Units and Type attributes
+        :raises:                        SOFAError if the variables are not valid
+        """
+        attributes, dimensions, variables = header
+        position, up, view = name + 'Position', name + 'Up', name + 'View'
+        if position not in variables:
+            raise SOFAError('Missing Variable: ' + position)
+
+        cls.checkPositionAttributes(variables, position, True)
+        if up in variables and orientationAttributes:
+            cls.checkPositionAttributes(variables, up, True)
+        if view in variables:
+            # By AES69-2015 SingleRoomDRIR specs, ListenerView and SourceView units are not mandatory
+            units = orientationAttributes or attributes.get('SOFAConventions') != 'SingleRoomDRIR'
+            cls.checkPositionAttributes(variables, view, units)
+
+        if up in variables and view not in variables:
+            raise SOFAError(up + ' exists but not ' + view)
+        if view in variables and up not in variables:
+            raise SOFAError(view + ' exists but not ' + up)
+
+        allowed = [tuple(dimensions[dimension] for dimension in dimensionsI),
+                   tuple(dimensions[dimension] for dimension in dimensionsM)]
+        expected = '[' + ','.join(dimensionsI) + '] or [' + ','.join(dimensionsM) + ']'
+        for variable in [position, up, view]:
+            if variable in variables and variables[variable][0] not in allowed:
+                # Like SOFAListener and the other helpers, the Position dimensions are reported
+                raise SOFAError('Invalid ' + variable + ' Dimensions (should be ' + expected + '): ',
+                                variables[position][0])
+
+    @classmethod
+    def checkPositionAttributes(cls, variables, name, units):
+        """
+        :param variables:   dictionary {name: (shape, attributes)}
+        :param name:        the position variable name
+        :param units:       whether the Units attribute is required
+        :raises:            SOFAError if the Units or Type attributes are missing
+        """
+        if units and 'Units' not in variables[name][1]:
+            raise SOFAError('Missing Variable Attribute: ' + name + '.Units')
+        if 'Type' not in variables[name][1]:
+            raise SOFAError('Missing Variable Attribute: ' + name + '.Coordinates')
+
+    @classmethod
+    def checkDataVariables(cls, header):
+        """
+        :param header:  the file metadata (see readHeader)
+        :raises:        SOFAError if the data variables do not match the DataType
+        """
+        attributes, dimensions, variables = header
+        dataType = attributes['DataType']
+        if str(dataType) not in cls.dataVariables:
+            raise SOFAError('DataType not known: ' + str(dataType))
+
+        for name, allowedDimensions, expected, frequencyUnits in cls.dataVariables[str(dataType)]:
+            if name not in variables:
+                raise SOFAError('Missing ' + name + ' Variable')
+            shape, variableAttributes = variables[name]
+            allowed = [tuple(dimensions[dimension] for dimension in names) for names in allowedDimensions]
+            if shape not in allowed:
+                raise SOFAError('Incorrect ' + name + ' dimensions: ' + str(shape) + '. Expected ' + expected)
+            if frequencyUnits:
+                units = variableAttributes.get('Units')
+                if units is None:
+                    raise SOFAError('Missing Attribute ' + name + '.Units')
+                if not SOFAUnits.isFrequencyUnit(units):
+                    raise SOFAError('Attribute ' + name + '.Units is not a frequency unit: ' + units)
+
+    @classmethod
+    def getConventionRules(cls, conventions):
+        """
+        :param conventions: a convention name
+        :return:            the headerRules of the convention class, or None if the convention is not known
+        """
+        from . import SOFAConventions
+        return getattr(getattr(SOFAConventions, 'SOFA' + str(conventions), None), 'headerRules', None)
+
+    @classmethod
+    def checkConvention(cls, header, conventions):
+        """
+        Check the rules of a convention: 'DataType' and 'RoomType' values, required global 'attributes'
+        and 'dataIRAttributes', position objects whose Up and View 'variables' are required,
+        required 'dimensionSizes', 'dimensionMultiples' and 'equalDimensions'
+
+        :param header:      the file metadata (see readHeader)
+        :param conventions: the convention name
+        :raises:            SOFAError with the description of the first broken rule
+        """
+        attributes, dimensions, variables = header
+        rules = cls.getConventionRules(conventions)
+
+        for attrName, value in [('DataType', rules['DataType']), ('SOFAConventions', conventions),
+                                ('RoomType', rules.get('RoomType'))]:
+            if value is not None and attributes[attrName] != value:
+                raise SOFAError(attrName + ' is not "' + value + '", got: "' + str(attributes[attrName]) + '"')
+
+        for attrName in rules.get('attributes', []):
+            if attrName not in attributes:
+                raise SOFAError('Missing required Global Attribute "' + attrName + '"')
+        for attrName in rules.get('dataIRAttributes', []):
+            if attrName not in variables['Data.IR'][1]:
+                raise SOFAError('Missing required Data.IR Attribute "' + attrName + '"')
+        for name in rules.get('variables', []):
+            if name + 'Up' not in variables or name + 'View' not in variables:
+                raise SOFAError('Missing required Variables "' + name + 'Up" and "' + name + 'View"')
+
+        for dimension, size in rules.get('dimensionSizes', []):
+            if dimensions[dimension] != size:
+                raise SOFAError('Number of ' + cls.dimensionDescriptions[dimension] + ' (' + dimension +
+                                ') is not "' + str(size) + '", got "' + str(dimensions[dimension]) + '"')
+        for dimension, multiple in rules.get('dimensionMultiples', []):
+            if dimensions[dimension] % multiple != 0:
+                raise SOFAError('Number of ' + cls.dimensionDescriptions[dimension] + ' (' + dimension +
+                                ') is not multiple of "' + str(multiple) + '", got "' +
+                                str(dimensions[dimension]) + '"')
+        for first, second in rules.get('equalDimensions', []):
+            if dimensions[first] != dimensions[second]:
+                raise SOFAError('Number of ' + cls.dimensionDescriptions[first] + ' (' + first + ') and number of ' +
+                                cls.dimensionDescriptions[second] + ' (' + second + ') do not match, got "' +
+                                str(dimensions[first]) + '" and "' + str(dimensions[second]) + '"')
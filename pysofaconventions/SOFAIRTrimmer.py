@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFAIRTrimmer.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import numpy as np
+
+from .SOFAError import SOFAError
+from .SOFAFIRConverter import SOFAFIRConverter
+from .SOFAWriter import SOFAWriter
+
+
+class SOFAIRTrimmer(object):
+    """
+    Storage of FIR or FIRE data without the leading silence and the decayed tail of the impulse responses.
+
+    Each impulse response is shifted to start at its onset (minus a margin), and all of them are cut
+    to the longest onset-to-decay length. The removed leading samples are added to Data.Delay,
+    which becomes [M,R] (or [M,R,E] for FIRE data), so the trimmed file is a valid SOFA file
+    of the same DataType with the same timing.
+    The removed samples and the original length are kept in the offsetVariable variable,
+    with the same dimensions as Data.Delay, to reconstruct the original alignment when reading.
+    """
+
+    offsetVariable = 'TrimOffset'
+    lengthAttribute = 'OriginalLength'
+
+    @classmethod
+    def getTrimPoints(cls, ir, threshold=-60., margin=4):
+        """
+        Find the onset and decay samples of impulse responses
+
+        :param ir:          ndarray with the impulse responses along the last axis
+        :param threshold:   level, in dB relative to the peak of each response, of the onset and decay samples
+        :param margin:      number of samples kept before the onset and after the decay
+        :return:            (onset, decay) ndarrays of sample indices (decay is -1 for silent responses)
+        """
+        envelope = np.abs(np.ma.filled(ir, 0.))
+        peak = envelope.max(axis=-1, keepdims=True)
+        above = (envelope >= peak * 10. ** (threshold / 20.)) & (peak > 0)
+        n = envelope.shape[-1]
+        silent = ~above.any(axis=-1)
+        onset = np.where(silent, 0, np.maximum(np.argmax(above, axis=-1) - margin, 0))
+        decay = np.where(silent, -1, np.minimum(n - 1 - np.argmax(above[..., ::-1], axis=-1) + margin, n - 1))
+        return onset, decay
+
+    @classmethod
+    def isTrimmed(cls, sofafile):
+        """
+        :param sofafile:    a SOFAFile instance
+        :return:            whether the file was written by trim
+        """
+        return sofafile.hasVariable(cls.offsetVariable)
+
+    @classmethod
+    def getResponseDimensions(cls, sofafile):
+        """
+        :param sofafile:    a SOFAFile instance
+        :return:            names of the dimensions of Data.IR before N: ('M', 'R') for FIR data,
+                            and ('M', 'R', 'E') for FIRE data
+        :raises:            SOFAError if the file does not have FIR or FIRE data
+        """
+        if sofafile.isFIRDataType():
+            return 'M', 'R'
+        if sofafile.isFIREDataType():
+            return 'M', 'R', 'E'
+        raise SOFAError('Only FIR or FIRE data can be trimmed: ' + str(sofafile.getGlobalAttributeValue('DataType')))
+
+    @classmethod
+    def getTrimRange(cls, sofafile, threshold=-60., margin=4, chunkSize=None):
+        """
+        Find the samples kept for each impulse response
+
+        :param sofafile:    a SOFAFile instance with FIR or FIRE data
+        :param threshold:   level of the onset and decay samples (see getTrimPoints)
+        :param margin:      number of samples kept before the onset and after the decay
+        :param chunkSize:   number of measurements read at once
+        :return:            (onset, length): [M,R] ([M,R,E] for FIRE data) ndarray with the first kept sample
+                            of each response, and the number of kept samples
+        :raises:            SOFAError if the file does not have FIR or FIRE data
+        """
+        cls.getResponseDimensions(sofafile)
+        variable = sofafile.getVariableInstance('Data.IR')
+        onsets = np.zeros(variable.shape[:-1], dtype=int)
+        length = 1
+        for start, stop in SOFAFIRConverter.getChunkRanges(variable.shape[0], chunkSize):
+            onset, decay = cls.getTrimPoints(variable[start:stop], threshold, margin)
+            onsets[start:stop] = onset
+            length = max(length, int(np.max(decay - onset + 1, initial=0)))
+        return onsets, length
+
+    @classmethod
+    def getDelay(cls, sofafile):
+        """
+        :param sofafile:    a SOFAFile instance
+        :return:            [M,R] ([M,R,E] for FIRE data) ndarray with Data.Delay
+        """
+        delay = np.ma.filled(sofafile.getDataDelay(), 0.)
+        return np.broadcast_to(delay, (sofafile.getDimensionSize('M'),) + delay.shape[1:])
+
+    @classmethod
+    def trim(cls, sofafile, path, threshold=-60., margin=4, chunkSize=None, compression=None):
+        """
+        Write a copy of a FIR or FIRE file with trimmed impulse responses
+
+        :param sofafile:    a SOFAFile instance with FIR or FIRE data
+        :param path:        path of the new file
+        :param threshold:   level of the onset and decay samples (see getTrimPoints)
+        :param margin:      number of samples kept before the onset and after the decay
+        :param chunkSize:   number of measurements processed at once
+        :param compression: dictionary {name: createVariable keyword arguments}, or a SOFACompression profile name
+        :return:            the number of samples of the trimmed responses
+        """
+        dimensions = cls.getResponseDimensions(sofafile)
+        onsets, length = cls.getTrimRange(sofafile, threshold, margin, chunkSize)
+        variable = sofafile.getVariableInstance('Data.IR')
+        originalLength = variable.shape[-1]
+        offsets = onsets
+        if cls.isTrimmed(sofafile):
+            # Trimming again accumulates the offsets of the original alignment
+            previous = sofafile.getVariableInstance(cls.offsetVariable)
+            offsets = onsets + np.ma.filled(previous[:], 0).astype(int)
+            originalLength = int(previous.getncattr(cls.lengthAttribute))
+
+        target = SOFAWriter.createFromTemplate(sofafile, path, dimensions={'N': length},
+                                               variables={'Data.IR': dimensions + ('N',), 'Data.Delay': dimensions,
+                                                          cls.offsetVariable: dimensions},
+                                               chunkSize=chunkSize, compression=compression)
+        try:
+            target.variables['Data.Delay'][:] = cls.getDelay(sofafile) + onsets
+            offsetVar = target.variables[cls.offsetVariable]
+            offsetVar.Units = 'samples'
+            offsetVar.setncattr(cls.lengthAttribute, originalLength)
+            offsetVar[:] = offsets
+            for start, stop in SOFAFIRConverter.getChunkRanges(variable.shape[0], chunkSize):
+                target.variables['Data.IR'][start:stop] = cls.trimChunk(variable[start:stop], onsets[start:stop],
+                                                                        length)
+        finally:
+            target.close()
+        return length
+
+    @classmethod
+    def trimChunk(cls, ir, onsets, length):
+        """
+        :param ir:      [K,R,N] (or [K,R,E,N]) ndarray with impulse responses (masked values are zero)
+        :param onsets:  [K,R] (or [K,R,E]) ndarray with the first kept sample of each response
+        :param length:  number of kept samples
+        :return:        [K,R,length] (or [K,R,E,length]) ndarray with the kept samples
+                        (zero after the end of the responses)
+        """
+        ir = np.ma.filled(ir, 0.)
+        ir = np.pad(ir, ((0, 0),) * (ir.ndim - 1) + ((0, length),))
+        return np.take_along_axis(ir, onsets[..., np.newaxis] + np.arange(length), axis=-1)
+
+    @classmethod
+    def getUntrimmedIR(cls, sofafile, start=None, stop=None):
+        """
+        Read impulse responses with their original alignment and length
+
+        :param sofafile:    a SOFAFile instance written by trim
+        :param start:       first measurement
+        :param stop:        end of the measurements
+        :return:            [M,R,N] (or [M,R,E,N]) ndarray with the original number of samples
+        """
+        offsetVar = sofafile.getVariableInstance(cls.offsetVariable)
+        originalLength = int(offsetVar.getncattr(cls.lengthAttribute))
+        ir = np.ma.filled(sofafile.getVariableInstance('Data.IR')[start:stop], 0.)
+        offsets = np.ma.filled(offsetVar[start:stop], 0).astype(int)
+        length = ir.shape[-1]
+        untrimmed = np.zeros(ir.shape[:-1] + (originalLength + length,), dtype=ir.dtype)
+        np.put_along_axis(untrimmed, offsets[..., np.newaxis] + np.arange(length), ir, axis=-1)
+        return untrimmed[..., :originalLength]
+
+    @classmethod
+    def getUntrimmedDelay(cls, sofafile):
+        """
+        :param sofafile:    a SOFAFile instance written by trim
+        :return:            [M,R] ([M,R,E] for FIRE data) ndarray with Data.Delay for the original alignment
+        """
+        return cls.getDelay(sofafile) - np.ma.filled(sofafile.getVariableValue(cls.offsetVariable), 0)
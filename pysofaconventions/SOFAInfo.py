@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFAInfo.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import argparse
+import functools
+import glob
+import json
+import os
+import sys
+from concurrent import futures
+
+import numpy as np
+
+from .SOFACatalog import SOFACatalog
+from .SOFAError import SOFAError
+from .SOFAFile import SOFAFile
+from .SOFAHeaderValidator import SOFAHeaderValidator
+from .SOFANcFile import SOFANetCDFFile
+from .SOFAResampler import SOFAResampler
+
+
+class SOFAInfo(object):
+    """
+    Summaries of SOFA files, as JSON-serializable dictionaries.
+
+    Summaries are built from a single open of each file, from its metadata only:
+    global attributes, dimensions, variable dimensions, shapes, types and attributes,
+    and the header validation result (see SOFAHeaderValidator). Optionally, the sampling rate
+    and the SourcePosition ranges are added, which are the only values read.
+    Files are summarized in a process pool, and results are returned in input order.
+    """
+
+    formats = ['text', 'json', 'ndjson']
+
+    @classmethod
+    def getJSONValue(cls, value):
+        """
+        :param value:   an attribute value
+        :return:        the value as a JSON-serializable object
+        """
+        if isinstance(value, bytes):
+            return value.decode('utf-8', 'replace')
+        if isinstance(value, np.ndarray):
+            return [cls.getJSONValue(item) for item in value.tolist()]
+        if isinstance(value, np.generic):
+            return cls.getJSONValue(value.item())
+        if isinstance(value, float) and not np.isfinite(value):
+            return None
+        return value
+
+    @classmethod
+    def getInfo(cls, path, values=False, backend=None):
+        """
+        Summarize a file
+
+        :param path:    path of the file
+        :param values:  whether to add the 'samplingRate' and the SourcePosition ranges (see SOFACatalog),
+                        the only values read
+        :param backend: storage backend (see SOFANetCDFFile.getBackend)
+        :return:        dictionary with 'path', 'size', 'conventions', 'conventionsVersion', 'dataType',
+                        'valid', 'error', 'attributes', 'dimensions' and 'variables' (with 'dimensions',
+                        'shape', 'dtype' and 'attributes' of each variable).
+                        Files which can not be read have 'valid' False, the 'error', and no metadata.
+        """
+        # The netCDF-C and HDF5 libraries can not be used from several threads (see SOFAThreadSafeFile)
+        with SOFANetCDFFile.lock:
+            info = {'path': path, 'valid': False, 'error': None}
+            try:
+                info['size'] = os.path.getsize(path)
+                sofafile = SOFAFile(path, 'r', backend=backend)
+            except (IOError, OSError, SOFAError) as e:
+                info['error'] = str(e) or e.__class__.__name__
+                return info
+            try:
+                dataset = sofafile.getFile()
+                header = SOFAHeaderValidator.readHeader(dataset)
+                attributes, dimensions, variables = header
+                info['conventions'] = cls.getJSONValue(attributes.get('SOFAConventions'))
+                info['conventionsVersion'] = cls.getJSONValue(attributes.get('SOFAConventionsVersion'))
+                info['dataType'] = cls.getJSONValue(attributes.get('DataType'))
+                info['valid'], info['error'] = SOFAHeaderValidator.validateHeader(header)
+                info['attributes'] = dict((name, cls.getJSONValue(value)) for name, value in attributes.items())
+                info['dimensions'] = dimensions
+                info['variables'] = {}
+                for name, variable in dataset.variables.items():
+                    info['variables'][name] = {
+                        'dimensions': list(variable.dimensions),
+                        'shape': list(variables[name][0]),
+                        'dtype': 'str' if variable.dtype == str else np.dtype(variable.dtype).name,
+                        'attributes': dict((attribute, cls.getJSONValue(value))
+                                           for attribute, value in variables[name][1].items())}
+                if values:
+                    try:
+                        info['samplingRate'] = SOFAResampler.getFileSamplingRate(sofafile)
+                    except SOFAError:
+                        info['samplingRate'] = None
+                    info.update(dict((key, cls.getJSONValue(value))
+                                     for key, value in SOFACatalog.getPositionRanges(sofafile).items()))
+            finally:
+                sofafile.close()
+            return info
+
+    @classmethod
+    def findPaths(cls, inputs, pattern=None):
+        """
+        Expand files, directories (searched recursively) and glob patterns
+
+        :param inputs:  list of paths or patterns
+        :param pattern: filename pattern of the files searched in directories (see SOFACatalog.findFiles)
+        :return:        list of paths, in input order, without duplicates
+        """
+        paths = []
+        for item in inputs:
+            if os.path.isdir(item):
+                paths.extend(SOFACatalog.findFiles(item, pattern))
+            elif glob.has_magic(item):
+                paths.extend(sorted(glob.glob(item, recursive=True)))
+            else:
+                paths.append(item)
+        seen = set()
+        return [path for path in paths if not (path in seen or seen.add(path))]
+
+    @classmethod
+    def iterInfo(cls, paths, values=False, backend=None, workers=None, processes=True):
+        """
+        Summarize several files in parallel
+
+        :param paths:       list of paths
+        :param values:      whether to read the sampling rate and SourcePosition ranges (see getInfo)
+        :param backend:     storage backend (see SOFANetCDFFile.getBackend)
+        :param workers:     number of parallel workers (defaults to the number of CPUs; 1 runs in the calling thread)
+        :param processes:   whether to use a process pool instead of a thread pool
+        :return:            iterator of summaries, in the order of paths
+        """
+        function = functools.partial(cls.getInfo, values=values, backend=backend)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers <= 1 or len(paths) <= 1:
+            for path in paths:
+                yield function(path)
+            return
+        executor = futures.ProcessPoolExecutor if processes else futures.ThreadPoolExecutor
+        with executor(max_workers=workers) as pool:
+            # Batches of files per task, so that the pool overhead is small compared to opening the files
+            for info in pool.map(function, paths, chunksize=max(1, len(paths) // (4 * workers))):
+                yield info
+
+    @classmethod
+    def getText(cls, info):
+        """
+        Format a summary as text, without attribute values nor arrays
+
+        :param info:    a summary (see getInfo)
+        :return:        List of lines
+        """
+        if 'variables' not in info:
+            return [info['path'] + ': error: ' + str(info['error'])]
+        status = 'valid' if info['valid'] else 'not valid: ' + str(info['error'])
+        lines = [info['path'] + ': ' + status,
+                 '  ' + str(info['conventions']) + ' ' + str(info['conventionsVersion']) +
+                 ', DataType ' + str(info['dataType']) + ', ' + str(info['size']) + ' bytes',
+                 '  dimensions: ' + ', '.join(name + '=' + str(size) for name, size in info['dimensions'].items())]
+        for name, variable in info['variables'].items():
+            lines.append('  ' + name + ' (' + ','.join(variable['dimensions']) + ') ' + variable['dtype'])
+        for key in ['samplingRate', 'azimuthMin', 'azimuthMax', 'elevationMin', 'elevationMax',
+                    'distanceMin', 'distanceMax']:
+            if key in info:
+                lines.append('  ' + key + ': ' + str(info[key]))
+        return lines
+
+    @classmethod
+    def main(cls, argv=None):
+        """
+        Command line interface: sofainfo [--format json|ndjson] file.sofa|directory|pattern ...
+
+        :param argv:    List of arguments (defaults to sys.argv[1:])
+        :return:        exit status: 0 if all files are valid, 1 if any is not valid, 2 if any can not be read
+        """
+        parser = argparse.ArgumentParser(prog='sofainfo', description='Summarize SOFA files')
+        parser.add_argument('inputs', nargs='+', help='SOFA files, directories or glob patterns')
+        parser.add_argument('--format', choices=cls.formats, default='text', help='output format')
+        parser.add_argument('--pattern', help='filename pattern of the files searched in directories')
+        parser.add_argument('--values', action='store_true',
+                            help='also read the sampling rate and the SourcePosition ranges')
+        parser.add_argument('--workers', type=int, help='number of parallel workers')
+        parser.add_argument('--backend', help='storage backend')
+        args = parser.parse_args(argv)
+
+        paths = cls.findPaths(args.inputs, args.pattern)
+        status = 0
+        infos = []
+        for info in cls.iterInfo(paths, args.values, args.backend, args.workers):
+            if 'variables' not in info:
+                status = 2
+            elif not info['valid']:
+                status = max(status, 1)
+            if args.format == 'ndjson':
+                sys.stdout.write(json.dumps(info) + '\n')
+                sys.stdout.flush()
+            elif args.format == 'json':
+                infos.append(info)
+            else:
+                sys.stdout.write('\n'.join(cls.getText(info)) + '\n')
+        if args.format == 'json':
+            sys.stdout.write(json.dumps(infos, indent=1) + '\n')
+        return status
+
+
+def main():
+    sys.exit(SOFAInfo.main())
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFAIntegrity.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import argparse
+import functools
+import sys
+
+import numpy as np
+
+from .SOFAError import SOFAError
+from .SOFAFile import SOFAFile
+from .SOFAHeaderValidator import SOFAHeaderValidator
+from .SOFAMapReduce import SOFAMapReduce
+from .SOFAUnits import SOFAUnits
+
+
+class SOFAIntegrity(object):
+    """
+    Numerical integrity checks of the values of SOFA files, complementary to the structural checks of isValid.
+
+    Floating point data variables are scanned for NaN and Inf values, in parallel hyperslabs along M
+    (see SOFAMapReduce). Position variables are read in chunks of measurements (see SOFAFile.iterMeasurements),
+    and checked for non-finite values, coordinate types and units which do not match,
+    negative radii and elevations out of range, and Up and View vectors of zero length or not orthogonal.
+    Memory use is bounded by the chunk size, so files larger than memory can be checked.
+
+    Problems are reported as {variable name: {problem: ndarray of measurement indices}}, where the indices
+    of variables without an M dimension include all the measurements.
+    Orthogonality problems are reported under the Up variable.
+    """
+
+    positionObjects = ['Listener', 'Source', 'Receiver', 'Emitter']
+
+    @classmethod
+    def getNonFiniteRows(cls, axis, data):
+        """
+        :param axis:    index of the measurement axis
+        :param data:    ndarray hyperslab (masked values are ignored)
+        :return:        boolean ndarray along the axis, True where there are NaN or Inf values
+        """
+        data = np.moveaxis(np.ma.filled(data, 0.), axis, 0)
+        return ~np.isfinite(data.reshape(data.shape[0], -1)).all(axis=1)
+
+    @classmethod
+    def checkDataVariables(cls, sofafile, variables=None, workers=None, chunkSize=None, processes=False):
+        """
+        Find the measurements with NaN or Inf values in floating point data variables
+
+        :param sofafile:    a SOFAFile instance, or the path of a SOFA file
+        :param variables:   names of the checked variables (defaults to the floating point 'Data.' variables)
+        :param workers:     number of workers (see SOFAMapReduce.mapReduce)
+        :param chunkSize:   number of measurements read at once by each worker
+        :param processes:   whether to use a process pool instead of a thread pool
+        :return:            dictionary {name: {'nonFinite': ndarray of measurement indices}}
+        """
+        source = SOFAFile.getSource(sofafile)
+        metadata = SOFAFile.openSource(source)
+        try:
+            m = metadata.getDimensionSize('M')
+            instances = metadata.getVariablesAsDict()
+            if variables is None:
+                variables = [name for name, variable in instances.items() if name.startswith('Data.') and
+                             variable.dtype != str and np.dtype(variable.dtype).kind in 'fc']
+            # Variables without M are small: read them here
+            constants = dict((name, cls.getNonFiniteRows(0, instances[name][:]).any()) for name in variables
+                             if 'M' not in instances[name].dimensions)
+            axes = dict((name, instances[name].dimensions.index('M')) for name in variables if name not in constants)
+        finally:
+            metadata.close()
+
+        problems = {}
+        for name in variables:
+            if name in constants:
+                indices = np.arange(m) if constants[name] else np.arange(0)
+            else:
+                rows = SOFAMapReduce.mapReduce(sofafile, functools.partial(cls.getNonFiniteRows, axes[name]),
+                                               variable=name, axis='M', workers=workers, chunkSize=chunkSize,
+                                               processes=processes)
+                indices = np.flatnonzero(np.concatenate(rows))
+            if len(indices):
+                problems[name] = {'nonFinite': indices}
+        return problems
+
+    @classmethod
+    def getMeasurementValues(cls, values, dimensions):
+        """
+        :param values:      a chunk of a position variable, as returned by SOFAFile.iterMeasurements
+        :param dimensions:  the variable dimension names
+        :return:            float ndarray with the measurements first and the coordinates last
+                            (masked values are NaN)
+        """
+        values = np.ma.filled(np.ma.asarray(values, dtype=float), np.nan)
+        axis = dimensions.index('M') if 'M' in dimensions else dimensions.index('I')
+        return np.moveaxis(values, [axis, dimensions.index('C')], [0, -1])
+
+    @classmethod
+    def isRadianUnit(cls, units):
+        """
+        :param units:   a Units attribute value
+        :return:        whether spherical angles are given in radians
+        """
+        return 'radian' in str(units)
+
+    @classmethod
+    def unitsMatchCoordinates(cls, units, coordinates):
+        """
+        :param units:       the Units attribute value, or None
+        :param coordinates: the Type attribute value, or None (cartesian)
+        :return:            whether the units are valid for the coordinate type
+        """
+        if coordinates not in [None, 'cartesian', 'spherical']:
+            return False
+        if units is None:
+            return True
+        if coordinates == 'spherical':
+            if cls.isRadianUnit(units):
+                return True
+            return SOFAUnits.isValid(units) and SOFAUnits.getType(units) == SOFAUnits.UnitTypes.SphericalUnits
+        return SOFAUnits.isValid(units) and SOFAUnits.isDistanceUnit(units)
+
+    @classmethod
+    def getCartesian(cls, positions, units, coordinates):
+        """
+        :param positions:   ndarray with shape [..., C]
+        :param units:       the Units attribute value, or None
+        :param coordinates: the Type attribute value, or None (cartesian)
+        :return:            the cartesian vectors, with shape [..., C]
+        """
+        if coordinates != 'spherical':
+            return positions
+        azimuth, elevation, radius = positions[..., 0], positions[..., 1], positions[..., 2]
+        if not cls.isRadianUnit(units):
+            azimuth, elevation = np.radians(azimuth), np.radians(elevation)
+        return np.stack([radius * np.cos(elevation) * np.cos(azimuth),
+                         radius * np.cos(elevation) * np.sin(azimuth),
+                         radius * np.sin(elevation)], axis=-1)
+
+    @classmethod
+    def getAnyRows(cls, condition):
+        """
+        :param condition:   boolean ndarray with the measurements first
+        :return:            boolean ndarray with a value per measurement
+        """
+        return condition.reshape(condition.shape[0], -1).any(axis=1)
+
+    @classmethod
+    def checkPositionValues(cls, positions, units, coordinates):
+        """
+        Check a chunk of position values
+
+        :param positions:   ndarray with the measurements first and the coordinates last
+        :param units:       the Units attribute value, or None
+        :param coordinates: the Type attribute value, or None (cartesian)
+        :return:            dictionary {problem: boolean ndarray with a value per measurement}
+        """
+        problems = {'nonFinite': cls.getAnyRows(~np.isfinite(positions))}
+        if not cls.unitsMatchCoordinates(units, coordinates):
+            problems['units'] = np.ones(len(positions), dtype=bool)
+        elif coordinates == 'spherical':
+            limit = np.pi / 2 if cls.isRadianUnit(units) else 90.
+            with np.errstate(invalid='ignore'):
+                problems['radius'] = cls.getAnyRows(positions[..., 2] < 0)
+                problems['elevation'] = cls.getAnyRows(np.abs(positions[..., 1]) > limit)
+        return problems
+
+    @classmethod
+    def checkOrientationValues(cls, up, view, tolerance):
+        """
+        Check a chunk of Up and View vectors
+
+        :param up:          cartesian Up vectors, with the measurements first and the coordinates last
+        :param view:        cartesian View vectors, with the same shape
+        :param tolerance:   maximum absolute cosine of the angle between Up and View
+        :return:            Tuple of dictionaries ({problem: rows} of Up, {problem: rows} of View)
+        """
+        upNorm, viewNorm = np.linalg.norm(up, axis=-1), np.linalg.norm(view, axis=-1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cosine = np.abs(np.sum(up * view, axis=-1)) / (upNorm * viewNorm)
+        upZero, viewZero = upNorm == 0, viewNorm == 0
+        notOrthogonal = (cosine > tolerance) & ~upZero & ~viewZero
+        return ({'zeroLength': cls.getAnyRows(upZero), 'notOrthogonal': cls.getAnyRows(notOrthogonal)},
+                {'zeroLength': cls.getAnyRows(viewZero)})
+
+    @classmethod
+    def checkPositionVariables(cls, sofafile, tolerance=1e-3, chunkSize=None):
+        """
+        Check the values of the position variables, in chunks of measurements
+
+        :param sofafile:    a SOFAFile instance
+        :param tolerance:   maximum absolute cosine of the angle between Up and View vectors
+        :param chunkSize:   number of measurements read at once
+        :return:            dictionary {name: {problem: ndarray of measurement indices}}
+        """
+        attributes = {}
+        for positionObject in cls.positionObjects:
+            for name in [positionObject + suffix for suffix in ['Position', 'Up', 'View']]:
+                if sofafile.hasVariable(name):
+                    attributes[name] = (sofafile.getVariableAttributeValue(name, 'Units'),
+                                        sofafile.getVariableAttributeValue(name, 'Type'))
+        found = {}
+        for start, stop, values in sofafile.iterMeasurements(chunkSize, sorted(attributes), readAhead=False):
+            chunk = {}
+            cartesian = {}
+            for name, (units, coordinates) in attributes.items():
+                positions = cls.getMeasurementValues(values[name], sofafile.getVariableInstance(name).dimensions)
+                chunk[name] = cls.checkPositionValues(positions, units, coordinates)
+                cartesian[name] = cls.getCartesian(positions, units, coordinates)
+            for positionObject in cls.positionObjects:
+                up, view = positionObject + 'Up', positionObject + 'View'
+                if up in cartesian and view in cartesian:
+                    upProblems, viewProblems = cls.checkOrientationValues(
+                        *np.broadcast_arrays(cartesian[up], cartesian[view]), tolerance=tolerance)
+                    chunk[up].update(upProblems)
+                    chunk[view].update(viewProblems)
+            for name, problems in chunk.items():
+                for problem, rows in problems.items():
+                    found.setdefault(name, {}).setdefault(problem, []).append(np.flatnonzero(rows) + start)
+
+        result = {}
+        for name, problems in found.items():
+            for problem, indices in problems.items():
+                indices = np.concatenate(indices)
+                if len(indices):
+                    result.setdefault(name, {})[problem] = indices
+        return result
+
+    @classmethod
+    def check(cls, sofafile, tolerance=1e-3, workers=None, chunkSize=None, processes=False):
+        """
+        Check the values of the data and position variables of a file
+
+        :param sofafile:    a SOFAFile instance, or the path of a SOFA file
+        :param tolerance:   maximum absolute cosine of the angle between Up and View vectors
+        :param workers:     number of workers of the data variables scan (see SOFAMapReduce.mapReduce)
+        :param chunkSize:   number of measurements read at once
+        :param processes:   whether to use a process pool instead of a thread pool
+        :return:            dictionary {name: {problem: ndarray of measurement indices}},
+                            empty if no problems were found
+        """
+        problems = cls.checkDataVariables(sofafile, workers=workers, chunkSize=chunkSize, processes=processes)
+        positionFile = sofafile if hasattr(sofafile, 'getFilename') else SOFAFile(sofafile, 'r')
+        try:
+            problems.update(cls.checkPositionVariables(positionFile, tolerance, chunkSize))
+        finally:
+            if positionFile is not sofafile:
+                positionFile.close()
+        return problems
+
+    @classmethod
+    def getReport(cls, problems, maxIndices=20):
+        """
+        Format the result of check as text
+
+        :param problems:    the result of check
+        :param maxIndices:  maximum number of measurement indices listed per problem
+        :return:            List of lines
+        """
+        lines = []
+        for name in sorted(problems):
+            for problem in sorted(problems[name]):
+                indices = problems[name][problem]
+                listed = [str(index) for index in indices[:maxIndices]]
+                if len(indices) > maxIndices:
+                    listed.append('...')
+                lines.append(name + ' ' + problem + ': ' + str(len(indices)) + ' measurements: ' +
+                             ', '.join(listed))
+        return lines
+
+    @classmethod
+    def main(cls, argv=None):
+        """
+        Command line interface: sofacheck file.sofa [file.sofa ...]
+
+        :param argv:    List of arguments (defaults to sys.argv[1:])
+        :return:        exit status: 0 if all files pass, 1 if any file has problems, 2 on errors
+        """
+        parser = argparse.ArgumentParser(prog='sofacheck', description='Check the structure and values of SOFA files')
+        parser.add_argument('paths', nargs='+', help='SOFA files')
+        parser.add_argument('--tolerance', type=float, default=1e-3,
+                            help='maximum absolute cosine of the angle between Up and View vectors')
+        parser.add_argument('--workers', type=int, help='number of parallel workers')
+        parser.add_argument('--chunk-size', type=int, help='number of measurements read at once')
+        parser.add_argument('--processes', action='store_true', help='use a process pool instead of a thread pool')
+        args = parser.parse_args(argv)
+
+        status = 0
+        for path in args.paths:
+            try:
+                valid, message = SOFAHeaderValidator.validate(path)
+                if not valid:
+                    sys.stdout.write(path + ': not valid: ' + message + '\n')
+                    status = max(status, 1)
+                    continue
+                problems = cls.check(path, args.tolerance, args.workers, args.chunk_size, args.processes)
+            except (IOError, OSError, SOFAError) as e:
+                sys.stderr.write('sofacheck: ' + path + ': ' + str(e) + '\n')
+                status = 2
+                continue
+            for line in cls.getReport(problems):
+                sys.stdout.write(path + ': ' + line + '\n')
+            if problems:
+                status = max(status, 1)
+        return status
+
+
+def main():
+    sys.exit(SOFAIntegrity.main())
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFAMapReduce.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import collections
+import functools
+import os
+import threading
+import uuid
+from concurrent import futures
+
+from .SOFAError import SOFAError
+from .SOFAFIRConverter import SOFAFIRConverter
+from .SOFAFile import SOFAFile
+from .SOFANcFile import SOFANetCDFFile
+
+
+class SOFAMapReduce(object):
+    """
+    Parallel map-reduce over the chunks of a variable.
+
+    The variable is split along one dimension into hyperslabs aligned with its
+    storage chunks, which are read and mapped in a thread or process pool.
+    Each worker opens its own handle of the file, since netCDF handles can not be shared.
+    In a thread pool, reads are serialized by SOFANetCDFFile.lock, and only the map functions run concurrently.
+    The mapped results are always reduced in chunk order, so the result does not
+    depend on the number of workers nor on the order in which chunks complete.
+    Results are reduced as soon as the previous ones are, with a bounded number of chunks
+    in flight, so only a few mapped results are held at once.
+    """
+
+    # Handles opened by the workers of this process, per call and thread
+    local = threading.local()
+    openFiles = {}
+    lock = threading.Lock()
+
+    @classmethod
+    def getChunkSize(cls, variable, axis, chunkSize=None):
+        """
+        Get the number of elements per hyperslab, as a multiple of the storage chunk size
+
+        :param variable:    a netCDF4.Variable instance
+        :param axis:        index of the split axis
+        :param chunkSize:   desired number of elements (defaults to SOFAFIRConverter.defaultChunkSize)
+        :return:            the aligned chunk size
+        """
+        if chunkSize is None:
+            chunkSize = SOFAFIRConverter.defaultChunkSize
+        storage = variable.chunking()
+        if storage == 'contiguous':
+            return chunkSize
+        return -(-chunkSize // storage[axis]) * storage[axis]
+
+    @classmethod
+    def getFile(cls, token, source):
+        """
+        Get the handle of a file for the current worker, opening it if needed
+
+        :param token:   identifier of the mapReduce call
+        :param source:  the file, as returned by SOFAFile.getSource
+        :return:        a SOFAFile instance
+        """
+        files = getattr(cls.local, 'files', None)
+        if files is None:
+            files = cls.local.files = {}
+        if (token, source) not in files:
+            with SOFANetCDFFile.lock:
+                files[(token, source)] = SOFAFile.openSource(source)
+            with cls.lock:
+                cls.openFiles.setdefault(token, []).append(files[(token, source)])
+        return files[(token, source)]
+
+    @classmethod
+    def closeFiles(cls, token):
+        """
+        Close the handles opened by the workers of a mapReduce call in this process
+
+        :param token:   identifier of the mapReduce call
+        """
+        with cls.lock, SOFANetCDFFile.lock:
+            for sofafile in cls.openFiles.pop(token, []):
+                sofafile.close()
+        files = getattr(cls.local, 'files', {})
+        for key in [key for key in files if key[0] == token]:
+            del files[key]
+
+    @classmethod
+    def mapChunk(cls, task):
+        """
+        Read one hyperslab and apply the map function to it
+
+        :param task:    a Tuple (token, source, variable, axis, start, stop, function), see getFile
+        :return:        the result of the map function
+        """
+        token, source, variableName, axis, start, stop, function = task
+        variable = cls.getFile(token, source).getVariableInstance(variableName)
+        index = [slice(None)] * len(variable.dimensions)
+        index[axis] = slice(start, stop)
+        with SOFANetCDFFile.lock:
+            data = variable[tuple(index)]
+        return function(data)
+
+    @classmethod
+    def mapReduce(cls, sofafile, function, reduce=None, variable='Data.IR', axis='M',
+                  workers=None, chunkSize=None, processes=False):
+        """
+        Apply a function to the hyperslabs of a variable in parallel, and combine the results
+
+        :param sofafile:    a SOFAFile instance, or the path of a SOFA file, opened again by each worker
+                            with the same backend (see SOFAFile.getSource)
+        :param function:    callable mapping an ndarray hyperslab to a result
+                            (it must be picklable when using processes)
+        :param reduce:      callable combining two results, applied in chunk order,
+                            or None to get the list of mapped results
+        :param variable:    name of the variable
+        :param axis:        name of the dimension along which the variable is split
+        :param workers:     number of workers (defaults to the number of CPUs; 1 runs in the calling thread)
+        :param chunkSize:   number of elements of each hyperslab along the axis (see getChunkSize)
+        :param processes:   whether to use a process pool instead of a thread pool
+        :return:            the reduced result, or None if the variable is empty along the axis
+        :raises:            SOFAError if the variable does not have the given dimension,
+                            or if the file was read from memory
+        """
+        source = SOFAFile.getSource(sofafile)
+        metadata = SOFAFile.openSource(source)
+        try:
+            instance = metadata.getVariableInstance(variable)
+            if axis not in instance.dimensions:
+                raise SOFAError('Variable ' + variable + ' does not have dimension: ' + axis)
+            axisIndex = instance.dimensions.index(axis)
+            ranges = SOFAFIRConverter.getChunkRanges(instance.shape[axisIndex],
+                                                     cls.getChunkSize(instance, axisIndex, chunkSize))
+        finally:
+            metadata.close()
+
+        token = uuid.uuid4().hex
+        tasks = [(token, source, variable, axisIndex, start, stop, function) for start, stop in ranges]
+        if workers is None:
+            workers = os.cpu_count() or 1
+        try:
+            if workers <= 1:
+                return cls.fold((cls.mapChunk(task) for task in tasks), reduce)
+            executor = futures.ProcessPoolExecutor if processes else futures.ThreadPoolExecutor
+            with executor(max_workers=workers) as pool:
+                results = cls.iterMapped(pool, tasks, 2 * workers)
+                try:
+                    return cls.fold(results, reduce)
+                finally:
+                    results.close()
+        finally:
+            cls.closeFiles(token)
+
+    @classmethod
+    def iterMapped(cls, pool, tasks, depth):
+        """
+        Map chunks in a pool, in order, with a bounded number of chunks in flight
+
+        :param pool:    a concurrent.futures executor
+        :param tasks:   List of mapChunk tasks
+        :param depth:   maximum number of submitted tasks
+        :return:        generator of mapped results; closing it cancels the chunks not started
+        """
+        submitted = collections.deque()
+        try:
+            for task in tasks:
+                submitted.append(pool.submit(cls.mapChunk, task))
+                if len(submitted) >= depth:
+                    yield submitted.popleft().result()
+            while submitted:
+                yield submitted.popleft().result()
+        finally:
+            for future in submitted:
+                future.cancel()
+
+    @classmethod
+    def fold(cls, results, reduce):
+        """
+        Combine mapped results as they are produced
+
+        :param results: iterable of mapped results, in chunk order
+        :param reduce:  callable combining two results, or None
+        :return:        the reduced result (None if there are no results), or the list of results if reduce is None
+        """
+        if reduce is None:
+            return list(results)
+        results = iter(results)
+        for first in results:
+            return functools.reduce(reduce, results, first)
+        return None
@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFAMemoryFile.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import os
+import threading
+
+import netCDF4
+import numpy as np
+
+from .SOFAError import SOFAError
+from .SOFANcFile import SOFANetCDFFile
+from .SOFAWriter import SOFAWriter
+
+
+class SOFAMemoryDimension(object):
+    """
+    In-memory dimension, with the netCDF4.Dimension interface used by SOFAFile
+    """
+
+    def __init__(self, name, size, unlimited=False):
+        self.name = name
+        self.size = size
+        self.unlimited = unlimited
+
+    def __len__(self):
+        return self.size
+
+    def isunlimited(self):
+        return self.unlimited
+
+
+class SOFAMemoryVariable(object):
+    """
+    In-memory variable, with the netCDF4.Variable interface used by SOFAFile and SOFAWriter.
+    Like netCDF4, reads return masked arrays, masking the fill values, and masked values are written as fill values.
+    Variable attributes are the only entries of __dict__.
+
+    Subclasses storing the values elsewhere override readData and writeData.
+    """
+
+    __slots__ = ('name', 'dimensions', 'shape', 'dtype', 'fillValue', 'data', 'autoMask', 'writable', '__dict__')
+
+    def __init__(self, name, dimensions, data, fillValue, attributes, writable=True):
+        self.name = name
+        self.dimensions = tuple(dimensions)
+        self.data = data
+        self.shape = data.shape
+        self.dtype = str if data.dtype.kind == 'O' else data.dtype
+        self.fillValue = fillValue
+        self.autoMask = True
+        self.writable = writable
+        self.__dict__.update(attributes)
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    def __len__(self):
+        return self.shape[0]
+
+    def readData(self, index):
+        """
+        :param index:   numpy index
+        :return:        the raw values
+        """
+        # Like netCDF4, scalar variables accept any index
+        return self.data[index] if self.data.ndim else self.data[()]
+
+    def writeData(self, index, values):
+        """
+        :param index:   numpy index
+        :param values:  the raw values
+        :raises:        SOFAError if the variable is read-only
+        """
+        self.checkWritable()
+        if self.data.ndim:
+            self.data[index] = values
+        else:
+            self.data[()] = values
+
+    def checkWritable(self):
+        """
+        :raises:    SOFAError if the variable is read-only
+        """
+        if not self.writable:
+            raise SOFAError('Variable is read-only: ' + self.name)
+
+    def __getitem__(self, index):
+        values = np.array(self.readData(index))
+        if not self.autoMask or self.dtype == str or self.fillValue is None:
+            return values
+        if isinstance(self.fillValue, float) and np.isnan(self.fillValue):
+            mask = np.isnan(values)
+        else:
+            mask = values == np.array(self.fillValue, dtype=values.dtype)
+        return np.ma.masked_array(values, mask=mask)
+
+    def __setitem__(self, index, values):
+        if self.fillValue is not None and np.ma.is_masked(values):
+            values = np.ma.filled(values, np.array(self.fillValue, dtype=np.ma.getdata(values).dtype))
+        self.writeData(index, np.ma.getdata(values))
+
+    def getValue(self):
+        return self[...]
+
+    def assignValue(self, value):
+        self[...] = value
+
+    def set_auto_maskandscale(self, value):
+        self.autoMask = value
+
+    def ncattrs(self):
+        return list(self.__dict__)
+
+    def getncattr(self, name):
+        return self.__dict__[name]
+
+    def setncattr(self, name, value):
+        self.__dict__[name] = value
+
+    def setncatts(self, attributes):
+        self.__dict__.update(attributes)
+
+    def chunking(self):
+        return 'contiguous'
+
+    def filters(self):
+        return None
+
+
+class SOFAMemoryDataset(object):
+    """
+    In-memory dataset, with the netCDF4.Dataset interface used by SOFANetCDFFile and SOFAWriter.
+    Global attributes are the only entries of __dict__.
+
+    Subclasses storing the variables elsewhere override createVariableInstance and close.
+    """
+
+    __slots__ = ('dimensions', 'variables', 'writable', '__dict__')
+
+    def __init__(self, writable=True):
+        self.dimensions = {}
+        self.variables = {}
+        self.writable = writable
+
+    def checkWritable(self):
+        """
+        :raises:    SOFAError if the dataset is read-only
+        """
+        if not self.writable:
+            raise SOFAError('Dataset is read-only')
+
+    def setncattr(self, name, value):
+        self.checkWritable()
+        self.__dict__[name] = value
+
+    def setncatts(self, attributes):
+        self.checkWritable()
+        self.__dict__.update(attributes)
+
+    def set_auto_maskandscale(self, value):
+        for variable in self.variables.values():
+            variable.set_auto_maskandscale(value)
+
+    def createDimension(self, name, size=None):
+        """
+        :param name:    dimension name
+        :param size:    dimension size, or None for an unlimited dimension (which has size 0, and can not grow)
+        :return:        the new SOFAMemoryDimension
+        """
+        self.checkWritable()
+        self.dimensions[name] = SOFAMemoryDimension(name, size or 0, size is None)
+        return self.dimensions[name]
+
+    def createVariable(self, name, datatype, dimensions=(), fill_value=None, **kwargs):
+        """
+        Create a variable filled with its fill value.
+        Compression and chunking keyword arguments are accepted and ignored.
+
+        :param name:        variable name
+        :param datatype:    numpy type, or str for string variables
+        :param dimensions:  dimension names tuple
+        :param fill_value:  the fill value, None for the netCDF default, or False for no fill value
+        :return:            the new variable
+        """
+        self.checkWritable()
+        shape = tuple(len(self.dimensions[dimension]) for dimension in dimensions)
+        attributes = {}
+        if datatype == str or np.dtype(datatype).kind in 'OU':
+            dtype = np.dtype(object)
+            fillValue = None
+        else:
+            dtype = np.dtype(datatype)
+            if fill_value is False:
+                fillValue = None
+            elif fill_value is not None:
+                fillValue = np.asarray(fill_value).item()
+                attributes['_FillValue'] = np.array(fill_value, dtype=dtype)[()]
+            else:
+                fillValue = netCDF4.default_fillvals.get(dtype.str[1:])
+        self.variables[name] = self.createVariableInstance(name, dimensions, shape, dtype, fillValue, attributes)
+        return self.variables[name]
+
+    def createVariableInstance(self, name, dimensions, shape, dtype, fillValue, attributes):
+        """
+        :param name:        variable name
+        :param dimensions:  dimension names tuple
+        :param shape:       shape tuple
+        :param dtype:       numpy dtype (object for strings)
+        :param fillValue:   the fill value, or None
+        :param attributes:  dictionary of variable attributes
+        :return:            a new variable filled with its fill value
+        """
+        data = np.empty(shape, dtype=dtype)
+        data[...] = '' if dtype.kind == 'O' else (0 if fillValue is None else fillValue)
+        return SOFAMemoryVariable(name, dimensions, data, fillValue, attributes)
+
+    def close(self):
+        pass
+
+
+class SOFAMemoryFile(SOFANetCDFFile):
+    """
+    SOFANetCDFFile keeping its data in memory.
+
+    Datasets are kept in the class store, by path, and shared by the instances opening them:
+    - files created with this backend ('w' mode) stay in the store until removed, so that they can be
+      opened again for reading or modifying them; call remove to release their memory
+    - files on disk are loaded, read-only, when opened for reading, and evicted when the last instance
+      opening them is closed. They are loaded again if they changed on disk.
+      They can not be modified, since changes would only apply to the copy in memory.
+    The store is guarded by storeLock, so files can be opened and closed from several threads.
+    """
+
+    usesNetCDF = False
+
+    store = {}
+    # (modification time, size) of the files loaded from disk, by path
+    loaded = {}
+    # Number of open instances of the files loaded from disk, by path
+    users = {}
+    storeLock = threading.RLock()
+
+    def __init__(self, path, mode='r'):
+        with self.storeLock:
+            if mode == 'w':
+                self.remove(path)
+                self.store[path] = SOFAMemoryDataset()
+            elif path not in self.store or path in self.loaded:
+                if mode != 'r':
+                    raise SOFAError('The memory backend can only modify files created with it: ' + str(path))
+                stamp = self.getStamp(path)
+                if path in self.loaded and self.loaded[path] != stamp:
+                    self.remove(path)
+                if path not in self.store:
+                    # Loading holds the lock: the netCDF library is not thread-safe
+                    with SOFANetCDFFile.lock:
+                        self.store[path] = self.load(path, writable=False)
+                    self.loaded[path] = stamp
+                    self.users[path] = 0
+                self.users[path] += 1
+            self.file = self.store[path]
+            self.filename = path
+            # Whether the instance is counted in users
+            self.counted = path in self.loaded
+
+    def close(self):
+        """
+        Close the file, evicting loaded files from the store when no instance uses them
+        """
+        self.file.close()
+        with self.storeLock:
+            path = self.filename
+            if self.counted and self.store.get(path) is self.file:
+                self.users[path] -= 1
+                if self.users[path] == 0:
+                    self.remove(path)
+            self.counted = False
+
+    @classmethod
+    def getStamp(cls, path):
+        """
+        :param path:    path of a file
+        :return:        Tuple (modification time, size) of the file, or None if it does not exist
+        """
+        try:
+            status = os.stat(path)
+        except OSError:
+            return None
+        return status.st_mtime_ns, status.st_size
+
+    @classmethod
+    def load(cls, path, writable=True):
+        """
+        Read a netCDF file into memory
+
+        :param path:        path of the file
+        :param writable:    whether the dataset can be modified
+        :return:            a SOFAMemoryDataset instance
+        """
+        source = netCDF4.Dataset(path, 'r')
+        try:
+            dataset = SOFAMemoryDataset()
+            SOFAWriter.copyDataset(source, dataset)
+        finally:
+            source.close()
+        if not writable:
+            dataset.writable = False
+            for variable in dataset.variables.values():
+                variable.writable = False
+        return dataset
+
+    @classmethod
+    def remove(cls, path):
+        """
+        Remove a dataset from the store. Files created with this backend are never evicted,
+        so this is the only way to release their memory once they are no longer used.
+
+        :param path:    path of the dataset
+        """
+        with cls.storeLock:
+            cls.store.pop(path, None)
+            cls.loaded.pop(path, None)
+            cls.users.pop(path, None)
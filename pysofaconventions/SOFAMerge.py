@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFAMerge.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import collections
+import os
+import uuid
+from concurrent import futures
+
+import numpy as np
+
+from .SOFAError import SOFAError
+from .SOFAFIRConverter import SOFAFIRConverter
+from .SOFAFile import SOFAFile
+from .SOFAMapReduce import SOFAMapReduce
+from .SOFANcFile import SOFANetCDFFile
+from .SOFAResampler import SOFAResampler
+from .SOFAWriter import SOFAWriter
+
+
+class SOFAMerge(object):
+    """
+    Concatenation of SOFA files along the measurement dimension M.
+
+    All dimensions other than M and I, the sampling rates and the variable definitions (including their
+    attributes, such as Type and Units) must match.
+    Variables with an M dimension are concatenated. Variables with an I dimension are kept
+    if they are equal in all inputs, and otherwise expanded to M, as are those with an I dimension in some
+    inputs and an M dimension in others. Any other variable must be equal in all inputs.
+    The output is preallocated, and the inputs are streamed into it in chunks along M,
+    read in a thread or process pool with a bounded number of chunks in flight.
+    """
+
+    @classmethod
+    def getFilled(cls, values):
+        """
+        :param values:  ndarray or masked array
+        :return:        the data of the array with masked values set to NaN (or to the fill value for integers)
+        """
+        values = np.ma.asarray(values)
+        if values.dtype.kind == 'f':
+            return np.ma.filled(values, np.nan)
+        return np.ma.filled(values)
+
+    @classmethod
+    def isEqual(cls, a, b):
+        """
+        :param a:   ndarray or masked array
+        :param b:   ndarray or masked array
+        :return:    True if both arrays have the same shape and values (NaN compare equal)
+        """
+        a, b = cls.getFilled(a), cls.getFilled(b)
+        if a.shape != b.shape:
+            return False
+        if a.dtype.kind == 'f' and b.dtype.kind == 'f':
+            return bool(np.array_equal(a, b, equal_nan=True))
+        return bool(np.array_equal(a, b))
+
+    @classmethod
+    def getAttributes(cls, variable):
+        """
+        :param variable:    a variable instance
+        :return:            dictionary {name: value as string} of the attributes, without the reserved ones
+                            (such as _FillValue) which depend on the storage
+        """
+        return dict((name, str(variable.getncattr(name))) for name in variable.ncattrs() if not name.startswith('_'))
+
+    @classmethod
+    def getExpandedDimensions(cls, dimensions):
+        """
+        :param dimensions:  Tuple of dimension names
+        :return:            the dimensions with I replaced by M
+        """
+        return tuple('M' if dimension == 'I' else dimension for dimension in dimensions)
+
+    @classmethod
+    def getMergedVariables(cls, sofafiles):
+        """
+        Check that files can be merged, and find the variables expanded from I to M
+
+        :param sofafiles:   List of SOFAFile instances
+        :return:            dictionary {name: dimensions} of the expanded variables
+        :raises:            SOFAError if the files are not compatible
+        """
+        first = sofafiles[0]
+        dimensions = dict((name, len(dimension)) for name, dimension in first.getDimensionsAsDict().items())
+        variables = first.getVariablesAsDict()
+        samplingRate = SOFAResampler.getFileSamplingRate(first) if 'Data.SamplingRate' in variables else None
+
+        expanded = {}
+        for sofafile in sofafiles[1:]:
+            filename = str(sofafile.getFilename())
+            otherDimensions = sofafile.getDimensionsAsDict()
+            for name, size in dimensions.items():
+                if name in ['M', 'I']:
+                    continue
+                if name not in otherDimensions or len(otherDimensions[name]) != size:
+                    raise SOFAError('Dimension ' + name + ' does not match: ' + filename)
+            others = sofafile.getVariablesAsDict()
+            if sorted(others) != sorted(variables):
+                raise SOFAError('Variables do not match: ' + filename)
+            for name, var in variables.items():
+                if np.dtype(others[name].dtype).kind != np.dtype(var.dtype).kind:
+                    raise SOFAError('Variable ' + name + ' does not match: ' + filename)
+                if others[name].dimensions != var.dimensions:
+                    # [I,...] in some inputs and [M,...] in others
+                    if cls.getExpandedDimensions(others[name].dimensions) != cls.getExpandedDimensions(var.dimensions):
+                        raise SOFAError('Variable ' + name + ' does not match: ' + filename)
+                    expanded[name] = cls.getExpandedDimensions(var.dimensions)
+                attributes, otherAttributes = cls.getAttributes(var), cls.getAttributes(others[name])
+                for attribute in sorted(set(attributes) | set(otherAttributes)):
+                    if attributes.get(attribute) != otherAttributes.get(attribute):
+                        raise SOFAError('Attribute ' + name + ':' + attribute + ' does not match: ' + filename)
+            if samplingRate is not None and SOFAResampler.getFileSamplingRate(sofafile) != samplingRate:
+                raise SOFAError('Sampling rate does not match: ' + filename)
+
+            for name, var in variables.items():
+                if 'M' in var.dimensions or name in expanded:
+                    continue
+                if not cls.isEqual(var[...], others[name][...]):
+                    if 'I' not in var.dimensions:
+                        raise SOFAError('Variable ' + name + ' differs and can not be expanded: ' + filename)
+                    expanded[name] = tuple('M' if dim == 'I' else dim for dim in var.dimensions)
+        return expanded
+
+    @classmethod
+    def readChunk(cls, task):
+        """
+        Read the variables with an M dimension of one range of measurements of an input
+
+        :param task:    a Tuple (token, source, names, start, stop), with the input as returned by SOFAFile.getSource
+        :return:        dictionary {name: values}
+        """
+        token, source, names, start, stop = task
+        sofafile = SOFAMapReduce.getFile(token, source)
+        values = {}
+        for name in names:
+            variable = sofafile.getVariableInstance(name)
+            index = [slice(None)] * len(variable.dimensions)
+            index[variable.dimensions.index('M')] = slice(start, stop)
+            with SOFANetCDFFile.lock:
+                values[name] = variable[tuple(index)]
+        return values
+
+    @classmethod
+    def merge(cls, sofafiles, path, chunkSize=None, workers=None, processes=False, compression=None):
+        """
+        Concatenate files along M into a new file
+
+        :param sofafiles:   List of SOFAFile instances or paths of SOFA files, in output order.
+                            The global attributes are taken from the first one.
+        :param path:        path of the new file
+        :param chunkSize:   number of measurements read at once (defaults to SOFAFIRConverter.defaultChunkSize)
+        :param workers:     number of reading workers (defaults to the number of CPUs; 1 reads in the calling thread)
+        :param processes:   whether to use a process pool instead of a thread pool
+        :param compression: dictionary {name: createVariable keyword arguments} (see SOFAWriter.createFromTemplate)
+        :return:            List of Tuples (start, stop) with the measurements of each input in the output
+        :raises:            SOFAError if there are no inputs or they are not compatible
+        """
+        if not sofafiles:
+            raise SOFAError('No files to merge')
+        sources = [SOFAFile.getSource(sofafile) for sofafile in sofafiles]
+        if chunkSize is None:
+            chunkSize = SOFAFIRConverter.defaultChunkSize
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        inputs = [SOFAFile.openSource(source) for source in sources]
+        token = uuid.uuid4().hex
+        target = None
+        pool = None
+        try:
+            expanded = cls.getMergedVariables(inputs)
+            variables = inputs[0].getVariablesAsDict()
+            measured = [name for name, var in variables.items() if 'M' in var.dimensions and name not in expanded]
+            sizes = [sofafile.getDimensionSize('M') for sofafile in inputs]
+            offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(int)
+            ranges = [(int(offsets[i]), int(offsets[i + 1])) for i in range(len(inputs))]
+
+            target = SOFAWriter.createFromTemplate(inputs[0], path, dimensions={'M': int(offsets[-1])},
+                                                   variables=expanded, skipVariables=measured,
+                                                   chunkSize=chunkSize, compression=compression)
+
+            # Expanded variables are constant within each input, unless it already has an M dimension
+            for name, dimensions in expanded.items():
+                axis = dimensions.index('M')
+                for sofafile, (start, stop) in zip(inputs, ranges):
+                    values = sofafile.getVariableInstance(name)[...]
+                    shape = list(values.shape)
+                    shape[axis] = stop - start
+                    index = [slice(None)] * len(dimensions)
+                    index[axis] = slice(start, stop)
+                    target.variables[name][tuple(index)] = np.ma.masked_array(
+                        np.broadcast_to(np.ma.getdata(values), shape),
+                        mask=np.broadcast_to(np.ma.getmaskarray(values), shape))
+
+            tasks = [(token, source, measured, start, stop, offset)
+                     for source, offset, size in zip(sources, offsets, sizes)
+                     for start, stop in SOFAFIRConverter.getChunkRanges(size, chunkSize)]
+            if workers <= 1 or len(tasks) <= 1:
+                chunks = ((task, cls.readChunk(task[:5])) for task in tasks)
+            else:
+                executor = futures.ProcessPoolExecutor if processes else futures.ThreadPoolExecutor
+                pool = executor(max_workers=workers)
+                chunks = cls.iterSubmitted(pool, tasks, 2 * workers)
+
+            for task, values in chunks:
+                start, stop, offset = task[3], task[4], int(task[5])
+                for name, data in values.items():
+                    dimensions = variables[name].dimensions
+                    index = [slice(None)] * len(dimensions)
+                    index[dimensions.index('M')] = slice(offset + start, offset + stop)
+                    with SOFANetCDFFile.lock:
+                        target.variables[name][tuple(index)] = data
+        finally:
+            if pool is not None:
+                chunks.close()
+                pool.shutdown(wait=True)
+            SOFAMapReduce.closeFiles(token)
+            for sofafile in inputs:
+                sofafile.close()
+            if target is not None:
+                target.close()
+        return ranges
+
+    @classmethod
+    def iterSubmitted(cls, pool, tasks, depth):
+        """
+        Read chunks in a pool, in order, with a bounded number of chunks in flight
+
+        :param pool:    a concurrent.futures executor
+        :param tasks:   List of merge tasks
+        :param depth:   maximum number of submitted tasks
+        :return:        generator of Tuples (task, values); closing it cancels the chunks not started
+        """
+        submitted = collections.deque()
+        try:
+            for task in tasks:
+                submitted.append((task, pool.submit(cls.readChunk, task[:5])))
+                if len(submitted) >= depth:
+                    task, future = submitted.popleft()
+                    yield task, future.result()
+            while submitted:
+                task, future = submitted.popleft()
+                yield task, future.result()
+        finally:
+            for task, future in submitted:
+                future.cancel()
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFAMinimumPhase.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import numpy as np
+
+from .SOFACache import SOFACache
+from .SOFAFIRConverter import SOFAFIRConverter
+from .SOFAWriter import SOFAWriter
+
+
+class SOFAMinimumPhase(object):
+    """
+    Decomposition of impulse responses into a minimum-phase filter plus a pure delay.
+
+    The minimum-phase responses are computed with the folded real cepstrum,
+    and the delays are the broadband onsets found by thresholding the envelope.
+    Both operate on the last axis and are batched over all leading axes.
+    """
+
+    # Onset threshold relative to the peak, in dB
+    defaultOnsetThreshold = -20.
+    # FFT oversampling used to reduce cepstral aliasing
+    fftOversampling = 4
+    # Magnitude floor relative to the peak, to keep the logarithm finite
+    magnitudeFloor = 1e-10
+
+    @classmethod
+    def getFFTSize(cls, numSamples):
+        """
+        Get the FFT size used for the cepstral method
+
+        :param numSamples:  impulse response length
+        :return:            the smallest power of two above fftOversampling * numSamples
+        """
+        return int(2 ** np.ceil(np.log2(max(cls.fftOversampling * numSamples, 2))))
+
+    @classmethod
+    def minimumPhase(cls, ir, nfft=None):
+        """
+        Compute the minimum-phase impulse responses with the same magnitude responses
+
+        :param ir:      ndarray with shape [..., N]
+        :param nfft:    FFT size (see getFFTSize)
+        :return:        ndarray with shape [..., N]
+        """
+        ir = np.asarray(ir, dtype=float)
+        numSamples = ir.shape[-1]
+        if nfft is None:
+            nfft = cls.getFFTSize(numSamples)
+
+        magnitude = np.abs(np.fft.rfft(ir, nfft, axis=-1))
+        floor = np.maximum(np.max(magnitude, axis=-1, keepdims=True) * cls.magnitudeFloor, np.finfo(float).tiny)
+        cepstrum = np.fft.irfft(np.log(np.maximum(magnitude, floor)), nfft, axis=-1)
+
+        # Fold the anticausal part of the cepstrum onto the causal one
+        window = np.zeros(nfft)
+        window[0] = 1.
+        window[1:(nfft + 1) // 2] = 2.
+        if nfft % 2 == 0:
+            window[nfft // 2] = 1.
+
+        spectrum = np.exp(np.fft.rfft(cepstrum * window, nfft, axis=-1))
+        return np.fft.irfft(spectrum, nfft, axis=-1)[..., :numSamples]
+
+    @classmethod
+    def getOnsets(cls, ir, threshold=None):
+        """
+        Get the onset of impulse responses, as the first sample reaching a threshold relative to the peak
+
+        :param ir:          ndarray with shape [..., N]
+        :param threshold:   threshold in dB relative to the absolute peak
+        :return:            ndarray with shape [...], in samples
+        """
+        if threshold is None:
+            threshold = cls.defaultOnsetThreshold
+        envelope = np.abs(np.asarray(ir, dtype=float))
+        level = np.max(envelope, axis=-1, keepdims=True) * 10. ** (threshold / 20.)
+        return np.argmax(envelope >= level, axis=-1).astype(float)
+
+    @classmethod
+    def iterDecomposition(cls, sofafile, chunkSize=None, nfft=None, threshold=None):
+        """
+        Stream the minimum-phase decomposition of Data.IR, in chunks along M.
+        The delays include the original Data.Delay of the file.
+
+        :param sofafile:    a SOFAFile instance with FIR or FIRE DataType
+        :param chunkSize:   number of measurements processed at once
+        :param nfft:        FFT size of the cepstral method
+        :param threshold:   onset threshold, in dB relative to the peak
+        :return:            generator of Tuples (start, stop, minimumPhaseIR, delay)
+        """
+        ir = sofafile.getVariableInstance('Data.IR')
+        delay = np.ma.filled(sofafile.getDataDelay(), 0.)
+        for start, stop in SOFAFIRConverter.getChunkRanges(ir.shape[0], chunkSize):
+            values = np.ma.filled(ir[start:stop], 0.)
+            onsets = cls.getOnsets(values, threshold)
+            originalDelay = delay[start:stop] if delay.shape[0] == ir.shape[0] else delay
+            yield start, stop, cls.minimumPhase(values, nfft), onsets + originalDelay
+
+    @classmethod
+    def getDecomposition(cls, sofafile, chunkSize=None, nfft=None, threshold=None, cacheDirectory=None):
+        """
+        Get the minimum-phase decomposition of Data.IR (see iterDecomposition).
+        If a cache directory is given, the results are stored there, keyed by
+        the file stamp (see SOFACache.getFileStamp) and the decomposition parameters, and reused on later calls.
+        Files that are not on disk are not cached.
+
+        :return:    a Tuple (minimumPhaseIR, delay), with Data.IR shape and Data.IR shape without N
+        """
+        cache = None
+        stamp = SOFACache.getFileStamp(sofafile) if cacheDirectory is not None else None
+        if stamp is not None:
+            cache = SOFACache(cacheDirectory)
+            key = cache.getKey('minimumphase', stamp, nfft, threshold,
+                               cls.defaultOnsetThreshold, cls.fftOversampling, cls.magnitudeFloor)
+            entry = cache.load(key)
+            if entry is not None:
+                return entry['ir'], entry['delay']
+
+        m = sofafile.getDimensionSize('M')
+        ir = delay = None
+        for start, stop, minimumPhaseIR, onsets in cls.iterDecomposition(sofafile, chunkSize, nfft, threshold):
+            if ir is None:
+                ir = np.empty((m,) + minimumPhaseIR.shape[1:])
+                delay = np.empty((m,) + onsets.shape[1:])
+            ir[start:stop] = minimumPhaseIR
+            delay[start:stop] = onsets
+
+        if cache is not None:
+            cache.save(key, {'ir': ir, 'delay': delay})
+
+        return ir, delay
+
+    @classmethod
+    def writeDecomposition(cls, sofafile, path, chunkSize=None, nfft=None, threshold=None):
+        """
+        Write a new SOFA file with the minimum-phase decomposition of Data.IR.
+        All the content of the original file is kept, except for Data.IR,
+        which holds the minimum-phase responses, and Data.Delay, which holds the onsets along M.
+
+        :param sofafile:    a SOFAFile instance with FIR or FIRE DataType
+        :param path:        path of the new file
+        :param chunkSize:   number of measurements processed and written at once
+        :param nfft:        FFT size of the cepstral method
+        :param threshold:   onset threshold, in dB relative to the peak
+        """
+        irDimensions = sofafile.getVariableInstance('Data.IR').dimensions
+        target = SOFAWriter.createFromTemplate(sofafile, path, variables={'Data.Delay': irDimensions[:-1]},
+                                               skipVariables=('Data.IR',), chunkSize=chunkSize)
+        try:
+            for start, stop, minimumPhaseIR, onsets in cls.iterDecomposition(sofafile, chunkSize, nfft, threshold):
+                target.variables['Data.IR'][start:stop] = minimumPhaseIR
+                target.variables['Data.Delay'][start:stop] = onsets
+        finally:
+            target.close()
@@ -35,14 +35,88 @@
 #
 # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
 
+import importlib
+import threading
+
 import netCDF4
+import numpy as np
 from .SOFAError import SOFAError
 
 class SOFANetCDFFile(object):
-
-    def __init__(self,path,mode):
-        self.file = netCDF4.Dataset(path,mode)
+    """
+    Storage backend of SOFAFile, reading and writing netCDF4 files.
+
+    Other backends subclass it and only replace the `file` instance: an object with
+    the subset of the netCDF4.Dataset interface used by this class, SOFAFile and SOFAWriter:
+    - global attributes as the entries of __dict__, setncattr and setncatts
+    - `dimensions`: dictionary of objects with `size`, len() and isunlimited()
+    - `variables`: dictionary of objects with `name`, `dimensions`, `shape` and `dtype`, attributes as the
+      entries of __dict__ (with ncattrs, getncattr, setncattr and setncatts), hyperslab reads and writes
+      with masked arrays (masking the fill value), getValue, assignValue, set_auto_maskandscale,
+      chunking and filters
+    - createDimension, createVariable and close
+    """
+
+    # The netCDF-C and HDF5 libraries are not thread-safe, and netCDF4 releases the GIL
+    # during their calls: threads accessing files concurrently must hold this lock
+    lock = threading.RLock()
+
+    # Available backends: name -> (module, class)
+    backends = {'netcdf4': ('SOFANcFile', 'SOFANetCDFFile'),
+                'h5py': ('SOFAH5pyFile', 'SOFAH5pyFile'),
+                'memory': ('SOFAMemoryFile', 'SOFAMemoryFile'),
+                'directory': ('SOFADirectoryFile', 'SOFADirectoryFile'),
+                'bundle': ('SOFABundle', 'SOFABundleFile'),
+                'threadsafe': ('SOFAThreadSafeFile', 'SOFAThreadSafeFile'),
+                'threadsafe-h5py': ('SOFAThreadSafeFile', 'SOFAThreadSafeH5pyFile')}
+
+    # Whether the file can be opened again from its path (see SOFAFile.getSource)
+    reopenable = True
+    # Whether reads go through the netCDF library, and must hold the lock
+    usesNetCDF = True
+
+    def __init__(self,path,mode,memory=None):
+        """
+        :param path:    path of the file (only used as its name when reading from memory)
+        :param mode:    'r' to read, 'w' to create, 'a' to modify
+        :param memory:  buffer with the contents of a netCDF file, to read it without touching the filesystem
+        """
+        self.file = netCDF4.Dataset(path,mode,memory=memory)
         self.filename = path
+        self.reopenable = memory is None
+
+    @classmethod
+    def getBackend(cls, backend):
+        """
+        Get a backend class
+
+        :param backend:     a backend name (see backends), or a SOFANetCDFFile subclass
+        :return:            the backend class
+        :raises:            SOFAError if the backend is not known
+        """
+        if isinstance(backend, type) and issubclass(backend, SOFANetCDFFile):
+            return backend
+        if backend not in cls.backends:
+            raise SOFAError('Backend not known: ' + str(backend))
+        moduleName, className = cls.backends[backend]
+        return getattr(importlib.import_module('pysofaconventions.' + moduleName), className)
+
+    @classmethod
+    def getVariableFillValue(cls, varInstance):
+        """
+        Get the value masked by netCDF4 when reading a variable: its _FillValue attribute,
+        or the netCDF default fill value of its type
+
+        :param varInstance: a variable instance
+        :return:            the fill value, or None for string variables
+        """
+        if varInstance.dtype == str:
+            return None
+        attributes = varInstance.__dict__
+        if '_FillValue' in attributes:
+            return np.asarray(attributes['_FillValue']).item()
+        fillValue = netCDF4.default_fillvals.get(np.dtype(varInstance.dtype).str[1:])
+        return np.asarray(fillValue).item() if fillValue is not None else None
 
     def close(self):
         '''
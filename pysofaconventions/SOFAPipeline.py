@@ -0,0 +1,710 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFAPipeline.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import argparse
+import copy
+import functools
+import json
+import os
+import sys
+import time
+from concurrent import futures
+
+import numpy as np
+
+from .SOFACompression import SOFACompression
+from .SOFAError import SOFAError
+from .SOFAFIRConverter import SOFAFIRConverter
+from .SOFAFile import SOFAFile
+from .SOFAHeaderValidator import SOFAHeaderValidator
+from .SOFAInfo import SOFAInfo
+from .SOFAIntegrity import SOFAIntegrity
+from .SOFAIRTrimmer import SOFAIRTrimmer
+from .SOFANcFile import SOFANetCDFFile
+from .SOFAResampler import SOFAResampler
+from .SOFASubset import SOFASubset
+from .SOFAWriter import SOFAWriter
+
+
+class SOFAPipelinePlan(object):
+    """
+    Description of the output of a SOFAPipeline for a file, filled in by the steps,
+    and the chunked reading and writing of the streamed variables.
+
+    The streamed variables are the ones with an M dimension, and the ones modified by the steps;
+    the rest are copied from the source when the output is created.
+    """
+
+    def __init__(self, sofafile, chunkSize=None):
+        """
+        :param sofafile:    the source SOFAFile instance
+        :param chunkSize:   number of measurements processed at once
+        """
+        self.sofafile = sofafile
+        self.chunkSize = chunkSize
+        self.steps = []
+        self.indices = None
+        self.dimensions = {}
+        self.variables = {}
+        self.dtypes = {}
+        self.attributes = {}
+        self.modified = set()
+        self.compression = None
+        self.samplingRate = None
+
+    def getDimensionSize(self, name):
+        """
+        :param name:    dimension name
+        :return:        the size of the dimension in the output
+        """
+        if name in self.dimensions:
+            return self.dimensions[name]
+        return self.sofafile.getDimensionSize(name)
+
+    def getVariableDimensions(self, name):
+        """
+        :param name:    variable name
+        :return:        Tuple with the dimensions of the variable in the output
+        """
+        if name in self.variables:
+            return tuple(self.variables[name])
+        return tuple(self.sofafile.getVariableInstance(name).dimensions)
+
+    def getStreamedVariables(self):
+        """
+        :return:    List of the names of the source variables read in chunks
+        """
+        return [name for name, var in self.sofafile.getVariablesAsDict().items()
+                if 'M' in var.dimensions or name in self.modified]
+
+    def getWrittenVariables(self):
+        """
+        :return:    List of the names of the output variables written in chunks
+        """
+        streamed = self.getStreamedVariables()
+        return streamed + sorted(name for name in self.variables if name not in streamed)
+
+    def getRanges(self):
+        """
+        :return:    List of Tuples (start, stop) with the source measurement ranges of the chunks
+        """
+        if self.indices is None:
+            return SOFAFIRConverter.getChunkRanges(self.sofafile.getDimensionSize('M'), self.chunkSize)
+        return SOFASubset.getRuns(self.indices, self.chunkSize)
+
+    def iterChunks(self):
+        """
+        Read the selected measurements in chunks, transformed by the steps of the plan.
+        The next chunk is read in a background thread (see SOFAFile.iterMeasurements).
+
+        :return:    an iterator of Tuples (start, stop, offset, values), with the source measurement range,
+                    the index of its first measurement in the output, and the dictionary of values
+        """
+        offset = 0
+        for start, stop, values in self.sofafile.iterMeasurements(variables=self.getStreamedVariables(),
+                                                                 ranges=self.getRanges()):
+            values = dict(values)
+            for step in self.steps:
+                values = step.apply(start, stop, values)
+            yield start, stop, offset, values
+            offset += stop - start
+
+    def write(self, target, offset, count, values):
+        """
+        Write a chunk of the written variables, holding SOFANetCDFFile.lock
+        since the next chunks are read in the background (see iterChunks)
+
+        :param target:  the output netCDF4.Dataset
+        :param offset:  index of the first measurement of the chunk in the output
+        :param count:   number of measurements of the chunk
+        :param values:  dictionary of values (see iterChunks)
+        """
+        with SOFANetCDFFile.lock:
+            for name in self.getWrittenVariables():
+                dimensions = self.getVariableDimensions(name)
+                data = values[name]
+                if 'M' in dimensions:
+                    index = [slice(None)] * len(dimensions)
+                    index[dimensions.index('M')] = slice(offset, offset + count)
+                    target.variables[name][tuple(index)] = data
+                elif offset == 0:
+                    # Values without M are the same in all the chunks
+                    if 'I' in dimensions:
+                        data = np.take(data, [0], axis=dimensions.index('I'))
+                    target.variables[name][:] = data
+
+
+class SOFAPipelineStep(object):
+    """
+    Transform of a SOFAPipeline.
+
+    prepare describes the output in the plan, and may read the source through plan.iterChunks,
+    which applies the previous steps. apply transforms a chunk, depending only on its values and
+    on the state set by prepare, since later steps may call it in their own reading passes.
+    inspect gets the output chunks, and finish the written file.
+    """
+
+    name = None
+
+    def __init__(self):
+        self.arguments = []
+
+    def getSpec(self):
+        """
+        :return:    the step specification, 'name' or 'name:argument,...'
+        """
+        return ':'.join([self.name] + ([','.join(self.arguments)] if self.arguments else []))
+
+    def prepare(self, plan):
+        """
+        :param plan:    the SOFAPipelinePlan of the file
+        """
+        pass
+
+    def apply(self, start, stop, values):
+        """
+        :param start:   first source measurement of the chunk
+        :param stop:    end of the source measurements of the chunk
+        :param values:  dictionary of values
+        :return:        the transformed dictionary of values
+        """
+        return values
+
+    def inspect(self, offset, values):
+        """
+        :param offset:  index of the first measurement of the chunk in the output
+        :param values:  dictionary of output values
+        """
+        pass
+
+    def finish(self, path, record):
+        """
+        :param path:    path of the written file
+        :param record:  the manifest record of the file, updated in place
+        """
+        pass
+
+
+class SOFAPipelineResample(SOFAPipelineStep):
+    """
+    Resample Data.IR to a sampling rate (see SOFAResampler); Data.Delay is scaled by the rate ratio
+    """
+
+    name = 'resample'
+
+    def __init__(self, rate):
+        """
+        :param rate:    the target sampling rate
+        """
+        self.rate = float(rate)
+        if self.rate <= 0:
+            raise SOFAError('Invalid sampling rate: ' + str(rate))
+        self.arguments = [str(rate)]
+
+    def prepare(self, plan):
+        sofafile = plan.sofafile
+        if not (sofafile.isFIRDataType() or sofafile.isFIREDataType()):
+            raise SOFAError('Only FIR data can be resampled: ' + str(sofafile.getGlobalAttributeValue('DataType')))
+        if SOFAIRTrimmer.offsetVariable in plan.variables or SOFAIRTrimmer.isTrimmed(sofafile):
+            raise SOFAError('Trimmed data can not be resampled')
+        originalRate = plan.samplingRate or SOFAResampler.getFileSamplingRate(sofafile)
+        self.up, self.down = SOFAResampler.getResamplingFactors(originalRate, self.rate)
+        self.h = SOFAResampler.designFilter(self.up, self.down)
+        plan.dimensions['N'] = SOFAResampler.getNumOutputSamples(plan.getDimensionSize('N'), self.up, self.down)
+        plan.samplingRate = self.rate
+        plan.modified.update(['Data.IR', 'Data.Delay', 'Data.SamplingRate'])
+
+    def apply(self, start, stop, values):
+        values['Data.IR'] = SOFAResampler.resample(np.ma.filled(values['Data.IR'], 0.), self.up, self.down, self.h)
+        values['Data.Delay'] = np.ma.filled(values['Data.Delay'], 0.) * (float(self.up) / self.down)
+        values['Data.SamplingRate'] = np.full(np.shape(values['Data.SamplingRate']), self.rate)
+        return values
+
+
+class SOFAPipelineTrim(SOFAPipelineStep):
+    """
+    Trim the impulse responses of FIR or FIRE data (see SOFAIRTrimmer.trim).
+    The onsets are found in a reading pass through the previous steps.
+    """
+
+    name = 'trim'
+
+    def __init__(self, threshold=-60., margin=4):
+        """
+        :param threshold:   level of the onset and decay samples (see SOFAIRTrimmer.getTrimPoints)
+        :param margin:      number of samples kept before the onset and after the decay
+        """
+        self.threshold = float(threshold)
+        self.margin = int(margin)
+        self.arguments = [str(self.threshold), str(self.margin)]
+
+    def prepare(self, plan):
+        sofafile = plan.sofafile
+        dimensions = SOFAIRTrimmer.getResponseDimensions(sofafile)
+        shape = [sofafile.getDimensionSize('M')] + [plan.getDimensionSize(name) for name in dimensions[1:]]
+        self.onsets = np.zeros(shape, dtype=int)
+        self.length = 1
+        for start, stop, offset, values in plan.iterChunks():
+            onset, decay = SOFAIRTrimmer.getTrimPoints(values['Data.IR'], self.threshold, self.margin)
+            self.onsets[start:stop] = onset
+            self.length = max(self.length, int(np.max(decay - onset + 1, initial=0)))
+
+        originalLength = plan.getDimensionSize('N')
+        if SOFAIRTrimmer.offsetVariable in plan.attributes:
+            originalLength = plan.attributes[SOFAIRTrimmer.offsetVariable][SOFAIRTrimmer.lengthAttribute]
+        elif SOFAIRTrimmer.isTrimmed(sofafile):
+            originalLength = int(sofafile.getVariableInstance(SOFAIRTrimmer.offsetVariable).getncattr(
+                SOFAIRTrimmer.lengthAttribute))
+        plan.dimensions['N'] = self.length
+        plan.variables['Data.Delay'] = dimensions
+        plan.variables[SOFAIRTrimmer.offsetVariable] = dimensions
+        plan.attributes[SOFAIRTrimmer.offsetVariable] = {'Units': 'samples',
+                                                         SOFAIRTrimmer.lengthAttribute: originalLength}
+        plan.modified.update(['Data.IR', 'Data.Delay'])
+
+    def apply(self, start, stop, values):
+        onsets = self.onsets[start:stop]
+        values['Data.IR'] = SOFAIRTrimmer.trimChunk(values['Data.IR'], onsets, self.length)
+        values['Data.Delay'] = np.ma.filled(values['Data.Delay'], 0.) + onsets
+        offsets = onsets
+        if SOFAIRTrimmer.offsetVariable in values:
+            # Trimming again accumulates the offsets of the original alignment
+            offsets = onsets + np.ma.filled(values[SOFAIRTrimmer.offsetVariable], 0).astype(int)
+        values[SOFAIRTrimmer.offsetVariable] = offsets
+        return values
+
+
+class SOFAPipelineSubset(SOFAPipelineStep):
+    """
+    Keep the selected measurements (see SOFASubset.getIndices).
+    Selections are evaluated on the source file, and successive selections are intersected.
+    """
+
+    name = 'subset'
+    selections = ['horizontal', 'frontal', 'elevation']
+
+    def __init__(self, selection, *elevations):
+        """
+        :param selection:   'horizontal', 'frontal', or 'elevation' followed by the elevations in degrees,
+                            or any selection accepted by SOFASubset.getIndices (which must be picklable
+                            to run in a process pool, see SOFAPipeline.run)
+        :param elevations:  the selected elevations
+        """
+        self.selection = selection
+        self.elevations = [float(elevation) for elevation in elevations]
+        if isinstance(selection, str):
+            if selection not in self.selections or (selection == 'elevation') != bool(elevations):
+                raise SOFAError('Invalid subset selection: ' + ','.join((selection,) + elevations))
+            self.arguments = [selection] + list(elevations)
+        else:
+            self.arguments = ['custom']
+
+    def getSelection(self):
+        """
+        :return:    the selection passed to SOFASubset.getIndices
+        """
+        if not isinstance(self.selection, str):
+            return self.selection
+        elif self.selection == 'horizontal':
+            return SOFASubset.getHorizontalPlanePredicate()
+        elif self.selection == 'frontal':
+            return SOFASubset.getFrontalHemispherePredicate()
+        return SOFASubset.getElevationPredicate(self.elevations)
+
+    def prepare(self, plan):
+        indices = SOFASubset.getIndices(plan.sofafile, self.getSelection(), chunkSize=plan.chunkSize)
+        if plan.indices is not None:
+            indices = np.intersect1d(plan.indices, indices)
+        if not len(indices):
+            raise SOFAError('No measurements selected')
+        plan.indices = indices
+        plan.dimensions['M'] = len(indices)
+
+
+class SOFAPipelineFloat32(SOFAPipelineStep):
+    """
+    Store the floating point data variables as 32-bit floats
+    """
+
+    name = 'float32'
+
+    def prepare(self, plan):
+        for name, var in plan.sofafile.getVariablesAsDict().items():
+            if name.startswith('Data.') and var.dtype != str and np.dtype(var.dtype).kind == 'f':
+                plan.dtypes[name] = 'f4'
+        self.names = set(plan.dtypes)
+
+    def apply(self, start, stop, values):
+        for name in self.names.intersection(values):
+            values[name] = values[name].astype(np.float32)
+        return values
+
+
+class SOFAPipelineRepack(SOFAPipelineStep):
+    """
+    Compress the data variables with a SOFACompression profile
+    """
+
+    name = 'repack'
+
+    def __init__(self, profile='lossless-small'):
+        """
+        :param profile: profile name
+        """
+        SOFACompression.getProfile(profile)
+        self.profile = profile
+        self.arguments = [profile]
+
+    def prepare(self, plan):
+        plan.compression = self.profile
+
+
+class SOFAPipelineValidate(SOFAPipelineStep):
+    """
+    Validate the header of the written file (see SOFAHeaderValidator), and find the measurements
+    with NaN or Inf values in the streamed floating point data variables (see SOFAIntegrity).
+    The record gets 'valid', 'validationError' and 'problems' ({name: {'nonFinite': indices}}).
+    """
+
+    name = 'validate'
+
+    def prepare(self, plan):
+        self.plan = plan
+        self.problems = {}
+
+    def inspect(self, offset, values):
+        for name, data in values.items():
+            dimensions = self.plan.getVariableDimensions(name)
+            if not name.startswith('Data.') or 'M' not in dimensions or np.asarray(data).dtype.kind != 'f':
+                continue
+            rows = SOFAIntegrity.getNonFiniteRows(dimensions.index('M'), data)
+            if rows.any():
+                indices = self.problems.setdefault(name, {}).setdefault('nonFinite', [])
+                indices.extend((offset + np.flatnonzero(rows)).tolist())
+
+    def finish(self, path, record):
+        record['valid'], record['validationError'] = SOFAHeaderValidator.validate(path)
+        record['problems'] = self.problems
+
+
+class SOFAPipeline(object):
+    """
+    Sequence of transforms applied to SOFA files, in a single chunked pass per file:
+    the selected measurements are read, transformed by each step and written, so only
+    a chunk is held in memory. Steps may read the source in additional passes to prepare
+    (such as trim, for the onsets, or subset, for the positions), but the data is written once.
+
+    Files are processed in a process pool. Each output is written next to its final path and renamed
+    when complete, and a record is appended to an NDJSON manifest; files with a 'done' record for
+    the same pipeline and the same source size and modification time are skipped when resuming.
+    """
+
+    stepClasses = dict((cls.name, cls) for cls in [SOFAPipelineResample, SOFAPipelineTrim, SOFAPipelineSubset,
+                                                   SOFAPipelineFloat32, SOFAPipelineRepack, SOFAPipelineValidate])
+    manifestName = 'manifest.ndjson'
+    partialSuffix = '.partial'
+
+    def __init__(self, steps):
+        """
+        :param steps:   List of SOFAPipelineStep instances or step specifications (see getStep)
+        """
+        self.steps = [self.getStep(step) if isinstance(step, str) else step for step in steps]
+
+    @classmethod
+    def getStep(cls, spec):
+        """
+        :param spec:    step specification, 'name' or 'name:argument,...', such as 'resample:44100',
+                        'trim', 'trim:-50,8', 'subset:horizontal', 'subset:elevation,0,30', 'float32',
+                        'repack:archive' or 'validate'
+        :return:        a SOFAPipelineStep instance
+        :raises:        SOFAError if the specification is not valid
+        """
+        name, separator, arguments = spec.partition(':')
+        if name not in cls.stepClasses:
+            raise SOFAError('Pipeline step not known: ' + str(name))
+        try:
+            return cls.stepClasses[name](*(arguments.split(',') if separator else []))
+        except (TypeError, ValueError):
+            raise SOFAError('Invalid pipeline step: ' + spec)
+
+    def getSpecs(self):
+        """
+        :return:    List of the step specifications
+        """
+        return [step.getSpec() for step in self.steps]
+
+    def process(self, path, output, chunkSize=None, backend=None):
+        """
+        Apply the steps to a file
+
+        :param path:        path of the source file
+        :param output:      path of the output file
+        :param chunkSize:   number of measurements processed at once
+        :param backend:     storage backend of the source (see SOFANetCDFFile.getBackend)
+        :return:            dictionary with the output 'M' and 'N', and the fields added by the steps
+        """
+        # Steps keep the state of the file they prepare
+        steps = copy.deepcopy(self.steps)
+        partial = output + self.partialSuffix
+        sofafile = SOFAFile(path, 'r', backend=backend)
+        try:
+            plan = SOFAPipelinePlan(sofafile, chunkSize)
+            for step in steps:
+                step.prepare(plan)
+                plan.steps.append(step)
+            if os.path.dirname(output):
+                os.makedirs(os.path.dirname(output), exist_ok=True)
+            # The chunks are read in a background thread, and the netCDF library is not thread-safe:
+            # the output is only used while holding SOFANetCDFFile.lock
+            with SOFANetCDFFile.lock:
+                target = SOFAWriter.createFromTemplate(sofafile, partial, dimensions=plan.dimensions,
+                                                       variables=plan.variables,
+                                                       skipVariables=plan.getWrittenVariables(),
+                                                       chunkSize=chunkSize, compression=plan.compression,
+                                                       dtypes=plan.dtypes)
+                for name, attributes in plan.attributes.items():
+                    target.variables[name].setncatts(attributes)
+            try:
+                for start, stop, offset, values in plan.iterChunks():
+                    for step in steps:
+                        step.inspect(offset, values)
+                    plan.write(target, offset, stop - start, values)
+            finally:
+                with SOFANetCDFFile.lock:
+                    target.close()
+            record = {'M': plan.getDimensionSize('M'), 'N': plan.getDimensionSize('N')}
+        finally:
+            with SOFANetCDFFile.lock:
+                sofafile.close()
+        os.replace(partial, output)
+        for step in steps:
+            step.finish(output, record)
+        return record
+
+    def processFile(self, task, chunkSize=None, backend=None):
+        """
+        Apply the steps to a file, recording the result
+
+        :param task:        Tuple (path, output) with the source and output paths
+        :param chunkSize:   number of measurements processed at once
+        :param backend:     storage backend of the source (see SOFANetCDFFile.getBackend)
+        :return:            the manifest record, with the 'source' and 'output' paths, the 'pipeline'
+                            specifications, the 'status' ('done' or 'failed'), the 'error', the 'sourceSize'
+                            and 'sourceMtime', the 'outputSize', the 'seconds' taken and the fields of process
+        """
+        path, output = task
+        record = {'source': os.path.abspath(path), 'output': os.path.abspath(output), 'pipeline': self.getSpecs(),
+                  'status': 'failed', 'error': None}
+        started = time.perf_counter()
+        try:
+            status = os.stat(path)
+            record['sourceSize'] = status.st_size
+            record['sourceMtime'] = status.st_mtime
+            record.update(self.process(path, output, chunkSize, backend))
+            record['outputSize'] = os.path.getsize(output)
+            record['status'] = 'done'
+        except Exception as e:
+            # A failed file is recorded, and does not stop the batch
+            record['error'] = str(e) or e.__class__.__name__
+            if os.path.exists(output + self.partialSuffix):
+                os.remove(output + self.partialSuffix)
+        record['seconds'] = time.perf_counter() - started
+        return dict((key, SOFAInfo.getJSONValue(value)) for key, value in record.items())
+
+    @classmethod
+    def getOutputPaths(cls, paths, outputDirectory):
+        """
+        :param paths:           List of source paths
+        :param outputDirectory: the output directory
+        :return:                List of output paths, keeping the layout of the sources below their
+                                common directory
+        :raises:                SOFAError if an output path is a source path
+        """
+        if not paths:
+            return []
+        sources = [os.path.abspath(path) for path in paths]
+        root = os.path.commonpath([os.path.dirname(source) for source in sources])
+        outputs = [os.path.join(outputDirectory, os.path.relpath(source, root)) for source in sources]
+        for source, output in zip(sources, outputs):
+            if os.path.abspath(output) == source:
+                raise SOFAError('Output would overwrite the source: ' + source)
+        return outputs
+
+    @classmethod
+    def loadManifest(cls, path):
+        """
+        :param path:    path of a manifest
+        :return:        dictionary {source: latest record}; lines cut by an interruption are ignored
+        """
+        records = {}
+        if not os.path.exists(path):
+            return records
+        with open(path) as manifest:
+            for line in manifest:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                records[record['source']] = record
+        return records
+
+    def isDone(self, record, path, output):
+        """
+        :param record:  the latest manifest record of the source, or None
+        :param path:    path of the source
+        :param output:  path of the output
+        :return:        whether the output is complete and up to date
+        """
+        if record is None or record['status'] != 'done' or record['pipeline'] != self.getSpecs():
+            return False
+        status = os.stat(path)
+        return (record['sourceSize'] == status.st_size and record['sourceMtime'] == status.st_mtime and
+                os.path.exists(output))
+
+    def run(self, paths, outputDirectory, workers=None, chunkSize=None, backend=None, manifest=None, resume=True):
+        """
+        Apply the steps to several files in parallel.
+        Files are processed in a process pool, since the netCDF-C and HDF5 libraries can not write
+        from several threads.
+
+        :param paths:           List of source paths
+        :param outputDirectory: the output directory (see getOutputPaths)
+        :param workers:         number of parallel workers (defaults to the number of CPUs;
+                                1 runs in the calling thread)
+        :param chunkSize:       number of measurements processed at once
+        :param backend:         storage backend of the sources (see SOFANetCDFFile.getBackend)
+        :param manifest:        path of the manifest (defaults to manifestName in the output directory)
+        :param resume:          whether to skip the files which are done (see isDone)
+        :return:                List of records (see processFile), in the order of paths;
+                                skipped files have their latest record, with 'status' 'skipped'
+        """
+        outputs = self.getOutputPaths(paths, outputDirectory)
+        if manifest is None:
+            manifest = os.path.join(outputDirectory, self.manifestName)
+        previous = self.loadManifest(manifest) if resume else {}
+        records = [None] * len(paths)
+        tasks = []
+        for i, (path, output) in enumerate(zip(paths, outputs)):
+            record = previous.get(os.path.abspath(path))
+            if self.isDone(record, path, output):
+                records[i] = dict(record, status='skipped')
+            else:
+                tasks.append((i, (path, output)))
+
+        if os.path.dirname(manifest):
+            os.makedirs(os.path.dirname(manifest), exist_ok=True)
+        function = functools.partial(self.processFile, chunkSize=chunkSize, backend=backend)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        with open(manifest, 'a') as manifestFile:
+            def append(i, record):
+                records[i] = record
+                manifestFile.write(json.dumps(record) + '\n')
+                manifestFile.flush()
+
+            if workers <= 1 or len(tasks) <= 1:
+                for i, task in tasks:
+                    append(i, function(task))
+            else:
+                with futures.ProcessPoolExecutor(max_workers=workers) as pool:
+                    pending = dict((pool.submit(function, task), i) for i, task in tasks)
+                    for future in futures.as_completed(pending):
+                        append(pending[future], future.result())
+        return records
+
+    @classmethod
+    def getText(cls, record):
+        """
+        :param record:  a manifest record (see processFile)
+        :return:        the record as a line of text
+        """
+        line = record['source'] + ' -> ' + record['output'] + ': ' + record['status']
+        if record['status'] == 'failed':
+            return line + ': ' + str(record['error'])
+        if record.get('valid') is False:
+            line += ', not valid: ' + str(record['validationError'])
+        for name, problems in sorted(record.get('problems', {}).items()):
+            line += ', ' + name + ': ' + str(len(problems['nonFinite'])) + ' measurements with NaN or Inf'
+        return line
+
+    @classmethod
+    def main(cls, argv=None):
+        """
+        Command line interface: sofapipeline --output directory --step step ... file.sofa|directory|pattern ...
+
+        :param argv:    List of arguments (defaults to sys.argv[1:])
+        :return:        exit status: 0 if all files are done, 1 if any is not valid or has NaN or Inf values,
+                        2 if any failed
+        """
+        parser = argparse.ArgumentParser(prog='sofapipeline', description='Transform SOFA files in batch')
+        parser.add_argument('inputs', nargs='+', help='SOFA files, directories or glob patterns')
+        parser.add_argument('-o', '--output', required=True, help='output directory')
+        parser.add_argument('-s', '--step', action='append', required=True, dest='steps',
+                            help='step, applied in order: ' + ', '.join(sorted(cls.stepClasses)) +
+                                 ' (arguments after a colon, such as resample:44100)')
+        parser.add_argument('--pattern', help='filename pattern of the files searched in directories')
+        parser.add_argument('--workers', type=int, help='number of parallel workers')
+        parser.add_argument('--chunk-size', type=int, help='number of measurements processed at once')
+        parser.add_argument('--manifest', help='path of the manifest')
+        parser.add_argument('--backend', help='storage backend of the sources')
+        parser.add_argument('--no-resume', action='store_true', help='process the files which are done again')
+        args = parser.parse_args(argv)
+
+        try:
+            pipeline = cls(args.steps)
+            records = pipeline.run(SOFAInfo.findPaths(args.inputs, args.pattern), args.output, args.workers,
+                                   chunkSize=args.chunk_size, backend=args.backend, manifest=args.manifest,
+                                   resume=not args.no_resume)
+        except (IOError, OSError, SOFAError) as e:
+            sys.stderr.write('sofapipeline: ' + str(e) + '\n')
+            return 2
+        status = 0
+        for record in records:
+            if record['status'] == 'failed':
+                status = 2
+            elif record.get('valid') is False or record.get('problems'):
+                status = max(status, 1)
+            sys.stdout.write(cls.getText(record) + '\n')
+        return status
+
+
+def main():
+    sys.exit(SOFAPipeline.main())
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFAReadAhead.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import threading
+
+try:
+    import queue
+except ImportError:  # pragma: no cover
+    import Queue as queue
+
+
+class SOFAReadAhead(object):
+    """
+    Iterate over the results of a function applied to a sequence of items,
+    computing the next result in a background thread while the current one is used.
+
+    The background thread only computes a result when fewer than `depth` results are waiting,
+    so at most depth + 1 results are held, counting the one being used. Exceptions raised
+    by the function are raised in the consuming thread, and stopping the iteration early stops the thread.
+    """
+
+    # Seconds between checks of the stop flag while the consumer is busy
+    pollInterval = 0.1
+
+    def __init__(self, function, items, depth=1):
+        """
+        :param function:    callable applied to each item
+        :param items:       iterable of items
+        :param depth:       number of results computed ahead
+        """
+        self.function = function
+        self.items = items
+        self.depth = max(1, depth)
+
+    def __iter__(self):
+        results = queue.Queue()
+        # A slot is taken before computing a result, and given back when the result is used
+        slots = threading.Semaphore(self.depth)
+        stop = threading.Event()
+
+        def acquire():
+            while not stop.is_set():
+                if slots.acquire(timeout=self.pollInterval):
+                    return True
+            return False
+
+        def produce():
+            try:
+                for item in self.items:
+                    if not acquire():
+                        return
+                    results.put((True, self.function(item)))
+                results.put(None)
+            except Exception as e:
+                results.put((False, e))
+
+        thread = threading.Thread(target=produce)
+        thread.daemon = True
+        thread.start()
+        try:
+            while True:
+                result = results.get()
+                if result is None:
+                    return
+                success, value = result
+                if not success:
+                    raise value
+                slots.release()
+                yield value
+        finally:
+            stop.set()
+            thread.join()
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFAResampler.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+from fractions import Fraction
+
+import numpy as np
+
+from .SOFACache import SOFACache
+from .SOFAError import SOFAError
+from .SOFAFIRConverter import SOFAFIRConverter
+
+
+class SOFAResampler(object):
+    """
+    Polyphase sample rate conversion of whole Data.IR variables.
+
+    The anti-aliasing filter is a Kaiser-windowed sinc, applied in polyphase form:
+    only the non-zero taps of the upsampled signal are evaluated, and every tap
+    is applied to all measurements, receivers and emitters of a chunk at once.
+    """
+
+    # Filter half length, in zero crossings of the lowest cutoff
+    filterHalfLength = 10
+    # Kaiser window shape parameter
+    kaiserBeta = 5.0
+    # Maximum denominator when approximating the rate ratio
+    maxDenominator = 1000
+
+    @classmethod
+    def getResamplingFactors(cls, originalRate, targetRate):
+        """
+        Get the upsampling and downsampling factors between two rates
+
+        :param originalRate:    the original sampling rate
+        :param targetRate:      the target sampling rate
+        :return:                a Tuple (up, down) of coprime integers
+        :raises:                SOFAError if the rates are not positive
+        """
+        if originalRate <= 0 or targetRate <= 0:
+            raise SOFAError('Invalid sampling rates: ' + str(originalRate) + ', ' + str(targetRate))
+
+        ratio = Fraction(float(targetRate) / float(originalRate)).limit_denominator(cls.maxDenominator)
+        return ratio.numerator, ratio.denominator
+
+    @classmethod
+    def designFilter(cls, up, down):
+        """
+        Design the anti-aliasing lowpass filter for the given factors.
+        The filter works at the upsampled rate, and has a gain of `up` to compensate the zero stuffing.
+
+        :param up:      upsampling factor
+        :param down:    downsampling factor
+        :return:        ndarray with the filter taps (odd length, linear phase)
+        """
+        maxFactor = max(up, down)
+        halfLength = cls.filterHalfLength * maxFactor
+        n = np.arange(-halfLength, halfLength + 1)
+        h = np.sinc(n / float(maxFactor)) * np.kaiser(2 * halfLength + 1, cls.kaiserBeta)
+        return h * (up / np.sum(h))
+
+    @classmethod
+    def getNumOutputSamples(cls, numSamples, up, down):
+        """
+        Get the length of a resampled signal
+
+        :param numSamples:  original length
+        :param up:          upsampling factor
+        :param down:        downsampling factor
+        :return:            resampled length
+        """
+        return -(-numSamples * up // down)
+
+    @classmethod
+    def resample(cls, data, up, down, h=None):
+        """
+        Resample the last axis of an array by the rational factor up/down.
+        The output is compensated for the filter delay, so onsets keep their time position.
+
+        :param data:    ndarray with shape [..., N]
+        :param up:      upsampling factor
+        :param down:    downsampling factor
+        :param h:       filter taps, as returned by designFilter (computed if None)
+        :return:        ndarray with shape [..., ceil(N*up/down)]
+        """
+        data = np.asarray(data, dtype=float)
+        if up == 1 and down == 1:
+            return data.copy()
+        if h is None:
+            h = cls.designFilter(up, down)
+
+        numSamples = data.shape[-1]
+        numOutputSamples = cls.getNumOutputSamples(numSamples, up, down)
+        halfLength = (len(h) - 1) // 2
+        numTaps = -(-len(h) // up)
+        h = np.concatenate([h, np.zeros(numTaps * up + up - len(h))])
+
+        # Position of each output sample in the (delay compensated) upsampled signal
+        position = np.arange(numOutputSamples) * down + halfLength
+        phase = position % up
+        base = position // up
+
+        result = np.zeros(data.shape[:-1] + (numOutputSamples,))
+        for tap in range(numTaps):
+            index = base - tap
+            weights = h[phase + tap * up]
+            valid = (index >= 0) & (index < numSamples)
+            result[..., valid] += data[..., index[valid]] * weights[valid]
+
+        return result
+
+    @classmethod
+    def getFileSamplingRate(cls, sofafile):
+        """
+        Get the single sampling rate of a file
+
+        :param sofafile:    a SOFAFile instance
+        :return:            the sampling rate
+        :raises:            SOFAError if Data.SamplingRate varies along M
+        """
+        rates = np.unique(np.ma.filled(sofafile.getSamplingRate(), 0.))
+        if len(rates) != 1:
+            raise SOFAError('Data.SamplingRate is not unique: ' + str(rates))
+        return float(rates[0])
+
+    @classmethod
+    def iterResampledIR(cls, sofafile, targetRate, chunkSize=None):
+        """
+        Stream Data.IR resampled to the target rate, in chunks along M
+
+        :param sofafile:    a SOFAFile instance with FIR or FIRE DataType
+        :param targetRate:  the target sampling rate
+        :param chunkSize:   number of measurements resampled at once
+        :return:            generator of Tuples (start, stop, ir)
+        """
+        up, down = cls.getResamplingFactors(cls.getFileSamplingRate(sofafile), targetRate)
+        h = cls.designFilter(up, down)
+
+        ir = sofafile.getVariableInstance('Data.IR')
+        for start, stop in SOFAFIRConverter.getChunkRanges(ir.shape[0], chunkSize):
+            yield start, stop, cls.resample(np.ma.filled(ir[start:stop], 0.), up, down, h)
+
+    @classmethod
+    def getResampledData(cls, sofafile, targetRate, chunkSize=None, cacheDirectory=None):
+        """
+        Get Data.IR and Data.Delay converted to the target rate.
+        Data.Delay (in samples) is scaled by the rate ratio.
+        If a cache directory is given, the results are stored there, keyed by
+        the file stamp (see SOFACache.getFileStamp) and the target rate, and reused on later calls.
+        Files that are not on disk are not cached.
+
+        :param sofafile:        a SOFAFile instance with FIR or FIRE DataType
+        :param targetRate:      the target sampling rate
+        :param chunkSize:       number of measurements resampled at once
+        :param cacheDirectory:  path to the cache directory, or None
+        :return:                a Tuple (ir, delay)
+        """
+        cache = None
+        stamp = SOFACache.getFileStamp(sofafile) if cacheDirectory is not None else None
+        if stamp is not None:
+            cache = SOFACache(cacheDirectory)
+            key = cache.getKey('resample', stamp, float(targetRate),
+                               cls.filterHalfLength, cls.kaiserBeta, cls.maxDenominator)
+            entry = cache.load(key)
+            if entry is not None:
+                return entry['ir'], entry['delay']
+
+        originalRate = cls.getFileSamplingRate(sofafile)
+        up, down = cls.getResamplingFactors(originalRate, targetRate)
+        ir = SOFAFIRConverter.collect(cls.iterResampledIR(sofafile, targetRate, chunkSize),
+                                      sofafile.getDimensionSize('M'))
+        delay = np.ma.filled(sofafile.getDataDelay(), 0.) * (float(up) / down)
+
+        if cache is not None:
+            cache.save(key, {'ir': ir, 'delay': delay})
+
+        return ir, delay
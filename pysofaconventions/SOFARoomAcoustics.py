@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFARoomAcoustics.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import numpy as np
+
+from .SOFAFIRConverter import SOFAFIRConverter
+from .SOFAMinimumPhase import SOFAMinimumPhase
+from .SOFAResampler import SOFAResampler
+
+
+class SOFARoomAcoustics(object):
+    """
+    Room acoustic parameters of impulse responses (ISO 3382 style).
+
+    All methods operate on the last axis and are batched over all leading axes,
+    so the parameters of every receiver and emitter of a chunk of measurements
+    are computed at once. No noise compensation is applied to the decay curves.
+
+    The parameters are:
+    - EDT, T20, T30: decay times in seconds, from linear fits of the Schroeder curve
+      between 0/-10, -5/-25 and -5/-35 dB, extrapolated to 60 dB
+    - C50, C80: clarity in dB, early (from the onset) to late energy ratio
+    - D50: definition, early to total energy ratio
+    - DRR: direct to reverberant ratio in dB, with the direct sound around the peak
+    - Ts: center time in seconds, relative to the onset
+    """
+
+    parameterNames = ('EDT', 'T20', 'T30', 'C50', 'C80', 'D50', 'DRR', 'Ts')
+    # Evaluation ranges of the decay times, in dB
+    decayRanges = {'EDT': (0., -10.), 'T20': (-5., -25.), 'T30': (-5., -35.)}
+    # Octave band center frequencies, in Hz
+    octaveBands = (125., 250., 500., 1000., 2000., 4000., 8000.)
+    # Order of the Butterworth lowpass prototype of the octave band filters, applied forward and backward
+    filterOrder = 3
+    # Highest band edge, relative to the Nyquist frequency
+    maxEdge = 0.95
+    # Half length of the direct sound window, in seconds
+    directWindow = 0.0025
+    # Threshold for the onset of the direct sound, in dB relative to the peak
+    onsetThreshold = -20.
+
+    @classmethod
+    def getEnergyDecayCurve(cls, ir):
+        """
+        Compute the Schroeder backwards integral, normalized to 0 dB
+
+        :param ir:  ndarray with shape [..., N]
+        :return:    ndarray with shape [..., N], in dB (NaN for silent responses)
+        """
+        energy = np.asarray(ir, dtype=float) ** 2
+        edc = np.cumsum(energy[..., ::-1], axis=-1)[..., ::-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return 10. * np.log10(edc / edc[..., :1])
+
+    @classmethod
+    def getDecayTime(cls, edc, samplingRate, start, stop):
+        """
+        Fit a line to the energy decay curve between two levels, and extrapolate it to 60 dB
+
+        :param edc:             ndarray with shape [..., N], in dB (see getEnergyDecayCurve)
+        :param samplingRate:    sampling rate in Hz
+        :param start:           upper level of the fit, in dB
+        :param stop:            lower level of the fit, in dB
+        :return:                ndarray with shape [...], in seconds (NaN if the range is not reached)
+        """
+        t = np.arange(edc.shape[-1]) / float(samplingRate)
+        mask = (edc <= start) & (edc >= stop)
+        count = np.sum(mask, axis=-1)
+        level = np.where(mask, edc, 0.)
+        sumT = np.sum(mask * t, axis=-1)
+        sumTT = np.sum(mask * t * t, axis=-1)
+        sumL = np.sum(level, axis=-1)
+        sumTL = np.sum(level * t, axis=-1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = (count * sumTL - sumT * sumL) / (count * sumTT - sumT ** 2)
+            return np.where((count > 1) & (slope < 0), -60. / slope, np.nan)
+
+    @classmethod
+    def getOctaveBandResponse(cls, frequencies, samplingRate, band, order=None):
+        """
+        Squared magnitude response of a digital Butterworth octave band-pass filter, which is the response of
+        the filter applied forward and backward. The band edges are band * 2 ** (+-1/2) (IEC 61260, base 2),
+        prewarped for the bilinear transform, and are limited below the Nyquist frequency (maxEdge).
+
+        :param frequencies:     ndarray of frequencies in Hz, up to samplingRate / 2
+        :param samplingRate:    sampling rate in Hz
+        :param band:            center frequency in Hz
+        :param order:           order of the lowpass prototype (defaults to filterOrder)
+        :return:                ndarray with the squared magnitude at the frequencies
+        """
+        if order is None:
+            order = cls.filterOrder
+        nyquist = samplingRate / 2.
+        lower, upper = [min(edge, cls.maxEdge * nyquist) for edge in (band / np.sqrt(2.), band * np.sqrt(2.))]
+        if lower >= upper:
+            # Bands above the Nyquist frequency are empty
+            return np.zeros(np.shape(frequencies))
+        warp = lambda frequency: np.tan(np.pi * np.asarray(frequency, dtype=float) / samplingRate)
+        center = np.sqrt(warp(lower) * warp(upper))
+        bandwidth = warp(upper) - warp(lower)
+        omega = warp(frequencies)
+        # The response is 0 at 0 Hz, where the prototype frequency is infinite
+        with np.errstate(divide='ignore', over='ignore'):
+            prototype = np.abs((omega ** 2 - center ** 2) / (omega * bandwidth))
+            return 1. / (1. + prototype ** (2 * order))
+
+    @classmethod
+    def getOctaveBands(cls, ir, samplingRate, bands=None):
+        """
+        Split impulse responses into octave bands, with Butterworth band-pass filters
+        (see getOctaveBandResponse) applied forward and backward, so without phase shift.
+        The filtering is done in the frequency domain, on the responses zero padded to twice their length,
+        which truncates the filter responses instead of wrapping them around.
+
+        :param ir:              ndarray with shape [..., N]
+        :param samplingRate:    sampling rate in Hz
+        :param bands:           center frequencies in Hz (defaults to octaveBands)
+        :return:                ndarray with shape [..., B, N]
+        """
+        if bands is None:
+            bands = cls.octaveBands
+        n = np.shape(ir)[-1]
+        frequencies = np.fft.rfftfreq(2 * n, 1. / samplingRate)
+        responses = np.array([cls.getOctaveBandResponse(frequencies, samplingRate, band) for band in bands])
+        spectrum = np.fft.rfft(ir, n=2 * n, axis=-1)
+        return np.fft.irfft(spectrum[..., np.newaxis, :] * responses, n=2 * n, axis=-1)[..., :n]
+
+    @classmethod
+    def getParameters(cls, ir, samplingRate):
+        """
+        Compute all room acoustic parameters
+
+        :param ir:              ndarray with shape [..., N]
+        :param samplingRate:    sampling rate in Hz
+        :return:                dict with an ndarray with shape [...] for each of parameterNames
+        """
+        ir = np.asarray(ir, dtype=float)
+        n = ir.shape[-1]
+        energy = ir ** 2
+        cumulative = np.concatenate([np.zeros(ir.shape[:-1] + (1,)), np.cumsum(energy, axis=-1)], axis=-1)
+
+        def getEnergy(start, stop):
+            start = np.broadcast_to(np.clip(start, 0, n).astype(int), ir.shape[:-1])[..., np.newaxis]
+            stop = np.broadcast_to(np.clip(stop, 0, n).astype(int), ir.shape[:-1])[..., np.newaxis]
+            return (np.take_along_axis(cumulative, stop, axis=-1) -
+                    np.take_along_axis(cumulative, start, axis=-1))[..., 0]
+
+        edc = cls.getEnergyDecayCurve(ir)
+        parameters = {}
+        for name, (start, stop) in cls.decayRanges.items():
+            parameters[name] = cls.getDecayTime(edc, samplingRate, start, stop)
+
+        onset = SOFAMinimumPhase.getOnsets(ir, cls.onsetThreshold)
+        peak = np.argmax(np.abs(ir), axis=-1)
+        total = getEnergy(onset, n)
+        direct = getEnergy(peak - round(cls.directWindow * samplingRate),
+                           peak + round(cls.directWindow * samplingRate) + 1)
+        early50 = getEnergy(onset, onset + round(0.05 * samplingRate))
+        early80 = getEnergy(onset, onset + round(0.08 * samplingRate))
+        t = (np.arange(n) - onset[..., np.newaxis]) / float(samplingRate)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            parameters['C50'] = 10. * np.log10(early50 / (total - early50))
+            parameters['C80'] = 10. * np.log10(early80 / (total - early80))
+            parameters['D50'] = early50 / total
+            parameters['DRR'] = 10. * np.log10(direct / (cumulative[..., -1] - direct))
+            parameters['Ts'] = np.sum(np.where(t >= 0, t, 0.) * energy, axis=-1) / total
+        return parameters
+
+    @classmethod
+    def getFileParameters(cls, sofafile, bands=None, chunkSize=None):
+        """
+        Compute the room acoustic parameters of all impulse responses of a file,
+        reading Data.IR in chunks along M
+
+        :param sofafile:    a SOFAFile with FIR or FIRE DataType
+        :param bands:       octave band center frequencies in Hz, or None for broadband parameters
+        :param chunkSize:   number of measurements processed at once
+        :return:            dict with an ndarray for each of parameterNames,
+                            plus 'dimensions' with the dimension names of their axes
+                            ('B' for the bands) and 'bands' with the center frequencies
+        """
+        ir = sofafile.getVariableInstance('Data.IR')
+        samplingRate = SOFAResampler.getFileSamplingRate(sofafile)
+        results = {}
+        for start, stop in SOFAFIRConverter.getChunkRanges(ir.shape[0], chunkSize):
+            data = np.ma.filled(ir[start:stop], 0.)
+            if bands is not None:
+                data = cls.getOctaveBands(data, samplingRate, bands)
+            for name, values in cls.getParameters(data, samplingRate).items():
+                if name not in results:
+                    results[name] = np.empty((ir.shape[0],) + values.shape[1:])
+                results[name][start:stop] = values
+
+        results['dimensions'] = tuple(ir.dimensions[:-1]) + (('B',) if bands is not None else ())
+        results['bands'] = None if bands is None else np.asarray(bands, dtype=float)
+        return results
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFASphericalHarmonicHRTF.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import numpy as np
+
+from .SOFAError import SOFAError
+from .SOFAFIRConverter import SOFAFIRConverter
+from .SOFAResampler import SOFAResampler
+from .SOFASphericalHarmonics import SOFASphericalHarmonics
+
+
+class SOFASphericalHarmonicHRTF(object):
+    """
+    Spherical harmonic representation of a set of HRTFs.
+
+    The coefficients are fitted by regularized least squares, for all frequency bins
+    and receivers at once, and are stored as a [(order+1)^2, R, F] complex array
+    (ACN/N3D, see SOFASphericalHarmonics). Evaluating the HRTFs at any direction
+    is then a single matrix multiplication.
+    """
+
+    def __init__(self, coefficients, samplingRate, numSamples, regularization=0., fittingError=None):
+        self.coefficients = np.asarray(coefficients)
+        self.order = int(round(np.sqrt(self.coefficients.shape[0]))) - 1
+        if SOFASphericalHarmonics.getNumCoefficients(self.order) != self.coefficients.shape[0]:
+            raise SOFAError('Invalid number of coefficients: ' + str(self.coefficients.shape[0]))
+        self.samplingRate = float(samplingRate)
+        self.numSamples = int(numSamples)
+        self.regularization = float(regularization)
+        self.fittingError = fittingError
+
+    @classmethod
+    def fit(cls, sofafile, order, regularization=1e-3, chunkSize=None):
+        """
+        Fit the spherical harmonic coefficients of the Data.IR of a file.
+        The normal equations are accumulated chunk by chunk along M, so memory
+        does not depend on the number of measurements.
+        The fitting error is the energy of the residual relative to the energy of the HRTFs, in dB.
+
+        :param sofafile:        a SOFAFile with FIR DataType and SourcePosition directions
+        :param order:           the spherical harmonic order
+        :param regularization:  Tikhonov regularization, relative to the number of measurements
+        :param chunkSize:       number of measurements read at once
+        :return:                a SOFASphericalHarmonicHRTF instance
+        """
+        units, coordinates = sofafile.getSourcePositionInfo()
+        positions = np.ma.filled(sofafile.getSourcePositionValues(), 0.)
+        ir = sofafile.getVariableInstance('Data.IR')
+        m, r, n = ir.shape
+        if positions.shape[0] != m:
+            positions = np.broadcast_to(positions, (m,) + positions.shape[1:])
+
+        azimuth, elevation = SOFASphericalHarmonics.getDirections(positions, coordinates, units)
+        numCoefficients = SOFASphericalHarmonics.getNumCoefficients(order)
+
+        gram = np.zeros((numCoefficients, numCoefficients))
+        projection = np.zeros((numCoefficients, r * (n // 2 + 1)), dtype=complex)
+        energy = 0.
+        for start, stop in SOFAFIRConverter.getChunkRanges(m, chunkSize):
+            basis = SOFASphericalHarmonics.getBasis(order, azimuth[start:stop], elevation[start:stop])
+            spectra = np.fft.rfft(np.ma.filled(ir[start:stop], 0.), axis=-1).reshape(stop - start, -1)
+            gram += np.dot(basis.T, basis)
+            projection += np.dot(basis.T, spectra)
+            energy += np.sum(np.abs(spectra) ** 2)
+
+        system = gram + regularization * m * np.eye(numCoefficients)
+        coefficients = np.linalg.solve(system, projection)
+
+        # Residual energy from the accumulated statistics: |H|^2 - 2 Re<YC,H> + |YC|^2
+        residual = energy - 2. * np.real(np.sum(np.conj(coefficients) * projection)) \
+                   + np.real(np.sum(np.conj(coefficients) * np.dot(gram, coefficients)))
+        fittingError = 10. * np.log10(residual / energy) if residual > 0 else -np.inf
+
+        return cls(coefficients.reshape(numCoefficients, r, -1), SOFAResampler.getFileSamplingRate(sofafile), n,
+                   regularization, fittingError)
+
+    def evaluate(self, azimuth, elevation, degrees=True):
+        """
+        Evaluate the HRTFs at a batch of directions
+
+        :param azimuth:     azimuth angles, shape [K]
+        :param elevation:   elevation angles, shape [K]
+        :param degrees:     whether the angles are given in degrees (otherwise radians)
+        :return:            complex ndarray with shape [K,R,F]
+        """
+        if degrees:
+            azimuth, elevation = np.radians(azimuth), np.radians(elevation)
+        basis = SOFASphericalHarmonics.getBasis(self.order, azimuth, elevation)
+        return np.tensordot(basis, self.coefficients, axes=(1, 0))
+
+    def evaluateIR(self, azimuth, elevation, degrees=True):
+        """
+        Evaluate the HRIRs at a batch of directions
+
+        :return:    ndarray with shape [K,R,N] (see evaluate)
+        """
+        return np.fft.irfft(self.evaluate(azimuth, elevation, degrees), n=self.numSamples, axis=-1)
+
+    def getCoefficientsIR(self):
+        """
+        Get the coefficients as time domain filters
+
+        :return:    ndarray with shape [(order+1)^2,R,N]
+        """
+        return np.fft.irfft(self.coefficients, n=self.numSamples, axis=-1)
+
+    def save(self, path):
+        """
+        Store the representation in a compressed .npz file (coefficients in single precision)
+
+        :param path:    path of the file
+        """
+        np.savez_compressed(path, coefficients=self.coefficients.astype(np.complex64),
+                            samplingRate=self.samplingRate, numSamples=self.numSamples,
+                            regularization=self.regularization,
+                            fittingError=np.nan if self.fittingError is None else self.fittingError)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a representation stored with save()
+
+        :param path:    path of the file
+        :return:        a SOFASphericalHarmonicHRTF instance
+        """
+        with np.load(path) as data:
+            fittingError = float(data['fittingError'])
+            return cls(data['coefficients'], float(data['samplingRate']), int(data['numSamples']),
+                       float(data['regularization']), None if np.isnan(fittingError) else fittingError)
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFASphericalHarmonics.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import math
+
+import numpy as np
+
+from .SOFAError import SOFAError
+
+
+class SOFASphericalHarmonics(object):
+    """
+    Real spherical harmonics, in ACN channel ordering and N3D normalization,
+    without the Condon-Shortley phase (the usual Ambisonics convention).
+    """
+
+    # ACN index of each FuMa channel (W X Y Z R S T U V K L M N O P Q)
+    fumaChannels = [0, 3, 1, 2, 6, 7, 5, 8, 4, 12, 13, 11, 14, 10, 15, 9]
+    # FuMa (MaxN) weights relative to SN3D, indexed by (order, |degree|)
+    fumaWeights = {(0, 0): 1. / math.sqrt(2.), (1, 0): 1., (1, 1): 1.,
+                   (2, 0): 1., (2, 1): 2. / math.sqrt(3.), (2, 2): 2. / math.sqrt(3.),
+                   (3, 0): 1., (3, 1): math.sqrt(45. / 32.), (3, 2): 3. / math.sqrt(5.), (3, 3): math.sqrt(8. / 5.)}
+
+    @classmethod
+    def getNumCoefficients(cls, order):
+        """
+        Get the number of spherical harmonics up to a given order
+
+        :param order:   the maximum order
+        :return:        (order+1)^2
+        """
+        return (order + 1) ** 2
+
+    @classmethod
+    def getOrderAndDegree(cls, acn):
+        """
+        Get the order and degree of the spherical harmonic with the given ACN index
+
+        :param acn:     the channel index
+        :return:        a Tuple (order, degree)
+        """
+        order = int(math.floor(math.sqrt(acn)))
+        return order, acn - order * order - order
+
+    @classmethod
+    def getDirections(cls, positions, coordinates, units=None):
+        """
+        Get the azimuth and elevation of SOFA positions
+
+        :param positions:   ndarray with shape [..., C]
+        :param coordinates: 'spherical' or 'cartesian' (the position Type attribute)
+        :param units:       the position Units attribute (radians are used if it contains 'radian')
+        :return:            a Tuple (azimuth, elevation) in radians
+        :raises:            SOFAError if the coordinate type is not known
+        """
+        positions = np.asarray(positions, dtype=float)
+        if coordinates == 'spherical':
+            azimuth, elevation = positions[..., 0], positions[..., 1]
+            if units is None or 'radian' not in units:
+                azimuth, elevation = np.radians(azimuth), np.radians(elevation)
+            return azimuth, elevation
+        elif coordinates == 'cartesian':
+            x, y, z = positions[..., 0], positions[..., 1], positions[..., 2]
+            return np.arctan2(y, x), np.arctan2(z, np.hypot(x, y))
+        else:
+            raise SOFAError('Coordinate type not known: ' + str(coordinates))
+
+    @classmethod
+    def getBasis(cls, order, azimuth, elevation):
+        """
+        Evaluate all real spherical harmonics up to the given order
+
+        :param order:       the maximum order
+        :param azimuth:     azimuth angles in radians, shape [K]
+        :param elevation:   elevation angles in radians, shape [K]
+        :return:            ndarray with shape [K, (order+1)^2]
+        """
+        azimuth = np.asarray(azimuth, dtype=float).reshape(-1)
+        elevation = np.asarray(elevation, dtype=float).reshape(-1)
+        x = np.sin(elevation)
+        y = np.cos(elevation)
+
+        # Associated Legendre functions P[l][m](x), without Condon-Shortley phase
+        legendre = {(0, 0): np.ones_like(x)}
+        for m in range(1, order + 1):
+            legendre[(m, m)] = legendre[(m - 1, m - 1)] * (2 * m - 1) * y
+        for m in range(0, order):
+            legendre[(m + 1, m)] = x * (2 * m + 1) * legendre[(m, m)]
+        for m in range(0, order + 1):
+            for l in range(m + 2, order + 1):
+                legendre[(l, m)] = ((2 * l - 1) * x * legendre[(l - 1, m)]
+                                    - (l + m - 1) * legendre[(l - 2, m)]) / (l - m)
+
+        basis = np.empty((len(azimuth), cls.getNumCoefficients(order)))
+        for l in range(order + 1):
+            for m in range(-l, l + 1):
+                absM = abs(m)
+                norm = math.sqrt((2 * l + 1) * (1 if m == 0 else 2)
+                                 * math.exp(math.lgamma(l - absM + 1) - math.lgamma(l + absM + 1)))
+                if m >= 0:
+                    trig = np.cos(absM * azimuth)
+                else:
+                    trig = np.sin(absM * azimuth)
+                basis[:, l * l + l + m] = norm * legendre[(l, absM)] * trig
+
+        return basis
+
+    @classmethod
+    def getNormalizationWeights(cls, order, normalization):
+        """
+        Get the weights of a normalization relative to SN3D, in ACN order
+
+        :param order:           the maximum order
+        :param normalization:   'SN3D', 'N3D' or 'FuMa' (also 'MaxN'), case insensitive
+        :return:                ndarray with shape [(order+1)^2]
+        :raises:                SOFAError if the normalization is not known,
+                                or not defined for the given order
+        """
+        normalization = str(normalization).lower()
+        weights = np.empty(cls.getNumCoefficients(order))
+        for acn in range(len(weights)):
+            l, m = cls.getOrderAndDegree(acn)
+            if normalization == 'sn3d':
+                weights[acn] = 1.
+            elif normalization == 'n3d':
+                weights[acn] = math.sqrt(2 * l + 1)
+            elif normalization in ('fuma', 'maxn'):
+                if (l, abs(m)) not in cls.fumaWeights:
+                    raise SOFAError('FuMa normalization is only defined up to order 3, got: ' + str(order))
+                weights[acn] = cls.fumaWeights[(l, abs(m))]
+            else:
+                raise SOFAError('Normalization not known: ' + normalization)
+        return weights
+
+    @classmethod
+    def getOrderingPermutation(cls, order, channelOrdering):
+        """
+        Get the ACN index of each channel of a given ordering
+
+        :param order:           the maximum order
+        :param channelOrdering: 'ACN' or 'FuMa', case insensitive
+        :return:                list with (order+1)^2 elements
+        :raises:                SOFAError if the ordering is not known,
+                                or not defined for the given order
+        """
+        channelOrdering = str(channelOrdering).lower()
+        numCoefficients = cls.getNumCoefficients(order)
+        if channelOrdering == 'acn':
+            return list(range(numCoefficients))
+        elif channelOrdering == 'fuma':
+            if numCoefficients > len(cls.fumaChannels):
+                raise SOFAError('FuMa ordering is only defined up to order 3, got: ' + str(order))
+            return cls.fumaChannels[:numCoefficients]
+        else:
+            raise SOFAError('Channel ordering not known: ' + channelOrdering)
+
+    @classmethod
+    def getConversionMatrix(cls, order, channelOrdering, normalization,
+                            targetOrdering='acn', targetNormalization='n3d'):
+        """
+        Get the matrix which converts Ambisonic signals between conventions
+
+        :param order:               the Ambisonics order
+        :param channelOrdering:     ordering of the source signals ('ACN' or 'FuMa')
+        :param normalization:       normalization of the source signals ('SN3D', 'N3D' or 'FuMa')
+        :param targetOrdering:      ordering of the converted signals
+        :param targetNormalization: normalization of the converted signals
+        :return:                    ndarray with shape [(order+1)^2, (order+1)^2],
+                                    to be applied as target = matrix . source
+        """
+        numCoefficients = cls.getNumCoefficients(order)
+        gain = cls.getNormalizationWeights(order, targetNormalization) / \
+               cls.getNormalizationWeights(order, normalization)
+
+        # Source channels to ACN, ACN to target channels
+        toACN = np.zeros((numCoefficients, numCoefficients))
+        toACN[cls.getOrderingPermutation(order, channelOrdering), np.arange(numCoefficients)] = 1.
+        fromACN = np.zeros((numCoefficients, numCoefficients))
+        fromACN[np.arange(numCoefficients), cls.getOrderingPermutation(order, targetOrdering)] = 1.
+
+        return np.dot(fromACN, gain[:, np.newaxis] * toACN)
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFASubset.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import numpy as np
+
+from .SOFAError import SOFAError
+from .SOFAFIRConverter import SOFAFIRConverter
+from .SOFAFile import SOFAFile
+from .SOFASphericalHarmonics import SOFASphericalHarmonics
+from .SOFAWriter import SOFAWriter
+
+
+class SOFASubset(object):
+    """
+    Extraction of a subset of the measurements of a SOFA file into a new file.
+
+    Measurements are selected by indices, by a boolean mask, or by a vectorized predicate
+    evaluated on chunks of the [M,...] variables and of the source directions.
+    Only the selected hyperslabs of the [M,...] variables are read and copied;
+    the global attributes and all other variables are kept, and M is updated.
+    """
+
+    @classmethod
+    def getDirectionValues(cls, sofafile, positions):
+        """
+        Get the source directions of a chunk of SourcePosition values
+
+        :param sofafile:    a SOFAFile instance
+        :param positions:   SourcePosition values with shape [K, C]
+        :return:            dictionary with 'azimuth' in [-180, 180), 'elevation' and 'distance',
+                            in degrees and in the distance units, or an empty dictionary if
+                            the coordinate type is not known
+        """
+        units, coordinates = sofafile.getSourcePositionInfo()
+        positions = np.ma.filled(np.ma.asarray(positions, dtype=float), np.nan)
+        try:
+            azimuth, elevation = SOFASphericalHarmonics.getDirections(positions, coordinates, units)
+        except SOFAError:
+            return {}
+        if coordinates == 'spherical':
+            distance = positions[..., 2]
+        else:
+            distance = np.linalg.norm(positions, axis=-1)
+        return {'azimuth': np.mod(np.degrees(azimuth) + 180., 360.) - 180.,
+                'elevation': np.degrees(elevation),
+                'distance': distance}
+
+    @classmethod
+    def getIndices(cls, sofafile, selection, variables=None, chunkSize=None):
+        """
+        Get the sorted indices of the selected measurements
+
+        :param sofafile:    a SOFAFile instance
+        :param selection:   indices, a boolean mask with M entries, or a predicate.
+                            A predicate is called with a dictionary holding a chunk of each variable
+                            (see SOFAFile.iterMeasurements) and the 'azimuth', 'elevation' and 'distance'
+                            of the sources (see getDirectionValues), and returns a boolean array
+                            over the measurements of the chunk.
+        :param variables:   variables passed to the predicate
+                            (defaults to the [M,...] and [I,...] variables, except the Data ones)
+        :param chunkSize:   number of measurements evaluated at once
+        :return:            ndarray of indices
+        :raises:            SOFAError if the selection is not valid
+        """
+        size = sofafile.getDimensionSize('M')
+        if not callable(selection):
+            selection = np.asarray(selection)
+            if selection.dtype == bool:
+                if selection.shape != (size,):
+                    raise SOFAError('Invalid mask shape: ' + str(selection.shape))
+                return np.flatnonzero(selection)
+            indices = np.unique(selection.astype(int).reshape(-1))
+            if len(indices) and (indices[0] < 0 or indices[-1] >= size):
+                raise SOFAError('Invalid measurement index')
+            return indices
+
+        if variables is None:
+            variables = [name for name, var in sofafile.getVariablesAsDict().items()
+                         if ('M' in var.dimensions or 'I' in var.dimensions) and not name.startswith('Data.')]
+        selected = []
+        for start, stop, values in sofafile.iterMeasurements(chunkSize, variables, readAhead=False):
+            if 'SourcePosition' in values:
+                values.update(cls.getDirectionValues(sofafile, values['SourcePosition']))
+            mask = np.broadcast_to(np.asarray(selection(values), dtype=bool), (stop - start,))
+            selected.append(start + np.flatnonzero(mask))
+        return np.concatenate(selected) if selected else np.zeros(0, dtype=int)
+
+    @classmethod
+    def getRuns(cls, indices, chunkSize=None):
+        """
+        Group sorted indices into ranges of consecutive measurements
+
+        :param indices:     sorted ndarray of indices
+        :param chunkSize:   maximum length of a range (defaults to SOFAFIRConverter.defaultChunkSize)
+        :return:            List of Tuples (start, stop)
+        """
+        if chunkSize is None:
+            chunkSize = SOFAFIRConverter.defaultChunkSize
+        runs = []
+        breaks = np.flatnonzero(np.diff(indices) != 1) + 1
+        for run in np.split(indices, breaks):
+            if len(run):
+                runs.extend((int(run[0]) + start, int(run[0]) + stop)
+                            for start, stop in SOFAFIRConverter.getChunkRanges(len(run), chunkSize))
+        return runs
+
+    @classmethod
+    def extract(cls, sofafile, selection, path, variables=None, chunkSize=None, compression=None):
+        """
+        Write the selected measurements to a new file of the same convention
+
+        :param sofafile:    a SOFAFile instance, or the path of a SOFA file
+        :param selection:   indices, a boolean mask or a predicate (see getIndices)
+        :param path:        path of the new file
+        :param variables:   variables passed to the predicate (see getIndices)
+        :param chunkSize:   number of measurements read at once
+        :param compression: dictionary {name: createVariable keyword arguments} (see SOFAWriter.createFromTemplate)
+        :return:            ndarray with the indices of the extracted measurements in the original file
+        :raises:            SOFAError if no measurement is selected
+        """
+        source = sofafile if isinstance(sofafile, SOFAFile) else SOFAFile(sofafile, 'r')
+        target = None
+        try:
+            indices = cls.getIndices(source, selection, variables, chunkSize)
+            if len(indices) == 0:
+                raise SOFAError('No measurements selected')
+            measured = [name for name, var in source.getVariablesAsDict().items() if 'M' in var.dimensions]
+            target = SOFAWriter.createFromTemplate(source, path, dimensions={'M': len(indices)},
+                                                   skipVariables=measured, chunkSize=chunkSize,
+                                                   compression=compression)
+            offset = 0
+            for start, stop in cls.getRuns(indices, chunkSize):
+                for name in measured:
+                    dimensions = source.getVariableInstance(name).dimensions
+                    sourceIndex = [slice(None)] * len(dimensions)
+                    sourceIndex[dimensions.index('M')] = slice(start, stop)
+                    targetIndex = [slice(None)] * len(dimensions)
+                    targetIndex[dimensions.index('M')] = slice(offset, offset + stop - start)
+                    target.variables[name][tuple(targetIndex)] = \
+                        source.getVariableInstance(name)[tuple(sourceIndex)]
+                offset += stop - start
+        finally:
+            if target is not None:
+                target.close()
+            if source is not sofafile:
+                source.close()
+        return indices
+
+    @classmethod
+    def getHorizontalPlanePredicate(cls, tolerance=0.5):
+        """
+        :param tolerance:   maximum absolute elevation, in degrees
+        :return:            predicate selecting the sources in the horizontal plane
+        """
+        return lambda values: np.abs(values['elevation']) <= tolerance
+
+    @classmethod
+    def getFrontalHemispherePredicate(cls):
+        """
+        :return:    predicate selecting the sources with azimuth in [-90, 90] degrees
+        """
+        return lambda values: np.abs(values['azimuth']) <= 90.
+
+    @classmethod
+    def getElevationPredicate(cls, elevations, tolerance=0.5):
+        """
+        :param elevations:  the selected elevations, in degrees
+        :param tolerance:   maximum absolute difference to a selected elevation, in degrees
+        :return:            predicate selecting the sources at the given elevations
+        """
+        elevations = np.asarray(elevations, dtype=float).reshape(-1)
+        return lambda values: np.any(np.abs(values['elevation'][:, np.newaxis] - elevations) <= tolerance, axis=1)
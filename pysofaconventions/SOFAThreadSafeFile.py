@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFAThreadSafeFile.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import threading
+import weakref
+
+from .SOFAError import SOFAError
+from .SOFAMemoryFile import SOFAMemoryDataset
+from .SOFAMemoryFile import SOFAMemoryDimension
+from .SOFAMemoryFile import SOFAMemoryVariable
+from .SOFANcFile import SOFANetCDFFile
+
+
+class SOFAThreadSafeVariable(SOFAMemoryVariable):
+    """
+    Variable of a SOFAThreadSafeDataset: the description is shared, and values are read
+    from the handle of the calling thread
+    """
+
+    __slots__ = ('dataset', 'chunks', 'compression')
+
+    def __init__(self, dataset, variable):
+        self.name = variable.name
+        self.dimensions = tuple(variable.dimensions)
+        self.data = None
+        self.shape = tuple(variable.shape)
+        self.dtype = variable.dtype
+        self.fillValue = SOFANetCDFFile.getVariableFillValue(variable)
+        self.autoMask = True
+        self.writable = False
+        self.dataset = dataset
+        self.chunks = variable.chunking()
+        self.compression = variable.filters()
+        self.__dict__.update(variable.__dict__)
+
+    def __getitem__(self, index):
+        if not self.dataset.backend.usesNetCDF:
+            return self.readHandle(index)
+        with SOFANetCDFFile.lock:
+            return self.readHandle(index)
+
+    def readHandle(self, index):
+        """
+        :param index:   numpy index
+        :return:        the values read from the handle of the calling thread
+        """
+        variable = self.dataset.getHandle().file.variables[self.name]
+        variable.set_auto_maskandscale(self.autoMask)
+        return variable[index]
+
+    def chunking(self):
+        return self.chunks
+
+    def filters(self):
+        return self.compression
+
+
+class SOFAThreadSafeHandle(object):
+    """
+    Backend handle owned by a thread, closed when the thread exits
+    """
+
+    def __init__(self, ncfile):
+        self.ncfile = ncfile
+
+
+class SOFAThreadSafeDataset(SOFAMemoryDataset):
+    """
+    Read-only file which can be shared by several threads.
+
+    Attributes, dimensions and variable descriptions are read once and shared.
+    Each thread reads the values through its own lazily opened handle of the backend,
+    which is closed when the thread exits, or when the dataset is closed.
+    Handles are opened holding SOFANetCDFFile.lock, and values are read holding it
+    only if the backend uses the netCDF library.
+    """
+
+    __slots__ = ('path', 'backend', 'local', 'handles')
+
+    def __init__(self, path, backend):
+        SOFAMemoryDataset.__init__(self, writable=False)
+        self.path = path
+        self.backend = backend
+        self.local = threading.local()
+        self.handles = []
+        handle = self.getHandle().file
+        self.__dict__.update(handle.__dict__)
+        for name, dimension in handle.dimensions.items():
+            self.dimensions[name] = SOFAMemoryDimension(name, len(dimension), dimension.isunlimited())
+        for name, variable in handle.variables.items():
+            self.variables[name] = SOFAThreadSafeVariable(self, variable)
+
+    def getHandle(self):
+        """
+        Get the handle of the calling thread, opening it if needed
+
+        :return:    a SOFANetCDFFile instance of the backend
+        """
+        holder = getattr(self.local, 'holder', None)
+        if holder is None:
+            with SOFANetCDFFile.lock:
+                holder = SOFAThreadSafeHandle(self.backend(self.path, 'r'))
+                self.handles = [handle for handle in self.handles if handle.alive]
+                self.handles.append(weakref.finalize(holder, SOFAThreadSafeDataset.closeHandle, holder.ncfile))
+            self.local.holder = holder
+        return holder.ncfile
+
+    def getOpenHandles(self):
+        """
+        :return:    number of open handles
+        """
+        return len([handle for handle in self.handles if handle.alive])
+
+    @classmethod
+    def closeHandle(cls, ncfile):
+        """
+        :param ncfile:  a SOFANetCDFFile instance
+        """
+        with SOFANetCDFFile.lock:
+            ncfile.close()
+
+    def close(self):
+        with SOFANetCDFFile.lock:
+            handles, self.handles = self.handles, []
+        for handle in handles:
+            handle()
+        self.local = threading.local()
+
+
+class SOFAThreadSafeFile(SOFANetCDFFile):
+    """
+    SOFANetCDFFile which can be read from several threads (see SOFAThreadSafeDataset),
+    with a handle per thread opened with handleBackend.
+
+    The netCDF-C and HDF5 libraries are not thread-safe, even with different handles, so reads
+    with the default 'netcdf4' handles are still serialized by SOFANetCDFFile.lock: they only avoid
+    sharing the handle state. Handles of backends which do not use the netCDF library
+    (see SOFAThreadSafeH5pyFile, or subclasses with another handleBackend such as 'memory' or 'directory')
+    are read in parallel.
+    """
+
+    handleBackend = 'netcdf4'
+
+    def __init__(self, path, mode='r'):
+        if mode != 'r':
+            raise SOFAError('The threadsafe backend can only open files for reading')
+        self.file = SOFAThreadSafeDataset(path, SOFANetCDFFile.getBackend(self.handleBackend))
+        self.filename = path
+
+
+class SOFAThreadSafeH5pyFile(SOFAThreadSafeFile):
+    """
+    SOFAThreadSafeFile with h5py handles, which are read without holding SOFANetCDFFile.lock
+    (h5py serializes its own calls to HDF5)
+    """
+
+    handleBackend = 'h5py'
+    usesNetCDF = False
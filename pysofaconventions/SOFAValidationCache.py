@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFAValidationCache.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import json
+import os
+import sqlite3
+import warnings
+
+from .SOFAAPI import SOFAAPI
+from .SOFACache import SOFACache
+from .SOFAFile import SOFAFile
+from .SOFAVersion import SOFAVersion
+from .SOFAWarning import SOFAWarning
+
+
+class SOFAValidationCache(object):
+    """
+    Persistent cache of validation results, stored in a SQLite database.
+
+    Results are stored per path, together with the fingerprint of the file
+    (size, modification time and optionally a content hash) and a validation key
+    built from the API version, the convention class and version, and the version
+    of the validation rules. A cached result is only used if both still match,
+    so modified files are validated again, and so are all files when the rules change
+    (which must increase SOFAVersion.SOFAValidationRulesVersion).
+    """
+
+    schema = '''
+        CREATE TABLE IF NOT EXISTS validation (
+            path TEXT PRIMARY KEY, mtime REAL, size INTEGER, hash TEXT,
+            conventionClass TEXT, validationKey TEXT, valid INTEGER, warnings TEXT);
+    '''
+
+    def __init__(self, path):
+        """
+        :param path:    path of the database, created if it does not exist
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(self.schema)
+
+    def close(self):
+        self.connection.close()
+
+    @classmethod
+    def getConventionClass(cls, conventions):
+        """
+        Get the class implementing a SOFAConventions name
+
+        :param conventions: the SOFAConventions attribute value
+        :return:            the convention class, or SOFAFile if it is not known
+        """
+        from . import SOFAConventions
+        return getattr(SOFAConventions, 'SOFA' + str(conventions), SOFAFile)
+
+    @classmethod
+    def getValidationKey(cls, conventionClass):
+        """
+        Get the key identifying the validation rules of a convention class.
+        It changes with the API version, the SOFA specifications version, the convention version,
+        and the version of the validation rules (SOFAVersion.SOFAValidationRulesVersion).
+
+        :param conventionClass: SOFAFile or one of its subclasses
+        :return:                hexadecimal key string
+        """
+        return SOFACache.getKey(conventionClass.__name__, conventionClass.getConventionVersion(),
+                                SOFAAPI.getSpecificationsVersion(), SOFAVersion.SOFAValidationRulesVersion)
+
+    def getEntry(self, path, stat, contentHash):
+        """
+        Get the cached entry of a file, if its fingerprint did not change.
+        With a content hash, the modification time is not compared, so files
+        which were only touched are not validated again.
+
+        :param path:        path of the file
+        :param stat:        os.stat result of the file
+        :param contentHash: the content hash of the file, or None
+        :return:            the database row, or None
+        """
+        row = self.connection.execute('SELECT * FROM validation WHERE path = ?', (path,)).fetchone()
+        if row is None or row['size'] != stat.st_size:
+            return None
+        if contentHash is None:
+            return row if row['mtime'] == stat.st_mtime else None
+        return row if row['hash'] == contentHash else None
+
+    def validate(self, sofafile, conventionClass=None, contentHash=False):
+        """
+        Get the validation result of a file, from the cache if possible
+
+        :param sofafile:        a SOFAFile instance, or the path of a SOFA file
+        :param conventionClass: class used for validation (defaults to the class of the instance,
+                                or to the class of the SOFAConventions attribute of the file)
+        :param contentHash:     whether to also compare the SHA-256 digest of the file contents
+        :return:                Tuple (valid, warnings, cached), with the list of warning messages
+        """
+        instance = sofafile if isinstance(sofafile, SOFAFile) else None
+        path = os.path.abspath(instance.getFilename() if instance is not None else sofafile)
+        if instance is not None and conventionClass is None:
+            conventionClass = type(instance)
+
+        stat = os.stat(path)
+        digest = SOFACache.getFileHash(path) if contentHash else None
+        row = self.getEntry(path, stat, digest)
+        if row is not None:
+            cachedClass = conventionClass
+            if cachedClass is None:
+                cachedClass = self.getConventionClass(row['conventionClass'][len('SOFA'):])
+            if cachedClass.__name__ == row['conventionClass'] and \
+                    self.getValidationKey(cachedClass) == row['validationKey']:
+                if digest is not None and row['mtime'] != stat.st_mtime:
+                    with self.connection:
+                        self.connection.execute('UPDATE validation SET mtime = ? WHERE path = ?',
+                                                (stat.st_mtime, path))
+                return bool(row['valid']), json.loads(row['warnings']), True
+
+        if conventionClass is None:
+            metadata = SOFAFile(path, 'r')
+            try:
+                conventions = metadata.getGlobalAttributesAsDict().get('SOFAConventions')
+            finally:
+                metadata.close()
+            conventionClass = self.getConventionClass(conventions)
+
+        validationFile = instance if isinstance(instance, conventionClass) else conventionClass(path, 'r')
+        try:
+            with warnings.catch_warnings(record=True) as record:
+                warnings.simplefilter('always')
+                valid = bool(validationFile.isValid())
+        finally:
+            if validationFile is not instance:
+                validationFile.close()
+        messages = [str(warning.message) for warning in record if issubclass(warning.category, SOFAWarning)]
+
+        with self.connection:
+            self.connection.execute('INSERT OR REPLACE INTO validation VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                                    (path, stat.st_mtime, stat.st_size, digest, conventionClass.__name__,
+                                     self.getValidationKey(conventionClass), int(valid), json.dumps(messages)))
+        return valid, messages, False
+
+    def isValid(self, sofafile, conventionClass=None, contentHash=False):
+        """
+        Cached equivalent of SOFAFile.isValid: the warnings of the validation are issued again,
+        also when the result comes from the cache
+
+        :param sofafile:        a SOFAFile instance, or the path of a SOFA file
+        :param conventionClass: class used for validation (see validate)
+        :param contentHash:     whether to also compare the content hash of the file (see validate)
+        :return:                Boolean
+        """
+        valid, messages, _ = self.validate(sofafile, conventionClass, contentHash)
+        for message in messages:
+            warnings.warn(message, SOFAWarning)
+        return valid
+
+    def remove(self, path):
+        """
+        Remove the cached result of a file, if it exists
+
+        :param path:    path of the file
+        """
+        with self.connection:
+            self.connection.execute('DELETE FROM validation WHERE path = ?', (os.path.abspath(path),))
+
+    def clear(self):
+        """
+        Remove all cached results
+        """
+        with self.connection:
+            self.connection.execute('DELETE FROM validation')
@@ -45,3 +45,7 @@ class SOFAVersion:
     # Version of SOFA specs
     SOFASpecificationsMajor = 1
     SOFASpecificationsMinor = 0
+
+    # Version of the validation rules, increased on every change of the result of isValid
+    # or SOFAHeaderValidator (cached results of older versions are discarded, see SOFAValidationCache)
+    SOFAValidationRulesVersion = 1
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   SOFAWriter.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import time
+
+import netCDF4
+import numpy as np
+
+from .SOFAFIRConverter import SOFAFIRConverter
+from .SOFANcFile import SOFANetCDFFile
+
+
+class SOFAWriter(object):
+    """
+    Helpers to write new SOFA files derived from existing ones
+    """
+
+    @classmethod
+    def getDateString(cls):
+        """
+        Get the current date in the format required by the SOFA date attributes
+
+        :return:    date string (yyyy-mm-dd HH:MM:SS)
+        """
+        return time.strftime('%Y-%m-%d %H:%M:%S')
+
+    @classmethod
+    def getVariableCompression(cls, varInstance):
+        """
+        Get the compression settings of a variable, as createVariable keyword arguments,
+        including its byte order when it is not the native one
+
+        :param varInstance: a netCDF4.Variable instance
+        :return:            a dictionary
+        """
+        filters = varInstance.filters() or {}
+        compression = dict((key, filters[key]) for key in ('zlib', 'complevel', 'shuffle') if key in filters)
+        if varInstance.dtype != str and np.dtype(varInstance.dtype).byteorder in '<>':
+            compression['endian'] = 'big' if np.dtype(varInstance.dtype).byteorder == '>' else 'little'
+        return compression
+
+    @classmethod
+    def getCompression(cls, variables, compression):
+        """
+        :param variables:   dictionary {name: variable instance} of the written variables
+        :param compression: dictionary {name: createVariable keyword arguments}, the name of a
+                            SOFACompression profile, or None
+        :return:            dictionary {name: createVariable keyword arguments}
+        """
+        if isinstance(compression, str):
+            from .SOFACompression import SOFACompression
+            return SOFACompression.getCompression(variables, compression)
+        return compression or {}
+
+    @classmethod
+    def createFromTemplate(cls, sofafile, path, dimensions=None, variables=None, skipVariables=(),
+                           chunkSize=None, compression=None, dtypes=None):
+        """
+        Create a new file with the same structure as an existing SOFA file.
+        Global attributes, dimensions and variable definitions (with their attributes) are copied,
+        and the data of all variables is copied in chunks along their first dimension,
+        except for the skipped variables and those with overriden definitions,
+        which are left to be written by the caller.
+
+        :param sofafile:        the template SOFAFile instance
+        :param path:            path of the new file
+        :param dimensions:      dictionary {name: size} overriding dimension sizes
+        :param variables:       dictionary {name: dimension names tuple} overriding or adding variables
+        :param skipVariables:   names of variables whose data is not copied
+        :param chunkSize:       number of rows copied at once
+        :param compression:     dictionary {name: createVariable keyword arguments} for the new variables,
+                                or the name of a SOFACompression profile
+        :param dtypes:          dictionary {name: numpy type} overriding variable types
+                                (copied data is converted)
+        :return:                the new netCDF4.Dataset, open for writing
+        """
+        dimensions = dimensions or {}
+        variables = variables or {}
+        dtypes = dtypes or {}
+        compression = cls.getCompression(sofafile.getVariablesAsDict(), compression)
+
+        target = netCDF4.Dataset(path, 'w', format='NETCDF4')
+        try:
+            attributes = sofafile.getGlobalAttributesAsDict()
+            target.setncatts(attributes)
+            if 'DateModified' in attributes:
+                target.DateModified = cls.getDateString()
+
+            for name, dim in sofafile.getDimensionsAsDict().items():
+                target.createDimension(name, dimensions.get(name, dim.size))
+            for name, size in dimensions.items():
+                if name not in target.dimensions:
+                    target.createDimension(name, size)
+
+            for name, var in sofafile.getVariablesAsDict().items():
+                attrs = dict(var.__dict__)
+                fillValue = attrs.pop('_FillValue', None)
+                dtype = var.dtype
+                if name in dtypes:
+                    dtype = np.dtype(dtypes[name])
+                    if fillValue is not None:
+                        fillValue = np.array(fillValue).astype(dtype)
+                kwargs = cls.getVariableCompression(var)
+                kwargs.update(compression.get(name, {}))
+                newVar = target.createVariable(name, dtype, variables.get(name, var.dimensions),
+                                               fill_value=fillValue, **kwargs)
+                newVar.setncatts(attrs)
+
+                if name in variables or name in skipVariables:
+                    continue
+                cls.copyVariableData(var, newVar, chunkSize)
+
+            for name, dims in variables.items():
+                if name not in target.variables:
+                    target.createVariable(name, 'f8', dims, **compression.get(name, {}))
+        except Exception:
+            target.close()
+            raise
+
+        return target
+
+    @classmethod
+    def copyVariableData(cls, source, target, chunkSize=None):
+        """
+        Copy the data of a variable into another one of the same shape, in chunks along the first dimension
+
+        :param source:      the source netCDF4.Variable
+        :param target:      the target netCDF4.Variable
+        :param chunkSize:   number of rows copied at once
+        """
+        if len(source.shape) == 0:
+            target.assignValue(source.getValue())
+            return
+        for start, stop in SOFAFIRConverter.getChunkRanges(source.shape[0], chunkSize):
+            values = source[start:stop]
+            # Skip never written (fully masked) ranges, so they keep being fill values
+            if np.ma.is_masked(values) and np.all(np.ma.getmaskarray(values)):
+                continue
+            target[start:stop] = values
+
+    @classmethod
+    def copyDataset(cls, source, target, chunkSize=None, compression=None):
+        """
+        Copy the global attributes, dimensions and variables of a dataset into an empty one.
+        Datasets may belong to different storage backends (see SOFANetCDFFile).
+
+        :param source:      the source dataset
+        :param target:      the target dataset, open for writing
+        :param chunkSize:   number of rows copied at once
+        :param compression: dictionary {name: createVariable keyword arguments} overriding the source compression,
+                            or the name of a SOFACompression profile
+        """
+        compression = cls.getCompression(source.variables, compression)
+        target.setncatts(source.__dict__)
+        for name, dim in source.dimensions.items():
+            target.createDimension(name, dim.size)
+        for name, var in source.variables.items():
+            attrs = dict(var.__dict__)
+            fillValue = attrs.pop('_FillValue', None)
+            kwargs = cls.getVariableCompression(var)
+            kwargs.update(compression.get(name, {}))
+            newVar = target.createVariable(name, var.dtype, var.dimensions, fill_value=fillValue, **kwargs)
+            newVar.setncatts(attrs)
+            cls.copyVariableData(var, newVar, chunkSize)
+
+    @classmethod
+    def copyFile(cls, sofafile, path, backend=None, chunkSize=None, compression=None):
+        """
+        Copy a SOFA file, possibly into another storage backend
+
+        :param sofafile:    a SOFAFile instance
+        :param path:        path of the copy
+        :param backend:     storage backend name or class of the copy (defaults to SOFAFile.defaultBackend)
+        :param chunkSize:   number of rows copied at once
+        :param compression: dictionary {name: createVariable keyword arguments} overriding the source compression,
+                            or the name of a SOFACompression profile
+        """
+        target = SOFANetCDFFile.getBackend(backend or sofafile.defaultBackend)(path, 'w')
+        try:
+            cls.copyDataset(sofafile.ncfile.file, target.file, chunkSize, compression)
+        finally:
+            target.close()
@@ -14,6 +14,37 @@ from .SOFAWarning import SOFAWarning
 from .SOFAUnits import SOFAUnits
 from .SOFAAPI import SOFAAPI
 from .SOFAVersion import SOFAVersion
+from .SOFAFIRConverter import SOFAFIRConverter
+from .SOFACache import SOFACache
+from .SOFAResampler import SOFAResampler
+from .SOFAWriter import SOFAWriter
+from .SOFAReadAhead import SOFAReadAhead
+from .SOFAMinimumPhase import SOFAMinimumPhase
+from .SOFASphericalHarmonics import SOFASphericalHarmonics
+from .SOFASphericalHarmonicHRTF import SOFASphericalHarmonicHRTF
+from .SOFAConvolver import SOFAConvolver
+from .SOFAAmbisonicsRenderer import SOFAAmbisonicsRenderer
+from .SOFAFIRERenderer import SOFAFIRERenderer
+from .SOFARoomAcoustics import SOFARoomAcoustics
+from .SOFAMapReduce import SOFAMapReduce
+from .SOFACatalog import SOFACatalog
+from .SOFAValidationCache import SOFAValidationCache
+from .SOFAFingerprint import SOFAFingerprint
+from .SOFADiff import SOFADiff
+from .SOFAMerge import SOFAMerge
+from .SOFASubset import SOFASubset
+from .SOFABundle import SOFABundle
+from .SOFAMemoryFile import SOFAMemoryFile
+from .SOFADirectoryFile import SOFADirectoryFile
+from .SOFAH5pyFile import SOFAH5pyFile
+from .SOFAThreadSafeFile import SOFAThreadSafeFile
+from .SOFAThreadSafeFile import SOFAThreadSafeH5pyFile
+from .SOFACompression import SOFACompression
+from .SOFAIRTrimmer import SOFAIRTrimmer
+from .SOFAHeaderValidator import SOFAHeaderValidator
+from .SOFAIntegrity import SOFAIntegrity
+from .SOFAInfo import SOFAInfo
+from .SOFAPipeline import SOFAPipeline
 from .SOFAConventions import SOFAAmbisonicsDRIR
 from .SOFAConventions import SOFAGeneralTF
 from .SOFAConventions import SOFAGeneralFIR
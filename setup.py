@@ -38,6 +38,14 @@ setup(
     install_requires=[
         'netCDF4'
     ],
+    entry_points={
+        'console_scripts': [
+            'sofadiff = pysofaconventions.SOFADiff:main',
+            'sofacheck = pysofaconventions.SOFAIntegrity:main',
+            'sofainfo = pysofaconventions.SOFAInfo:main',
+            'sofapipeline = pysofaconventions.SOFAPipeline:main',
+        ],
+    },
     extras_require={
         'docs': [
                 'sphinx==1.2.3',  # autodoc was broken in 1.3.1
@@ -45,6 +53,7 @@ setup(
                 'sphinx_rtd_theme',
                 'numpydoc',
             ],
+        'h5py': ['h5py'],
         # 'tests': ['backports.tempfile', 'pysoundfile']
     }
 )
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   conftest.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import time
+import numpy as np
+from netCDF4 import Dataset
+
+
+def createHRIRFile(path):
+    """
+    Write a valid SimpleFreeFieldHRIR file with masked measurements, fill values,
+    scalar, string and big-endian variables, shared by the storage backend tests
+    """
+
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.Conventions = 'SOFA'
+    rootgrp.Version = '1.0'
+    rootgrp.SOFAConventions = 'SimpleFreeFieldHRIR'
+    rootgrp.SOFAConventionsVersion = '1.0'
+    rootgrp.APIName = 'pysofaconventions'
+    rootgrp.APIVersion = '0.1'
+    rootgrp.AuthorContact = 'andres.perez@eurecat.org'
+    rootgrp.Organization = 'Eurecat - UPF'
+    rootgrp.License = 'WTFPL - Do What the Fuck You Want to Public License'
+    rootgrp.DataType = 'FIR'
+    rootgrp.RoomType = 'free field'
+    rootgrp.DateCreated = time.ctime(time.time())
+    rootgrp.DateModified = time.ctime(time.time())
+    rootgrp.Title = 'testpysofaconventions'
+    rootgrp.ListenerShortName = 'AmazinglyShortName'
+    rootgrp.DatabaseName = 'IncredibleDatabase'
+    rootgrp.Gains = np.array([0.5, 2.], dtype='f4')
+    rootgrp.Index = np.int16(3)
+    rootgrp.createDimension('I', 1)
+    rootgrp.createDimension('N', 5)
+    rootgrp.createDimension('C', 3)
+    rootgrp.createDimension('M', 7)
+    rootgrp.createDimension('R', 2)
+    rootgrp.createDimension('E', 1)
+    sr = rootgrp.createVariable('Data.SamplingRate', 'f8', ('I',))
+    sr.Units = 'hertz'
+    sr[:] = 48000.
+    rootgrp.createVariable('Data.Delay', 'f8', ('I', 'R'))[:] = 0.
+    ir = rootgrp.createVariable('Data.IR', '>f4', ('M', 'R', 'N'), endian='big', zlib=True, complevel=4)
+    ir[:] = np.random.randn(7, 2, 5)
+    ir[3] = np.ma.masked
+    listenerPositionVar = rootgrp.createVariable('ListenerPosition', 'f8', ('I', 'C'))
+    listenerPositionVar.Units = 'metre'
+    listenerPositionVar.Type = 'cartesian'
+    sourcePositionVar = rootgrp.createVariable('SourcePosition', 'f8', ('M', 'C'), fill_value=-1.)
+    sourcePositionVar.Units = 'degree, degree, metre'
+    sourcePositionVar.Type = 'spherical'
+    sourcePositionVar[:5] = np.random.rand(5, 3)
+    receiverPositionVar = rootgrp.createVariable('ReceiverPosition', 'f8', ('R', 'C', 'I'))
+    receiverPositionVar.Units = 'metre'
+    receiverPositionVar.Type = 'cartesian'
+    receiverPositionVar[:] = 0.
+    emitterPositionVar = rootgrp.createVariable('EmitterPosition', 'f8', ('E', 'C', 'I'))
+    emitterPositionVar.Units = 'metre'
+    emitterPositionVar.Type = 'cartesian'
+    emitterPositionVar[:] = 0.
+    rootgrp.createVariable('Scalar', 'i4').assignValue(4)
+    rootgrp.createVariable('NanFill', 'f8', ('R',), fill_value=np.nan)[0] = 1.
+    names = rootgrp.createVariable('Names', str, ('R',))
+    names[0] = 'left'
+    names[1] = 'right'
+    rootgrp.close()
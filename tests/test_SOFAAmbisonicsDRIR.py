@@ -39,6 +39,7 @@ import pytest
 import os
 import tempfile
 import time
+import numpy as np
 from netCDF4 import Dataset
 from pysofaconventions import *
 
@@ -219,3 +220,106 @@ def test_isValid():
 
 
 
+
+
+def createDRIRFile(path, ir, channelOrdering='acn', normalization='sn3d', order=1):
+
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.Conventions = 'SOFA'
+    rootgrp.SOFAConventions = 'AmbisonicsDRIR'
+    rootgrp.DataType = 'FIRE'
+    if order is not None:
+        rootgrp.AmbisonicsOrder = str(order)
+    m, r, e, n = ir.shape
+    rootgrp.createDimension('I', 1)
+    rootgrp.createDimension('M', m)
+    rootgrp.createDimension('R', r)
+    rootgrp.createDimension('E', e)
+    rootgrp.createDimension('N', n)
+    sr = rootgrp.createVariable('Data.SamplingRate', 'f8', ('I',))
+    sr.Units = 'hertz'
+    sr[:] = 48000.
+    irVar = rootgrp.createVariable('Data.IR', 'f8', ('M', 'R', 'E', 'N'))
+    irVar.ChannelOrdering = channelOrdering
+    irVar.Normalization = normalization
+    irVar[:] = ir
+    rootgrp.close()
+
+
+def test_getRenderer():
+
+    fd, path = tempfile.mkstemp()
+
+    m, e, n = 2, 2, 40
+    ir = np.random.randn(m, 4, e, n)
+    signal = np.random.randn(e, 100)
+
+    def expected(filters):
+        return np.array([sum(np.convolve(signal[i], filters[o, i]) for i in range(e))
+                         for o in range(filters.shape[0])])
+
+    # ACN/SN3D to ACN/SN3D
+    createDRIRFile(path, ir)
+    drir = SOFAAmbisonicsDRIR(path, 'r')
+    renderer = drir.getRenderer(measurement=1, blockSize=16)
+    assert renderer.order == 1
+    assert (renderer.numInputs, renderer.numOutputs, renderer.blockSize) == (e, 4, 16)
+    output = renderer.render(signal)
+    assert np.allclose(output, expected(ir[1]))
+    assert np.allclose(renderer.process(signal[:, :96]), output[:, :96])
+    renderer.reset()
+    assert np.allclose(renderer.processBlock(signal[:, :16]), output[:, :16])
+
+    # ACN/SN3D to FuMa
+    renderer = drir.getRenderer(channelOrdering='fuma', normalization='fuma')
+    output = renderer.render(signal)
+    assert np.allclose(output[0], expected(ir[0, :1])[0] / np.sqrt(2.))
+    assert np.allclose(output[1], expected(ir[0, 3:])[0])
+    drir.close()
+
+    # FuMa to ACN/N3D
+    fumaIR = ir[:, [0, 3, 1, 2]]
+    fumaIR[:, 0] /= np.sqrt(2.)
+    createDRIRFile(path, fumaIR, 'FuMa', 'FuMa')
+    drir = SOFAAmbisonicsDRIR(path, 'r')
+    output = drir.getRenderer(normalization='N3D').render(signal)
+    assert np.allclose(output[0], expected(ir[0, :1])[0])
+    assert np.allclose(output[1:], np.sqrt(3.) * expected(ir[0, 1:]))
+    drir.close()
+
+    # Binaural output: a plane wave from the left, decoded with an order 1 HRTF model
+    planeWave = np.zeros((1, 4, 1, 8))
+    planeWave[0, :, 0, 0] = SOFASphericalHarmonics.getBasis(1, [np.pi / 2], [0.])[0] \
+        / np.sqrt([1., 3., 3., 3.])
+    createDRIRFile(path, planeWave)
+    drir = SOFAAmbisonicsDRIR(path, 'r')
+    coefficients = np.fft.rfft(np.random.randn(4, 2, 16), axis=-1)
+    decoder = SOFASphericalHarmonicHRTF(coefficients, 48000., 16)
+    renderer = drir.getRenderer(decoder=decoder, blockSize=8)
+    assert renderer.numOutputs == 2
+    hrir = decoder.evaluateIR([90.], [0.])[0]
+    output = renderer.render(np.eye(1, 50)[0])
+    assert np.allclose(output[:, :16], hrir)
+    assert np.allclose(output[:, 16:], 0.)
+
+    with pytest.raises(SOFAError) as e:
+        drir.getRenderer(decoder=SOFASphericalHarmonicHRTF(coefficients, 44100., 16))
+    assert e.match('Decoder sampling rate does not match')
+    drir.close()
+
+    # Errors
+    createDRIRFile(path, ir, order=2)
+    drir = SOFAAmbisonicsDRIR(path, 'r')
+    with pytest.raises(SOFAError) as e:
+        drir.getRenderer()
+    assert e.match('Number of receivers does not match AmbisonicsOrder')
+    drir.close()
+
+    createDRIRFile(path, ir, order=None)
+    drir = SOFAAmbisonicsDRIR(path, 'r')
+    with pytest.raises(SOFAError) as e:
+        drir.getRenderer()
+    assert e.match('Missing AmbisonicsOrder attribute')
+    drir.close()
+
+    os.remove(path)
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFABundle.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import os
+import shutil
+import tempfile
+import warnings
+import numpy as np
+from pysofaconventions import *
+from .conftest import createHRIRFile
+from pysofaconventions.SOFABundle import SOFABundleFile
+
+
+@pytest.fixture
+def paths():
+
+    directory = tempfile.mkdtemp()
+    paths = [os.path.join(directory, name) for name in ['hrir.sofa', 'hrir.sofab', 'roundtrip.sofa']]
+    createHRIRFile(paths[0])
+    yield paths
+    shutil.rmtree(directory)
+
+
+def test_export(paths):
+
+    SOFABundle.export(paths[0], paths[1], chunkSize=2)
+    original = SOFASimpleFreeFieldHRIR(paths[0], 'r')
+    bundle = SOFABundle.open(paths[1])
+    assert isinstance(bundle, SOFASimpleFreeFieldHRIR)
+    assert isinstance(bundle.ncfile, SOFABundleFile)
+    assert bundle.getFilename() == paths[1]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        assert bundle.isValid()
+    attributes = bundle.getGlobalAttributesAsDict()
+    assert attributes['Title'] == 'testpysofaconventions'
+    assert attributes['Gains'].dtype == np.float32 and list(attributes['Gains']) == [0.5, 2.]
+    assert attributes['Index'] == 3 and attributes['Index'].dtype == np.int16
+    assert bundle.getDimensionsAsDict().keys() == original.getDimensionsAsDict().keys()
+    assert bundle.getDimensionSize('M') == 7
+    for name in original.getVariablesAsDict():
+        a, b = original.getVariableValue(name), bundle.getVariableValue(name)
+        assert np.array_equal(np.ma.getmaskarray(a), np.ma.getmaskarray(b))
+        assert np.array_equal(np.ma.filled(a, 0), np.ma.filled(b, 0))
+    assert np.ma.is_masked(bundle.getDataIR()[3])
+    assert bundle.getVariableAttributeValue('SourcePosition', 'Units') == 'degree, degree, metre'
+    assert bundle.getDataIR().dtype == np.float32
+
+    # netCDF4.Variable and Dimension interface
+    variable = bundle.getVariableInstance('Data.IR')
+    assert (variable.ndim, variable.size, len(variable)) == (3, 70, 7)
+    assert variable.chunking() == 'contiguous' and variable.filters() is None
+    sourcePosition = bundle.getVariableInstance('SourcePosition')
+    assert sorted(sourcePosition.ncattrs()) == ['Type', 'Units', '_FillValue']
+    assert sourcePosition.getncattr('_FillValue') == -1.
+    assert bundle.getVariableInstance('Scalar').getValue() == 4
+    assert bundle.getVariableInstance('Names').dtype == str
+    assert not bundle.getDimension('M').isunlimited() and len(bundle.getDimension('M')) == 7
+    original.close()
+    bundle.close()
+
+    sofafile = SOFABundle.open(paths[1], conventionClass=SOFAFile)
+    assert type(sofafile) is SOFAFile
+    sofafile.close()
+
+    with pytest.raises(SOFAError) as e:
+        SOFABundleFile(paths[1], 'a')
+    assert e.match('only be opened for reading')
+    with pytest.raises(SOFAError) as e:
+        SOFABundle.open(paths[0])
+    assert e.match('Not a SOFA bundle')
+
+
+def test_exportOpenFile(paths):
+
+    SOFABundle.export(paths[0], paths[1])
+    with open(paths[1], 'rb') as f:
+        expected = f.read()
+
+    # Open files are read through their backend, including files read from memory
+    with open(paths[0], 'rb') as f:
+        sources = [SOFAFile.fromBytes(f.read()), SOFAFile(paths[0], 'r', backend='h5py')]
+    for sofafile in sources:
+        SOFABundle.export(sofafile, paths[2], chunkSize=3)
+        sofafile.close()
+        with open(paths[2], 'rb') as f:
+            assert f.read() == expected
+
+
+def test_toSOFA(paths):
+
+    sofafile = SOFAFile(paths[0], 'r')
+    SOFABundle.export(sofafile, paths[1])
+    sofafile.close()
+    SOFABundle.toSOFA(paths[1], paths[2], chunkSize=3, compression={'Data.IR': {'zlib': True, 'complevel': 4}})
+
+    roundtrip = SOFASimpleFreeFieldHRIR(paths[2], 'r')
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        assert roundtrip.isValid()
+    assert roundtrip.getVariableInstance('Data.IR').filters()['zlib']
+    roundtrip.close()
+    assert SOFADiff.diff(paths[0], paths[2], ignoredAttributes=[])['equal']
+    assert SOFAFingerprint.getFingerprint(paths[0], ignoredAttributes=[]) == \
+        SOFAFingerprint.getFingerprint(paths[2], ignoredAttributes=[])
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFACache.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import os
+import shutil
+import tempfile
+import hashlib
+import numpy as np
+from pysofaconventions import *
+from .conftest import createHRIRFile
+
+
+def test_getFileHash():
+
+    fd, path = tempfile.mkstemp()
+    content = os.urandom(3 * 1024)
+    with open(path, 'wb') as f:
+        f.write(content)
+
+    blockSize = SOFACache.hashBlockSize
+    SOFACache.hashBlockSize = 1000
+    assert SOFACache.getFileHash(path) == hashlib.sha256(content).hexdigest()
+    SOFACache.hashBlockSize = blockSize
+
+    os.remove(path)
+
+
+def test_getFileStamp():
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'hrir.sofa')
+    createHRIRFile(path)
+
+    sofafile = SOFAFile(path, 'r')
+    stamp = SOFACache.getFileStamp(sofafile)
+    assert stamp == (path, os.path.getsize(path), os.stat(path).st_mtime_ns)
+    os.utime(path, ns=(0, 0))
+    assert SOFACache.getFileStamp(sofafile) != stamp
+    sofafile.close()
+    with open(path, 'rb') as f:
+        sofafile = SOFAFile.fromBytes(f.read())
+    assert SOFACache.getFileStamp(sofafile) is None
+    sofafile.close()
+
+    # Every file below a directory backend
+    sofafile = SOFAFile(path, 'r')
+    SOFAWriter.copyFile(sofafile, os.path.join(directory, 'hrir.sofad'), backend='directory')
+    sofafile.close()
+    sofafile = SOFAFile(os.path.join(directory, 'hrir.sofad'), 'r', backend='directory')
+    stamp = SOFACache.getFileStamp(sofafile)
+    assert ('header.json', os.path.getsize(os.path.join(directory, 'hrir.sofad', 'header.json')),
+            os.stat(os.path.join(directory, 'hrir.sofad', 'header.json')).st_mtime_ns) in stamp
+    os.utime(os.path.join(directory, 'hrir.sofad', 'Data.IR', '0.npy'), ns=(0, 0))
+    assert SOFACache.getFileStamp(sofafile) != stamp
+    sofafile.close()
+
+    # Files created by the memory backend are not on disk
+    rootgrp = SOFAMemoryFile(os.path.join(directory, 'memory.sofa'), 'w')
+    sofafile = SOFAFile(os.path.join(directory, 'memory.sofa'), 'r', backend='memory')
+    assert SOFACache.getFileStamp(sofafile) is None
+    sofafile.close()
+    rootgrp.close()
+    SOFAMemoryFile.remove(os.path.join(directory, 'memory.sofa'))
+
+    shutil.rmtree(directory)
+
+
+def test_getKey():
+
+    assert SOFACache.getKey('a', 1) == SOFACache.getKey('a', 1)
+    assert SOFACache.getKey('a', 1) != SOFACache.getKey('a', 1.)
+    assert SOFACache.getKey('ab', 'c') != SOFACache.getKey('a', 'bc')
+
+
+def test_saveLoad(monkeypatch):
+
+    directory = os.path.join(tempfile.mkdtemp(), 'cache')
+    cache = SOFACache(directory)
+    assert os.path.isdir(directory)
+
+    key = SOFACache.getKey('test')
+    assert not cache.has(key)
+    assert cache.load(key) is None
+
+    arrays = {'a': np.arange(5), 'b': np.ones((2, 3))}
+    cache.save(key, arrays)
+    assert cache.has(key)
+    entry = cache.load(key)
+    assert sorted(entry.keys()) == ['a', 'b']
+    assert np.array_equal(entry['a'], arrays['a'])
+    assert np.array_equal(entry['b'], arrays['b'])
+    assert os.listdir(directory) == [key + '.npz']
+
+    # Failed writes leave no entry behind
+    def failingSavez(f, **arrays):
+        raise IOError('disk full')
+    monkeypatch.setattr(np, 'savez', failingSavez)
+    with pytest.raises(IOError):
+        cache.save(SOFACache.getKey('other'), arrays)
+    monkeypatch.undo()
+    assert os.listdir(directory) == [key + '.npz']
+
+    # Corrupted entries are ignored
+    with open(cache.getPath(key), 'wb') as f:
+        f.write(b'garbage')
+    assert cache.load(key) is None
+
+    cache.remove(key)
+    assert not cache.has(key)
+    cache.remove(key)
+
+    shutil.rmtree(os.path.dirname(directory))
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFACatalog.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from netCDF4 import Dataset
+from pysofaconventions import *
+
+
+def createHRIRFile(path, m=6):
+
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.Conventions = 'SOFA'
+    rootgrp.Version = '1.0'
+    rootgrp.SOFAConventions = 'SimpleFreeFieldHRIR'
+    rootgrp.SOFAConventionsVersion = '1.0'
+    rootgrp.APIName = 'pysofaconventions'
+    rootgrp.APIVersion = '0.1'
+    rootgrp.AuthorContact = 'andres.perez@eurecat.org'
+    rootgrp.Organization = 'Eurecat - UPF'
+    rootgrp.License = 'WTFPL - Do What the Fuck You Want to Public License'
+    rootgrp.DataType = 'FIR'
+    rootgrp.RoomType = 'free field'
+    rootgrp.DateCreated = time.ctime(time.time())
+    rootgrp.DateModified = time.ctime(time.time())
+    rootgrp.Title = 'testpysofaconventions'
+    rootgrp.ListenerShortName = 'AmazinglyShortName'
+    rootgrp.DatabaseName = 'IncredibleDatabase'
+    rootgrp.createDimension('I', 1)
+    rootgrp.createDimension('N', 8)
+    rootgrp.createDimension('C', 3)
+    rootgrp.createDimension('M', m)
+    rootgrp.createDimension('R', 2)
+    rootgrp.createDimension('E', 1)
+    sr = rootgrp.createVariable('Data.SamplingRate', 'f8', ('I',))
+    sr.Units = 'hertz'
+    sr[:] = 48000.
+    rootgrp.createVariable('Data.Delay', 'f8', ('I', 'R'))[:] = 0.
+    rootgrp.createVariable('Data.IR', 'f8', ('M', 'R', 'N'))[:] = 0.
+    listenerPositionVar = rootgrp.createVariable('ListenerPosition', 'f8', ('I', 'C'))
+    listenerPositionVar.Units = 'metre'
+    listenerPositionVar.Type = 'cartesian'
+    sourcePositionVar = rootgrp.createVariable('SourcePosition', 'f8', ('M', 'C'))
+    sourcePositionVar.Units = 'degree, degree, metre'
+    sourcePositionVar.Type = 'spherical'
+    sourcePositionVar[:] = np.stack([np.linspace(-90, 180, m), np.linspace(-10, 10, m), 1.5 * np.ones(m)], axis=1)
+    receiverPositionVar = rootgrp.createVariable('ReceiverPosition', 'f8', ('R', 'C', 'I'))
+    receiverPositionVar.Units = 'metre'
+    receiverPositionVar.Type = 'cartesian'
+    emitterPositionVar = rootgrp.createVariable('EmitterPosition', 'f8', ('E', 'C', 'I'))
+    emitterPositionVar.Units = 'metre'
+    emitterPositionVar.Type = 'cartesian'
+    rootgrp.close()
+
+
+def createPartialFile(path, m=4):
+
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.SOFAConventions = 'GeneralFIR'
+    rootgrp.DataType = 'FIR'
+    rootgrp.createDimension('M', m)
+    rootgrp.createDimension('C', 3)
+    sourcePositionVar = rootgrp.createVariable('SourcePosition', 'f8', ('M', 'C'))
+    sourcePositionVar.Units = 'metre'
+    sourcePositionVar.Type = 'cartesian'
+    sourcePositionVar[:] = [[1., 0., -1.]] + [[0., 2., 0.]] * (m - 1)
+    rootgrp.close()
+
+
+def test_getFileInfo(monkeypatch):
+
+    directory = tempfile.mkdtemp()
+
+    path = os.path.join(directory, 'hrir.sofa')
+    createHRIRFile(path)
+    # Files are opened once, and only their metadata is validated
+    opened = []
+    openSource = SOFAFile.openSource
+    monkeypatch.setattr(SOFAFile, 'openSource', classmethod(lambda cls, source: opened.append(source) or
+                                                            openSource(source)))
+    monkeypatch.setattr(SOFAFile, 'isValid', None)
+    info = SOFACatalog.getFileInfo(path)
+    assert len(opened) == 1
+    monkeypatch.undo()
+    assert info['conventions'] == 'SimpleFreeFieldHRIR'
+    assert info['dataType'] == 'FIR'
+    assert info['samplingRate'] == 48000.
+    assert (info['M'], info['R'], info['N'], info['E']) == (6, 2, 8, 1)
+    assert info['valid'] == 1
+    assert info['error'] is None
+    assert np.isclose(info['azimuthMin'], 18.) and np.isclose(info['azimuthMax'], 324.)
+    assert np.isclose(info['elevationMin'], -10.) and np.isclose(info['elevationMax'], 10.)
+    assert np.isclose(info['distanceMin'], 1.5)
+    assert info['attributes']['DatabaseName'] == 'IncredibleDatabase'
+    assert info['dimensions']['C'] == 3
+
+    path = os.path.join(directory, 'partial.sofa')
+    createPartialFile(path)
+    info = SOFACatalog.getFileInfo(path)
+    assert info['valid'] == 0
+    assert 'Missing required attribute' in info['error']
+    assert info['samplingRate'] is None
+    assert np.isclose(info['elevationMin'], -45.)
+    assert np.isclose(info['distanceMax'], 2.)
+
+    path = os.path.join(directory, 'broken.sofa')
+    with open(path, 'w') as f:
+        f.write('not a netCDF file')
+    info = SOFACatalog.getFileInfo(path)
+    assert info['valid'] == 0
+    assert info['error']
+    assert info['size'] == 17
+
+    assert SOFACatalog.getConventionClass('SimpleFreeFieldHRIR') is SOFASimpleFreeFieldHRIR
+    assert SOFACatalog.getConventionClass(None) is SOFAFile
+
+    shutil.rmtree(directory)
+
+
+def test_getPositionRanges():
+
+    fd, path = tempfile.mkstemp()
+
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.createDimension('M', 1)
+    rootgrp.createDimension('C', 3)
+    sourcePositionVar = rootgrp.createVariable('SourcePosition', 'f8', ('M', 'C'))
+    sourcePositionVar.Type = 'unknown'
+    rootgrp.close()
+    sofafile = SOFAFile(path, 'r')
+    assert SOFACatalog.getPositionRanges(sofafile) == {}
+    sofafile.close()
+
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.close()
+    sofafile = SOFAFile(path, 'r')
+    assert SOFACatalog.getPositionRanges(sofafile) == {}
+    sofafile.close()
+
+    os.remove(path)
+
+
+def test_scan(monkeypatch):
+
+    directory = tempfile.mkdtemp()
+    fd, databasePath = tempfile.mkstemp(suffix='.db')
+
+    os.makedirs(os.path.join(directory, 'sub'))
+    createHRIRFile(os.path.join(directory, 'a.sofa'), m=1200)
+    createPartialFile(os.path.join(directory, 'sub', 'b.sofa'))
+    with open(os.path.join(directory, 'c.sofa'), 'w') as f:
+        f.write('broken')
+    with open(os.path.join(directory, 'ignored.txt'), 'w') as f:
+        f.write('ignored')
+    paths = [os.path.join(directory, name) for name in ['a.sofa', 'c.sofa', os.path.join('sub', 'b.sofa')]]
+    assert SOFACatalog.findFiles(directory) == paths
+
+    catalog = SOFACatalog(databasePath)
+    assert catalog.scan(directory, workers=1) == {'added': 3, 'updated': 0, 'removed': 0, 'unchanged': 0}
+
+    # Queries
+    assert [row['path'] for row in catalog.query()] == paths
+    assert [row['path'] for row in catalog.query('SimpleFreeFieldHRIR', samplingRate=48000)] == paths[:1]
+    assert [row['path'] for row in catalog.query(where='M > ? AND elevationMin < ?', parameters=(1000, 0))] == \
+        paths[:1]
+    assert [row['path'] for row in catalog.query(where='elevationMin < ?', parameters=(-30,))] == paths[2:]
+    assert [row['path'] for row in catalog.query(valid=False, dataType='FIR')] == paths[2:]
+    assert [row['path'] for row in catalog.query(attributes={'DatabaseName': 'IncredibleDatabase'})] == paths[:1]
+    assert catalog.query(attributes={'DatabaseName': 'Other'}) == []
+    assert catalog.getAttributes(paths[0])['SOFAConventions'] == 'SimpleFreeFieldHRIR'
+    assert catalog.getDimensions(paths[0])['M'] == 1200
+    catalog.close()
+
+    # Incremental refresh
+    catalog = SOFACatalog(databasePath)
+    assert catalog.scan([directory], workers=1) == {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 3}
+    createPartialFile(paths[2], m=7)
+    os.utime(paths[2], (time.time() + 10, time.time() + 10))
+    os.remove(paths[1])
+    assert catalog.scan(directory, workers=1) == {'added': 0, 'updated': 1, 'removed': 1, 'unchanged': 1}
+    assert catalog.getDimensions(paths[2])['M'] == 7
+    assert [row['path'] for row in catalog.query()] == [paths[0], paths[2]]
+
+    # Files outside the scanned directories are kept
+    assert catalog.scan(os.path.join(directory, 'sub'), workers=1)['removed'] == 0
+    assert len(catalog.query()) == 2
+    assert catalog.scan(directory)['unchanged'] == 2
+    catalog.close()
+
+    # Changed validation rules
+    catalog = SOFACatalog(databasePath)
+    monkeypatch.setattr(SOFAVersion, 'SOFAValidationRulesVersion', SOFAVersion.SOFAValidationRulesVersion + 1)
+    assert catalog.scan(directory, workers=1) == {'added': 0, 'updated': 2, 'removed': 0, 'unchanged': 0}
+    assert catalog.scan(directory, workers=1)['unchanged'] == 2
+    monkeypatch.undo()
+    catalog.close()
+
+    # Parallel scans
+    for processes in [True, False]:
+        os.remove(databasePath)
+        catalog = SOFACatalog(databasePath)
+        assert catalog.scan(directory, workers=2, processes=processes)['added'] == 2
+        assert catalog.query(valid=True)[0]['M'] == 1200
+        catalog.close()
+
+    os.remove(databasePath)
+    shutil.rmtree(directory)
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFACompression.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import os
+import shutil
+import tempfile
+import warnings
+import numpy as np
+from netCDF4 import Dataset
+from pysofaconventions import *
+from .conftest import createHRIRFile
+
+
+@pytest.fixture
+def paths():
+
+    directory = tempfile.mkdtemp()
+    paths = [os.path.join(directory, name) for name in ['hrir.sofa', 'repacked.sofa']]
+    createHRIRFile(paths[0])
+    yield paths
+    shutil.rmtree(directory)
+
+
+def test_getCompression(paths):
+
+    sofafile = SOFAFile(paths[0], 'r')
+    variables = sofafile.getVariablesAsDict()
+    compression = SOFACompression.getCompression(variables, 'archive')
+    assert sorted(compression) == ['Data.Delay', 'Data.IR', 'Data.SamplingRate']
+    assert compression['Data.IR'] == {'zlib': True, 'complevel': 9, 'shuffle': True, 'significant_digits': 5}
+    assert compression['Data.SamplingRate'] == compression['Data.Delay'] == \
+        {'zlib': True, 'complevel': 9, 'shuffle': True}
+    assert SOFAWriter.getCompression(variables, 'fast-read')['Data.IR']['complevel'] == 1
+    assert SOFAWriter.getCompression(variables, None) == {}
+    with pytest.raises(SOFAError) as e:
+        SOFACompression.getCompression(variables, 'unknown')
+    assert e.match('Compression profile not known: unknown')
+    sofafile.close()
+
+    # Quantization only applies to floating point variables
+    rootgrp = Dataset(paths[1], 'w', format='NETCDF4')
+    rootgrp.createDimension('M', 2)
+    rootgrp.createVariable('Data.Counts', 'i4', ('M',))
+    rootgrp.close()
+    sofafile = SOFAFile(paths[1], 'r')
+    assert SOFACompression.getCompression(sofafile.getVariablesAsDict(), 'archive') == \
+        {'Data.Counts': {'zlib': True, 'complevel': 9, 'shuffle': True}}
+    sofafile.close()
+
+
+def test_repack(paths):
+
+    sofafile = SOFASimpleFreeFieldHRIR(paths[0], 'r')
+    SOFACompression.repack(sofafile, paths[1], 'archive', chunkSize=2)
+    sofafile.close()
+    repacked = SOFASimpleFreeFieldHRIR(paths[1], 'r')
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        assert repacked.isValid()
+    variable = repacked.getVariableInstance('Data.IR')
+    assert variable.filters()['complevel'] == 9 and variable.filters()['shuffle']
+    assert variable.quantization() == (5, 'BitGroom')
+    assert repacked.getVariableInstance('SourcePosition').quantization() is None
+    assert repacked.getVariableInstance('Data.Delay').filters()['zlib']
+    repacked.close()
+
+    # The sampling rate and delays are not quantized
+    rootgrp = Dataset(paths[0], 'a')
+    rootgrp.variables['Data.SamplingRate'][:] = 44100.
+    rootgrp.variables['Data.Delay'][:] = [1., 17.]
+    rootgrp.close()
+    SOFACompression.repack(paths[0], paths[1], 'archive')
+    original, repacked = SOFAFile(paths[0], 'r'), SOFAFile(paths[1], 'r')
+    for name in ['Data.SamplingRate', 'Data.Delay']:
+        assert repacked.getVariableInstance(name).quantization() is None
+        assert repacked.getVariableValue(name).tobytes() == original.getVariableValue(name).tobytes()
+    original.close()
+    repacked.close()
+
+    SOFACompression.repack(paths[0], paths[1], 'none')
+    repacked = SOFAFile(paths[1], 'r')
+    assert not repacked.getVariableInstance('Data.IR').filters()['zlib']
+    repacked.close()
+    assert SOFADiff.diff(paths[0], paths[1])['equal']
+
+    # Profiles are also accepted by the other writers
+    sofafile = SOFAFile(paths[0], 'r')
+    sofafile.extract([0, 1], paths[1], compression='fast-read')
+    sofafile.close()
+    repacked = SOFAFile(paths[1], 'r')
+    assert repacked.getVariableInstance('Data.IR').filters()['complevel'] == 1
+    repacked.close()
+
+    with pytest.raises(SOFAError):
+        SOFACompression.repack(paths[0], paths[1], 'unknown')
+
+
+def test_evaluate(paths):
+
+    results = SOFACompression.evaluate(paths[0], repeats=2, chunkSize=3)
+    assert sorted(results) == ['archive', 'fast-read', 'lossless-small', 'none']
+    for profile, result in results.items():
+        assert result['size'] > 0 and result['ratio'] > 0
+        assert result['decodeTime'] > 0 and result['throughput'] > 0
+    assert results['none']['maxAbsError'] == 0 and results['lossless-small']['maxRelError'] == 0
+    assert 0 < results['archive']['maxAbsError'] < 1e-3
+    assert results['archive']['maxRelError'] < 1e-4
+
+    rootgrp = Dataset(paths[1], 'w', format='NETCDF4')
+    rootgrp.createDimension('M', 4)
+    rootgrp.createVariable('Data.Counts', 'i4', ('M',))[:] = np.arange(4)
+    rootgrp.createVariable('Data.Gain', 'f8').assignValue(0.5)
+    rootgrp.close()
+    sofafile = SOFAFile(paths[1], 'r')
+    results = SOFACompression.evaluate(sofafile, profiles=['lossless-small'])
+    assert list(results) == ['lossless-small']
+    assert results['lossless-small']['maxAbsError'] == 0
+    sofafile.close()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFAConvolver.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import numpy as np
+from pysofaconventions import *
+
+
+def directConvolution(filters, signal):
+
+    return np.array([sum(np.convolve(signal[i], filters[o, i]) for i in range(filters.shape[1]))
+                     for o in range(filters.shape[0])])
+
+
+def test_convolve():
+
+    filters = np.random.randn(3, 2, 100)
+    signal = np.random.randn(2, 203)
+    expected = directConvolution(filters, signal)
+
+    for blockSize in [1, 16, 100, 256]:
+        convolver = SOFAConvolver(filters, blockSize)
+        assert convolver.numPartitions == -(-100 // blockSize)
+        assert np.allclose(convolver.convolve(signal), expected)
+
+    # Mono input
+    convolver = SOFAConvolver(filters[:, :1], 32)
+    assert np.allclose(convolver.convolve(signal[0]), directConvolution(filters[:, :1], signal[:1]))
+
+    assert SOFAConvolver(filters).blockSize == SOFAConvolver.defaultBlockSize
+
+
+def test_process():
+
+    filters = np.random.randn(2, 3, 50)
+    signal = np.random.randn(3, 160)
+    expected = directConvolution(filters, signal)[:, :160]
+
+    # The state is kept between calls
+    convolver = SOFAConvolver(filters, 16)
+    output = np.concatenate([convolver.process(signal[:, :64]), convolver.process(signal[:, 64:])], axis=1)
+    assert np.allclose(output, expected)
+
+    convolver.reset()
+    blocks = [convolver.processBlock(signal[:, start:start + 16]) for start in range(0, 160, 16)]
+    assert np.allclose(np.concatenate(blocks, axis=1), expected)
+
+    with pytest.raises(SOFAError) as e:
+        convolver.process(signal[:, :10])
+    assert e.match('Signal length is not a multiple of the block size')
+
+    with pytest.raises(SOFAError) as e:
+        convolver.processBlock(signal[:2, :16])
+    assert e.match('Invalid block shape')
+
+    mono = SOFAConvolver(filters[:, :1], 16)
+    monoExpected = directConvolution(filters[:, :1], signal[:1])
+    assert np.allclose(mono.process(signal[0]), monoExpected[:, :160])
+    mono.reset()
+    assert np.allclose(mono.processBlock(signal[0, :16]), monoExpected[:, :16])
+
+
+def test_invalidParameters():
+
+    with pytest.raises(SOFAError) as e:
+        SOFAConvolver(np.zeros((2, 10)))
+    assert e.match('Filters must have shape')
+
+    with pytest.raises(SOFAError) as e:
+        SOFAConvolver(np.zeros((1, 1, 0)))
+    assert e.match('Filters must have shape')
+
+    with pytest.raises(SOFAError) as e:
+        SOFAConvolver(np.zeros((1, 1, 10)), 0)
+    assert e.match('Invalid block size')
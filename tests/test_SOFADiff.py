@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFADiff.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import os
+import sys
+import tempfile
+import numpy as np
+from netCDF4 import Dataset
+from pysofaconventions import *
+
+
+def createFile(path, ir, title='diff', names=('left', 'right'), extra=False, chunksizes=None):
+
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.Conventions = 'SOFA'
+    rootgrp.Title = title
+    rootgrp.DateCreated = path
+    for name, size in zip('MRN', ir.shape):
+        rootgrp.createDimension(name, size)
+    rootgrp.createDimension('I', 1)
+    irVar = rootgrp.createVariable('Data.IR', 'f8', ('M', 'R', 'N'), chunksizes=chunksizes)
+    irVar.ChannelOrdering = title
+    irVar[:] = ir
+    rootgrp.createVariable('Data.SamplingRate', 'f8', ('I',))[:] = 48000.
+    namesVar = rootgrp.createVariable('Names', str, ('R',))
+    for i, name in enumerate(names):
+        namesVar[i] = name
+    if extra:
+        rootgrp.createVariable('Extra', 'i4', ('M',))[:] = 0
+    rootgrp.close()
+
+
+@pytest.fixture
+def files():
+
+    directory = tempfile.mkdtemp()
+    paths = [os.path.join(directory, name) for name in ['a.sofa', 'b.sofa', 'c.sofa', 'd.sofa']]
+    ir = np.random.randn(20, 2, 16)
+    modified = ir.copy()
+    modified[3, 0, 5] += 1e-3
+    modified[17, 1, 0] += 0.5
+    createFile(paths[0], ir)
+    createFile(paths[1], ir, chunksizes=(7, 2, 16))
+    createFile(paths[2], modified, title='new', names=('left', 'center'), extra=True)
+    createFile(paths[3], ir[:10])
+    yield paths, ir, modified
+    for path in paths:
+        os.remove(path)
+    os.rmdir(directory)
+
+
+def test_diffMetadata(files):
+
+    paths, ir, modified = files
+    a, c, d = SOFAFile(paths[0], 'r'), SOFAFile(paths[2], 'r'), SOFAFile(paths[3], 'r')
+
+    assert SOFADiff.diffMetadata(a, a) == {'attributes': {}, 'dimensions': {}, 'variables': {}}
+    metadata = SOFADiff.diffMetadata(a, c)
+    assert metadata['attributes'] == {'Title': ('diff', 'new')}
+    assert metadata['dimensions'] == {}
+    assert metadata['variables'] == {'Data.IR': {'attributes': {'ChannelOrdering': ('diff', 'new')}},
+                                     'Extra': {'dimensions': (None, ('M',))}}
+    metadata = SOFADiff.diffMetadata(a, c, ignoredAttributes=[])
+    assert 'DateCreated' in metadata['attributes']
+    metadata = SOFADiff.diffMetadata(d, a)
+    assert metadata['dimensions'] == {'M': (10, 20)}
+    assert metadata['variables'] == {'Data.IR': {'shape': ((10, 2, 16), (20, 2, 16))}}
+
+    a.close()
+    c.close()
+    d.close()
+
+
+def test_diffData(files):
+
+    paths, ir, modified = files
+
+    data = SOFADiff.diffData(paths[0], paths[1], workers=1)
+    assert sorted(data) == ['Data.IR', 'Data.SamplingRate', 'Names']
+    assert all(result['indices'] == [] and result['complete'] for result in data.values())
+    assert np.all(data['Data.IR']['maxAbsError'] == 0)
+
+    expectedAbs = np.max(np.abs(ir - modified), axis=(1, 2))
+    expectedRel = expectedAbs / np.max(np.abs(ir), axis=(1, 2))
+    for workers, processes in [(1, False), (4, False), (2, True)]:
+        data = SOFADiff.diffData(paths[0], paths[2], workers=workers, chunkSize=4, processes=processes)
+        assert data['Data.IR']['indices'] == [3, 17]
+        assert np.allclose(data['Data.IR']['maxAbsError'], expectedAbs)
+        assert np.allclose(data['Data.IR']['maxRelError'], expectedRel)
+        assert data['Data.SamplingRate']['indices'] == []
+        assert data['Names']['indices'] == [0]
+        assert np.isnan(data['Names']['maxAbsError'][0])
+        assert 'Extra' not in data
+    assert SOFAMapReduce.openFiles == {}
+
+    # Tolerances, selected variables and other axes
+    data = SOFADiff.diffData(paths[0], paths[2], variables=['Data.IR', 'Extra'], atol=1e-2)
+    assert list(data) == ['Data.IR']
+    assert data['Data.IR']['indices'] == [17]
+    data = SOFADiff.diffData(paths[0], paths[2], variables=['Data.IR'], axis='R')
+    assert data['Data.IR']['indices'] == [0, 1]
+
+    # Early exit
+    for workers in [1, 4]:
+        data = SOFADiff.diffData(paths[0], paths[2], variables=['Data.IR'], maxDifferences=1, chunkSize=4,
+                                 workers=workers)
+        assert data['Data.IR']['indices'] == [3]
+        assert not data['Data.IR']['complete']
+        assert np.isnan(data['Data.IR']['maxAbsError'][-1])
+    assert SOFAMapReduce.openFiles == {}
+
+    # NaN and infinities
+    special = ir.copy()
+    special[2, 0, 0] = special[5, 1, 3] = np.nan
+    special[8, 0, 1] = np.inf
+    special[11, 1, 2] = -np.inf
+    createFile(paths[3], special)
+    data = SOFADiff.diffData(paths[0], paths[3], variables=['Data.IR'], workers=1)
+    assert data['Data.IR']['indices'] == [2, 5, 8, 11]
+    assert np.isnan(data['Data.IR']['maxAbsError'][[2, 5]]).all()
+    assert np.isnan(data['Data.IR']['maxRelError'][[2, 5]]).all()
+    assert np.isinf(data['Data.IR']['maxAbsError'][[8, 11]]).all()
+    assert data['Data.IR']['maxAbsError'][0] == 0
+    data = SOFADiff.diffData(paths[3], paths[0], variables=['Data.IR'], rtol=1., workers=1)
+    assert data['Data.IR']['indices'] == [2, 5, 8, 11]
+    data = SOFADiff.diffData(paths[3], paths[3], variables=['Data.IR'], workers=1)
+    assert data['Data.IR']['indices'] == []
+    assert np.all(data['Data.IR']['maxAbsError'] == 0)
+
+
+def test_diff(files, capsys, monkeypatch):
+
+    paths, ir, modified = files
+
+    assert SOFADiff.diff(paths[0], paths[1])['equal']
+    sofafile = SOFAFile(paths[2], 'r')
+    differences = SOFADiff.diff(paths[0], sofafile, atol=1e-2)
+    sofafile.close()
+    assert not differences['equal']
+    assert differences['data']['Data.IR']['indices'] == [17]
+
+    lines = SOFADiff.getReport(differences)
+    assert "attribute Title: 'diff' != 'new'" in lines
+    assert "variable Data.IR attribute ChannelOrdering: 'diff' != 'new'" in lines
+    assert "variable Extra dimensions: None != ('M',)" in lines
+    assert any(line.startswith('data Data.IR: 1 of 20 differ, max abs error') for line in lines)
+    differences['data']['Data.IR']['complete'] = False
+    lines = SOFADiff.getReport(differences, maxIndices=0)
+    assert lines[-2] == 'data Data.IR: 1 of 20 differ (incomplete), max abs error ' + \
+        '%g' % np.max(np.abs(ir - modified)) + ', max rel error ' + \
+        '%g' % np.nanmax(differences['data']['Data.IR']['maxRelError']) + ': ...'
+    assert lines[-1] == 'data Names: 1 of 1 differ: ...'
+
+    # Command line
+    assert SOFADiff.main([paths[0], paths[1]]) == 0
+    assert capsys.readouterr().out == ''
+    assert SOFADiff.main([paths[0], paths[2], '--variable', 'Data.IR', '--max-differences', '1', '--chunk-size', '4',
+                          '--ignore-attribute', 'Title', '--ignore-attribute', 'Names']) == 1
+    out = capsys.readouterr().out
+    # Ignored besides the default attributes
+    assert 'Title' not in out and 'DateCreated' not in out
+    assert 'data Data.IR: 1 of 20 differ (incomplete)' in out
+    assert SOFADiff.main([paths[0], 'missing.sofa']) == 2
+    assert 'sofadiff:' in capsys.readouterr().err
+
+    monkeypatch.setattr(sys, 'argv', ['sofadiff', paths[0], paths[3], '--axis', 'R', '--workers', '1'])
+    with pytest.raises(SystemExit) as e:
+        from pysofaconventions.SOFADiff import main
+        main()
+    assert e.value.code == 1
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFADirectoryFile.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import os
+import shutil
+import tempfile
+import time
+import warnings
+import numpy as np
+from pysofaconventions import *
+from .conftest import createHRIRFile
+from pysofaconventions.SOFADirectoryFile import SOFADirectoryVariable
+
+
+@pytest.fixture
+def paths():
+
+    directory = tempfile.mkdtemp()
+    paths = [os.path.join(directory, name) for name in ['hrir.sofa', 'hrir.sofad']]
+    createHRIRFile(paths[0])
+    yield paths
+    shutil.rmtree(directory)
+
+
+def test_copyFile(paths, monkeypatch):
+
+    monkeypatch.setattr(SOFADirectoryFile, 'chunkBytes', 80)
+    original = SOFASimpleFreeFieldHRIR(paths[0], 'r')
+    SOFAWriter.copyFile(original, paths[1], backend='directory', chunkSize=3)
+    assert os.path.exists(os.path.join(paths[1], 'header.json'))
+    # Data.IR rows are 40 bytes, so chunks of 2 rows
+    assert sorted(os.listdir(os.path.join(paths[1], 'Data.IR'))) == ['0.npy', '1.npy', '2.npy', '3.npy']
+    # Chunks of 3 rows; the last row of SourcePosition is never written, so its chunk is not stored
+    assert sorted(os.listdir(os.path.join(paths[1], 'SourcePosition'))) == ['0.npy', '1.npy']
+
+    sofafile = SOFASimpleFreeFieldHRIR(paths[1], 'r', backend='directory')
+    assert isinstance(sofafile.ncfile, SOFADirectoryFile)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        assert sofafile.isValid()
+    assert sofafile.getGlobalAttributeValue('Index') == 3
+    assert sofafile.getDimensionsAsDict().keys() == original.getDimensionsAsDict().keys()
+    for name in original.getVariablesAsDict():
+        a, b = original.getVariableValue(name), sofafile.getVariableValue(name)
+        assert np.array_equal(np.ma.getmaskarray(a), np.ma.getmaskarray(b))
+        assert np.array_equal(np.ma.filled(a, 0), np.ma.filled(b, 0))
+        assert sofafile.getVariableInstance(name).dtype == original.getVariableInstance(name).dtype
+    assert sofafile.getVariableAttributeValue('SourcePosition', '_FillValue') == -1.
+
+    # Hyperslab reads
+    ir = original.getDataIR()
+    variable = sofafile.getVariableInstance('Data.IR')
+    assert isinstance(variable, SOFADirectoryVariable)
+    for index in [3, -1, slice(1, 6, 2), (slice(None), 1), (Ellipsis, 2), (2, Ellipsis, 0), [6, 0, 3], (5, 1, 4),
+                  np.arange(7) % 3 == 0, (slice(2, 2),), ()]:
+        assert np.ma.allequal(variable[index], ir[index])
+        assert np.array_equal(np.ma.getmaskarray(variable[index]), np.ma.getmaskarray(ir[index]))
+
+    with pytest.raises(SOFAError) as e:
+        variable[0] = 0.
+    assert e.match('Variable is read-only')
+    with pytest.raises(SOFAError):
+        sofafile.ncfile.file.createVariable('New', 'f8', ('M',))
+    sofafile.close()
+
+    # Modify a single chunk
+    mtimes = dict((name, os.path.getmtime(os.path.join(paths[1], 'Data.IR', name))) for name in ['1.npy', '3.npy'])
+    time.sleep(0.01)
+    sofafile = SOFAFile(paths[1], 'a', backend='directory')
+    variable = sofafile.getVariableInstance('Data.IR')
+    variable[3, 1] = np.ones(5)
+    variable[[4, 0], 0, :2] = [[2., 2.], [3., 3.]]
+    variable[6] = np.ma.masked
+    sofafile.ncfile.file.setncattr('Title', 'modified')
+    # The last chunk only has row 6, so it is complete and already written
+    assert set(variable.chunks) == {0, 1, 2}
+    assert os.path.getmtime(os.path.join(paths[1], 'Data.IR', '3.npy')) > mtimes['3.npy']
+    variable[2:4] = variable[2:4]
+    assert set(variable.chunks) == {0, 2}
+    sofafile.close()
+    assert os.path.getmtime(os.path.join(paths[1], 'Data.IR', '1.npy')) > mtimes['1.npy']
+
+    sofafile = SOFAFile(paths[1], 'r', backend='directory')
+    assert sofafile.getGlobalAttributeValue('Title') == 'modified'
+    modified = sofafile.getDataIR()
+    assert np.all(modified[3, 1] == 1.) and np.ma.is_masked(modified[3, 0, 0])
+    assert modified[4, 0, :2].tolist() == [2., 2.] and modified[0, 0, :2].tolist() == [3., 3.]
+    assert np.all(modified.mask[6])
+    assert np.ma.allequal(modified[1:3], ir[1:3])
+    sofafile.close()
+    original.close()
+
+    # Overwrite the store, but not other directories
+    sofafile = SOFAFile(paths[1], 'w', backend='directory')
+    dataset = sofafile.ncfile.file
+    dataset.createDimension('M', 3)
+    dataset.createVariable('Values', 'f8', ('M', 'M'))[1] = 1.
+    sofafile.close()
+    assert sorted(os.listdir(paths[1])) == ['Values', 'header.json']
+    sofafile = SOFAFile(paths[1], 'r', backend='directory')
+    assert sofafile.getVariableValue('Values').mask.tolist() == [[True] * 3, [False] * 3, [True] * 3]
+    sofafile.close()
+    with pytest.raises(SOFAError) as e:
+        SOFAFile(os.path.dirname(paths[0]), 'w', backend='directory')
+    assert e.match('Not a directory store')
+    os.makedirs(os.path.join(os.path.dirname(paths[0]), 'empty'))
+    SOFAFile(os.path.join(os.path.dirname(paths[0]), 'empty'), 'w', backend='directory').close()
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFAFIRConverter.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import numpy as np
+from pysofaconventions import *
+
+
+def test_getChunkRanges():
+
+    assert SOFAFIRConverter.getChunkRanges(10, 4) == [(0, 4), (4, 8), (8, 10)]
+    assert SOFAFIRConverter.getChunkRanges(3, 4) == [(0, 3)]
+    assert SOFAFIRConverter.getChunkRanges(0, 4) == []
+    assert len(SOFAFIRConverter.getChunkRanges(1000)) == 4
+
+    with pytest.raises(SOFAError) as e:
+        SOFAFIRConverter.getChunkRanges(10, 0)
+    assert e.match('Invalid chunk size')
+
+
+def test_getInterpolationWeights():
+
+    lower, upper, weight = SOFAFIRConverter.getInterpolationWeights([0., 10., 20.], [-5., 0., 5., 15., 20., 30.])
+    assert np.array_equal(lower, [0, 0, 0, 1, 1, 1])
+    assert np.array_equal(upper, [1, 1, 1, 2, 2, 2])
+    assert np.allclose(weight, [0., 0., 0.5, 0.5, 1., 1.])
+
+    # Single bin
+    lower, upper, weight = SOFAFIRConverter.getInterpolationWeights([100.], [0., 200.])
+    assert np.array_equal(lower, [0, 0])
+    assert np.array_equal(weight, [0., 0.])
+
+
+def test_transferFunctionToIR():
+
+    samplingRate = 48000.
+    numSamples = 64
+    ir = np.random.randn(3, 2, numSamples)
+    tf = np.fft.rfft(ir, axis=-1)
+    frequencies = np.fft.rfftfreq(numSamples, 1. / samplingRate)
+
+    # Same grid, exact round trip
+    result = SOFAFIRConverter.transferFunctionToIR(tf.real, tf.imag, frequencies, samplingRate, numSamples)
+    assert result.shape == (3, 2, numSamples)
+    assert np.allclose(result, ir)
+
+    # Unordered frequencies
+    order = np.random.permutation(len(frequencies))
+    result = SOFAFIRConverter.transferFunctionToIR(tf.real[..., order], tf.imag[..., order],
+                                                   frequencies[order], samplingRate, numSamples)
+    assert np.allclose(result, ir)
+
+    # Interpolation of a linear spectrum into a finer grid
+    real = np.tile(frequencies, (2, 1))
+    result = SOFAFIRConverter.transferFunctionToIR(real, np.zeros_like(real), frequencies, samplingRate, 2 * numSamples)
+    expected = np.fft.irfft(np.fft.rfftfreq(2 * numSamples, 1. / samplingRate), n=2 * numSamples)
+    assert np.allclose(result[0], expected)
+
+    with pytest.raises(SOFAError) as e:
+        SOFAFIRConverter.transferFunctionToIR(tf.real, tf.imag[..., 1:], frequencies, samplingRate, numSamples)
+    assert e.match('Real and imaginary parts have different shapes')
+    with pytest.raises(SOFAError) as e:
+        SOFAFIRConverter.transferFunctionToIR(tf.real, tf.imag, frequencies[1:], samplingRate, numSamples)
+    assert e.match('Number of frequency bins does not match')
+    with pytest.raises(SOFAError) as e:
+        SOFAFIRConverter.transferFunctionToIR(tf.real, tf.imag, frequencies, 0, numSamples)
+    assert e.match('Invalid sampling rate or number of samples')
+
+
+def test_sosToIR():
+
+    def referenceBiquad(b, a, x):
+        y = np.zeros(len(x))
+        for n in range(len(x)):
+            y[n] = b[0] * x[n]
+            if n > 0:
+                y[n] += b[1] * x[n - 1] - a[1] * y[n - 1]
+            if n > 1:
+                y[n] += b[2] * x[n - 2] - a[2] * y[n - 2]
+            y[n] /= a[0]
+        return y
+
+    numSamples = 32
+    section1 = [0.5, 0.2, 0.1, 1., -0.3, 0.1]
+    section2 = [1., -0.5, 0.25, 2., 0.4, -0.2]
+
+    impulse = np.zeros(numSamples)
+    impulse[0] = 1.
+    expected = referenceBiquad(section1[:3], section1[3:], impulse)
+    section2Normalized = np.asarray(section2) / section2[3]
+    expected = referenceBiquad(section2Normalized[:3], section2Normalized[3:], expected)
+
+    coefficients = np.tile(section1 + section2, (4, 2, 1))
+    result = SOFAFIRConverter.sosToIR(coefficients, numSamples)
+    assert result.shape == (4, 2, numSamples)
+    assert np.allclose(result, expected)
+
+    # Identity section
+    result = SOFAFIRConverter.sosToIR([1., 0., 0., 1., 0., 0.], 4)
+    assert np.allclose(result, [1., 0., 0., 0.])
+
+    with pytest.raises(SOFAError) as e:
+        SOFAFIRConverter.sosToIR(np.zeros(5), numSamples)
+    assert e.match('Number of SOS coefficients is not multiple of 6')
+    with pytest.raises(SOFAError) as e:
+        SOFAFIRConverter.sosToIR(np.zeros(6), numSamples)
+    assert e.match('a0 is zero')
+    with pytest.raises(SOFAError) as e:
+        SOFAFIRConverter.sosToIR(section1, 0)
+    assert e.match('Invalid number of samples')
+
+
+def test_collect():
+
+    chunks = [(0, 2, np.ones((2, 3))), (2, 3, 2 * np.ones((1, 3)))]
+    result = SOFAFIRConverter.collect(chunks, 3)
+    assert np.array_equal(result, [[1, 1, 1], [1, 1, 1], [2, 2, 2]])
+    assert SOFAFIRConverter.collect([], 3) is None
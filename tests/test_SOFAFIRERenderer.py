@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFAFIRERenderer.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import os
+import tempfile
+import numpy as np
+from netCDF4 import Dataset
+from pysofaconventions import *
+
+
+def createFile(path, ir):
+
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.Conventions = 'SOFA'
+    rootgrp.DataType = 'FIRE' if ir.ndim == 4 else 'FIR'
+    for name, size in zip('MREN' if ir.ndim == 4 else 'MRN', ir.shape):
+        rootgrp.createDimension(name, size)
+    rootgrp.createVariable('Data.IR', 'f8', tuple('MREN' if ir.ndim == 4 else 'MRN'))[:] = ir
+    rootgrp.close()
+
+
+def convolve(filters, signal):
+
+    return np.array([sum(np.convolve(signal[e], filters[r, e]) for e in range(filters.shape[1]))
+                     for r in range(filters.shape[0])])
+
+
+def test_render():
+
+    fd, path = tempfile.mkstemp()
+
+    m, r, e, n = 3, 2, 4, 30
+    ir = np.random.randn(m, r, e, n)
+    signal = np.random.randn(e, 64)
+    createFile(path, ir)
+    sofafile = SOFAFile(path, 'r')
+
+    renderer = SOFAFIRERenderer(sofafile, measurement=1, blockSize=16)
+    assert (renderer.numInputs, renderer.numOutputs, renderer.numMeasurements) == (e, r, m)
+    assert renderer.spectra.flags['C_CONTIGUOUS']
+    assert np.allclose(renderer.convolve(signal), convolve(ir[1], signal))
+
+    # Switch without crossfade: the full input history is rendered with the new measurement
+    renderer = SOFAFIRERenderer(sofafile, blockSize=16, crossfade=False)
+    first = renderer.process(signal[:, :32])
+    renderer.setMeasurement(2)
+    second = renderer.process(signal[:, 32:])
+    assert np.allclose(first, convolve(ir[0], signal)[:, :32])
+    assert np.allclose(second, convolve(ir[2], signal)[:, 32:64])
+
+    # Switch with crossfade over one block
+    renderer = SOFAFIRERenderer(sofafile, blockSize=16)
+    renderer.process(signal[:, :32])
+    renderer.setMeasurement(2)
+    renderer.setMeasurement(2)
+    output = renderer.process(signal[:, 32:])
+    old = convolve(ir[0], signal)[:, 32:48]
+    new = convolve(ir[2], signal)[:, 32:64]
+    fade = np.arange(1, 17) / 16.
+    assert np.allclose(output[:, :16], old + fade * (new[:, :16] - old))
+    assert np.allclose(output[:, 16:], new[:, 16:])
+
+    # Pending crossfades are dropped on reset
+    renderer.setMeasurement(1)
+    renderer.reset()
+    assert renderer.previousSpectra is None
+    assert np.allclose(renderer.process(signal[:, :16]), convolve(ir[1], signal)[:, :16])
+
+    # Least recently used spectra are evicted
+    renderer = SOFAFIRERenderer(sofafile, blockSize=16, cacheSize=2)
+    renderer.setMeasurement(1)
+    renderer.setMeasurement(0)
+    renderer.setMeasurement(2)
+    assert list(renderer.cache.keys()) == [0, 2]
+
+    with pytest.raises(SOFAError) as e:
+        renderer.setMeasurement(3)
+    assert e.match('Invalid measurement index')
+    sofafile.close()
+
+    createFile(path, ir[:, :, 0])
+    sofafile = SOFAFile(path, 'r')
+    with pytest.raises(SOFAError) as e:
+        SOFAFIRERenderer(sofafile)
+    assert e.match('Data.IR is not FIRE')
+    sofafile.close()
+
+    os.remove(path)
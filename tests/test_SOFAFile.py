@@ -2419,4 +2419,51 @@ def test_checkTFDataType():
     n.Units = 'hertz'
     rootgrp.close()
     assert SOFAFile(path, 'r').checkTFDataType()
-    os.remove(path)
\ No newline at end of file
+    os.remove(path)
+
+def test_iterMeasurements():
+
+    fd, path = tempfile.mkstemp()
+
+    m, r, n = 5, 2, 4
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.createDimension('I', 1)
+    rootgrp.createDimension('M', m)
+    rootgrp.createDimension('R', r)
+    rootgrp.createDimension('C', 3)
+    rootgrp.createDimension('N', n)
+    rootgrp.createVariable('Data.IR', 'f8', ('M', 'R', 'N'))[:] = np.arange(m * r * n).reshape(m, r, n)
+    rootgrp.createVariable('Data.Delay', 'f8', ('I', 'R'))[:] = [[1., 2.]]
+    rootgrp.createVariable('SourcePosition', 'f8', ('M', 'C'))[:] = np.arange(m * 3).reshape(m, 3)
+    rootgrp.createVariable('ReceiverPosition', 'f8', ('R', 'C', 'I'))[:] = np.ones((r, 3, 1))
+    rootgrp.createVariable('EmitterPosition', 'f8', ('C', 'M'))[:] = np.arange(3 * m).reshape(3, m)
+    rootgrp.createVariable('Data.SamplingRate', 'f8', ('I',))[:] = 48000.
+    rootgrp.createVariable('Scalar', 'f8')[:] = 3.
+    rootgrp.close()
+
+    sofafile = SOFAFile(path, 'r')
+    ir = sofafile.getDataIR()
+
+    # Default: variables with an M dimension
+    chunks = list(sofafile.iterMeasurements(batch=2))
+    assert [(start, stop) for start, stop, _ in chunks] == [(0, 2), (2, 4), (4, 5)]
+    assert sorted(chunks[0][2].keys()) == ['Data.IR', 'EmitterPosition', 'SourcePosition']
+    assert np.array_equal(chunks[1][2]['Data.IR'], ir[2:4])
+    assert np.array_equal(chunks[2][2]['EmitterPosition'], np.arange(3 * m).reshape(3, m)[:, 4:5])
+
+    # [I,...] variables are broadcast, other variables are returned as they are
+    for readAhead in [True, False]:
+        variables = ['Data.IR', 'Data.Delay', 'ReceiverPosition', 'Data.SamplingRate', 'Scalar']
+        for start, stop, values in sofafile.iterMeasurements(batch=3, variables=variables, readAhead=readAhead):
+            assert np.array_equal(values['Data.IR'], ir[start:stop])
+            assert np.array_equal(values['Data.Delay'], [[1., 2.]] * (stop - start))
+            assert values['ReceiverPosition'].shape == (r, 3, stop - start)
+            assert np.array_equal(values['Data.SamplingRate'], [48000.] * (stop - start))
+            assert values['Scalar'] == 3.
+
+    with pytest.raises(SOFAError) as e:
+        sofafile.iterMeasurements(variables=['Unknown'])
+    assert e.match('Variable not found')
+    sofafile.close()
+
+    os.remove(path)
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFAFingerprint.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import os
+import tempfile
+import time
+import numpy as np
+from netCDF4 import Dataset
+from pysofaconventions import *
+
+
+def createFile(path, ir, reverse=False, dtype='f8', **kwargs):
+
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    attributes = [('Conventions', 'SOFA'), ('DataType', 'FIR'), ('Title', 'fingerprint'),
+                  ('DateCreated', time.ctime(time.time() + reverse))]
+    for name, value in (attributes[::-1] if reverse else attributes):
+        rootgrp.setncattr(name, value)
+    for name, size in zip('MRN', ir.shape):
+        rootgrp.createDimension(name, size)
+    rootgrp.createDimension('I', 1)
+    rootgrp.createDimension('S', 0)
+    irVar = rootgrp.createVariable('Data.IR', dtype, ('M', 'R', 'N'), **kwargs)
+    irVar.ChannelOrdering = 'acn'
+    irVar.Gain = np.array([0.5, 1.], dtype=dtype)
+    irVar[:] = ir
+    rootgrp.createVariable('Data.SamplingRate', 'f8', ('I',))[:] = 48000.
+    rootgrp.createVariable('Scalar', 'i4')[...] = 3
+    names = rootgrp.createVariable('Names', str, ('R',))
+    names[0] = 'left'
+    names[1] = 'right'
+    rootgrp.close()
+
+
+def test_getCanonicalValue():
+
+    assert SOFAFingerprint.getCanonicalValue(b'SOFA') == 'SOFA'
+    assert SOFAFingerprint.getCanonicalValue('SOFA') == 'SOFA'
+    assert SOFAFingerprint.getCanonicalValue(np.array([1, 2], dtype='>i4')) == [1, 2]
+    assert SOFAFingerprint.getCanonicalValue(np.float32(0.5)) == 0.5
+
+
+def test_getDataDigest():
+
+    data = np.ma.masked_array([1., 2., 3.], mask=[False, True, False])
+    other = np.ma.masked_array([1., 5., 3.], mask=[False, True, False])
+    assert SOFAFingerprint.getDataDigest(data) == SOFAFingerprint.getDataDigest(other)
+    assert SOFAFingerprint.getDataDigest(data) != SOFAFingerprint.getDataDigest(other.filled(5.))
+    assert SOFAFingerprint.getDataDigest(np.array([1., 2.], dtype='>f8')) == \
+        SOFAFingerprint.getDataDigest(np.array([1., 2.], dtype='<f8'))
+    assert SOFAFingerprint.getDataDigest(np.array(['a', 'b'], dtype=object)) != \
+        SOFAFingerprint.getDataDigest(np.array(['ab', ''], dtype=object))
+
+
+def test_getFingerprint(monkeypatch):
+
+    directory = tempfile.mkdtemp()
+    paths = [os.path.join(directory, str(i) + '.sofa') for i in range(5)]
+    ir = np.random.randn(20, 2, 16)
+
+    # Same content, different layout and volatile attributes
+    createFile(paths[0], ir)
+    createFile(paths[1], ir, reverse=True, chunksizes=(3, 1, 16), zlib=True, complevel=9)
+    createFile(paths[2], ir, dtype='>f8', contiguous=True, endian='big', fill_value=-1.)
+    # Different content
+    createFile(paths[3], ir * 2)
+    createFile(paths[4], ir[:-1])
+
+    fingerprint = SOFAFingerprint.getFingerprint(paths[0])
+    assert len(fingerprint) == 64
+    sofafile = SOFAFile(paths[1], 'r')
+    assert SOFAFingerprint.getFingerprint(sofafile) == fingerprint
+    sofafile.close()
+    assert SOFAFingerprint.getFingerprint(paths[2], workers=1) == fingerprint
+    assert SOFAFingerprint.getFingerprint(paths[3]) != fingerprint
+    assert SOFAFingerprint.getFingerprint(paths[4]) != fingerprint
+    assert SOFAFingerprint.getFingerprint(paths[1], ignoredAttributes=[]) != fingerprint
+
+    # Leaves are hashed in parallel, and the result does not depend on the number of workers
+    monkeypatch.setattr(SOFAFingerprint, 'leafSize', 512)
+    sofafile = SOFAFile(paths[0], 'r')
+    assert SOFAFingerprint.getLeafRows(sofafile.getVariableInstance('Data.IR')) == 2
+    sofafile.close()
+    leafFingerprint = SOFAFingerprint.getFingerprint(paths[0], workers=1)
+    assert leafFingerprint != fingerprint
+    assert SOFAFingerprint.getFingerprint(paths[1], workers=4) == leafFingerprint
+    assert SOFAFingerprint.getFingerprint(paths[2], workers=2, processes=True) == leafFingerprint
+    assert SOFAMapReduce.openFiles == {}
+
+    for path in paths:
+        os.remove(path)
+    os.rmdir(directory)
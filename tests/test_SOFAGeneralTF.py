@@ -40,6 +40,7 @@ import os
 import tempfile
 import time
 from netCDF4 import Dataset
+import numpy as np
 from pysofaconventions import *
 
 
@@ -141,3 +142,51 @@ def test_isValid():
 
 
 
+
+
+def test_getDataIRFromTF():
+
+    fd, path = tempfile.mkstemp()
+
+    m, r, n = 5, 2, 9
+    samplingRate = 16000.
+    ir = np.random.randn(m, r, 2 * (n - 1))
+    tf = np.fft.rfft(ir, axis=-1)
+
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.Conventions = 'SOFA'
+    rootgrp.SOFAConventions = 'GeneralTF'
+    rootgrp.DataType = 'TF'
+    rootgrp.createDimension('M', m)
+    rootgrp.createDimension('R', r)
+    rootgrp.createDimension('N', n)
+    rootgrp.createVariable('Data.Real', 'f8', ('M', 'R', 'N'))[:] = tf.real
+    rootgrp.createVariable('Data.Imag', 'f8', ('M', 'R', 'N'))[:] = tf.imag
+    frequencies = rootgrp.createVariable('N', 'f8', ('N',))
+    frequencies.Units = 'hertz'
+    frequencies[:] = np.fft.rfftfreq(2 * (n - 1), 1. / samplingRate)
+    rootgrp.close()
+
+    generalTF = SOFAGeneralTF(path, 'r')
+
+    # Default parameters keep the original resolution
+    assert np.allclose(generalTF.getDataIRFromTF(chunkSize=2), ir)
+
+    # Streaming
+    chunks = list(generalTF.iterDataIRFromTF(samplingRate, 32, chunkSize=2))
+    assert [(start, stop) for start, stop, _ in chunks] == [(0, 2), (2, 4), (4, 5)]
+    assert chunks[-1][2].shape == (1, r, 32)
+
+    generalTF.close()
+
+    # Not a TF file
+    rootgrp = Dataset(path, 'a')
+    rootgrp.DataType = 'FIR'
+    rootgrp.close()
+    generalTF = SOFAGeneralTF(path, 'r')
+    with pytest.raises(SOFAError) as e:
+        generalTF.getDataIRFromTF()
+    assert e.match('DataType is not TF')
+    generalTF.close()
+
+    os.remove(path)
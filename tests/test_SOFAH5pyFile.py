@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFAH5pyFile.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import os
+import shutil
+import tempfile
+import warnings
+import numpy as np
+from netCDF4 import Dataset
+from pysofaconventions import *
+from .conftest import createHRIRFile
+
+
+@pytest.fixture
+def path():
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'hrir.sofa')
+    createHRIRFile(path)
+    yield path
+    shutil.rmtree(directory)
+
+
+def test_read(path):
+
+    original = SOFASimpleFreeFieldHRIR(path, 'r')
+    sofafile = SOFASimpleFreeFieldHRIR(path, 'r', backend='h5py')
+    assert isinstance(sofafile.ncfile, SOFAH5pyFile)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        assert sofafile.isValid()
+    attributes = sofafile.getGlobalAttributesAsDict()
+    assert attributes.keys() == original.getGlobalAttributesAsDict().keys()
+    assert attributes['Title'] == 'testpysofaconventions'
+    assert attributes['Index'] == 3 and list(attributes['Gains']) == [0.5, 2.]
+    assert list(sofafile.getDimensionsAsDict()) == list(original.getDimensionsAsDict())
+    assert [len(dimension) for dimension in sofafile.getDimensionsAsDict().values()] == [1, 5, 3, 7, 2, 1]
+    assert sofafile.getVariablesAsDict().keys() == original.getVariablesAsDict().keys()
+    for name, variable in original.getVariablesAsDict().items():
+        a, b = original.getVariableValue(name), sofafile.getVariableValue(name)
+        assert np.array_equal(np.ma.getmaskarray(a), np.ma.getmaskarray(b))
+        assert np.array_equal(np.ma.filled(a, 0), np.ma.filled(b, 0))
+        assert sofafile.getVariableInstance(name).dimensions == variable.dimensions
+        assert sofafile.getVariableInstance(name).ncattrs() == variable.ncattrs()
+    assert sofafile.getVariableInstance('Names').dtype == str
+    assert sofafile.getVariableValue('Names').tolist() == ['left', 'right']
+    assert sofafile.getVariableInstance('Scalar').getValue() == 4
+
+    ir = original.getDataIR()
+    variable = sofafile.getVariableInstance('Data.IR')
+    assert variable.filters() == {'zlib': True, 'complevel': 4, 'shuffle': True}
+    assert variable.chunking() == list(original.getVariableInstance('Data.IR').chunking())
+    assert sofafile.getVariableInstance('Data.Delay').filters()['zlib'] is False
+    assert sofafile.getVariableInstance('Scalar').chunking() == 'contiguous'
+    for index in [3, slice(1, 6, 2), [6, 0, 3], (Ellipsis, 2)]:
+        assert np.ma.allequal(variable[index], ir[index])
+    with pytest.raises(SOFAError) as e:
+        variable[0] = 0.
+    assert e.match('read-only')
+    original.close()
+    sofafile.close()
+
+    # Conversion to other backends
+    SOFAWriter.copyFile(sofafile.__class__(path, 'r', backend='h5py'), path + '.copy', backend='netcdf4')
+    assert SOFADiff.diff(path, path + '.copy')['equal']
+    copy = SOFAFile(path + '.copy', 'r')
+    assert copy.getVariableInstance('Data.IR').filters()['zlib']
+    copy.close()
+
+    with pytest.raises(SOFAError) as e:
+        SOFAFile(path, 'a', backend='h5py')
+    assert e.match('only open files for reading')
+
+
+def test_coordinateVariables():
+
+    fd, path = tempfile.mkstemp()
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.createDimension('U', None)
+    rootgrp.createDimension('M', 3)
+    rootgrp.createVariable('M', 'f8', ('M',))[:] = [1., 2., 3.]
+    rootgrp.createVariable('Values', 'i4', ('U', 'M'))[:2] = 1
+    rootgrp.close()
+
+    sofafile = SOFAFile(path, 'r', backend='h5py')
+    assert list(sofafile.getDimensionsAsDict()) == ['U', 'M']
+    assert sofafile.getDimension('U').isunlimited() and sofafile.getDimensionSize('U') == 2
+    assert sorted(sofafile.getVariablesAsDict()) == ['M', 'Values']
+    assert sofafile.getVariableInstance('M').dimensions == ('M',)
+    assert sofafile.getVariableValue('M').tolist() == [1., 2., 3.]
+    assert sofafile.getVariableInstance('Values').dimensions == ('U', 'M')
+    sofafile.close()
+    os.remove(path)
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFAHeaderValidator.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import os
+import shutil
+import tempfile
+import time
+import warnings
+from netCDF4 import Dataset
+from pysofaconventions import *
+from pysofaconventions.SOFAMemoryFile import SOFAMemoryVariable
+
+
+def position():
+
+    return {'Units': 'metre', 'Type': 'cartesian'}
+
+
+def createFile(path, dataType='FIR', attributes=None, dimensions=None, variables=None):
+    """
+    Create a file, valid for all the conventions of its data type
+
+    :param attributes:  global attributes added, or removed if None
+    :param dimensions:  dimension sizes changed, or removed if None
+    :param variables:   {name: (dimensions, attributes)} added or changed, or removed if None
+    """
+    globalAttributes = {'Conventions': 'SOFA', 'Version': '1.0', 'SOFAConventions': 'SimpleFreeFieldHRIR',
+                        'SOFAConventionsVersion': '1.0', 'APIName': 'pysofaconventions', 'APIVersion': '0.1',
+                        'AuthorContact': 'andres.perez@eurecat.org', 'Organization': 'Eurecat - UPF',
+                        'License': 'WTFPL', 'DataType': dataType, 'RoomType': 'free field',
+                        'DateCreated': time.ctime(time.time()), 'DateModified': time.ctime(time.time()),
+                        'Title': 'testpysofaconventions', 'ListenerShortName': 'AmazinglyShortName',
+                        'ListenerDescription': 'Listener', 'SourceDescription': 'Source',
+                        'EmitterDescription': 'Emitter', 'DatabaseName': 'IncredibleDatabase',
+                        'SourceModel': 'Model', 'SourceManufacturer': 'Manufacturer', 'SourceURI': 'URI',
+                        'RoomDescription': 'Room', 'AmbisonicsOrder': '1'}
+    globalAttributes.update(attributes or {})
+    sizes = {'I': 1, 'N': 12, 'C': 3, 'M': 2, 'R': 2, 'E': 1}
+    sizes.update(dimensions or {})
+
+    dataVariables = {'ListenerPosition': (('I', 'C'), position()), 'SourcePosition': (('I', 'C'), position()),
+                     'ReceiverPosition': (('R', 'C', 'I'), position()),
+                     'EmitterPosition': (('E', 'C', 'I'), position())}
+    if dataType == 'TF':
+        dataVariables.update({'Data.Real': (('M', 'R', 'N'), {}), 'Data.Imag': (('M', 'R', 'N'), {}),
+                              'N': (('N',), {'Units': 'hertz'})})
+    else:
+        fire = ('E',) if dataType == 'FIRE' else ()
+        dataVariables.update({'Data.IR': (('M', 'R') + fire + ('N',), {}),
+                              'Data.SamplingRate': (('I',), {'Units': 'hertz'}),
+                              'Data.Delay': (('I', 'R') + fire, {})})
+    dataVariables.update(variables or {})
+
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.setncatts(dict((name, value) for name, value in globalAttributes.items() if value is not None))
+    for name, size in sizes.items():
+        if size is not None:
+            rootgrp.createDimension(name, size)
+    for name, variable in dataVariables.items():
+        if variable is not None:
+            rootgrp.createVariable(name, 'f8', variable[0]).setncatts(variable[1])
+    rootgrp.close()
+
+
+def getIsValidResult(sofafile):
+
+    with warnings.catch_warnings(record=True) as record:
+        warnings.simplefilter('always')
+        valid = sofafile.isValid()
+    return valid, None if valid else str(record[-1].message)
+
+
+# (convention class, createFile keyword arguments, expected error or None)
+cases = [
+    (SOFASimpleFreeFieldHRIR, {}, None),
+    (SOFAFile, {'attributes': {'Title': None}}, 'Missing required attribute: Title'),
+    (SOFAFile, {'attributes': {'Conventions': 'NotSOFA'}}, 'File convention is not SOFA: NotSOFA'),
+    (SOFAFile, {'dimensions': {'E': None}, 'variables': {'EmitterPosition': None}}, 'Dimension not found: E'),
+    (SOFAFile, {'dimensions': {'M': 0}}, 'Incorrect dimension size for M: 0'),
+    (SOFAFile, {'dimensions': {'I': 2}}, 'Incorrect dimension size for I: 2'),
+    (SOFAFile, {'dimensions': {'C': 2}}, 'Incorrect dimension size for C: 2'),
+    (SOFAFile, {'variables': {'ListenerPosition': None}}, 'Missing Variable: ListenerPosition'),
+    (SOFAFile, {'variables': {'SourcePosition': (('I', 'C'), {'Type': 'cartesian'})}},
+     'Missing Variable Attribute: SourcePosition.Units'),
+    (SOFAFile, {'variables': {'ReceiverPosition': (('R', 'C', 'I'), {'Units': 'metre'})}},
+     'Missing Variable Attribute: ReceiverPosition.Coordinates'),
+    (SOFAFile, {'variables': {'ListenerUp': (('I', 'C'), {})}}, 'ListenerUp exists but not ListenerView'),
+    (SOFAFile, {'variables': {'SourceView': (('I', 'C'), {'Units': 'metre', 'Type': 'cartesian'})}},
+     'SourceView exists but not SourceUp'),
+    (SOFAFile, {'variables': {'ListenerUp': (('I', 'C'), {}), 'ListenerView': (('I', 'C'), {'Type': 'cartesian'})}},
+     'Missing Variable Attribute: ListenerView.Units'),
+    (SOFASingleRoomDRIR, {'attributes': {'SOFAConventions': 'SingleRoomDRIR', 'RoomType': 'reverberant'},
+                          'variables': {'ListenerUp': (('I', 'C'), {}),
+                                        'ListenerView': (('M', 'C'), {'Type': 'cartesian'})}}, None),
+    (SOFAFile, {'variables': {'ReceiverUp': (('R', 'C', 'I'), {'Type': 'cartesian'})}},
+     'Missing Variable Attribute: ReceiverUp.Units'),
+    (SOFAFile, {'variables': {'EmitterUp': (('E', 'C', 'I'), position()),
+                              'EmitterView': (('E', 'C', 'I'), {'Units': 'metre'})}},
+     'Missing Variable Attribute: EmitterView.Coordinates'),
+    (SOFAFile, {'variables': {'ListenerPosition': (('C', 'M'), position())}},
+     "('Invalid ListenerPosition Dimensions (should be [I,C] or [M,C]): ', (3, 2))"),
+    (SOFAFile, {'variables': {'SourceUp': (('C', 'C'), {}), 'SourceView': (('I', 'C'), position())}},
+     "('Invalid SourceUp Dimensions (should be [I,C] or [M,C]): ', (1, 3))"),
+    (SOFAFile, {'variables': {'EmitterPosition': (('E', 'C', 'M'), position()),
+                              'EmitterUp': (('E', 'C', 'I'), position()),
+                              'EmitterView': (('E', 'C', 'R'), position())}, 'dimensions': {'R': 3}},
+     "('Invalid EmitterView Dimensions (should be [E,C,I] or [E,C,M]): ', (1, 3, 2))"),
+    (SOFAFile, {'attributes': {'DataType': 'Unknown'}}, 'DataType not known: Unknown'),
+    (SOFAFile, {'variables': {'Data.IR': None}}, 'Missing Data.IR Variable'),
+    (SOFAFile, {'variables': {'Data.IR': (('M', 'N', 'R'), {})}},
+     'Incorrect Data.IR dimensions: (2, 12, 2). Expected [M,R,N]'),
+    (SOFAFile, {'variables': {'Data.SamplingRate': (('M',), {})}}, 'Missing Attribute Data.SamplingRate.Units'),
+    (SOFAFile, {'variables': {'Data.SamplingRate': (('I',), {'Units': 'metre'})}},
+     'Attribute Data.SamplingRate.Units is not a frequency unit: metre'),
+    (SOFAFile, {'variables': {'Data.SamplingRate': (('I',), {'Units': 'furlongs'})}},
+     'Unit name not known: furlongs'),
+    (SOFAFile, {'variables': {'Data.Delay': (('R',), {})}},
+     'Incorrect Data.Delay dimensions: (2,). Expected [I,R] or [M,R]'),
+    (SOFASimpleFreeFieldHRIR, {'attributes': {'RoomType': 'reverberant'}},
+     'RoomType is not "free field", got: "reverberant"'),
+    (SOFASimpleFreeFieldHRIR, {'attributes': {'DatabaseName': None}},
+     'Missing required Global Attribute "DatabaseName"'),
+    (SOFASimpleFreeFieldHRIR, {'dimensions': {'R': 3}}, 'Number of receivers (R) is not "2", got "3"'),
+    (SOFASimpleFreeFieldHRIR, {'attributes': {'SOFAConventions': 'GeneralFIR'}},
+     'SOFAConventions is not "SimpleFreeFieldHRIR", got: "GeneralFIR"'),
+    (SOFAGeneralFIR, {'attributes': {'SOFAConventions': 'GeneralFIR'}}, None),
+    (SOFAGeneralFIR, {'dataType': 'SOS', 'attributes': {'SOFAConventions': 'GeneralFIR'}},
+     'DataType is not "FIR", got: "SOS"'),
+    (SOFASimpleFreeFieldSOS, {'dataType': 'SOS', 'attributes': {'SOFAConventions': 'SimpleFreeFieldSOS'}}, None),
+    (SOFASimpleFreeFieldSOS, {'dataType': 'SOS', 'attributes': {'SOFAConventions': 'SimpleFreeFieldSOS'},
+                              'dimensions': {'N': 8}},
+     'Number of coefficients (N) is not multiple of "6", got "8"'),
+    (SOFASimpleHeadphoneIR, {'attributes': {'SOFAConventions': 'SimpleHeadphoneIR'}, 'dimensions': {'E': 2}}, None),
+    (SOFASimpleHeadphoneIR, {'attributes': {'SOFAConventions': 'SimpleHeadphoneIR'}},
+     'Number of emitters (E) and number of receivers (R) do not match, got "1" and "2"'),
+    (SOFASingleRoomDRIR, {'attributes': {'SOFAConventions': 'SingleRoomDRIR', 'RoomType': 'reverberant'}},
+     'Missing required Variables "ListenerUp" and "ListenerView"'),
+    (SOFAGeneralTF, {'dataType': 'TF', 'attributes': {'SOFAConventions': 'GeneralTF'}}, None),
+    (SOFAGeneralTF, {'dataType': 'TF', 'attributes': {'SOFAConventions': 'GeneralTF'},
+                     'variables': {'N': (('N',), {'Units': 'samples'})}},
+     'Attribute N.Units is not a frequency unit: samples'),
+    (SOFAGeneralFIRE, {'dataType': 'FIRE', 'attributes': {'SOFAConventions': 'GeneralFIRE'}}, None),
+    (SOFAGeneralFIRE, {'dataType': 'FIRE', 'attributes': {'SOFAConventions': 'GeneralFIRE'},
+                       'variables': {'Data.Delay': (('I', 'R'), {})}},
+     'Incorrect Data.Delay dimensions: (1, 2). Expected [I,R,E] or [M,R,E]'),
+    (SOFAMultiSpeakerBRIR, {'dataType': 'FIRE', 'attributes': {'SOFAConventions': 'MultiSpeakerBRIR',
+                                                               'DatabaseName': None}},
+     'Missing required Global Attribute "DatabaseName"'),
+    (SOFAAmbisonicsDRIR, {'dataType': 'FIRE', 'attributes': {'SOFAConventions': 'AmbisonicsDRIR'},
+                          'variables': {'Data.IR': (('M', 'R', 'E', 'N'), {'ChannelOrdering': 'acn'})}},
+     'Missing required Data.IR Attribute "Normalization"'),
+    (SOFAAmbisonicsDRIR, {'dataType': 'FIRE', 'attributes': {'SOFAConventions': 'AmbisonicsDRIR'},
+                          'variables': {'Data.IR': (('M', 'R', 'E', 'N'), {'ChannelOrdering': 'acn',
+                                                                           'Normalization': 'sn3d'}),
+                                        'ListenerUp': (('I', 'C'), {}), 'ListenerView': (('I', 'C'), position())}},
+     'Missing required Variables "SourceUp" and "SourceView"'),
+]
+
+
+@pytest.fixture(scope='module')
+def directory():
+
+    directory = tempfile.mkdtemp()
+    yield directory
+    shutil.rmtree(directory)
+
+
+@pytest.mark.parametrize('conventionClass, kwargs, error', cases)
+def test_validate(directory, conventionClass, kwargs, error):
+
+    path = os.path.join(directory, 'file.sofa')
+    createFile(path, **kwargs)
+    sofafile = conventionClass(path, 'r')
+    expected = (error is None, error)
+    with warnings.catch_warnings(record=True) as record:
+        warnings.simplefilter('always')
+        assert SOFAHeaderValidator.validate(sofafile) == expected
+        assert sofafile.validateHeader() == expected
+        assert SOFAHeaderValidator.isValid(sofafile) == (error is None)
+    assert not record
+
+    # Same result as isValid
+    assert getIsValidResult(sofafile) == expected
+    sofafile.close()
+
+    # From the path, with the convention of the file
+    conventions = conventionClass.__name__[len('SOFA'):]
+    assert SOFAHeaderValidator.validate(path, conventions) == expected
+    if kwargs.get('attributes', {}).get('SOFAConventions', 'SimpleFreeFieldHRIR') == conventions:
+        assert SOFAHeaderValidator.validate(path) == expected
+
+
+def test_validateConventions(directory):
+
+    path = os.path.join(directory, 'conventions.sofa')
+    createFile(path, attributes={'SOFAConventions': 'UnknownConvention', 'RoomType': 'reverberant'})
+
+    # Unknown conventions only have the general rules
+    assert SOFAHeaderValidator.validate(path) == (True, None)
+    assert SOFAHeaderValidator.validate(path, conventions='SimpleFreeFieldHRIR') == \
+        (False, 'SOFAConventions is not "SimpleFreeFieldHRIR", got: "UnknownConvention"')
+    assert SOFAHeaderValidator.validate(path, backend='h5py') == (True, None)
+    with pytest.raises(SOFAError):
+        SOFAHeaderValidator.validate(path, backend='unknown')
+
+
+def test_metadataOnly(directory, monkeypatch):
+
+    path = os.path.join(directory, 'metadata.sofa')
+    createFile(path, variables={'ListenerUp': (('I', 'C'), {}), 'ListenerView': (('I', 'C'), position())})
+    sofafile = SOFASimpleFreeFieldHRIR(path, 'r', backend='memory')
+
+    def fail(*args):
+        raise AssertionError('Unexpected call')
+
+    # Values are never read, and no helper objects are created
+    monkeypatch.setattr(SOFAMemoryVariable, 'readData', fail)
+    monkeypatch.setattr(SOFAPositionVariable, '__init__', fail)
+    monkeypatch.setattr(SOFAListener, '__init__', fail)
+    assert sofafile.validateHeader() == (True, None)
+    monkeypatch.undo()
+    assert sofafile.isValid()
+    sofafile.close()
+    SOFAMemoryFile.remove(path)
+
+
+def test_benchmark(directory):
+
+    path = os.path.join(directory, 'benchmark.sofa')
+    createFile(path, dimensions={'M': 1000, 'N': 256})
+
+    def getTime(function, repeats=20):
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    def isValid():
+        sofafile = SOFASimpleFreeFieldHRIR(path, 'r')
+        sofafile.isValid()
+        sofafile.close()
+
+    openTime = getTime(lambda: Dataset(path, 'r').close())
+    validateTime = getTime(lambda: SOFAHeaderValidator.validate(path))
+    # Close to a bare open, and faster than isValid
+    assert validateTime < 3 * openTime
+    assert validateTime < getTime(isValid)
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFAIRTrimmer.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import os
+import shutil
+import tempfile
+import time
+import warnings
+import numpy as np
+from netCDF4 import Dataset
+from pysofaconventions import *
+
+
+def createHRIRFile(path, ir, delay, samplingRate=48000.):
+
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.Conventions = 'SOFA'
+    rootgrp.Version = '1.0'
+    rootgrp.SOFAConventions = 'GeneralFIRE' if ir.ndim == 4 else 'SimpleFreeFieldHRIR'
+    rootgrp.SOFAConventionsVersion = '1.0'
+    rootgrp.APIName = 'pysofaconventions'
+    rootgrp.APIVersion = '0.1'
+    rootgrp.AuthorContact = 'andres.perez@eurecat.org'
+    rootgrp.Organization = 'Eurecat - UPF'
+    rootgrp.License = 'WTFPL - Do What the Fuck You Want to Public License'
+    rootgrp.DataType = 'FIRE' if ir.ndim == 4 else 'FIR'
+    rootgrp.RoomType = 'free field'
+    rootgrp.DateCreated = time.ctime(time.time())
+    rootgrp.DateModified = time.ctime(time.time())
+    rootgrp.Title = 'testpysofaconventions'
+    rootgrp.ListenerShortName = 'AmazinglyShortName'
+    rootgrp.DatabaseName = 'IncredibleDatabase'
+    dimensions = ('M', 'R', 'E', 'N') if ir.ndim == 4 else ('M', 'R', 'N')
+    m = ir.shape[0]
+    rootgrp.createDimension('I', 1)
+    rootgrp.createDimension('C', 3)
+    for name, size in zip(dimensions, ir.shape):
+        rootgrp.createDimension(name, size)
+    if 'E' not in dimensions:
+        rootgrp.createDimension('E', 1)
+    sr = rootgrp.createVariable('Data.SamplingRate', 'f8', ('I',))
+    sr.Units = 'hertz'
+    sr[:] = samplingRate
+    rootgrp.createVariable('Data.Delay', 'f8', ('I',) + dimensions[1:-1])[:] = delay
+    rootgrp.createVariable('Data.IR', 'f8', dimensions)[:] = ir
+    listenerPositionVar = rootgrp.createVariable('ListenerPosition', 'f8', ('I', 'C'))
+    listenerPositionVar.Units = 'metre'
+    listenerPositionVar.Type = 'cartesian'
+    sourcePositionVar = rootgrp.createVariable('SourcePosition', 'f8', ('M', 'C'))
+    sourcePositionVar.Units = 'degree, degree, metre'
+    sourcePositionVar.Type = 'spherical'
+    sourcePositionVar[:] = np.stack([np.linspace(0, 360, m, endpoint=False), np.zeros(m), np.ones(m)], axis=1)
+    receiverPositionVar = rootgrp.createVariable('ReceiverPosition', 'f8', ('R', 'C', 'I'))
+    receiverPositionVar.Units = 'metre'
+    receiverPositionVar.Type = 'cartesian'
+    emitterPositionVar = rootgrp.createVariable('EmitterPosition', 'f8', ('E', 'C', 'I'))
+    emitterPositionVar.Units = 'metre'
+    emitterPositionVar.Type = 'cartesian'
+    rootgrp.close()
+
+
+def getImpulseResponses(m, n, onsets, length=10):
+
+    ir = np.zeros((m, 2, n))
+    for measurement in range(m):
+        for receiver in range(2):
+            onset = onsets[measurement] + 3 * receiver
+            ir[measurement, receiver, onset:onset + length] = 0.5 ** np.arange(length) * (receiver + 1)
+    return ir
+
+
+@pytest.fixture
+def paths():
+
+    directory = tempfile.mkdtemp()
+    paths = [os.path.join(directory, name) for name in ['hrir.sofa', 'trimmed.sofa', 'retrimmed.sofa']]
+    yield paths
+    shutil.rmtree(directory)
+
+
+def test_getTrimPoints():
+
+    ir = np.zeros((2, 3, 32))
+    ir[0, 0, 5:9] = [1., -0.5, 0.01, 0.0001]
+    ir[0, 1, 10] = -2.
+    ir[1, 2, 30:] = 1.
+    onset, decay = SOFAIRTrimmer.getTrimPoints(ir, threshold=-60., margin=0)
+    assert onset.tolist() == [[5, 10, 0], [0, 0, 30]]
+    assert decay.tolist() == [[7, 10, -1], [-1, -1, 31]]
+    onset, decay = SOFAIRTrimmer.getTrimPoints(ir, threshold=-100., margin=2)
+    assert onset[0].tolist() == [3, 8, 0] and decay[0].tolist() == [10, 12, -1]
+    assert decay[1, 2] == 31
+    onset, decay = SOFAIRTrimmer.getTrimPoints(np.ma.masked_array(ir, mask=ir > 0.5), margin=0)
+    assert onset[0, 0] == 6
+
+
+def test_trim(paths):
+
+    m, n = 6, 128
+    onsets = [20, 40, 60, 80, 100, 10]
+    ir = getImpulseResponses(m, n, onsets)
+    ir[5, 1] = 0.
+    createHRIRFile(paths[0], ir, [[1., 2.]])
+
+    sofafile = SOFASimpleFreeFieldHRIR(paths[0], 'r')
+    assert not SOFAIRTrimmer.isTrimmed(sofafile)
+    assert np.array_equal(sofafile.getDataIR(untrimmed=True), sofafile.getDataIR())
+    length = SOFAIRTrimmer.trim(sofafile, paths[1], threshold=-80., margin=1, chunkSize=4)
+    # 10 samples and the margins
+    assert length == 12
+    sofafile.close()
+
+    trimmed = SOFASimpleFreeFieldHRIR(paths[1], 'r')
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        assert trimmed.isValid()
+    assert SOFAIRTrimmer.isTrimmed(trimmed)
+    assert trimmed.getDataIR().shape == (m, 2, length)
+    delay = trimmed.getDataDelay()
+    assert delay.shape == (m, 2)
+    assert delay[:, 0].tolist() == [1. + onset - 1 for onset in onsets]
+    assert delay[:5, 1].tolist() == [2. + onset + 3 - 1 for onset in onsets[:5]] and delay[5, 1] == 2.
+    assert np.allclose(trimmed.getDataIR()[:, :, 1], ir.max(axis=-1))
+
+    # Original alignment
+    assert np.array_equal(trimmed.getDataIR(untrimmed=True), ir)
+    assert np.array_equal(trimmed.getDataDelay(untrimmed=True), [[1., 2.]] * m)
+    assert np.array_equal(SOFAIRTrimmer.getUntrimmedIR(trimmed, 2, 4), ir[2:4])
+
+    # Trimming again keeps the original alignment
+    assert SOFAIRTrimmer.trim(trimmed, paths[2], threshold=-80., margin=0) == 10
+    trimmed.close()
+    retrimmed = SOFASimpleFreeFieldHRIR(paths[2], 'r')
+    assert retrimmed.isValid()
+    assert np.array_equal(retrimmed.getDataIR(untrimmed=True), ir)
+    assert np.array_equal(retrimmed.getDataDelay(untrimmed=True), [[1., 2.]] * m)
+    assert retrimmed.getDataDelay()[0, 0] == 1. + onsets[0]
+    retrimmed.close()
+
+
+def test_trimFIRE(paths):
+
+    m, e, n = 4, 3, 96
+    onsets = [[20, 40, 60], [10, 30, 5], [50, 0, 70], [15, 25, 35]]
+    ir = np.stack([getImpulseResponses(m, n, [onset[emitter] for onset in onsets]) for emitter in range(e)], axis=2)
+    ir[1, 0, 2] = 0.
+    delay = [[[1., 2., 3.], [4., 5., 6.]]]
+    createHRIRFile(paths[0], ir, delay)
+
+    sofafile = SOFAGeneralFIRE(paths[0], 'r')
+    onset, length = SOFAIRTrimmer.getTrimRange(sofafile, threshold=-80., margin=0)
+    assert onset.shape == (m, 2, e) and length == 10
+    assert onset[:, 0].tolist() == [[20, 40, 60], [10, 30, 0], [50, 0, 70], [15, 25, 35]]
+    assert SOFAIRTrimmer.trim(sofafile, paths[1], threshold=-80., margin=1, chunkSize=3) == 12
+    sofafile.close()
+
+    trimmed = SOFAGeneralFIRE(paths[1], 'r')
+    assert trimmed.isValid()
+    assert trimmed.getDataIR().shape == (m, 2, e, 12)
+    assert trimmed.getDataDelay().shape == (m, 2, e)
+    assert trimmed.getDataDelay()[0, 1].tolist() == [4. + 20 + 3 - 1, 5. + 40 + 3 - 1, 6. + 60 + 3 - 1]
+    assert np.array_equal(trimmed.getDataIR(untrimmed=True), ir)
+    assert np.array_equal(trimmed.getDataDelay(untrimmed=True), np.broadcast_to(delay, (m, 2, e)))
+
+    # The pipeline step writes the same file
+    SOFAPipeline(['trim:-80,1']).process(paths[0], paths[2])
+    processed = SOFAGeneralFIRE(paths[2], 'r')
+    assert np.array_equal(processed.getDataIR(), trimmed.getDataIR())
+    assert np.array_equal(processed.getDataDelay(), trimmed.getDataDelay())
+    processed.close()
+    trimmed.close()
+
+
+def test_trimErrors(paths):
+
+    rootgrp = Dataset(paths[0], 'w', format='NETCDF4')
+    rootgrp.DataType = 'TF'
+    rootgrp.close()
+    sofafile = SOFAFile(paths[0], 'r')
+    with pytest.raises(SOFAError) as e:
+        SOFAIRTrimmer.trim(sofafile, paths[1])
+    assert e.match('Only FIR or FIRE data can be trimmed: TF')
+    sofafile.close()
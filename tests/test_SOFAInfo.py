@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFAInfo.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import json
+import os
+import shutil
+import sys
+import tempfile
+import numpy as np
+from netCDF4 import Dataset
+from pysofaconventions import *
+from .conftest import createHRIRFile
+from pysofaconventions.SOFAMemoryFile import SOFAMemoryVariable
+
+
+@pytest.fixture(scope='module')
+def paths():
+
+    directory = tempfile.mkdtemp()
+    os.mkdir(os.path.join(directory, 'subject'))
+    paths = [os.path.join(directory, name) for name in ['a.sofa', os.path.join('subject', 'b.sofa'),
+                                                        'broken.sofa', 'other.nc']]
+    createHRIRFile(paths[0])
+    createHRIRFile(paths[1])
+    with open(paths[2], 'w') as f:
+        f.write('not a netCDF file')
+    createHRIRFile(paths[3])
+    rootgrp = Dataset(paths[3], 'a')
+    rootgrp.RoomType = 'reverberant'
+    rootgrp.close()
+    yield paths
+    shutil.rmtree(directory)
+
+
+def test_getInfo(paths, monkeypatch):
+
+    info = SOFAInfo.getInfo(paths[0])
+    assert info['path'] == paths[0]
+    assert info['size'] == os.path.getsize(paths[0])
+    assert info['valid'] and info['error'] is None
+    assert (info['conventions'], info['conventionsVersion'], info['dataType']) == ('SimpleFreeFieldHRIR', '1.0', 'FIR')
+    assert info['attributes']['Gains'] == [0.5, 2.]
+    assert info['attributes']['Index'] == 3
+    assert info['dimensions'] == {'I': 1, 'N': 5, 'C': 3, 'M': 7, 'R': 2, 'E': 1}
+    assert info['variables']['Data.IR'] == {'dimensions': ['M', 'R', 'N'], 'shape': [7, 2, 5],
+                                            'dtype': 'float32', 'attributes': {}}
+    assert info['variables']['Names']['dtype'] == 'str'
+    # JSON has no NaN
+    assert info['variables']['NanFill']['attributes']['_FillValue'] is None
+    assert json.loads(json.dumps(info)) == json.loads(json.dumps(SOFAInfo.getInfo(paths[0])))
+    assert 'samplingRate' not in info
+
+    info = SOFAInfo.getInfo(paths[0], values=True)
+    assert info['samplingRate'] == 48000.
+    assert info['distanceMin'] >= 0.
+
+    def notUnique(sofafile):
+        raise SOFAError('Data.SamplingRate is not unique')
+
+    monkeypatch.setattr(SOFAResampler, 'getFileSamplingRate', notUnique)
+    assert SOFAInfo.getInfo(paths[0], values=True)['samplingRate'] is None
+    monkeypatch.undo()
+
+    assert SOFAInfo.getInfo(paths[3])['error'] == 'RoomType is not "free field", got: "reverberant"'
+    broken = SOFAInfo.getInfo(paths[2])
+    assert not broken['valid'] and broken['error'] and 'variables' not in broken
+    missing = SOFAInfo.getInfo(paths[2] + '.missing')
+    assert 'size' not in missing and 'No such file' in missing['error']
+
+    # The summary does not read any values
+    sofafile = SOFAFile(paths[0], 'r', backend='memory')
+    sofafile.close()
+
+    def fail(*args):
+        raise AssertionError('Unexpected read')
+
+    monkeypatch.setattr(SOFAMemoryVariable, 'readData', fail)
+    assert SOFAInfo.getInfo(paths[0], backend='memory')['valid']
+    with pytest.raises(AssertionError):
+        SOFAInfo.getInfo(paths[0], values=True, backend='memory')
+    monkeypatch.undo()
+    SOFAMemoryFile.remove(paths[0])
+
+
+def test_getJSONValue():
+
+    assert SOFAInfo.getJSONValue(b'text') == 'text'
+    assert SOFAInfo.getJSONValue(np.float32(np.inf)) is None
+    assert SOFAInfo.getJSONValue(np.array([[1, 2]], dtype='i2')) == [[1, 2]]
+    assert SOFAInfo.getJSONValue('text') == 'text'
+
+
+def test_iterInfo(paths):
+
+    directory = os.path.dirname(paths[0])
+    assert SOFAInfo.findPaths([directory]) == [paths[0], paths[2], paths[1]]
+    assert SOFAInfo.findPaths([directory], pattern='*.nc') == [paths[3]]
+    assert SOFAInfo.findPaths([os.path.join(directory, '**', '*.sofa'), paths[0], paths[3]]) == \
+        [paths[0], paths[2], paths[1], paths[3]]
+
+    expected = [SOFAInfo.getInfo(path) for path in paths]
+    for workers, processes in [(1, True), (3, True), (2, False)]:
+        infos = list(SOFAInfo.iterInfo(paths, workers=workers, processes=processes))
+        assert [info['path'] for info in infos] == paths
+        assert [info['valid'] for info in infos] == [info['valid'] for info in expected]
+        assert infos[0]['variables'] == expected[0]['variables']
+
+
+def test_main(paths, capsys, monkeypatch):
+
+    directory = os.path.dirname(paths[0])
+    assert SOFAInfo.main([paths[0], '--workers', '1']) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == paths[0] + ': valid'
+    assert lines[1].startswith('  SimpleFreeFieldHRIR 1.0, DataType FIR, ')
+    assert lines[2] == '  dimensions: I=1, N=5, C=3, M=7, R=2, E=1'
+    assert '  Data.IR (M,R,N) float32' in lines
+    assert '[' not in ''.join(lines)
+
+    assert SOFAInfo.main([paths[0], paths[3], '--values', '--workers', '1']) == 1
+    out = capsys.readouterr().out
+    assert 'not valid: RoomType' in out and '  samplingRate: 48000.0' in out
+
+    assert SOFAInfo.main([directory, '--format', 'ndjson', '--workers', '2']) == 2
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line)['path'] for line in lines] == [paths[0], paths[2], paths[1]]
+
+    assert SOFAInfo.main([os.path.join(directory, '*.nc'), paths[2], '--format', 'json', '--workers', '1']) == 2
+    infos = json.loads(capsys.readouterr().out)
+    assert [info['path'] for info in infos] == [paths[3], paths[2]]
+    assert SOFAInfo.main([paths[2]]) == 2
+    assert capsys.readouterr().out.startswith(paths[2] + ': error: ')
+
+    monkeypatch.setattr(sys, 'argv', ['sofainfo', paths[0]])
+    with pytest.raises(SystemExit) as e:
+        from pysofaconventions.SOFAInfo import main
+        main()
+    assert e.value.code == 0
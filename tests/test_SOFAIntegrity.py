@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFAIntegrity.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import os
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+from netCDF4 import Dataset
+from pysofaconventions import *
+
+
+def createFile(path, ir, delay=None, positions=None):
+    """
+    :param positions:   {name: (dimensions, values, attributes)} added or changed
+    """
+    m = ir.shape[0]
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.Conventions = 'SOFA'
+    rootgrp.Version = '1.0'
+    rootgrp.SOFAConventions = 'SimpleFreeFieldHRIR'
+    rootgrp.SOFAConventionsVersion = '1.0'
+    rootgrp.APIName = 'pysofaconventions'
+    rootgrp.APIVersion = '0.1'
+    rootgrp.AuthorContact = 'andres.perez@eurecat.org'
+    rootgrp.Organization = 'Eurecat - UPF'
+    rootgrp.License = 'WTFPL - Do What the Fuck You Want to Public License'
+    rootgrp.DataType = 'FIR'
+    rootgrp.RoomType = 'free field'
+    rootgrp.DateCreated = time.ctime(time.time())
+    rootgrp.DateModified = time.ctime(time.time())
+    rootgrp.Title = 'testpysofaconventions'
+    rootgrp.ListenerShortName = 'AmazinglyShortName'
+    rootgrp.DatabaseName = 'IncredibleDatabase'
+    rootgrp.createDimension('I', 1)
+    rootgrp.createDimension('N', ir.shape[2])
+    rootgrp.createDimension('C', 3)
+    rootgrp.createDimension('M', m)
+    rootgrp.createDimension('R', 2)
+    rootgrp.createDimension('E', 1)
+    sr = rootgrp.createVariable('Data.SamplingRate', 'f8', ('I',))
+    sr.Units = 'hertz'
+    sr[:] = 48000.
+    rootgrp.createVariable('Data.Delay', 'f8', ('I', 'R'))[:] = 0. if delay is None else delay
+    rootgrp.createVariable('Data.IR', 'f8', ('M', 'R', 'N'), chunksizes=(4, 2, ir.shape[2]))[:] = ir
+
+    cartesian = {'Units': 'metre', 'Type': 'cartesian'}
+    spherical = {'Units': 'degree, degree, metre', 'Type': 'spherical'}
+    azimuth = np.linspace(0., 360., m, endpoint=False)
+    variables = {
+        'ListenerPosition': (('I', 'C'), np.zeros((1, 3)), cartesian),
+        'ListenerUp': (('I', 'C'), np.array([[0., 0., 1.]]), cartesian),
+        'ListenerView': (('I', 'C'), np.array([[1., 0., 0.]]), cartesian),
+        'SourcePosition': (('M', 'C'), np.stack([azimuth, np.zeros(m), np.ones(m)], axis=1), spherical),
+        'ReceiverPosition': (('R', 'C', 'I'), np.array([[[0.], [0.09], [0.]], [[0.], [-0.09], [0.]]]), cartesian),
+        'EmitterPosition': (('E', 'C', 'I'), np.zeros((1, 3, 1)), cartesian),
+    }
+    variables.update(positions or {})
+    for name, (dimensions, values, attributes) in variables.items():
+        positionVar = rootgrp.createVariable(name, 'f8', dimensions)
+        positionVar.setncatts(attributes)
+        positionVar[:] = values
+    rootgrp.close()
+
+
+@pytest.fixture(scope='module')
+def directory():
+
+    directory = tempfile.mkdtemp()
+    yield directory
+    shutil.rmtree(directory)
+
+
+def test_checkDataVariables(directory):
+
+    path = os.path.join(directory, 'data.sofa')
+    ir = np.random.RandomState(0).randn(20, 2, 16)
+    createFile(path, ir)
+    assert SOFAIntegrity.check(path) == {}
+
+    ir[3, 1, 5] = np.nan
+    ir[17, 0, 0] = np.inf
+    createFile(path, ir, delay=[[0., np.nan]])
+    for workers in [1, 3]:
+        problems = SOFAIntegrity.checkDataVariables(path, workers=workers, chunkSize=4)
+        assert list(problems['Data.IR']['nonFinite']) == [3, 17]
+        # Delay has no M dimension: all measurements are affected
+        assert list(problems['Data.Delay']['nonFinite']) == list(range(20))
+    problems = SOFAIntegrity.checkDataVariables(path, variables=['Data.IR'], workers=2, chunkSize=4, processes=True)
+    assert list(problems) == ['Data.IR']
+    assert SOFAMapReduce.openFiles == {}
+
+    sofafile = SOFASimpleFreeFieldHRIR(path, 'r')
+    assert sofafile.isValid()
+    assert list(sofafile.checkIntegrity(workers=1)['Data.IR']['nonFinite']) == [3, 17]
+    sofafile.close()
+
+
+def test_checkPositionVariables(directory):
+
+    path = os.path.join(directory, 'positions.sofa')
+    ir = np.zeros((20, 2, 8))
+    m = ir.shape[0]
+    view = np.tile([1., 0., 0.], (m, 1))
+    view[2] = [0., 0., 0.]
+    view[5] = [1., 0., 1.]
+    view[6] = [np.nan, 0., 0.]
+    sources = np.stack([np.zeros(m), np.zeros(m), np.ones(m)], axis=1)
+    sources[7, 2] = -1.
+    sources[8, 1] = 120.
+    createFile(path, ir, positions={
+        'ListenerView': (('M', 'C'), view, {'Units': 'metre', 'Type': 'cartesian'}),
+        'SourcePosition': (('M', 'C'), sources, {'Units': 'degree, degree, metre', 'Type': 'spherical'}),
+        'EmitterPosition': (('E', 'C', 'I'), np.zeros((1, 3, 1)), {'Units': 'degree, degree, metre',
+                                                                   'Type': 'cartesian'}),
+        # Receivers with their own orientations, in spherical coordinates
+        'ReceiverUp': (('R', 'C', 'I'), np.array([[[0.], [90.], [1.]], [[0.], [90.], [0.]]]),
+                       {'Units': 'degree, degree, metre', 'Type': 'spherical'}),
+        'ReceiverView': (('R', 'C', 'I'), np.array([[[0.], [0.], [1.]], [[0.], [0.], [1.]]]),
+                         {'Units': 'degree, degree, metre', 'Type': 'spherical'}),
+    })
+
+    sofafile = SOFAFile(path, 'r')
+    assert sofafile.isValid()
+    for chunkSize in [3, None]:
+        problems = SOFAIntegrity.checkPositionVariables(sofafile, chunkSize=chunkSize)
+        assert sorted(problems) == ['EmitterPosition', 'ListenerUp', 'ListenerView', 'ReceiverUp', 'SourcePosition']
+        assert list(problems['ListenerView']['zeroLength']) == [2]
+        assert list(problems['ListenerView']['nonFinite']) == [6]
+        assert list(problems['ListenerUp']['notOrthogonal']) == [5]
+        assert list(problems['SourcePosition']['radius']) == [7]
+        assert list(problems['SourcePosition']['elevation']) == [8]
+        assert list(problems['EmitterPosition']['units']) == list(range(m))
+        assert list(problems['ReceiverUp']['zeroLength']) == list(range(m))
+        assert 'notOrthogonal' not in problems['ReceiverUp']
+    # 45 degrees between Up and View
+    assert 'ListenerUp' not in SOFAIntegrity.checkPositionVariables(sofafile, tolerance=0.8)
+    sofafile.close()
+
+
+def test_unitsMatchCoordinates():
+
+    assert SOFAIntegrity.unitsMatchCoordinates('metre', 'cartesian')
+    assert SOFAIntegrity.unitsMatchCoordinates(None, None)
+    assert SOFAIntegrity.unitsMatchCoordinates('radian, radian, metre', 'spherical')
+    assert SOFAIntegrity.unitsMatchCoordinates('degree, degree, metre', 'spherical')
+    assert not SOFAIntegrity.unitsMatchCoordinates('metre', 'spherical')
+    assert not SOFAIntegrity.unitsMatchCoordinates('furlongs', 'cartesian')
+    assert not SOFAIntegrity.unitsMatchCoordinates('metre', 'polar')
+
+    positions = np.array([[np.pi / 2, np.pi / 4, 2.], [0., 2., 1.]])
+    problems = SOFAIntegrity.checkPositionValues(positions, 'radian, radian, metre', 'spherical')
+    assert list(problems['elevation']) == [False, True]
+    assert np.allclose(SOFAIntegrity.getCartesian(positions, 'radian, radian, metre', 'spherical')[0],
+                       [0., np.sqrt(2), np.sqrt(2)])
+
+
+def test_main(directory, capsys, monkeypatch):
+
+    valid = os.path.join(directory, 'valid.sofa')
+    createFile(valid, np.zeros((4, 2, 8)))
+    broken = os.path.join(directory, 'broken.sofa')
+    ir = np.zeros((30, 2, 8))
+    ir[:, 0, 0] = np.nan
+    createFile(broken, ir)
+    invalid = os.path.join(directory, 'invalid.sofa')
+    createFile(invalid, np.zeros((4, 2, 8)), positions={'ListenerPosition': (('I', 'C'), np.zeros((1, 3)),
+                                                                    {'Type': 'cartesian'})})
+
+    assert SOFAIntegrity.main([valid]) == 0
+    assert capsys.readouterr().out == ''
+    assert SOFAIntegrity.main([valid, broken, '--workers', '1', '--chunk-size', '8']) == 1
+    out = capsys.readouterr().out
+    assert out.startswith(broken + ': Data.IR nonFinite: 30 measurements: 0, 1, 2,')
+    assert out.rstrip().endswith('19, ...')
+    assert SOFAIntegrity.main([invalid]) == 1
+    assert 'not valid: Missing Variable Attribute: ListenerPosition.Units' in capsys.readouterr().out
+    assert SOFAIntegrity.main([valid, os.path.join(directory, 'missing.sofa')]) == 2
+    assert 'sofacheck:' in capsys.readouterr().err
+
+    monkeypatch.setattr(sys, 'argv', ['sofacheck', valid])
+    with pytest.raises(SystemExit) as e:
+        from pysofaconventions.SOFAIntegrity import main
+        main()
+    assert e.value.code == 0
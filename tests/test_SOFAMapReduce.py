@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFAMapReduce.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import os
+import tempfile
+import numpy as np
+from netCDF4 import Dataset
+from pysofaconventions import *
+
+
+def energy(data):
+
+    return np.sum(data ** 2, axis=(1, 2))
+
+
+def createFile(path, ir, chunksizes=None):
+
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    for name, size in zip('MRN', ir.shape):
+        rootgrp.createDimension(name, size)
+    rootgrp.createVariable('Data.IR', 'f8', ('M', 'R', 'N'), chunksizes=chunksizes)[:] = ir
+    rootgrp.close()
+
+
+def test_getChunkSize():
+
+    fd, path = tempfile.mkstemp()
+
+    createFile(path, np.zeros((10, 2, 4)), chunksizes=(3, 2, 4))
+    sofafile = SOFAFile(path, 'r')
+    variable = sofafile.getVariableInstance('Data.IR')
+    assert SOFAMapReduce.getChunkSize(variable, 0, 4) == 6
+    assert SOFAMapReduce.getChunkSize(variable, 0, 3) == 3
+    assert SOFAMapReduce.getChunkSize(variable, 0) == 258
+    sofafile.close()
+
+    createFile(path, np.zeros((10, 2, 4)))
+    sofafile = SOFAFile(path, 'r')
+    assert SOFAMapReduce.getChunkSize(sofafile.getVariableInstance('Data.IR'), 0, 4) == 4
+    sofafile.close()
+
+    os.remove(path)
+
+
+def test_mapReduce():
+
+    fd, path = tempfile.mkstemp()
+
+    ir = np.random.randn(23, 2, 8)
+    createFile(path, ir, chunksizes=(2, 2, 8))
+    expected = np.sum(ir ** 2, axis=(1, 2))
+
+    # Per-measurement energy, concatenated in order
+    concatenate = lambda a, b: np.concatenate([a, b])
+    for workers in [1, 4]:
+        result = SOFAMapReduce.mapReduce(path, energy, concatenate, workers=workers, chunkSize=3)
+        assert np.allclose(result, expected)
+    assert SOFAMapReduce.openFiles == {}
+
+    # Results are reduced while the next chunks are mapped, with at most 2 * workers chunks in flight
+    mapped, reduced, pending = [], [], []
+
+    def track(data):
+        mapped.append(data)
+        pending.append(len(mapped) - len(reduced))
+        return energy(data)
+
+    def trackConcatenate(a, b):
+        reduced.append(b)
+        return concatenate(a, b)
+
+    result = SOFAMapReduce.mapReduce(path, track, trackConcatenate, workers=2, chunkSize=2)
+    assert np.allclose(result, expected)
+    assert len(mapped) == 12 and max(pending) <= 5
+
+    # Errors of the reduction cancel the chunks not started
+    def fail(a, b):
+        raise ValueError('reduce')
+
+    del mapped[:]
+    with pytest.raises(ValueError):
+        SOFAMapReduce.mapReduce(path, track, fail, workers=2, chunkSize=2)
+    assert len(mapped) < 12
+    assert SOFAMapReduce.openFiles == {}
+
+    # Processes, with a SOFAFile instance
+    sofafile = SOFAFile(path, 'r')
+    result = SOFAMapReduce.mapReduce(sofafile, energy, concatenate, workers=2, processes=True)
+    assert np.allclose(result, expected)
+    sofafile.close()
+
+    # Along other dimensions, without reduction; hyperslabs are aligned to the storage chunks
+    results = SOFAMapReduce.mapReduce(path, np.max, axis='R', chunkSize=1)
+    assert len(results) == 1
+    results = SOFAMapReduce.mapReduce(path, np.max, axis='M', chunkSize=1)
+    assert len(results) == 12
+    assert np.isclose(max(results), ir.max())
+
+    with pytest.raises(SOFAError) as e:
+        SOFAMapReduce.mapReduce(path, np.max, axis='E')
+    assert e.match('does not have dimension')
+
+    # Workers open the file with the backend of the instance
+    sofafile = SOFAFile(path, 'r', backend='h5py')
+    assert SOFAFile.getSource(sofafile) == (path, SOFAH5pyFile)
+    result = SOFAMapReduce.mapReduce(sofafile, energy, concatenate, workers=2, chunkSize=5)
+    assert np.allclose(result, expected)
+    sofafile.close()
+    assert SOFAFile.getSource(path, backend='h5py') == (path, SOFAH5pyFile)
+    assert SOFAFile.getSource(path) == (path, SOFANetCDFFile)
+
+    # Files read from memory can not be opened by the workers
+    with open(path, 'rb') as f:
+        sofafile = SOFAFile.fromBytes(f.read(), name='upload.sofa')
+    with pytest.raises(SOFAError) as e:
+        SOFAMapReduce.mapReduce(sofafile, energy, concatenate)
+    assert e.match('upload.sofa')
+    sofafile.close()
+
+    # Nothing to reduce
+    createFile(path, np.zeros((0, 2, 8)))
+    assert SOFAMapReduce.mapReduce(path, energy, concatenate) is None
+    assert SOFAMapReduce.mapReduce(path, energy) == []
+
+    os.remove(path)
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFAMemoryFile.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import os
+import shutil
+import tempfile
+import warnings
+import numpy as np
+from concurrent import futures
+from pysofaconventions import *
+from .conftest import createHRIRFile
+from pysofaconventions.SOFAMemoryFile import SOFAMemoryDataset
+
+
+@pytest.fixture
+def path():
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'hrir.sofa')
+    createHRIRFile(path)
+    yield path
+    SOFAMemoryFile.remove(path)
+    shutil.rmtree(directory)
+
+
+def test_load(path):
+
+    original = SOFASimpleFreeFieldHRIR(path, 'r')
+    sofafile = SOFASimpleFreeFieldHRIR(path, 'r', backend='memory')
+    assert isinstance(sofafile.ncfile, SOFAMemoryFile)
+    assert path in SOFAMemoryFile.store
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        assert sofafile.isValid()
+    assert sofafile.getGlobalAttributesAsDict().keys() == original.getGlobalAttributesAsDict().keys()
+    assert list(sofafile.getGlobalAttributeValue('Gains')) == [0.5, 2.]
+    assert sofafile.getDimensionsAsDict().keys() == original.getDimensionsAsDict().keys()
+    for name in original.getVariablesAsDict():
+        a, b = original.getVariableValue(name), sofafile.getVariableValue(name)
+        assert np.array_equal(np.ma.getmaskarray(a), np.ma.getmaskarray(b))
+        assert np.array_equal(np.ma.filled(a, 0), np.ma.filled(b, 0))
+    assert np.ma.is_masked(sofafile.getDataIR()[3])
+    assert np.all(np.isnan(sofafile.getVariableValue('NanFill').data[1:]))
+    assert sofafile.getVariableValue('NanFill').mask.tolist() == [False, True]
+    assert sofafile.getVariableAttributeValue('SourcePosition', '_FillValue') == -1.
+    assert sofafile.getVariableInstance('Names').dtype == str
+    assert sofafile.getVariableInstance('Scalar').getValue() == 4
+    assert sofafile.getVariableInstance('Scalar')[0] == 4
+    original.close()
+    sofafile.close()
+
+    # Files loaded for reading are read-only
+    sofafile = SOFAFile(path, 'r', backend='memory')
+    with pytest.raises(SOFAError) as e:
+        sofafile.getVariableInstance('Data.IR')[0, 0] = 0.
+    assert e.match('read-only')
+    sofafile.close()
+
+    # Files on disk can not be modified
+    with pytest.raises(SOFAError) as e:
+        SOFAFile(path, 'a', backend='memory')
+    assert e.match('can only modify files created with it')
+
+    # Loaded files are shared while open, and evicted when the last instance is closed
+    first = SOFAFile(path, 'r', backend='memory')
+    second = SOFAFile(path, 'r', backend='memory')
+    assert first.getFile() is second.getFile()
+    first.close()
+    first.close()
+    assert SOFAMemoryFile.users[path] == 1
+    second.close()
+    assert path not in SOFAMemoryFile.store and path not in SOFAMemoryFile.users
+
+    # Concurrent opening and closing
+    def openAndClose(index):
+        sofafile = SOFAFile(path, 'r', backend='memory')
+        values = sofafile.getDataIR()[index % 7]
+        sofafile.close()
+        return values
+
+    with futures.ThreadPoolExecutor(max_workers=4) as pool:
+        assert len(list(pool.map(openAndClose, range(40)))) == 40
+    assert path not in SOFAMemoryFile.store and path not in SOFAMemoryFile.users
+
+    # Files changed on disk are loaded again
+    first = SOFAFile(path, 'r', backend='memory')
+    stamp = SOFAMemoryFile.loaded[path]
+    os.utime(path, ns=(stamp[0] + 10 ** 9, stamp[0] + 10 ** 9))
+    second = SOFAFile(path, 'r', backend='memory')
+    assert first.getFile() is not second.getFile()
+    first.close()
+    assert SOFAMemoryFile.users[path] == 1
+    second.close()
+    assert path not in SOFAMemoryFile.store
+    os.remove(path)
+    with pytest.raises((IOError, OSError)):
+        SOFAFile(path, 'r', backend='memory')
+    assert path not in SOFAMemoryFile.store
+
+
+def test_write(path):
+
+    memoryPath = path + '.memory'
+    sofafile = SOFAFile(path, 'r')
+    SOFAWriter.copyFile(sofafile, memoryPath, backend='memory')
+    copy = SOFAFile(memoryPath, 'r', backend='memory')
+    assert np.ma.allequal(copy.getDataIR(), sofafile.getDataIR())
+    copy.close()
+    # Files created in memory are kept after closing, and can be modified
+    copy = SOFAFile(memoryPath, 'a', backend='memory')
+    copy.getVariableInstance('Data.IR')[0, 0] = np.ma.masked
+    copy.close()
+    copy = SOFAFile(memoryPath, 'r', backend='memory')
+    assert np.all(copy.getDataIR().mask[0, 0])
+    copy.close()
+    sofafile.close()
+
+    dataset = SOFAFile(memoryPath, 'w', backend='memory').ncfile.file
+    assert isinstance(dataset, SOFAMemoryDataset)
+    assert dataset.variables == {}
+    dataset.setncattr('Title', 'memory')
+    dataset.createDimension('M', 4)
+    unlimited = dataset.createDimension('U', None)
+    assert unlimited.isunlimited() and len(unlimited) == 0
+    assert not dataset.dimensions['M'].isunlimited()
+
+    variable = dataset.createVariable('Values', 'f4', ('M',), zlib=True, complevel=4)
+    assert variable.filters() is None and variable.chunking() == 'contiguous'
+    assert len(variable) == 4
+    assert variable.ncattrs() == []
+    assert np.all(variable[:].mask)
+    variable[1:3] = np.ma.masked_array([1., 2.], mask=[False, True])
+    assert variable[:].mask.tolist() == [True, False, True, True]
+    variable.set_auto_maskandscale(False)
+    assert variable[1] == 1. and variable[2] == np.float32(9.96921e+36)
+    dataset.set_auto_maskandscale(True)
+    assert np.ma.is_masked(variable[2])
+
+    variable = dataset.createVariable('Filled', 'i2', ('M',), fill_value=-1)
+    assert variable.getncattr('_FillValue') == -1 and variable.getncattr('_FillValue').dtype == np.int16
+    variable.setncatts({'Units': 'metre', 'Type': 'cartesian'})
+    variable.setncattr('Units', 'degree')
+    assert variable.Units == 'degree' and sorted(variable.ncattrs()) == ['Type', 'Units', '_FillValue']
+    variable[0] = 5
+    assert variable[:].tolist() == [5, None, None, None]
+
+    variable = dataset.createVariable('NoFill', 'f8', ('M',), fill_value=False)
+    assert variable.fillValue is None and not np.ma.is_masked(variable[:])
+    variable = dataset.createVariable('Flags', 'bool', ('M',))
+    assert SOFANetCDFFile.getVariableFillValue(variable) is None
+    variable = dataset.createVariable('Names', str, ('M',))
+    variable[1] = 'name'
+    assert variable[:].tolist() == ['', 'name', '', '']
+    variable = dataset.createVariable('Scalar', 'f8')
+    variable.assignValue(2.)
+    assert variable.getValue() == 2. and (variable.ndim, variable.size) == (0, 1)
+    dataset.close()
+
+    sofafile = SOFAFile(memoryPath, 'r', backend='memory')
+    assert sofafile.getGlobalAttributeValue('Title') == 'memory'
+    assert sofafile.getVariableShape('Values') == (4,)
+    sofafile.close()
+    SOFAMemoryFile.remove(memoryPath)
+
+    # Read-only datasets and variables
+    dataset = SOFAMemoryDataset(writable=False)
+    with pytest.raises(SOFAError) as e:
+        dataset.createDimension('M', 1)
+    assert e.match('read-only')
+    with pytest.raises(SOFAError):
+        dataset.setncatts({'Title': 'memory'})
+    SOFABundle.export(path, memoryPath)
+    bundle = SOFABundle.open(memoryPath)
+    with pytest.raises(SOFAError) as e:
+        bundle.getVariableInstance('Data.IR')[0] = 0.
+    assert e.match('Variable is read-only: Data.IR')
+    bundle.close()
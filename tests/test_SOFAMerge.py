@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFAMerge.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import os
+import shutil
+import tempfile
+import time
+import warnings
+import numpy as np
+from concurrent import futures
+from netCDF4 import Dataset
+from pysofaconventions import *
+
+
+def createHRIRFile(path, ir, sourcePositions, listenerPosition=(0, 0, 0), samplingRate=48000., receiverSpacing=0.09,
+                   delay=None):
+
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.Conventions = 'SOFA'
+    rootgrp.Version = '1.0'
+    rootgrp.SOFAConventions = 'SimpleFreeFieldHRIR'
+    rootgrp.SOFAConventionsVersion = '1.0'
+    rootgrp.APIName = 'pysofaconventions'
+    rootgrp.APIVersion = '0.1'
+    rootgrp.AuthorContact = 'andres.perez@eurecat.org'
+    rootgrp.Organization = 'Eurecat - UPF'
+    rootgrp.License = 'WTFPL - Do What the Fuck You Want to Public License'
+    rootgrp.DataType = 'FIR'
+    rootgrp.RoomType = 'free field'
+    rootgrp.DateCreated = time.ctime(time.time())
+    rootgrp.DateModified = time.ctime(time.time())
+    rootgrp.Title = os.path.basename(path)
+    rootgrp.ListenerShortName = 'AmazinglyShortName'
+    rootgrp.DatabaseName = 'IncredibleDatabase'
+    m, r, n = ir.shape
+    rootgrp.createDimension('I', 1)
+    rootgrp.createDimension('N', n)
+    rootgrp.createDimension('C', 3)
+    rootgrp.createDimension('M', m)
+    rootgrp.createDimension('R', r)
+    rootgrp.createDimension('E', 1)
+    sr = rootgrp.createVariable('Data.SamplingRate', 'f8', ('I',))
+    sr.Units = 'hertz'
+    sr[:] = samplingRate
+    if delay is None:
+        rootgrp.createVariable('Data.Delay', 'f8', ('I', 'R'))[:] = 0.
+    else:
+        rootgrp.createVariable('Data.Delay', 'f8', ('M', 'R'))[:] = delay
+    rootgrp.createVariable('Data.IR', 'f8', ('M', 'R', 'N'), chunksizes=(1, r, n))[:] = ir
+    listenerPositionVar = rootgrp.createVariable('ListenerPosition', 'f8', ('I', 'C'))
+    listenerPositionVar.Units = 'metre'
+    listenerPositionVar.Type = 'cartesian'
+    listenerPositionVar[:] = listenerPosition
+    sourcePositionVar = rootgrp.createVariable('SourcePosition', 'f8', ('M', 'C'))
+    sourcePositionVar.Units = 'degree, degree, metre'
+    sourcePositionVar.Type = 'spherical'
+    sourcePositionVar[:] = sourcePositions
+    receiverPositionVar = rootgrp.createVariable('ReceiverPosition', 'f8', ('R', 'C', 'I'))
+    receiverPositionVar.Units = 'metre'
+    receiverPositionVar.Type = 'cartesian'
+    receiverPositionVar[:] = 0.
+    receiverPositionVar[:, 1, 0] = [receiverSpacing, -receiverSpacing]
+    emitterPositionVar = rootgrp.createVariable('EmitterPosition', 'f8', ('E', 'C', 'I'))
+    emitterPositionVar.Units = 'metre'
+    emitterPositionVar.Type = 'cartesian'
+    emitterPositionVar[:] = 0.
+    rootgrp.close()
+
+
+@pytest.fixture
+def sessions():
+
+    directory = tempfile.mkdtemp()
+    irs = [np.random.randn(m, 2, 8) for m in [3, 5, 2]]
+    positions = [np.stack([np.arange(len(ir)) * 10. + 100 * i, np.zeros(len(ir)), np.ones(len(ir))], axis=1)
+                 for i, ir in enumerate(irs)]
+    listeners = [(0, 0, 0), (0, 0, 0), (0, 0, 1)]
+    paths = []
+    for i, (ir, position, listener) in enumerate(zip(irs, positions, listeners)):
+        paths.append(os.path.join(directory, 'session' + str(i) + '.sofa'))
+        createHRIRFile(paths[-1], ir, position, listener)
+    yield directory, paths, irs, positions, listeners
+    shutil.rmtree(directory)
+
+
+def test_merge(sessions):
+
+    directory, paths, irs, positions, listeners = sessions
+    output = os.path.join(directory, 'merged.sofa')
+
+    for workers, processes in [(1, False), (4, False), (2, True)]:
+        sofafile = SOFAFile(paths[1], 'r')
+        ranges = SOFAMerge.merge([paths[0], sofafile, paths[2]], output, chunkSize=2,
+                                 workers=workers, processes=processes)
+        sofafile.close()
+        assert ranges == [(0, 3), (3, 8), (8, 10)]
+
+        merged = SOFASimpleFreeFieldHRIR(output, 'r')
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            assert merged.isValid()
+        assert merged.getDimensionSize('M') == 10
+        assert np.allclose(merged.getDataIR(), np.concatenate(irs))
+        assert np.allclose(merged.getSourcePositionValues(), np.concatenate(positions))
+        # Different listener positions are expanded to M, equal variables are kept
+        assert merged.getVariableInstance('ListenerPosition').dimensions == ('M', 'C')
+        assert np.allclose(merged.getListenerPositionValues(), np.repeat(listeners, [3, 5, 2], axis=0))
+        assert merged.getVariableInstance('Data.Delay').dimensions == ('I', 'R')
+        assert merged.getGlobalAttributeValue('Title') == 'session0.sofa'
+        merged.close()
+        assert SOFAMapReduce.openFiles == {}
+
+    # Closing the reader early cancels the chunks not started
+    pool = futures.ThreadPoolExecutor(max_workers=1)
+    tasks = [('token', SOFAFile.getSource(paths[1]), ['Data.IR'], start, start + 1, 0) for start in range(5)]
+    chunks = SOFAMerge.iterSubmitted(pool, tasks, 5)
+    task, values = next(chunks)
+    assert task == tasks[0]
+    assert np.allclose(values['Data.IR'], irs[1][:1])
+    chunks.close()
+    pool.shutdown(wait=True)
+    SOFAMapReduce.closeFiles('token')
+    assert SOFAMapReduce.openFiles == {}
+
+    # Delays per measurement in some inputs are expanded to M in the output
+    delay = np.arange(10.).reshape(5, 2)
+    createHRIRFile(paths[1], irs[1], positions[1], delay=delay)
+    expected = np.concatenate([np.zeros((3, 2)), delay, np.zeros((2, 2))])
+    for inputs, values in [(paths, expected), (paths[1:], expected[3:])]:
+        SOFAMerge.merge(inputs, output, workers=1)
+        merged = SOFAFile(output, 'r')
+        assert merged.getVariableInstance('Data.Delay').dimensions == ('M', 'R')
+        assert np.allclose(merged.getVariableValue('Data.Delay'), values)
+        merged.close()
+    createHRIRFile(paths[1], irs[1], positions[1])
+
+    # Equal listener positions are not expanded
+    SOFAMerge.merge(paths[:2], output, workers=1, compression={'Data.IR': {'zlib': True, 'complevel': 4}})
+    merged = SOFAFile(output, 'r')
+    assert merged.getVariableInstance('ListenerPosition').dimensions == ('I', 'C')
+    assert merged.getVariableInstance('Data.IR').filters()['zlib']
+    assert np.allclose(merged.getDataIR(), np.concatenate(irs[:2]))
+    merged.close()
+
+
+def test_incompatible(sessions):
+
+    directory, paths, irs, positions, listeners = sessions
+    output = os.path.join(directory, 'merged.sofa')
+    other = os.path.join(directory, 'other.sofa')
+
+    with pytest.raises(SOFAError) as e:
+        SOFAMerge.merge([], output)
+    assert e.match('No files to merge')
+
+    for kwargs, message in [({'ir': np.zeros((2, 2, 4))}, 'Dimension N does not match'),
+                            ({'samplingRate': 44100.}, 'Sampling rate does not match')]:
+        arguments = {'ir': irs[0], 'sourcePositions': positions[0]}
+        arguments.update(kwargs)
+        if arguments['ir'].shape[0] != len(arguments['sourcePositions']):
+            arguments['sourcePositions'] = arguments['sourcePositions'][:arguments['ir'].shape[0]]
+        createHRIRFile(other, **arguments)
+        with pytest.raises(SOFAError) as e:
+            SOFAMerge.merge([paths[0], other], output)
+        assert e.match(message)
+
+    # Different variables without M nor I
+    createHRIRFile(other, irs[0], positions[0])
+    for path, value in [(paths[0], 1.), (other, 2.)]:
+        rootgrp = Dataset(path, 'a')
+        rootgrp.createVariable('Extra', 'f8', ('R',))[:] = value
+        rootgrp.close()
+    with pytest.raises(SOFAError) as e:
+        SOFAMerge.merge([paths[0], other], output)
+    assert e.match('Extra differs and can not be expanded')
+
+    # Different attributes
+    createHRIRFile(other, irs[0], positions[0])
+    rootgrp = Dataset(other, 'a')
+    rootgrp.variables['SourcePosition'].Type = 'cartesian'
+    rootgrp.close()
+    with pytest.raises(SOFAError) as e:
+        SOFAMerge.merge([paths[1], other], output)
+    assert e.match('Attribute SourcePosition:Type does not match')
+
+    # Different variables
+    createHRIRFile(other, irs[0], positions[0])
+    rootgrp = Dataset(other, 'a')
+    rootgrp.createVariable('Extra', 'f8', ('M',))
+    rootgrp.close()
+    with pytest.raises(SOFAError) as e:
+        SOFAMerge.merge([paths[1], other], output)
+    assert e.match('Variables do not match')
+
+    rootgrp = Dataset(other, 'w', format='NETCDF4')
+    rootgrp.createDimension('M', 1)
+    rootgrp.createDimension('N', 8)
+    rootgrp.createVariable('Data.IR', 'i4', ('M', 'N'))
+    rootgrp.close()
+    first = os.path.join(directory, 'first.sofa')
+    rootgrp = Dataset(first, 'w', format='NETCDF4')
+    rootgrp.createDimension('M', 1)
+    rootgrp.createDimension('N', 8)
+    rootgrp.createVariable('Data.IR', 'f8', ('M', 'N'))
+    rootgrp.close()
+    with pytest.raises(SOFAError) as e:
+        SOFAMerge.merge([first, other], output)
+    assert e.match('Variable Data.IR does not match')
+    rootgrp = Dataset(other, 'w', format='NETCDF4')
+    rootgrp.createDimension('M', 1)
+    rootgrp.createDimension('N', 8)
+    rootgrp.createVariable('Data.IR', 'f8', ('N', 'M'))
+    rootgrp.close()
+    with pytest.raises(SOFAError) as e:
+        SOFAMerge.merge([first, other], output)
+    assert e.match('Variable Data.IR does not match')
+
+
+def test_isEqual():
+
+    assert SOFAMerge.isEqual(np.array([1., np.nan]), np.array([1., np.nan]))
+    assert not SOFAMerge.isEqual(np.array([1., 2.]), np.array([1., 2., 3.]))
+    assert SOFAMerge.isEqual(np.ma.masked_array([1, 2], mask=[False, True]),
+                             np.ma.masked_array([1, 3], mask=[False, True]))
+    assert not SOFAMerge.isEqual(np.array(['a', 'b'], dtype=object), np.array(['a', 'c'], dtype=object))
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFAMinimumPhase.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import numpy as np
+from pysofaconventions import *
+
+
+def test_getFFTSize():
+
+    assert SOFAMinimumPhase.getFFTSize(256) == 1024
+    assert SOFAMinimumPhase.getFFTSize(200) == 1024
+    assert SOFAMinimumPhase.getFFTSize(1) == 4
+
+
+def test_minimumPhase():
+
+    # A minimum-phase signal is kept
+    minimum = np.zeros(64)
+    minimum[:3] = [1., 0.5, 0.25]
+    assert np.allclose(SOFAMinimumPhase.minimumPhase(minimum), minimum, atol=1e-6)
+
+    # Its maximum-phase (reversed) version is converted back
+    maximum = np.zeros(64)
+    maximum[10:13] = [0.25, 0.5, 1.]
+    assert np.allclose(SOFAMinimumPhase.minimumPhase(maximum), minimum, atol=1e-6)
+
+    # Delays are removed, magnitude is kept, batched over leading axes
+    ir = np.zeros((3, 2, 64))
+    ir[..., 20:23] = [1., -0.3, 0.2]
+    result = SOFAMinimumPhase.minimumPhase(ir)
+    assert result.shape == ir.shape
+    assert np.all(np.argmax(np.abs(result), axis=-1) == 0)
+    assert np.allclose(np.abs(np.fft.rfft(result, 256)), np.abs(np.fft.rfft(ir, 256)), atol=1e-6)
+
+    # Silence does not produce NaN
+    assert np.all(np.isfinite(SOFAMinimumPhase.minimumPhase(np.zeros(16))))
+
+
+def test_getOnsets():
+
+    ir = np.zeros((2, 2, 32))
+    ir[0, 0, 5] = 1.
+    ir[0, 1, 7] = -1.
+    ir[1, 0, 0] = 1.
+    ir[1, 1, 10:12] = [0.05, 1.]
+
+    onsets = SOFAMinimumPhase.getOnsets(ir)
+    assert onsets.shape == (2, 2)
+    assert np.allclose(onsets[0], [5., 7.])
+    assert onsets[1, 0] == 0.
+    # -20 dB is 0.1, above 0.05
+    assert onsets[1, 1] == 11.
+
+    # Threshold
+    assert SOFAMinimumPhase.getOnsets(ir[1, 1], threshold=-30.) == 10.
@@ -39,6 +39,7 @@ import pytest
 import os
 import tempfile
 import time
+import numpy as np
 from netCDF4 import Dataset
 from pysofaconventions import *
 
@@ -181,3 +182,47 @@ def test_isValid():
 
 
 
+
+
+def test_getRenderer():
+
+    fd, path = tempfile.mkstemp()
+
+    ir = np.random.randn(2, 2, 3, 10)
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.DataType = 'FIRE'
+    for name, size in zip('MREN', ir.shape):
+        rootgrp.createDimension(name, size)
+    rootgrp.createVariable('Data.IR', 'f8', ('M', 'R', 'E', 'N'))[:] = ir
+    rootgrp.close()
+
+    sofafile = SOFAMultiSpeakerBRIR(path, 'r')
+    renderer = sofafile.getRenderer(measurement=1, blockSize=4)
+    signal = np.random.randn(3, 8)
+    expected = [sum(np.convolve(signal[e], ir[1, r, e]) for e in range(3)) for r in range(2)]
+    assert np.allclose(renderer.convolve(signal), expected)
+    sofafile.close()
+
+    os.remove(path)
+
+
+def test_getRoomAcousticParameters():
+
+    fd, path = tempfile.mkstemp()
+
+    t = np.arange(4000) / 8000.
+    ir = np.exp(-3. * np.log(10.) * t / 0.25) * np.ones((2, 2, 3, 1))
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    for name, size in zip('IMREN', (1,) + ir.shape):
+        rootgrp.createDimension(name, size)
+    rootgrp.createVariable('Data.SamplingRate', 'f8', ('I',))[:] = 8000.
+    rootgrp.createVariable('Data.IR', 'f8', ('M', 'R', 'E', 'N'))[:] = ir
+    rootgrp.close()
+
+    sofafile = SOFAMultiSpeakerBRIR(path, 'r')
+    parameters = sofafile.getRoomAcousticParameters(chunkSize=1)
+    assert parameters['dimensions'] == ('M', 'R', 'E')
+    assert np.allclose(parameters['T20'], 0.25, rtol=1e-2)
+    sofafile.close()
+
+    os.remove(path)
@@ -535,4 +535,32 @@ def test_getVariableDimensionalityFromName():
     assert sofaNcFile.getVariableDimensionalityFromName(variableName) == 2
 
     sofafile.close()
-    os.remove(path)
\ No newline at end of file
+    os.remove(path)
+def test_getBackend():
+
+    assert SOFANetCDFFile.getBackend('netcdf4') is SOFANetCDFFile
+    assert SOFANetCDFFile.getBackend('memory') is SOFAMemoryFile
+    assert SOFANetCDFFile.getBackend('directory') is SOFADirectoryFile
+    assert SOFANetCDFFile.getBackend('h5py') is SOFAH5pyFile
+    assert SOFANetCDFFile.getBackend(SOFAMemoryFile) is SOFAMemoryFile
+    with pytest.raises(SOFAError) as e:
+        SOFANetCDFFile.getBackend('zarr')
+    assert e.match('Backend not known')
+    with pytest.raises(SOFAError):
+        SOFANetCDFFile.getBackend(SOFAFile)
+
+    # Default fill values of the variables
+    fd, path = tempfile.mkstemp()
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.createDimension('M', 2)
+    rootgrp.createVariable('Default', 'f4', ('M',))
+    rootgrp.createVariable('Fill', 'i2', ('M',), fill_value=3)
+    rootgrp.createVariable('Names', str, ('M',))
+    rootgrp.close()
+    sofafile = SOFAFile(path, 'r')
+    assert SOFANetCDFFile.getVariableFillValue(sofafile.getVariableInstance('Default')) == \
+        np.float32(9.96921e+36).item()
+    assert SOFANetCDFFile.getVariableFillValue(sofafile.getVariableInstance('Fill')) == 3
+    assert SOFANetCDFFile.getVariableFillValue(sofafile.getVariableInstance('Names')) is None
+    sofafile.close()
+    os.remove(path)
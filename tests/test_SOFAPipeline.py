@@ -0,0 +1,406 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFAPipeline.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+from netCDF4 import Dataset
+from pysofaconventions import *
+from pysofaconventions.SOFAPipeline import SOFAPipelineRepack
+from pysofaconventions.SOFAPipeline import SOFAPipelineResample
+from pysofaconventions.SOFAPipeline import SOFAPipelineStep
+from pysofaconventions.SOFAPipeline import SOFAPipelineSubset
+
+
+def createHRIRFile(path, ir, delay, samplingRate=48000.):
+
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.Conventions = 'SOFA'
+    rootgrp.Version = '1.0'
+    rootgrp.SOFAConventions = 'SimpleFreeFieldHRIR'
+    rootgrp.SOFAConventionsVersion = '1.0'
+    rootgrp.APIName = 'pysofaconventions'
+    rootgrp.APIVersion = '0.1'
+    rootgrp.AuthorContact = 'andres.perez@eurecat.org'
+    rootgrp.Organization = 'Eurecat - UPF'
+    rootgrp.License = 'WTFPL - Do What the Fuck You Want to Public License'
+    rootgrp.DataType = 'FIR'
+    rootgrp.RoomType = 'free field'
+    rootgrp.DateCreated = time.ctime(time.time())
+    rootgrp.DateModified = time.ctime(time.time())
+    rootgrp.Title = 'testpysofaconventions'
+    rootgrp.ListenerShortName = 'AmazinglyShortName'
+    rootgrp.DatabaseName = 'IncredibleDatabase'
+    m, r, n = ir.shape
+    rootgrp.createDimension('I', 1)
+    rootgrp.createDimension('N', n)
+    rootgrp.createDimension('C', 3)
+    rootgrp.createDimension('M', m)
+    rootgrp.createDimension('R', r)
+    rootgrp.createDimension('E', 1)
+    sr = rootgrp.createVariable('Data.SamplingRate', 'f8', ('I',))
+    sr.Units = 'hertz'
+    sr[:] = samplingRate
+    rootgrp.createVariable('Data.Delay', 'f8', ('I', 'R'))[:] = delay
+    rootgrp.createVariable('Data.IR', 'f8', ('M', 'R', 'N'))[:] = ir
+    listenerPositionVar = rootgrp.createVariable('ListenerPosition', 'f8', ('I', 'C'))
+    listenerPositionVar.Units = 'metre'
+    listenerPositionVar.Type = 'cartesian'
+    sourcePositionVar = rootgrp.createVariable('SourcePosition', 'f8', ('M', 'C'))
+    sourcePositionVar.Units = 'degree, degree, metre'
+    sourcePositionVar.Type = 'spherical'
+    # Alternate elevations of 0 and 30 degrees
+    sourcePositionVar[:] = np.stack([np.linspace(0, 360, m, endpoint=False), 30. * (np.arange(m) % 2),
+                                     np.ones(m)], axis=1)
+    receiverPositionVar = rootgrp.createVariable('ReceiverPosition', 'f8', ('R', 'C', 'I'))
+    receiverPositionVar.Units = 'metre'
+    receiverPositionVar.Type = 'cartesian'
+    emitterPositionVar = rootgrp.createVariable('EmitterPosition', 'f8', ('E', 'C', 'I'))
+    emitterPositionVar.Units = 'metre'
+    emitterPositionVar.Type = 'cartesian'
+    rootgrp.close()
+
+
+def getImpulseResponses(m, n, onsets, length=10):
+
+    ir = np.zeros((m, 2, n))
+    for measurement in range(m):
+        for receiver in range(2):
+            onset = onsets[measurement] + 3 * receiver
+            ir[measurement, receiver, onset:onset + length] = 0.5 ** np.arange(length) * (receiver + 1)
+    return ir
+
+
+class GainStep(SOFAPipelineStep):
+
+    name = 'gain'
+
+    def apply(self, start, stop, values):
+        values['Data.IR'] = values['Data.IR'] * 2.
+        return values
+
+
+def readVariables(path):
+
+    rootgrp = Dataset(path, 'r')
+    try:
+        return dict((name, (var.dimensions, var.dtype, var[:], dict(var.__dict__)))
+                    for name, var in rootgrp.variables.items())
+    finally:
+        rootgrp.close()
+
+
+@pytest.fixture
+def directory():
+
+    directory = tempfile.mkdtemp()
+    yield directory
+    shutil.rmtree(directory)
+
+
+@pytest.fixture
+def source(directory):
+
+    path = os.path.join(directory, 'input', 'hrir.sofa')
+    os.mkdir(os.path.dirname(path))
+    createHRIRFile(path, getImpulseResponses(8, 128, [20, 40, 60, 80, 100, 10, 30, 50]), [[1., 2.]])
+    return path
+
+
+def test_getStep():
+
+    assert isinstance(SOFAPipeline.getStep('resample:44100'), SOFAPipelineResample)
+    assert SOFAPipeline.getStep('resample:44100').getSpec() == 'resample:44100'
+    assert SOFAPipeline.getStep('trim').getSpec() == 'trim:-60.0,4'
+    assert SOFAPipeline.getStep('trim:-50,8').getSpec() == 'trim:-50.0,8'
+    assert SOFAPipeline.getStep('subset:elevation,0,30').getSpec() == 'subset:elevation,0,30'
+    assert SOFAPipeline.getStep('float32').getSpec() == 'float32'
+    assert SOFAPipeline.getStep('repack').getSpec() == 'repack:lossless-small'
+    assert SOFAPipelineSubset([0, 2]).getSpec() == 'subset:custom'
+    pipeline = SOFAPipeline(['validate', SOFAPipelineRepack('archive')])
+    assert pipeline.getSpecs() == ['validate', 'repack:archive']
+
+    for spec in ['resample', 'resample:x', 'resample:-1', 'trim:a', 'float32:1', 'subset:diagonal',
+                 'subset:elevation', 'subset:frontal,0', 'repack:zip', 'normalize']:
+        with pytest.raises(SOFAError):
+            SOFAPipeline.getStep(spec)
+
+
+def test_trim(directory, source):
+
+    sofafile = SOFASimpleFreeFieldHRIR(source, 'r')
+    expected = os.path.join(directory, 'expected.sofa')
+    SOFAIRTrimmer.trim(sofafile, expected, threshold=-80., margin=1)
+    sofafile.close()
+    output = os.path.join(directory, 'trimmed.sofa')
+    record = SOFAPipeline(['trim:-80,1']).process(source, output, chunkSize=3)
+    assert record == {'M': 8, 'N': 12}
+    assert not os.path.exists(output + SOFAPipeline.partialSuffix)
+
+    expectedVariables = readVariables(expected)
+    variables = readVariables(output)
+    assert sorted(variables) == sorted(expectedVariables)
+    for name, (dimensions, dtype, values, attributes) in expectedVariables.items():
+        assert variables[name][:2] == (dimensions, dtype)
+        assert np.array_equal(variables[name][2], values)
+        assert variables[name][3] == attributes
+
+    # Trimming again, in another run or in the same pipeline, accumulates the offsets
+    trimmed = SOFASimpleFreeFieldHRIR(output, 'r')
+    SOFAIRTrimmer.trim(trimmed, expected, threshold=-40., margin=0)
+    trimmed.close()
+    SOFAPipeline(['trim:-40,0']).process(output, os.path.join(directory, 'retrimmed.sofa'))
+    SOFAPipeline(['trim:-80,1', 'trim:-40,0']).process(source, os.path.join(directory, 'chained.sofa'), chunkSize=3)
+    expectedVariables = readVariables(expected)
+    for name in ['retrimmed.sofa', 'chained.sofa']:
+        variables = readVariables(os.path.join(directory, name))
+        for variable in ['Data.IR', 'Data.Delay', 'TrimOffset']:
+            assert np.array_equal(variables[variable][2], expectedVariables[variable][2])
+        assert variables['TrimOffset'][3] == {'Units': 'samples', 'OriginalLength': 128}
+
+
+def test_resample(directory, source):
+
+    output = os.path.join(directory, 'resampled.sofa')
+    assert SOFAPipeline(['resample:24000']).process(source, output, chunkSize=3) == {'M': 8, 'N': 64}
+    sofafile = SOFASimpleFreeFieldHRIR(source, 'r')
+    ir, delay = SOFAResampler.getResampledData(sofafile, 24000.)
+    sofafile.close()
+    resampled = SOFASimpleFreeFieldHRIR(output, 'r')
+    assert resampled.isValid()
+    assert np.allclose(resampled.getDataIR(), ir)
+    assert np.array_equal(resampled.getDataDelay(), [[0.5, 1.]]) and np.array_equal(delay, [[0.5, 1.]])
+    assert resampled.getSamplingRate().tolist() == [24000.]
+    resampled.close()
+
+    # Resampling and trimming in one pass
+    output = os.path.join(directory, 'trimmed.sofa')
+    SOFAPipeline(['resample:24000', 'trim']).process(source, output)
+    trimmed = SOFASimpleFreeFieldHRIR(output, 'r')
+    assert trimmed.isValid()
+    assert np.allclose(trimmed.getDataIR(untrimmed=True), ir)
+    assert trimmed.getSamplingRate().tolist() == [24000.]
+    trimmed.close()
+
+    # Trimmed responses keep offsets at the original rate
+    with pytest.raises(SOFAError):
+        SOFAPipeline(['trim', 'resample:24000']).process(source, os.path.join(directory, 'other.sofa'))
+    with pytest.raises(SOFAError):
+        SOFAPipeline(['resample:24000']).process(output, os.path.join(directory, 'other.sofa'))
+    rootgrp = Dataset(source, 'a')
+    rootgrp.DataType = 'TF'
+    rootgrp.close()
+    for step in ['resample:24000', 'trim']:
+        with pytest.raises(SOFAError):
+            SOFAPipeline([step]).process(source, os.path.join(directory, 'other.sofa'))
+
+
+def test_subset(directory, source):
+
+    expected = os.path.join(directory, 'expected.sofa')
+    predicate = SOFASubset.getElevationPredicate([30.])
+    SOFASubset.extract(source, lambda values: predicate(values) & (np.abs(values['azimuth']) <= 90.), expected)
+    output = os.path.join(directory, 'subset.sofa')
+    record = SOFAPipeline(['subset:elevation,30', 'subset:frontal']).process(source, output, chunkSize=1)
+    assert record['M'] == 2
+    expectedVariables = readVariables(expected)
+    variables = readVariables(output)
+    for name, (dimensions, dtype, values, attributes) in expectedVariables.items():
+        assert np.array_equal(variables[name][2], values)
+
+    # Trimming the selected measurements, with selections before and after
+    ir = getImpulseResponses(8, 128, [20, 40, 60, 80, 100, 10, 30, 50])
+    for steps in [['subset:horizontal', 'trim'], ['trim', SOFAPipelineSubset(np.arange(8) % 2 == 0)]]:
+        SOFAPipeline(steps).process(source, output, chunkSize=3)
+        trimmed = SOFASimpleFreeFieldHRIR(output, 'r')
+        assert trimmed.getDimensionSize('M') == 4
+        assert np.array_equal(trimmed.getDataIR(untrimmed=True), ir[::2])
+        trimmed.close()
+
+    with pytest.raises(SOFAError):
+        SOFAPipeline(['subset:horizontal', 'subset:elevation,30']).process(source, output)
+
+
+def test_float32_repack(directory, source):
+
+    rootgrp = Dataset(source, 'a')
+    gain = rootgrp.createVariable('Data.Gain', 'f8', ('M',), fill_value=-1.)
+    gain[:4] = 0.5
+    rootgrp.close()
+    output = os.path.join(directory, 'small.sofa')
+    SOFAPipeline(['float32', 'repack:archive']).process(source, output)
+    variables = readVariables(output)
+    sourceVariables = readVariables(source)
+    for name in ['Data.IR', 'Data.Delay', 'Data.SamplingRate']:
+        assert variables[name][1] == np.float32
+        assert np.allclose(variables[name][2], sourceVariables[name][2], rtol=1e-5, atol=1e-6)
+    assert variables['Data.Gain'][1] == np.float32 and variables['Data.Gain'][3]['_FillValue'] == -1.
+    assert np.ma.getmaskarray(variables['Data.Gain'][2]).tolist() == [False] * 4 + [True] * 4
+    assert np.allclose(variables['Data.Gain'][2][:4], 0.5)
+    assert variables['SourcePosition'][1] == np.float64
+    assert np.array_equal(variables['SourcePosition'][2], sourceVariables['SourcePosition'][2])
+    rootgrp = Dataset(output, 'r')
+    assert rootgrp.variables['Data.IR'].filters()['complevel'] == 9
+    assert rootgrp.variables['Data.IR'].filters()['shuffle']
+    rootgrp.close()
+    sofafile = SOFASimpleFreeFieldHRIR(output, 'r')
+    assert sofafile.isValid()
+    sofafile.close()
+
+
+def test_validate(directory, source):
+
+    rootgrp = Dataset(source, 'a')
+    rootgrp.variables['Data.IR'][7, 1, 3] = np.inf
+    rootgrp.variables['Data.IR'][6, 0, 3] = np.nan
+    rootgrp.close()
+    record = SOFAPipeline(['subset:frontal', 'validate']).process(source, os.path.join(directory, 'valid.sofa'),
+                                                                 chunkSize=2)
+    assert record['valid'] and record['validationError'] is None
+    # Indices in the output
+    assert record['problems'] == {'Data.IR': {'nonFinite': [3, 4]}}
+
+    rootgrp = Dataset(source, 'a')
+    del rootgrp.variables['SourcePosition'].Units
+    rootgrp.close()
+    record = SOFAPipeline(['validate']).process(source, os.path.join(directory, 'invalid.sofa'))
+    assert not record['valid'] and 'SourcePosition' in record['validationError']
+
+
+def test_processFile(directory, source, monkeypatch):
+
+    def trimChunk(cls, ir, onsets, length):
+        raise SOFAError('Interrupted')
+
+    # Failing after the output was created
+    monkeypatch.setattr(SOFAIRTrimmer, 'trimChunk', classmethod(trimChunk))
+    output = os.path.join(directory, 'output', 'trimmed.sofa')
+    record = SOFAPipeline(['trim']).processFile((source, output))
+    assert record['status'] == 'failed' and record['error'] == 'Interrupted'
+    assert os.listdir(os.path.dirname(output)) == []
+
+
+def test_run(directory, source):
+
+    sources = [source, os.path.join(directory, 'input', 'subject', 'hrir.sofa'),
+               os.path.join(directory, 'input', 'broken.sofa')]
+    os.mkdir(os.path.dirname(sources[1]))
+    shutil.copy(source, sources[1])
+    with open(sources[2], 'w') as f:
+        f.write('not a netCDF file')
+    outputDirectory = os.path.join(directory, 'output')
+    outputs = [os.path.join(outputDirectory, 'hrir.sofa'), os.path.join(outputDirectory, 'subject', 'hrir.sofa'),
+               os.path.join(outputDirectory, 'broken.sofa')]
+    assert SOFAPipeline.getOutputPaths(sources, outputDirectory) == outputs
+    assert SOFAPipeline.getOutputPaths([], outputDirectory) == []
+    with pytest.raises(SOFAError):
+        SOFAPipeline.getOutputPaths(sources, os.path.dirname(source))
+
+    pipeline = SOFAPipeline([GainStep(), 'trim', 'validate'])
+    records = pipeline.run(sources, outputDirectory, workers=2, chunkSize=3)
+    assert [record['status'] for record in records] == ['done', 'done', 'failed']
+    assert [record['output'] for record in records] == outputs
+    assert records[0]['pipeline'] == ['gain', 'trim:-60.0,4', 'validate']
+    assert records[0]['sourceSize'] == os.path.getsize(source)
+    assert records[0]['outputSize'] == os.path.getsize(outputs[0])
+    assert records[0]['valid'] and records[0]['problems'] == {}
+    assert records[2]['error'] and not os.path.exists(outputs[2] + SOFAPipeline.partialSuffix)
+    trimmed = SOFASimpleFreeFieldHRIR(outputs[1], 'r')
+    assert np.array_equal(trimmed.getDataIR(untrimmed=True),
+                          2. * getImpulseResponses(8, 128, [20, 40, 60, 80, 100, 10, 30, 50]))
+    trimmed.close()
+    manifest = os.path.join(outputDirectory, SOFAPipeline.manifestName)
+    with open(manifest) as f:
+        lines = [json.loads(line) for line in f]
+    assert sorted(line['source'] for line in lines) == sorted(sources)
+    assert SOFAPipeline.loadManifest(os.path.join(directory, 'missing.ndjson')) == {}
+
+    # An interrupted run leaves a cut line; done files are skipped, failed and changed ones processed again
+    with open(manifest, 'a') as f:
+        f.write('{"source": ')
+    createHRIRFile(sources[1], getImpulseResponses(8, 64, [0] * 8), [[0., 0.]])
+    records = pipeline.run(sources, outputDirectory, workers=1)
+    assert [record['status'] for record in records] == ['skipped', 'done', 'failed']
+    assert records[1]['sourceSize'] == os.path.getsize(sources[1])
+    assert [record['status'] for record in SOFAPipeline(['validate']).run(sources[:1], outputDirectory)] == ['done']
+    assert [record['status'] for record in pipeline.run(sources[:2], outputDirectory, resume=False)] == ['done'] * 2
+    os.remove(outputs[0])
+    assert pipeline.run(sources[:1], outputDirectory)[0]['status'] == 'done'
+
+    # Another manifest
+    manifest = os.path.join(directory, 'manifests', 'float32.ndjson')
+    records = SOFAPipeline(['float32']).run(sources[:2], outputDirectory, workers=2, manifest=manifest)
+    assert [record['status'] for record in records] == ['done', 'done']
+    assert sorted(SOFAPipeline.loadManifest(manifest)) == sorted(sources[:2])
+
+
+def test_main(directory, source, capsys, monkeypatch):
+
+    outputDirectory = os.path.join(directory, 'output')
+    assert SOFAPipeline.main([os.path.dirname(source), '-o', outputDirectory, '-s', 'trim', '-s', 'validate',
+                              '--workers', '1', '--chunk-size', '3']) == 0
+    out = capsys.readouterr().out
+    assert out == source + ' -> ' + os.path.join(outputDirectory, 'hrir.sofa') + ': done\n'
+    assert SOFAPipeline.main([source, '-o', outputDirectory, '-s', 'trim', '-s', 'validate']) == 0
+    assert capsys.readouterr().out.endswith(': skipped\n')
+
+    rootgrp = Dataset(source, 'a')
+    rootgrp.variables['Data.IR'][0, 0, 0] = np.nan
+    del rootgrp.variables['SourcePosition'].Units
+    rootgrp.close()
+    assert SOFAPipeline.main([source, '-o', outputDirectory, '-s', 'validate', '--no-resume']) == 1
+    out = capsys.readouterr().out
+    assert 'not valid' in out and 'Data.IR: 1 measurements with NaN or Inf' in out
+
+    broken = os.path.join(directory, 'broken.sofa')
+    with open(broken, 'w') as f:
+        f.write('not a netCDF file')
+    assert SOFAPipeline.main([broken, '-o', outputDirectory, '-s', 'validate']) == 2
+    assert ': failed: ' in capsys.readouterr().out
+    assert SOFAPipeline.main([source, '-o', outputDirectory, '-s', 'normalize']) == 2
+    assert capsys.readouterr().err == 'sofapipeline: Pipeline step not known: normalize\n'
+
+    monkeypatch.setattr(sys, 'argv', ['sofapipeline', source, '-o', outputDirectory, '-s', 'float32'])
+    with pytest.raises(SystemExit) as e:
+        from pysofaconventions.SOFAPipeline import main
+        main()
+    assert e.value.code == 0
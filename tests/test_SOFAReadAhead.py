@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFAReadAhead.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import threading
+import time
+from pysofaconventions import *
+
+
+def test_iterate():
+
+    assert list(SOFAReadAhead(lambda x: x * 2, range(5))) == [0, 2, 4, 6, 8]
+    assert list(SOFAReadAhead(lambda x: x, [], depth=0)) == []
+
+
+def test_readAhead():
+
+    # The next result is computed while the current one is being used
+    computed = []
+    readAhead = iter(SOFAReadAhead(lambda x: computed.append(x) or x, range(4)))
+    assert next(readAhead) == 0
+    while len(computed) < 2:
+        pass
+    # Only one result is computed ahead, so two are held at most
+    time.sleep(0.05)
+    assert computed == [0, 1]
+    assert next(readAhead) == 1
+    while len(computed) < 3:
+        pass
+    time.sleep(0.05)
+    assert computed == [0, 1, 2]
+    readAhead.close()
+
+
+def test_exception():
+
+    def function(x):
+        if x == 2:
+            raise ValueError('Failed: ' + str(x))
+        return x
+
+    results = []
+    with pytest.raises(ValueError) as e:
+        for result in SOFAReadAhead(function, range(5)):
+            results.append(result)
+    assert e.match('Failed: 2')
+    assert results == [0, 1]
+
+
+def test_stop():
+
+    # Stopping early stops the background thread, even if it is waiting for a free slot
+    SOFAReadAhead.pollInterval = 0.01
+    threads = threading.active_count()
+    readAhead = iter(SOFAReadAhead(lambda x: x, range(100)))
+    assert next(readAhead) == 0
+    time.sleep(0.05)
+    readAhead.close()
+    assert threading.active_count() == threads
+    SOFAReadAhead.pollInterval = 0.1
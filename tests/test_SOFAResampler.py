@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFAResampler.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import os
+import shutil
+import tempfile
+import numpy as np
+from netCDF4 import Dataset
+from pysofaconventions import *
+
+
+def createFile(path, ir, samplingRate, delay):
+
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.Conventions = 'SOFA'
+    rootgrp.DataType = 'FIR'
+    rootgrp.createDimension('I', 1)
+    rootgrp.createDimension('M', ir.shape[0])
+    rootgrp.createDimension('R', ir.shape[1])
+    rootgrp.createDimension('N', ir.shape[2])
+    sr = rootgrp.createVariable('Data.SamplingRate', 'f8', ('I',) if np.size(samplingRate) == 1 else ('M',))
+    sr.Units = 'hertz'
+    sr[:] = samplingRate
+    rootgrp.createVariable('Data.Delay', 'f8', ('M', 'R'))[:] = delay
+    rootgrp.createVariable('Data.IR', 'f8', ('M', 'R', 'N'))[:] = ir
+    rootgrp.close()
+
+
+def test_getResamplingFactors():
+
+    assert SOFAResampler.getResamplingFactors(44100, 48000) == (160, 147)
+    assert SOFAResampler.getResamplingFactors(96000, 48000) == (1, 2)
+    assert SOFAResampler.getResamplingFactors(48000, 48000) == (1, 1)
+
+    with pytest.raises(SOFAError) as e:
+        SOFAResampler.getResamplingFactors(0, 48000)
+    assert e.match('Invalid sampling rates')
+
+
+def test_designFilter():
+
+    h = SOFAResampler.designFilter(3, 2)
+    assert len(h) % 2 == 1
+    assert np.isclose(np.sum(h), 3)
+    assert np.allclose(h, h[::-1])
+
+
+def test_resample():
+
+    # Identity
+    data = np.random.randn(2, 3, 16)
+    assert np.array_equal(SOFAResampler.resample(data, 1, 1), data)
+
+    # Band limited signal keeps its shape (away from the edges)
+    originalRate, targetRate = 44100., 48000.
+    up, down = SOFAResampler.getResamplingFactors(originalRate, targetRate)
+    t = np.arange(441) / originalRate
+    signal = np.sin(2 * np.pi * 1000. * t)
+    result = SOFAResampler.resample(np.tile(signal, (4, 2, 1)), up, down)
+    assert result.shape == (4, 2, SOFAResampler.getNumOutputSamples(441, up, down))
+    assert result.shape[-1] == 480
+    expected = np.sin(2 * np.pi * 1000. * np.arange(480) / targetRate)
+    assert np.max(np.abs(result[..., 50:-50] - expected[50:-50])) < 1e-2
+
+    # Decimation by two of an impulse keeps its position
+    impulse = np.zeros(64)
+    impulse[20] = 1.
+    result = SOFAResampler.resample(impulse, 1, 2)
+    assert len(result) == 32
+    assert np.argmax(result) == 10
+
+
+def test_getDataIRResampled():
+
+    fd, path = tempfile.mkstemp()
+    cacheDirectory = tempfile.mkdtemp()
+
+    ir = np.zeros((5, 2, 96))
+    ir[:, :, 10] = 1.
+    delay = np.arange(10).reshape(5, 2)
+    createFile(path, ir, 96000., delay)
+
+    sofafile = SOFAFile(path, 'r')
+    assert SOFAResampler.getFileSamplingRate(sofafile) == 96000.
+
+    resampledIR, resampledDelay = sofafile.getDataIRResampled(48000, chunkSize=2)
+    assert resampledIR.shape == (5, 2, 48)
+    assert np.all(np.argmax(resampledIR, axis=-1) == 5)
+    assert np.allclose(resampledDelay, delay / 2.)
+
+    chunks = list(SOFAResampler.iterResampledIR(sofafile, 48000, chunkSize=2))
+    assert [(start, stop) for start, stop, _ in chunks] == [(0, 2), (2, 4), (4, 5)]
+
+    # Cached results
+    cachedIR, cachedDelay = sofafile.getDataIRResampled(48000, cacheDirectory=cacheDirectory)
+    assert np.allclose(cachedIR, resampledIR)
+    assert len(os.listdir(cacheDirectory)) == 1
+    cachedIR, cachedDelay = sofafile.getDataIRResampled(48000, cacheDirectory=cacheDirectory)
+    assert np.allclose(cachedIR, resampledIR)
+    assert np.allclose(cachedDelay, delay / 2.)
+    assert len(os.listdir(cacheDirectory)) == 1
+
+    # Another target rate is another entry
+    sofafile.getDataIRResampled(44100, cacheDirectory=cacheDirectory)
+    assert len(os.listdir(cacheDirectory)) == 2
+    sofafile.close()
+
+    # Files read from memory are not cached
+    with open(path, 'rb') as f:
+        sofafile = SOFAFile.fromBytes(f.read())
+    cachedIR, cachedDelay = sofafile.getDataIRResampled(32000, cacheDirectory=cacheDirectory)
+    assert cachedIR.shape == (5, 2, 32)
+    assert len(os.listdir(cacheDirectory)) == 2
+    sofafile.close()
+
+    # Non unique sampling rate
+    createFile(path, ir, [48000., 48000., 48000., 44100., 48000.], delay)
+    sofafile = SOFAFile(path, 'r')
+    with pytest.raises(SOFAError) as e:
+        sofafile.getDataIRResampled(48000)
+    assert e.match('Data.SamplingRate is not unique')
+    sofafile.close()
+
+    os.remove(path)
+    shutil.rmtree(cacheDirectory)
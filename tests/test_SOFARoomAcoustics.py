@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFARoomAcoustics.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import os
+import tempfile
+import numpy as np
+from netCDF4 import Dataset
+from pysofaconventions import *
+
+
+samplingRate = 8000.
+
+
+def exponentialDecay(reverberationTime, length=2.):
+
+    t = np.arange(int(length * samplingRate)) / samplingRate
+    return np.exp(-3. * np.log(10.) * t / reverberationTime)
+
+
+def test_getEnergyDecayCurve():
+
+    edc = SOFARoomAcoustics.getEnergyDecayCurve([[1., 1., 0., 0.], [0., 0., 0., 0.]])
+    assert np.allclose(edc[0], [0., 10 * np.log10(0.5), -np.inf, -np.inf])
+    assert np.isnan(edc[1]).all()
+
+
+def test_getDecayTime():
+
+    edc = SOFARoomAcoustics.getEnergyDecayCurve(exponentialDecay(0.5))
+    assert np.isclose(SOFARoomAcoustics.getDecayTime(edc, samplingRate, -5., -25.), 0.5, rtol=1e-3)
+
+    # Range not reached
+    assert np.isnan(SOFARoomAcoustics.getDecayTime(edc[:10], samplingRate, -5., -25.))
+
+
+def test_getParameters():
+
+    # Batched over leading axes
+    ir = np.stack([exponentialDecay(0.5), exponentialDecay(1.)])[np.newaxis]
+    parameters = SOFARoomAcoustics.getParameters(ir, samplingRate)
+    assert set(parameters.keys()) == set(SOFARoomAcoustics.parameterNames)
+    for name in ['EDT', 'T20', 'T30']:
+        assert parameters[name].shape == (1, 2)
+        assert np.allclose(parameters[name], [[0.5, 1.]], rtol=1e-2)
+
+    a = 3. * np.log(10.) / np.array([0.5, 1.])
+    assert np.allclose(parameters['C50'], 10 * np.log10(np.exp(0.1 * a) - 1.), atol=0.05)
+    assert np.allclose(parameters['C80'], 10 * np.log10(np.exp(0.16 * a) - 1.), atol=0.05)
+    assert np.allclose(parameters['D50'], 1. - np.exp(-0.1 * a), atol=1e-2)
+    assert np.allclose(parameters['Ts'], 1. / (2 * a), rtol=1e-2)
+
+    # Direct sound and a single reflection, relative to the onset
+    ir = np.zeros(2000)
+    ir[10] = 1.
+    ir[510] = 0.1
+    parameters = SOFARoomAcoustics.getParameters(ir, samplingRate)
+    assert np.isclose(parameters['DRR'], 20.)
+    assert np.isclose(parameters['C50'], 20.)
+    assert np.isinf(parameters['C80'])
+    assert np.isclose(parameters['D50'], 1. / 1.01)
+    assert np.isclose(parameters['Ts'], 0.01 * 500. / samplingRate / 1.01)
+
+    # Silence
+    parameters = SOFARoomAcoustics.getParameters(np.zeros(100), samplingRate)
+    assert all(np.isnan(parameters[name]) for name in SOFARoomAcoustics.parameterNames)
+
+
+def test_getOctaveBands():
+
+    t = np.arange(8000) / samplingRate
+    signal = np.cos(2 * np.pi * 1000. * t)
+    bands = SOFARoomAcoustics.getOctaveBands(signal[np.newaxis], samplingRate)
+    assert bands.shape == (1, len(SOFARoomAcoustics.octaveBands), 8000)
+    energy = np.sum(bands[0] ** 2, axis=-1)
+    assert np.argmax(energy) == list(SOFARoomAcoustics.octaveBands).index(1000.)
+    assert energy[3] > 0.9 * np.sum(signal ** 2)
+
+    assert SOFARoomAcoustics.getOctaveBands(signal, samplingRate, [500., 1000.]).shape == (2, 8000)
+
+    # Butterworth responses, -3 dB per direction at the band edges
+    response = SOFARoomAcoustics.getOctaveBandResponse(np.array([0., 1000. / np.sqrt(2.), 1000., 1000. * np.sqrt(2.),
+                                                                 samplingRate / 2.]), samplingRate, 1000.)
+    assert np.allclose(response, [0., 0.5, 1., 0.5, 0.])
+    assert not SOFARoomAcoustics.getOctaveBandResponse(np.array([1000.]), samplingRate, 8000.).any()
+
+    # Smooth responses do not ring far before the onset
+    impulse = np.zeros(8000)
+    impulse[2000] = 1.
+    band = SOFARoomAcoustics.getOctaveBands(impulse, samplingRate, [1000.])[0]
+    assert np.sum(band[:1950] ** 2) < 1e-5 * np.sum(band ** 2)
+
+
+def test_getFileParameters():
+
+    fd, path = tempfile.mkstemp()
+
+    ir = np.stack([exponentialDecay(r, 1.) for r in [0.2, 0.3, 0.4, 0.5, 0.6, 0.7]]).reshape(3, 2, -1)
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.createDimension('I', 1)
+    rootgrp.createDimension('M', 3)
+    rootgrp.createDimension('R', 2)
+    rootgrp.createDimension('N', ir.shape[-1])
+    rootgrp.createVariable('Data.SamplingRate', 'f8', ('I',))[:] = samplingRate
+    rootgrp.createVariable('Data.IR', 'f8', ('M', 'R', 'N'))[:] = ir
+    rootgrp.close()
+
+    sofafile = SOFAFile(path, 'r')
+    results = SOFARoomAcoustics.getFileParameters(sofafile, chunkSize=2)
+    assert results['dimensions'] == ('M', 'R')
+    assert results['bands'] is None
+    assert np.allclose(results['T20'], np.array([0.2, 0.3, 0.4, 0.5, 0.6, 0.7]).reshape(3, 2), rtol=1e-2)
+    assert np.allclose(results['C50'], SOFARoomAcoustics.getParameters(ir, samplingRate)['C50'])
+
+    results = SOFARoomAcoustics.getFileParameters(sofafile, bands=[500., 1000.])
+    assert results['dimensions'] == ('M', 'R', 'B')
+    assert np.array_equal(results['bands'], [500., 1000.])
+    assert results['T30'].shape == (3, 2, 2)
+    sofafile.close()
+
+    os.remove(path)
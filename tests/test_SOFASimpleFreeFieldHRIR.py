@@ -38,8 +38,10 @@
 import pytest
 import os
 import tempfile
+import shutil
 import time
 from netCDF4 import Dataset
+import numpy as np
 from pysofaconventions import *
 
 
@@ -254,4 +256,148 @@ def test_isValid():
     rootgrp.close()
 
     # Data type should be FIR
-    raiseWarning('DataType is not "FIR", got: "FIRE"')
\ No newline at end of file
+    raiseWarning('DataType is not "FIR", got: "FIRE"')
+
+
+def createHRIRFile(path, ir, delay, samplingRate=48000.):
+
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.Conventions = 'SOFA'
+    rootgrp.Version = '1.0'
+    rootgrp.SOFAConventions = 'SimpleFreeFieldHRIR'
+    rootgrp.SOFAConventionsVersion = '1.0'
+    rootgrp.APIName = 'pysofaconventions'
+    rootgrp.APIVersion = '0.1'
+    rootgrp.AuthorContact = 'andres.perez@eurecat.org'
+    rootgrp.Organization = 'Eurecat - UPF'
+    rootgrp.License = 'WTFPL - Do What the Fuck You Want to Public License'
+    rootgrp.DataType = 'FIR'
+    rootgrp.RoomType = 'free field'
+    rootgrp.DateCreated = time.ctime(time.time())
+    rootgrp.DateModified = time.ctime(time.time())
+    rootgrp.Title = 'testpysofaconventions'
+    rootgrp.ListenerShortName = 'AmazinglyShortName'
+    rootgrp.DatabaseName = 'IncredibleDatabase'
+    m, r, n = ir.shape
+    rootgrp.createDimension('I', 1)
+    rootgrp.createDimension('N', n)
+    rootgrp.createDimension('C', 3)
+    rootgrp.createDimension('M', m)
+    rootgrp.createDimension('R', r)
+    rootgrp.createDimension('E', 1)
+    sr = rootgrp.createVariable('Data.SamplingRate', 'f8', ('I',))
+    sr.Units = 'hertz'
+    sr[:] = samplingRate
+    rootgrp.createVariable('Data.Delay', 'f8', ('I', 'R'))[:] = delay
+    rootgrp.createVariable('Data.IR', 'f8', ('M', 'R', 'N'))[:] = ir
+    listenerPositionVar = rootgrp.createVariable('ListenerPosition', 'f8', ('I', 'C'))
+    listenerPositionVar.Units = 'metre'
+    listenerPositionVar.Type = 'cartesian'
+    sourcePositionVar = rootgrp.createVariable('SourcePosition', 'f8', ('M', 'C'))
+    sourcePositionVar.Units = 'degree, degree, metre'
+    sourcePositionVar.Type = 'spherical'
+    sourcePositionVar[:] = np.stack([np.linspace(0, 360, m, endpoint=False), np.zeros(m), np.ones(m)], axis=1)
+    receiverPositionVar = rootgrp.createVariable('ReceiverPosition', 'f8', ('R', 'C', 'I'))
+    receiverPositionVar.Units = 'metre'
+    receiverPositionVar.Type = 'cartesian'
+    emitterPositionVar = rootgrp.createVariable('EmitterPosition', 'f8', ('E', 'C', 'I'))
+    emitterPositionVar.Units = 'metre'
+    emitterPositionVar.Type = 'cartesian'
+    rootgrp.close()
+
+
+def test_getMinimumPhaseDecomposition():
+
+    fd, path = tempfile.mkstemp()
+    fd, outPath = tempfile.mkstemp()
+    cacheDirectory = tempfile.mkdtemp()
+
+    m, n = 6, 64
+    ir = np.zeros((m, 2, n))
+    ir[:, 0, 10:13] = [1., 0.5, 0.25]
+    ir[:, 1, 14:17] = [0.5, 0.25, 0.125]
+    createHRIRFile(path, ir, [[1., 2.]])
+
+    hrir = SOFASimpleFreeFieldHRIR(path, 'r')
+    minimumPhaseIR, delay, itd = hrir.getMinimumPhaseDecomposition(chunkSize=4)
+    assert minimumPhaseIR.shape == (m, 2, n)
+    assert np.allclose(minimumPhaseIR[:, 0, :3], [1., 0.5, 0.25], atol=1e-6)
+    assert np.allclose(delay, [[11., 16.]] * m)
+    assert np.allclose(itd, -5. / 48000.)
+
+    chunks = list(hrir.iterMinimumPhaseDecomposition(chunkSize=4))
+    assert [(start, stop) for start, stop, _, _ in chunks] == [(0, 4), (4, 6)]
+
+    # Cache
+    cached = hrir.getMinimumPhaseDecomposition(cacheDirectory=cacheDirectory)
+    cached = hrir.getMinimumPhaseDecomposition(cacheDirectory=cacheDirectory)
+    assert len(os.listdir(cacheDirectory)) == 1
+    assert np.allclose(cached[0], minimumPhaseIR)
+    assert np.allclose(cached[1], delay)
+
+    # New SOFA file with delays along M
+    hrir.writeMinimumPhaseFile(outPath, chunkSize=4)
+    hrir.close()
+
+    decomposed = SOFASimpleFreeFieldHRIR(outPath, 'r')
+    assert decomposed.isValid()
+    assert decomposed.getVariableShape('Data.Delay') == (m, 2)
+    assert np.allclose(decomposed.getDataIR(), minimumPhaseIR)
+    assert np.allclose(decomposed.getDataDelay(), delay)
+    assert np.allclose(decomposed.getSourcePositionValues()[:, 0], np.linspace(0, 360, m, endpoint=False))
+    decomposed.close()
+
+    os.remove(path)
+    os.remove(outPath)
+    shutil.rmtree(cacheDirectory)
+
+
+def test_getSphericalHarmonicHRTF():
+
+    fd, path = tempfile.mkstemp()
+
+    # Same HRIR for all directions: fully described by the zeroth order
+    m, n = 8, 32
+    ir = np.zeros((m, 2, n))
+    ir[:, 0, 3] = 1.
+    ir[:, 1, 5] = 0.5
+    createHRIRFile(path, ir, [[0., 0.]])
+
+    hrir = SOFASimpleFreeFieldHRIR(path, 'r')
+    model = hrir.getSphericalHarmonicHRTF(0, regularization=0.)
+    assert model.coefficients.shape == (1, 2, n // 2 + 1)
+    assert model.fittingError < -100.
+    assert np.allclose(model.evaluateIR([33.], [12.]), ir[:1])
+    assert hrir.getSphericalHarmonicHRTF(1, chunkSize=3).order == 1
+    hrir.close()
+
+    os.remove(path)
+
+
+def test_fromBytes():
+
+    fd, path = tempfile.mkstemp()
+
+    m, n = 4, 8
+    ir = np.random.randn(m, 2, n)
+    createHRIRFile(path, ir, [[0., 0.]])
+    with open(path, 'rb') as f:
+        buffer = f.read()
+    os.remove(path)
+
+    hrir = SOFASimpleFreeFieldHRIR.fromBytes(buffer, name='upload.sofa')
+    assert isinstance(hrir, SOFASimpleFreeFieldHRIR)
+    assert hrir.getFilename() == 'upload.sofa'
+    assert hrir.isValid()
+    assert np.allclose(hrir.getDataIR(), ir)
+    assert hrir.getGlobalAttributeValue('DatabaseName') == 'IncredibleDatabase'
+    hrir.close()
+
+    sofafile = SOFAFile.fromBytes(memoryview(bytearray(buffer)))
+    assert type(sofafile) is SOFAFile
+    assert sofafile.getFilename() == '<memory>'
+    assert sofafile.getDimensionSize('M') == m
+    sofafile.close()
+
+    with pytest.raises((IOError, OSError)):
+        SOFAFile.fromBytes(b'not a netCDF file')
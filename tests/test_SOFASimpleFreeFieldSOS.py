@@ -40,6 +40,7 @@ import os
 import tempfile
 import time
 from netCDF4 import Dataset
+import numpy as np
 from pysofaconventions import *
 
 
@@ -203,4 +204,51 @@ def test_isValid():
     rootgrp.close()
 
     # Data type should be SOS
-    raiseWarning('DataType is not "SOS", got: "FIRE"')
\ No newline at end of file
+    raiseWarning('DataType is not "SOS", got: "FIRE"')
+
+def test_getDataIRFromSOS():
+
+    fd, path = tempfile.mkstemp()
+
+    m, r = 3, 2
+    identity = [1., 0., 0., 1., 0., 0.]
+    gain = [0.5, 0., 0., 1., 0., 0.]
+    delay = [0., 1., 0., 1., 0., 0.]
+
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.Conventions = 'SOFA'
+    rootgrp.SOFAConventions = 'SimpleFreeFieldSOS'
+    rootgrp.DataType = 'SOS'
+    rootgrp.createDimension('M', m)
+    rootgrp.createDimension('R', r)
+    rootgrp.createDimension('N', 12)
+    sos = rootgrp.createVariable('Data.IR', 'f8', ('M', 'R', 'N'))
+    sos[0] = [identity + identity] * r
+    sos[1] = [gain + identity] * r
+    sos[2] = [gain + delay] * r
+    rootgrp.close()
+
+    simpleFreeFieldSOS = SOFASimpleFreeFieldSOS(path, 'r')
+
+    ir = simpleFreeFieldSOS.getDataIRFromSOS(4, chunkSize=2)
+    assert ir.shape == (m, r, 4)
+    assert np.allclose(ir[0], [1., 0., 0., 0.])
+    assert np.allclose(ir[1], [0.5, 0., 0., 0.])
+    assert np.allclose(ir[2], [0., 0.5, 0., 0.])
+
+    chunks = list(simpleFreeFieldSOS.iterDataIRFromSOS(4, chunkSize=2))
+    assert [(start, stop) for start, stop, _ in chunks] == [(0, 2), (2, 3)]
+
+    simpleFreeFieldSOS.close()
+
+    # Not a SOS file
+    rootgrp = Dataset(path, 'a')
+    rootgrp.DataType = 'FIR'
+    rootgrp.close()
+    simpleFreeFieldSOS = SOFASimpleFreeFieldSOS(path, 'r')
+    with pytest.raises(SOFAError) as e:
+        simpleFreeFieldSOS.getDataIRFromSOS(4)
+    assert e.match('DataType is not SOS')
+    simpleFreeFieldSOS.close()
+
+    os.remove(path)
@@ -39,6 +39,7 @@ import pytest
 import os
 import tempfile
 import time
+import numpy as np
 from netCDF4 import Dataset
 from pysofaconventions import *
 
@@ -212,4 +213,26 @@ def test_isValid():
     rootgrp.close()
 
     # Data type should be FIR
-    raiseWarning('DataType is not "FIR", got: "FIRE"')
\ No newline at end of file
+    raiseWarning('DataType is not "FIR", got: "FIRE"')
+
+def test_getRoomAcousticParameters():
+
+    fd, path = tempfile.mkstemp()
+
+    t = np.arange(4000) / 8000.
+    ir = np.exp(-3. * np.log(10.) * t / 0.25) * np.ones((2, 3, 1))
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    for name, size in zip('IMRN', (1,) + ir.shape):
+        rootgrp.createDimension(name, size)
+    rootgrp.createVariable('Data.SamplingRate', 'f8', ('I',))[:] = 8000.
+    rootgrp.createVariable('Data.IR', 'f8', ('M', 'R', 'N'))[:] = ir
+    rootgrp.close()
+
+    drir = SOFASingleRoomDRIR(path, 'r')
+    parameters = drir.getRoomAcousticParameters()
+    assert parameters['dimensions'] == ('M', 'R')
+    assert np.allclose(parameters['T30'], 0.25, rtol=1e-2)
+    assert drir.getRoomAcousticParameters(bands=[1000.], chunkSize=1)['EDT'].shape == (2, 3, 1)
+    drir.close()
+
+    os.remove(path)
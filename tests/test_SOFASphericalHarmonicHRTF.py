@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFASphericalHarmonicHRTF.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import os
+import tempfile
+import numpy as np
+from netCDF4 import Dataset
+from pysofaconventions import *
+
+
+def createFile(path, ir, azimuth, elevation):
+
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.Conventions = 'SOFA'
+    rootgrp.DataType = 'FIR'
+    rootgrp.createDimension('I', 1)
+    rootgrp.createDimension('C', 3)
+    rootgrp.createDimension('M', ir.shape[0])
+    rootgrp.createDimension('R', ir.shape[1])
+    rootgrp.createDimension('N', ir.shape[2])
+    sr = rootgrp.createVariable('Data.SamplingRate', 'f8', ('I',))
+    sr.Units = 'hertz'
+    sr[:] = 48000.
+    rootgrp.createVariable('Data.IR', 'f8', ('M', 'R', 'N'))[:] = ir
+    sourcePositionVar = rootgrp.createVariable('SourcePosition', 'f8', ('M' if len(azimuth) > 1 else 'I', 'C'))
+    sourcePositionVar.Units = 'degree, degree, metre'
+    sourcePositionVar.Type = 'spherical'
+    sourcePositionVar[:] = np.stack([azimuth, elevation, np.ones(len(azimuth))], axis=1)
+    rootgrp.close()
+
+
+def getGrid(order):
+
+    nodes, weights = np.polynomial.legendre.leggauss(order + 1)
+    numAzimuths = 2 * order + 2
+    elevation = np.repeat(np.degrees(np.arcsin(nodes)), numAzimuths)
+    azimuth = np.tile(np.arange(numAzimuths) * 360. / numAzimuths, order + 1)
+    return azimuth, elevation
+
+
+def test_fit():
+
+    fd, path = tempfile.mkstemp()
+    fd, modelPath = tempfile.mkstemp(suffix='.npz')
+
+    # HRIRs which are exactly band limited to order 2
+    order, n = 2, 16
+    azimuth, elevation = getGrid(4)
+    coefficients = np.random.randn(9, 2, n)
+    basis = SOFASphericalHarmonics.getBasis(order, np.radians(azimuth), np.radians(elevation))
+    ir = np.tensordot(basis, coefficients, axes=(1, 0))
+    createFile(path, ir, azimuth, elevation)
+
+    sofafile = SOFAFile(path, 'r')
+    model = SOFASphericalHarmonicHRTF.fit(sofafile, order, regularization=0., chunkSize=7)
+    sofafile.close()
+
+    assert model.order == order
+    assert model.coefficients.shape == (9, 2, n // 2 + 1)
+    assert model.samplingRate == 48000.
+    assert model.fittingError < -100.
+    assert np.allclose(model.getCoefficientsIR(), coefficients)
+
+    # Evaluation at arbitrary directions
+    testAzimuth = np.array([12., 200., 77.])
+    testElevation = np.array([-40., 10., 85.])
+    testBasis = SOFASphericalHarmonics.getBasis(order, np.radians(testAzimuth), np.radians(testElevation))
+    expected = np.tensordot(testBasis, coefficients, axes=(1, 0))
+    assert np.allclose(model.evaluateIR(testAzimuth, testElevation), expected)
+    assert np.allclose(model.evaluateIR(np.radians(testAzimuth), np.radians(testElevation), degrees=False), expected)
+    assert model.evaluate(testAzimuth, testElevation).shape == (3, 2, n // 2 + 1)
+
+    # Lower order fit reports the error
+    sofafile = SOFAFile(path, 'r')
+    lowModel = SOFASphericalHarmonicHRTF.fit(sofafile, 1)
+    assert -100. < lowModel.fittingError < 0.
+    sofafile.close()
+
+    # Save and load
+    model.save(modelPath)
+    loaded = SOFASphericalHarmonicHRTF.load(modelPath)
+    assert loaded.coefficients.dtype == np.complex64
+    assert loaded.order == order
+    assert loaded.numSamples == n
+    assert loaded.regularization == 0.
+    assert np.isclose(loaded.fittingError, model.fittingError)
+    assert np.allclose(loaded.evaluateIR(testAzimuth, testElevation), expected, atol=1e-5)
+
+    SOFASphericalHarmonicHRTF(np.zeros((4, 2, 3)), 48000., 4).save(modelPath)
+    assert SOFASphericalHarmonicHRTF.load(modelPath).fittingError is None
+
+    with pytest.raises(SOFAError) as e:
+        SOFASphericalHarmonicHRTF(np.zeros((5, 2, 3)), 48000., 4)
+    assert e.match('Invalid number of coefficients')
+
+    # Silence, with a single source position
+    createFile(path, np.zeros_like(ir), [0.], [0.])
+    sofafile = SOFAFile(path, 'r')
+    assert SOFASphericalHarmonicHRTF.fit(sofafile, 1).fittingError == -np.inf
+    sofafile.close()
+
+    os.remove(path)
+    os.remove(modelPath)
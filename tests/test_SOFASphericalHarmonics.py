@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFASphericalHarmonics.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import numpy as np
+from pysofaconventions import *
+
+
+def test_getNumCoefficients():
+
+    assert SOFASphericalHarmonics.getNumCoefficients(0) == 1
+    assert SOFASphericalHarmonics.getNumCoefficients(3) == 16
+
+
+def test_getOrderAndDegree():
+
+    assert SOFASphericalHarmonics.getOrderAndDegree(0) == (0, 0)
+    assert SOFASphericalHarmonics.getOrderAndDegree(1) == (1, -1)
+    assert SOFASphericalHarmonics.getOrderAndDegree(3) == (1, 1)
+    assert SOFASphericalHarmonics.getOrderAndDegree(6) == (2, 0)
+
+
+def test_getDirections():
+
+    azimuth, elevation = SOFASphericalHarmonics.getDirections([[90., 45., 1.], [0., 0., 2.]], 'spherical',
+                                                              'degree, degree, metre')
+    assert np.allclose(azimuth, [np.pi / 2, 0.])
+    assert np.allclose(elevation, [np.pi / 4, 0.])
+
+    azimuth, elevation = SOFASphericalHarmonics.getDirections([[1., 0.5, 1.]], 'spherical', 'radian, radian, metre')
+    assert np.allclose(azimuth, [1.])
+    assert np.allclose(elevation, [0.5])
+
+    azimuth, elevation = SOFASphericalHarmonics.getDirections([[0., 2., 0.], [1., 0., 1.]], 'cartesian')
+    assert np.allclose(azimuth, [np.pi / 2, 0.])
+    assert np.allclose(elevation, [0., np.pi / 4])
+
+    with pytest.raises(SOFAError) as e:
+        SOFASphericalHarmonics.getDirections([[0., 0., 1.]], 'unknown')
+    assert e.match('Coordinate type not known')
+
+
+def test_getBasis():
+
+    azimuth = np.array([0., np.pi / 2, 1.])
+    elevation = np.array([0., 0., 0.3])
+
+    basis = SOFASphericalHarmonics.getBasis(1, azimuth, elevation)
+    assert basis.shape == (3, 4)
+    expected = np.stack([np.ones(3),
+                         np.sqrt(3) * np.cos(elevation) * np.sin(azimuth),
+                         np.sqrt(3) * np.sin(elevation),
+                         np.sqrt(3) * np.cos(elevation) * np.cos(azimuth)], axis=1)
+    assert np.allclose(basis, expected)
+
+    # Second order, ACN 4 and 6
+    basis = SOFASphericalHarmonics.getBasis(2, azimuth, elevation)
+    assert np.allclose(basis[:, 4], np.sqrt(15) / 2 * np.cos(elevation) ** 2 * np.sin(2 * azimuth))
+    assert np.allclose(basis[:, 6], np.sqrt(5) / 2 * (3 * np.sin(elevation) ** 2 - 1))
+
+    # N3D orthonormality (4 pi normalization), on a Gauss-Legendre x uniform grid
+    order = 4
+    nodes, weights = np.polynomial.legendre.leggauss(order + 1)
+    numAzimuths = 2 * order + 2
+    elevation = np.repeat(np.arcsin(nodes), numAzimuths)
+    azimuth = np.tile(np.arange(numAzimuths) * 2 * np.pi / numAzimuths, order + 1)
+    w = np.repeat(weights, numAzimuths) / (2 * numAzimuths)
+    basis = SOFASphericalHarmonics.getBasis(order, azimuth, elevation)
+    assert np.allclose(np.dot(basis.T * w, basis), np.eye(25))
+
+
+def test_getConversionMatrix():
+
+    azimuth = np.array([0.3, 2.])
+    elevation = np.array([0.4, -0.2])
+    n3d = SOFASphericalHarmonics.getBasis(3, azimuth, elevation).T
+
+    # FuMa first order: W = 1/sqrt(2), X = cos(el) cos(az), Y = cos(el) sin(az), Z = sin(el)
+    matrix = SOFASphericalHarmonics.getConversionMatrix(3, 'ACN', 'N3D', 'FuMa', 'FuMa')
+    fuma = np.dot(matrix, n3d)
+    assert np.allclose(fuma[0], 1. / np.sqrt(2.))
+    assert np.allclose(fuma[1], np.cos(elevation) * np.cos(azimuth))
+    assert np.allclose(fuma[2], np.cos(elevation) * np.sin(azimuth))
+    assert np.allclose(fuma[3], np.sin(elevation))
+    # MaxN: U = cos^2(el) cos(2 az), Q = cos^3(el) sin(3 az)
+    assert np.allclose(fuma[7], np.cos(elevation) ** 2 * np.cos(2 * azimuth))
+    assert np.allclose(fuma[15], np.cos(elevation) ** 3 * np.sin(3 * azimuth))
+
+    # Round trip
+    back = SOFASphericalHarmonics.getConversionMatrix(3, 'fuma', 'maxn', 'acn', 'n3d')
+    assert np.allclose(np.dot(back, fuma), n3d)
+
+    sn3d = np.dot(SOFASphericalHarmonics.getConversionMatrix(1, 'acn', 'n3d', 'acn', 'sn3d'), n3d[:4])
+    assert np.allclose(sn3d[2], np.sin(elevation))
+
+    with pytest.raises(SOFAError) as e:
+        SOFASphericalHarmonics.getConversionMatrix(4, 'fuma', 'sn3d')
+    assert e.match('FuMa ordering is only defined up to order 3')
+
+    with pytest.raises(SOFAError) as e:
+        SOFASphericalHarmonics.getConversionMatrix(4, 'acn', 'fuma')
+    assert e.match('FuMa normalization is only defined up to order 3')
+
+    with pytest.raises(SOFAError) as e:
+        SOFASphericalHarmonics.getConversionMatrix(1, 'sid', 'sn3d')
+    assert e.match('Channel ordering not known')
+
+    with pytest.raises(SOFAError) as e:
+        SOFASphericalHarmonics.getConversionMatrix(1, 'acn', 'unknown')
+    assert e.match('Normalization not known')
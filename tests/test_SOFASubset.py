@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFASubset.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import os
+import shutil
+import tempfile
+import time
+import warnings
+import numpy as np
+from netCDF4 import Dataset
+from pysofaconventions import *
+
+
+def createHRIRFile(path, sourcePositions, coordinates='spherical'):
+
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.Conventions = 'SOFA'
+    rootgrp.Version = '1.0'
+    rootgrp.SOFAConventions = 'SimpleFreeFieldHRIR'
+    rootgrp.SOFAConventionsVersion = '1.0'
+    rootgrp.APIName = 'pysofaconventions'
+    rootgrp.APIVersion = '0.1'
+    rootgrp.AuthorContact = 'andres.perez@eurecat.org'
+    rootgrp.Organization = 'Eurecat - UPF'
+    rootgrp.License = 'WTFPL - Do What the Fuck You Want to Public License'
+    rootgrp.DataType = 'FIR'
+    rootgrp.RoomType = 'free field'
+    rootgrp.DateCreated = time.ctime(time.time())
+    rootgrp.DateModified = time.ctime(time.time())
+    rootgrp.Title = 'testpysofaconventions'
+    rootgrp.ListenerShortName = 'AmazinglyShortName'
+    rootgrp.DatabaseName = 'IncredibleDatabase'
+    m = len(sourcePositions)
+    rootgrp.createDimension('I', 1)
+    rootgrp.createDimension('N', 4)
+    rootgrp.createDimension('C', 3)
+    rootgrp.createDimension('M', m)
+    rootgrp.createDimension('R', 2)
+    rootgrp.createDimension('E', 1)
+    sr = rootgrp.createVariable('Data.SamplingRate', 'f8', ('I',))
+    sr.Units = 'hertz'
+    sr[:] = 48000.
+    rootgrp.createVariable('Data.Delay', 'f8', ('I', 'R'))[:] = 0.
+    rootgrp.createVariable('Data.IR', 'f8', ('M', 'R', 'N'))[:] = np.arange(m * 8).reshape(m, 2, 4)
+    listenerPositionVar = rootgrp.createVariable('ListenerPosition', 'f8', ('I', 'C'))
+    listenerPositionVar.Units = 'metre'
+    listenerPositionVar.Type = 'cartesian'
+    sourcePositionVar = rootgrp.createVariable('SourcePosition', 'f8', ('M', 'C'))
+    sourcePositionVar.Units = 'degree, degree, metre' if coordinates == 'spherical' else 'metre'
+    sourcePositionVar.Type = coordinates
+    sourcePositionVar[:] = sourcePositions
+    receiverPositionVar = rootgrp.createVariable('ReceiverPosition', 'f8', ('R', 'C', 'I'))
+    receiverPositionVar.Units = 'metre'
+    receiverPositionVar.Type = 'cartesian'
+    emitterPositionVar = rootgrp.createVariable('EmitterPosition', 'f8', ('E', 'C', 'I'))
+    emitterPositionVar.Units = 'metre'
+    emitterPositionVar.Type = 'cartesian'
+    rootgrp.close()
+
+
+@pytest.fixture
+def grid():
+
+    directory = tempfile.mkdtemp()
+    azimuth, elevation = np.meshgrid(np.arange(0, 360, 30.), [-30., 0., 30.])
+    positions = np.stack([azimuth.ravel(), elevation.ravel(), 1.2 * np.ones(azimuth.size)], axis=1)
+    path = os.path.join(directory, 'hrir.sofa')
+    createHRIRFile(path, positions)
+    yield directory, path, positions
+    shutil.rmtree(directory)
+
+
+def test_getIndices(grid):
+
+    directory, path, positions = grid
+    sofafile = SOFAFile(path, 'r')
+
+    assert list(SOFASubset.getIndices(sofafile, [5, 1, 1, 30])) == [1, 5, 30]
+    assert list(SOFASubset.getIndices(sofafile, np.arange(36) % 12 == 0)) == [0, 12, 24]
+    for selection, message in [([36], 'Invalid measurement index'), ([-1], 'Invalid measurement index'),
+                               (np.ones(3, dtype=bool), 'Invalid mask shape')]:
+        with pytest.raises(SOFAError) as e:
+            SOFASubset.getIndices(sofafile, selection)
+        assert e.match(message)
+
+    horizontal = SOFASubset.getIndices(sofafile, SOFASubset.getHorizontalPlanePredicate(), chunkSize=5)
+    assert list(horizontal) == list(range(12, 24))
+    frontal = SOFASubset.getIndices(sofafile, SOFASubset.getFrontalHemispherePredicate())
+    assert np.all(np.abs(np.mod(positions[frontal, 0] + 180, 360) - 180) <= 90)
+    assert len(frontal) == 3 * 7
+    elevations = SOFASubset.getIndices(sofafile, SOFASubset.getElevationPredicate([-30, 30]))
+    assert list(elevations) == list(range(12)) + list(range(24, 36))
+
+    # Predicates on any variable, with scalar results broadcast
+    assert list(SOFASubset.getIndices(sofafile, lambda values: values['Data.IR'][:, 0, 0] >= 280,
+                                      variables=['Data.IR'])) == [35]
+    assert len(SOFASubset.getIndices(sofafile, lambda values: 'azimuth' not in values,
+                                     variables=['Data.IR'], chunkSize=7)) == 36
+    sofafile.close()
+
+
+def test_getDirectionValues(grid):
+
+    directory, path, positions = grid
+    createHRIRFile(path, [[1., 1., 0.], [0., 0., -2.]], coordinates='cartesian')
+    sofafile = SOFAFile(path, 'r')
+    directions = SOFASubset.getDirectionValues(sofafile, sofafile.getSourcePositionValues())
+    assert np.allclose(directions['azimuth'], [45., 0.])
+    assert np.allclose(directions['elevation'], [0., -90.])
+    assert np.allclose(directions['distance'], [np.sqrt(2.), 2.])
+    sofafile.close()
+
+    rootgrp = Dataset(path, 'a')
+    rootgrp.variables['SourcePosition'].Type = 'unknown'
+    rootgrp.close()
+    sofafile = SOFAFile(path, 'r')
+    assert SOFASubset.getDirectionValues(sofafile, sofafile.getSourcePositionValues()) == {}
+    sofafile.close()
+
+
+def test_getRuns():
+
+    assert SOFASubset.getRuns(np.array([0, 1, 2, 5, 6, 9])) == [(0, 3), (5, 7), (9, 10)]
+    assert SOFASubset.getRuns(np.arange(10), chunkSize=4) == [(0, 4), (4, 8), (8, 10)]
+    assert SOFASubset.getRuns(np.zeros(0, dtype=int)) == []
+
+
+def test_extract(grid):
+
+    directory, path, positions = grid
+    output = os.path.join(directory, 'subset.sofa')
+
+    sofafile = SOFASimpleFreeFieldHRIR(path, 'r')
+    ir = sofafile.getDataIR()
+    indices = sofafile.extract(SOFASubset.getHorizontalPlanePredicate(), output, chunkSize=5)
+    assert list(indices) == list(range(12, 24))
+    with pytest.raises(SOFAError) as e:
+        sofafile.extract(lambda values: values['elevation'] > 45, output)
+    assert e.match('No measurements selected')
+    sofafile.close()
+
+    subset = SOFASimpleFreeFieldHRIR(output, 'r')
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        assert subset.isValid()
+    assert subset.getDimensionSize('M') == 12
+    assert np.allclose(subset.getDataIR(), ir[12:24])
+    assert np.allclose(subset.getSourcePositionValues(), positions[12:24])
+    assert subset.getGlobalAttributeValue('DatabaseName') == 'IncredibleDatabase'
+    subset.close()
+
+    indices = SOFASubset.extract(path, [35, 0, 2, 3, 4, 17], output, chunkSize=2,
+                                 compression={'Data.IR': {'zlib': True, 'complevel': 4}})
+    assert list(indices) == [0, 2, 3, 4, 17, 35]
+    subset = SOFAFile(output, 'r')
+    assert np.allclose(subset.getDataIR(), ir[indices])
+    assert np.allclose(subset.getSourcePositionValues(), positions[indices])
+    assert subset.getVariableInstance('Data.IR').filters()['zlib']
+    subset.close()
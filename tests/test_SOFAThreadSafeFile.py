@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFAThreadSafeFile.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import os
+import shutil
+import tempfile
+import gc
+import threading
+import warnings
+from concurrent import futures
+import numpy as np
+from pysofaconventions import *
+from .conftest import createHRIRFile
+
+
+@pytest.fixture
+def path():
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'hrir.sofa')
+    createHRIRFile(path)
+    yield path
+    shutil.rmtree(directory)
+
+
+def test_read(path):
+
+    original = SOFASimpleFreeFieldHRIR(path, 'r')
+    ir = original.getDataIR()
+    for backend, backendClass in [('threadsafe', SOFAThreadSafeFile), ('threadsafe-h5py', SOFAThreadSafeH5pyFile)]:
+        sofafile = SOFASimpleFreeFieldHRIR(path, 'r', backend=backend)
+        assert type(sofafile.ncfile) is backendClass
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            assert sofafile.isValid()
+        assert sofafile.getGlobalAttributeValue('Index') == 3
+        assert [len(dimension) for dimension in sofafile.getDimensionsAsDict().values()] == [1, 5, 3, 7, 2, 1]
+        for name in original.getVariablesAsDict():
+            a, b = original.getVariableValue(name), sofafile.getVariableValue(name)
+            assert np.array_equal(np.ma.getmaskarray(a), np.ma.getmaskarray(b))
+            assert np.array_equal(np.ma.filled(a, 0), np.ma.filled(b, 0))
+        variable = sofafile.getVariableInstance('Data.IR')
+        assert variable.filters()['complevel'] == 4
+        assert variable.chunking() == original.getVariableInstance('Data.IR').chunking()
+        assert sofafile.getVariableAttributeValue('SourcePosition', '_FillValue') == -1.
+        variable.set_auto_maskandscale(False)
+        assert not np.ma.is_masked(variable[3])
+        variable.set_auto_maskandscale(True)
+
+        # Concurrent reads, with a handle per thread
+        dataset = sofafile.ncfile.file
+        assert dataset.getOpenHandles() == 1
+        barrier = threading.Barrier(4)
+
+        def read(measurement):
+            barrier.wait()
+            return measurement, sofafile.getVariableInstance('Data.IR')[measurement]
+
+        with futures.ThreadPoolExecutor(max_workers=4) as pool:
+            for measurement, values in pool.map(read, [0, 1, 2, 3]):
+                assert np.ma.allequal(values, ir[measurement])
+            assert dataset.getOpenHandles() == 5
+        # Handles are closed when their threads exit
+        gc.collect()
+        assert dataset.getOpenHandles() == 1
+        sofafile.close()
+        assert dataset.getOpenHandles() == 0
+    original.close()
+
+    with pytest.raises(SOFAError) as e:
+        SOFAFile(path, 'a', backend='threadsafe')
+    assert e.match('only open files for reading')
+
+
+def test_lockFree(path):
+
+    # h5py handles are read while another thread holds the netCDF lock
+    sofafile = SOFAFile(path, 'r', backend='threadsafe-h5py')
+    variable = sofafile.getVariableInstance('Data.IR')
+    with futures.ThreadPoolExecutor(max_workers=1) as pool:
+        # The handle of the worker is opened with the lock
+        pool.submit(variable.__getitem__, 0).result()
+        with SOFANetCDFFile.lock:
+            assert pool.submit(variable.__getitem__, 1).result(timeout=10).shape == (2, 5)
+    sofafile.close()
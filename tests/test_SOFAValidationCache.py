@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFAValidationCache.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import os
+import tempfile
+import time
+from netCDF4 import Dataset
+from pysofaconventions import *
+
+
+def createHRIRFile(path, roomType='free field'):
+
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.Conventions = 'SOFA'
+    rootgrp.Version = '1.0'
+    rootgrp.SOFAConventions = 'SimpleFreeFieldHRIR'
+    rootgrp.SOFAConventionsVersion = '1.0'
+    rootgrp.APIName = 'pysofaconventions'
+    rootgrp.APIVersion = '0.1'
+    rootgrp.AuthorContact = 'andres.perez@eurecat.org'
+    rootgrp.Organization = 'Eurecat - UPF'
+    rootgrp.License = 'WTFPL - Do What the Fuck You Want to Public License'
+    rootgrp.DataType = 'FIR'
+    rootgrp.RoomType = roomType
+    rootgrp.DateCreated = time.ctime(time.time())
+    rootgrp.DateModified = time.ctime(time.time())
+    rootgrp.Title = 'testpysofaconventions'
+    rootgrp.ListenerShortName = 'AmazinglyShortName'
+    rootgrp.DatabaseName = 'IncredibleDatabase'
+    rootgrp.createDimension('I', 1)
+    rootgrp.createDimension('N', 8)
+    rootgrp.createDimension('C', 3)
+    rootgrp.createDimension('M', 2)
+    rootgrp.createDimension('R', 2)
+    rootgrp.createDimension('E', 1)
+    sr = rootgrp.createVariable('Data.SamplingRate', 'f8', ('I',))
+    sr.Units = 'hertz'
+    sr[:] = 48000.
+    rootgrp.createVariable('Data.Delay', 'f8', ('I', 'R'))[:] = 0.
+    rootgrp.createVariable('Data.IR', 'f8', ('M', 'R', 'N'))[:] = 0.
+    for name, dimensions in [('ListenerPosition', ('I', 'C')), ('SourcePosition', ('I', 'C')),
+                             ('ReceiverPosition', ('R', 'C', 'I')), ('EmitterPosition', ('E', 'C', 'I'))]:
+        positionVar = rootgrp.createVariable(name, 'f8', dimensions)
+        positionVar.Units = 'metre'
+        positionVar.Type = 'cartesian'
+    rootgrp.close()
+
+
+def setModificationTime(path, offset):
+
+    os.utime(path, (time.time() + offset, time.time() + offset))
+
+
+def test_getValidationKey(monkeypatch):
+
+    key = SOFAValidationCache.getValidationKey(SOFASimpleFreeFieldHRIR)
+    assert key == SOFAValidationCache.getValidationKey(SOFASimpleFreeFieldHRIR)
+    assert key != SOFAValidationCache.getValidationKey(SOFAFile)
+    monkeypatch.setattr(SOFAVersion, 'SOFAValidationRulesVersion', SOFAVersion.SOFAValidationRulesVersion + 1)
+    assert SOFAValidationCache.getValidationKey(SOFASimpleFreeFieldHRIR) != key
+    monkeypatch.setattr(SOFASimpleFreeFieldHRIR, 'conventionVersionMinor', 1)
+    assert SOFAValidationCache.getValidationKey(SOFASimpleFreeFieldHRIR) != key
+    monkeypatch.undo()
+    assert SOFAValidationCache.getValidationKey(SOFASimpleFreeFieldHRIR) == key
+    assert SOFAValidationCache.getConventionClass('GeneralFIR') is SOFAGeneralFIR
+    assert SOFAValidationCache.getConventionClass('Unknown') is SOFAFile
+
+
+def test_validate(monkeypatch):
+
+    fd, databasePath = tempfile.mkstemp(suffix='.db')
+    fd, path = tempfile.mkstemp(suffix='.sofa')
+    createHRIRFile(path)
+
+    cache = SOFAValidationCache(databasePath)
+    assert cache.validate(path) == (True, [], False)
+    assert cache.validate(path) == (True, [], True)
+    cache.close()
+
+    # Results persist across instances, and are invalidated by modifications
+    cache = SOFAValidationCache(databasePath)
+    assert cache.validate(path)[2]
+    createHRIRFile(path, roomType='reverberant')
+    setModificationTime(path, 10)
+    valid, messages, cached = cache.validate(path)
+    assert not valid and not cached
+    assert 'RoomType is not "free field"' in messages[-1]
+    with pytest.warns(SOFAWarning) as record:
+        assert not cache.isValid(path)
+    assert 'RoomType' in str(record[-1].message)
+
+    # Validation rules changed
+    monkeypatch.setattr(SOFAVersion, 'SOFAValidationRulesVersion', SOFAVersion.SOFAValidationRulesVersion + 1)
+    assert cache.validate(path)[2] is False
+    assert cache.validate(path)[2] is True
+    monkeypatch.undo()
+    assert cache.validate(path)[2] is False
+
+    # Another convention class
+    assert cache.validate(path, conventionClass=SOFAFile) == (True, [], False)
+    assert cache.validate(path, conventionClass=SOFASimpleFreeFieldHRIR)[2] is False
+
+    # Instances
+    sofafile = SOFASimpleFreeFieldHRIR(path, 'r')
+    assert cache.validate(sofafile)[:2] == (False, messages)
+    assert cache.validate(sofafile)[2] is True
+    sofafile.close()
+    sofafile = SOFAFile(path, 'r')
+    assert cache.validate(sofafile, conventionClass=SOFASimpleFreeFieldHRIR)[:2] == (False, messages)
+    sofafile.close()
+
+    # Content hash: touched files are not validated again, changed contents are
+    assert cache.validate(path, contentHash=True)[2] is False
+    setModificationTime(path, 20)
+    assert cache.validate(path, contentHash=True)[2] is True
+    assert cache.validate(path)[2] is True
+    size = os.path.getsize(path)
+    createHRIRFile(path, roomType='free-field!')
+    assert os.path.getsize(path) == size
+    setModificationTime(path, 20)
+    assert cache.validate(path, contentHash=True)[2] is False
+
+    cache.remove(path)
+    assert cache.validate(path)[2] is False
+    cache.clear()
+    assert cache.validate(path)[2] is False
+    cache.close()
+
+    os.remove(path)
+    os.remove(databasePath)
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+# Copyright (c) 2018, Eurecat / UPF
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the <organization> nor the
+#       names of its contributors may be used to endorse or promote products
+#       derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   @file   test_SOFAWriter.py
+#   @author Andrés Pérez-López
+#   @date   19/10/2026
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import pytest
+import os
+import re
+import tempfile
+import numpy as np
+from netCDF4 import Dataset
+from pysofaconventions import *
+
+
+def test_getDateString():
+
+    assert re.match(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$', SOFAWriter.getDateString())
+
+
+def test_createFromTemplate():
+
+    fd, path = tempfile.mkstemp()
+    fd, outPath = tempfile.mkstemp()
+
+    rootgrp = Dataset(path, 'w', format='NETCDF4')
+    rootgrp.Conventions = 'SOFA'
+    rootgrp.DateModified = 'yesterday'
+    rootgrp.createDimension('M', 5)
+    rootgrp.createDimension('N', 3)
+    rootgrp.createDimension('I', 1)
+    ir = rootgrp.createVariable('Data.IR', 'f4', ('M', 'N'), zlib=True, complevel=4, shuffle=True)
+    ir.Units = 'none'
+    ir[:] = np.arange(15).reshape(5, 3)
+    rootgrp.createVariable('Data.Delay', 'f8', ('I',), fill_value=-1.)[:] = 2.
+    rootgrp.createVariable('Unwritten', 'f8', ('M',))
+    rootgrp.createVariable('Scalar', 'i4')[:] = 7
+    rootgrp.close()
+
+    sofafile = SOFAFile(path, 'r')
+    assert SOFAWriter.getVariableCompression(sofafile.getVariableInstance('Data.IR')) == \
+        {'zlib': True, 'complevel': 4, 'shuffle': True}
+
+    # Plain copy
+    target = SOFAWriter.createFromTemplate(sofafile, outPath, chunkSize=2)
+    target.close()
+    copy = SOFAFile(outPath, 'r')
+    assert copy.getGlobalAttributeValue('Conventions') == 'SOFA'
+    assert copy.getGlobalAttributeValue('DateModified') != 'yesterday'
+    assert copy.getDimensionSize('M') == 5
+    assert np.array_equal(copy.getDataIR(), np.arange(15).reshape(5, 3))
+    assert copy.getVariableInstance('Data.IR').dtype == np.float32
+    assert copy.getVariableAttributeValue('Data.IR', 'Units') == 'none'
+    assert copy.getVariableInstance('Data.IR').filters()['zlib']
+    assert copy.getVariableAttributeValue('Data.Delay', '_FillValue') == -1.
+    assert np.ma.getmaskarray(copy.getVariableValue('Unwritten')).all()
+    assert copy.getVariableValue('Scalar') == 7
+    copy.close()
+
+    # Overriden dimensions and variables are left to the caller
+    target = SOFAWriter.createFromTemplate(sofafile, outPath, dimensions={'N': 6, 'K': 2},
+                                           variables={'Data.Delay': ('M',), 'Extra': ('K',)},
+                                           skipVariables=('Data.IR',),
+                                           compression={'Data.IR': {'zlib': False}})
+    assert target.dimensions['N'].size == 6
+    assert target.variables['Data.IR'].shape == (5, 6)
+    assert not target.variables['Data.IR'].filters()['zlib']
+    assert target.variables['Data.Delay'].shape == (5,)
+    assert target.variables['Extra'].shape == (2,)
+    target.variables['Data.IR'][:] = np.ones((5, 6))
+    target.close()
+    copy = SOFAFile(outPath, 'r')
+    assert np.array_equal(copy.getDataIR(), np.ones((5, 6)))
+    assert np.ma.getmaskarray(copy.getDataDelay()).all()
+    copy.close()
+
+    # Errors close the new file
+    with pytest.raises(Exception):
+        SOFAWriter.createFromTemplate(sofafile, outPath, variables={'Data.IR': ('Unknown',)})
+
+    sofafile.close()
+    os.remove(path)
+    os.remove(outPath)